@@ -3,7 +3,7 @@ Nicole V7 Configuration - Tiger Native
 """
 
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 
@@ -103,6 +103,19 @@ class Settings(BaseSettings):
     BRAVE_API_KEY: str = ""
     RECRAFT_API_KEY: str = ""  # For image generation via MCP bridge
 
+    # MCP Server Supervisor (stdio servers)
+    MCP_BROWSER_POOL_SIZE: int = 3  # Warm puppeteer workers (sessions pinned per worker)
+    MCP_STATELESS_POOL_SIZE: int = 2  # Warm workers for fetch / search servers
+    MCP_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    MCP_PING_TIMEOUT_SECONDS: int = 5
+    MCP_PING_FAILURE_THRESHOLD: int = 2  # Consecutive missed pings before restart
+    MCP_RESTART_BACKOFF_BASE_SECONDS: float = 1.0
+    MCP_RESTART_BACKOFF_MAX_SECONDS: float = 120.0
+
+    # MCP Tool Result Cache (read-only tools, see app/mcp/mcp_tool_cache.py)
+    MCP_TOOL_CACHE_ENABLED: bool = True
+    MCP_TOOL_CACHE_MAX_ENTRIES: int = 1024
+
     # Gemini API
     GEMINI_API_KEY: str = ""
     GEMINI_PRO_MODEL: str = "gemini-3-pro-preview"
@@ -145,18 +158,116 @@ class Settings(BaseSettings):
     MEMORY_MAX_DAILY_PER_USER: int = 100
     MEMORY_SIMILARITY_THRESHOLD: float = 0.85
     MEMORY_RELATIONSHIP_THRESHOLD: float = 0.6
+    MEMORY_INTEL_BATCH_SIZE: int = 4  # Exchanges per batched analysis call (1 = per-turn analysis)
+    MEMORY_INTEL_BATCH_MAX_WAIT_SECONDS: int = 120  # Flush a partial window after this long
+    
+    # Memory Write-Time Dedup
+    MEMORY_DEDUP_POLICY: str = "skip"  # skip | merge | off (exact-hash index only)
+    MEMORY_NEAR_DUPLICATE_THRESHOLD: float = 0.95  # Cosine similarity for near-duplicates
+    MEMORY_DEDUP_WINDOW_DAYS: int = 90  # Only probe the user's recent memories
+    MEMORY_DEDUP_PROBE_LIMIT: int = 5  # Neighbours checked per save
     
     # Memory Decay Settings
     MEMORY_DECAY_DAYS_THRESHOLD: int = 30
     MEMORY_DECAY_AMOUNT: float = 0.03
     MEMORY_MIN_CONFIDENCE: float = 0.10
     MEMORY_ARCHIVE_THRESHOLD: float = 0.15
-    
+    MEMORY_DECAY_INTERVAL_HOURS: int = 24  # Minimum spacing between decays of one memory
+
+    # Memory Maintenance Batching (decay / archival)
+    MEMORY_JOB_BATCH_SIZE: int = 500
+    MEMORY_JOB_MAX_BATCHES: int = 200  # Per run; the rest waits for the next run
+    MEMORY_JOB_STATEMENT_TIMEOUT_MS: int = 5000
+    MEMORY_JOB_LOCK_TIMEOUT_MS: int = 1000
+    MEMORY_JOB_BATCH_PAUSE_MS: int = 50  # Yield to interactive traffic between batches
+
+    # Workflow Engine
+    WORKFLOW_MAX_CONCURRENCY: int = 4  # Steps running at once per run
+    WORKFLOW_CHECKPOINTS_ENABLED: bool = True  # Persist step results (workflow_runs)
+    WORKFLOW_RUN_LEASE_SECONDS: int = 300  # Unrenewed runs are resumable after this
+
+    # Model Router (app/services/model_router.py)
+    MODEL_ROUTER_WINDOW: int = 256  # Rolling samples per model
+    MODEL_ROUTER_MIN_SAMPLES: int = 5  # Catalog priors are used below this
+    MODEL_ROUTER_MAX_ERROR_RATE: float = 0.5  # Above this a model is routed last
+    MODEL_ROUTER_HEDGE_ENABLED: bool = True  # Hedge latency-objective calls
+    MODEL_ROUTER_HEDGE_P95_MULTIPLIER: float = 1.0  # Hedge deadline = p95 x this
+    MODEL_ROUTER_HEDGE_MIN_MS: float = 2000
+    MODEL_ROUTER_HEDGE_MAX_MS: float = 90000
+    MODEL_ROUTER_DECISION_LOG_SIZE: int = 1000  # Decisions kept in memory
+    MODEL_ROUTER_DECISION_LOG_PATH: str = ""  # JSONL decision log (empty = memory only)
+
+    # LLM Governor (app/integrations/llm_governor.py)
+    LLM_GOVERNOR_ENABLED: bool = True
+    # Keyed "provider" or "provider:model"; the model key wins
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+        "anthropic": {"rpm": 1000, "tpm": 400000},
+        "openai": {"rpm": 3000, "tpm": 1000000},
+        "gemini": {"rpm": 150, "tpm": 1000000},
+    }
+    # Share of each bucket a lane must leave for higher-priority lanes
+    LLM_GOVERNOR_LANE_RESERVE: Dict[str, float] = {"interactive": 0.0, "pipeline": 0.1, "background": 0.3}
+    LLM_GOVERNOR_MAX_IN_FLIGHT: int = 64  # Concurrent calls per model
+    LLM_GOVERNOR_MAX_WAIT_SECONDS: float = 120.0  # Then proceed over budget (fail open)
+    LLM_GOVERNOR_MIN_SCALE: float = 0.2  # Floor for the 429-adapted share of a limit
+    LLM_GOVERNOR_REDIS_ENABLED: bool = False  # Share per-minute budgets across replicas
+
+    # LLM Telemetry (app/integrations/llm_telemetry.py, GET /health/metrics)
+    LLM_TELEMETRY_ENABLED: bool = True
+    LLM_TELEMETRY_WINDOW: int = 1000  # Recent spans kept per feature / model for percentiles
+    LLM_TELEMETRY_LOG_SPANS: bool = True  # Log each span as {"type": "llm_span", ...}
+
+    # Usage Logging (write-behind api_usage_log, alphawave_usage_service.py)
+    USAGE_LOG_WRITE_BEHIND: bool = True  # False = insert in the caller's request path
+    USAGE_LOG_BATCH_SIZE: int = 500  # Flush as soon as this many events are queued
+    USAGE_LOG_FLUSH_INTERVAL_SECONDS: float = 2.0
+    USAGE_LOG_QUEUE_MAX: int = 10000  # Oldest events dropped beyond this while the DB is down
+    USAGE_LOG_SPILL_PATH: str = ""  # JSONL file for events the DB can't take (empty = keep in memory)
+
+    # File Blob Store (app/services/file_blob_store.py)
+    BLOB_STORE_ENABLED: bool = True  # Record Vibe / Faz / Enjineer file versions
+    BLOB_STORE_BACKEND: str = "postgres"  # postgres (file_blobs.data) or disk
+    BLOB_STORE_PATH: str = "/var/lib/nicole/blobs"  # Blob directory for the disk backend
+    BLOB_STORE_ZSTD_LEVEL: int = 6
+
+    # WebSocket Broadcast Hub (app/services/broadcast_hub.py, Faz project streams)
+    BROADCAST_REDIS_ENABLED: bool = True  # Fan events across workers via Redis pub/sub when connected
+    BROADCAST_SEND_QUEUE_MAX: int = 256  # Per-socket queued events before the oldest is dropped
+    BROADCAST_SEND_TIMEOUT_SECONDS: float = 10.0  # A send stalled this long closes the socket
+    BROADCAST_REPLAY_SIZE: int = 500  # Recent events per channel kept for reconnect replay
+    BROADCAST_REPLAY_TTL_SECONDS: int = 86400  # Idle channels' replay buffers expire after this
+
+    # Faz Pipeline (app/services/faz_orchestrator.py)
+    FAZ_PARALLEL_STAGES: bool = True  # Run declared independent agents concurrently in AUTO mode (review+memory, QA shards)
+    FAZ_QA_SHARD_CHARS: int = 60000  # QA reviews files in concurrent shards above this much source
+    FAZ_QA_MAX_SHARDS: int = 4
+
+    # Knowledge Base Search (app/services/knowledge_base_service.py, kb_search_index.py)
+    KB_BM25_ENABLED: bool = False  # Rank sections with the in-process BM25 index instead of Postgres ts_rank
+    KB_BM25_K1: float = 1.2
+    KB_BM25_B: float = 0.75
+    KB_VERSION_CHECK_SECONDS: float = 30.0  # How often to look for KB writes made by other workers
+    KB_CONTEXT_CACHE_SIZE: int = 256  # Assembled context packs kept in process (0 = no cache)
+    KB_ACCESS_LOG_BATCH_SIZE: int = 200  # knowledge_base_usage_log rows per write-behind insert
+    KB_ACCESS_LOG_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Background Worker (worker.py)
+    WORKER_JOB_LEASE_SECONDS: int = 600  # Unrenewed job runs can be taken over after this
+    WORKER_MISFIRE_GRACE_SECONDS: int = 300  # Late fires within this window still run
+    WORKER_CATCHUP_HOURS: int = 12  # On startup, re-run fires missed within this window
+    WORKER_USER_CONCURRENCY: int = 8  # Per-user fan-out width for nightly jobs
+
     # Conversation Settings
     CONVERSATION_HISTORY_LIMIT: int = 15  # Reduced from 25 to prevent token overflow
     MEMORY_SEARCH_LIMIT: int = 10
     MEMORY_SEARCH_MIN_CONFIDENCE: float = 0.3
-    
+
+    # Vector Search (ANN indexes on document_chunks / memory_entries)
+    VECTOR_INDEX_METHOD: str = "hnsw"  # hnsw (pgvector) or diskann (pgvectorscale)
+    VECTOR_EF_SEARCH: int = 40  # Default candidate list size per query
+    VECTOR_MAX_EF_SEARCH: int = 800  # Cap when oversampling for filtered search
+    VECTOR_EXACT_SCAN_MAX_ROWS: int = 5000  # Per-user rows below which exact scan wins
+
     # Token Management - Prevent prompt overflow
     # Claude 3.5 Sonnet has 200K token context, but we need to leave room for:
     # - System prompt (~5K tokens)
@@ -15,6 +15,8 @@ import logging
 import json
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
+from app.integrations.llm_telemetry import set_tool_iteration, tool_loop
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +59,7 @@ class AlphawaveClaudeClient:
         # Sync client for non-streaming and tool calls
         self.client = anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         # Async client for true async streaming
-        self.async_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.async_client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=governed_http_client())
         # Use latest Claude 4.5 models (December 2025)
         self.sonnet_model = "claude-sonnet-4-5-20250929"
         self.haiku_model = "claude-haiku-4-5-20251001"
@@ -150,6 +152,7 @@ class AlphawaveClaudeClient:
             logger.error(f"Claude unexpected error: {e}", exc_info=True)
             raise
     
+    @tool_loop
     async def generate_response_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -197,6 +200,7 @@ class AlphawaveClaudeClient:
         
         while iterations < max_tool_iterations:
             iterations += 1
+            set_tool_iteration(iterations)
             
             try:
                 # Build kwargs dynamically to handle thinking fallback
@@ -545,6 +549,7 @@ class AlphawaveClaudeClient:
             logger.error(f"[CLAUDE] Extended thinking error: {e}", exc_info=True)
             yield {"type": "error", "message": str(e)}
     
+    @tool_loop
     async def generate_streaming_response_with_tools(
         self,
         messages: List[Dict[str, Any]],
@@ -593,6 +598,7 @@ class AlphawaveClaudeClient:
         
         while iterations < max_tool_iterations:
             iterations += 1
+            set_tool_iteration(iterations)
             
             try:
                 kwargs = {
@@ -888,9 +894,11 @@ class AlphawaveClaudeClient:
             Model name to use
         """
         
-        # Use Haiku for simple queries
+        # Use Haiku for simple queries, unless the router has seen it failing
         if query_length < 20 and not has_agents and context_size < 5000:
-            return self.haiku_model
+            from app.services.model_router import model_router
+            if not model_router.is_degraded("claude-haiku"):
+                return self.haiku_model
         
         # Use Sonnet for complex queries
         return self.sonnet_model
@@ -21,13 +21,15 @@ import logging
 import json
 import asyncio
 import random
-from typing import Optional, Dict, Any, List, Callable, TypeVar
+from typing import Optional, Dict, Any, List, Callable, TypeVar, Tuple
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
 from functools import wraps
 
 from app.config import settings
+from app.integrations.llm_governor import llm_governor
+from app.integrations.llm_telemetry import llm_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -235,13 +237,15 @@ Format your response as structured JSON with these fields:
                     async def _execute_deep_research_agent():
                         # Deep Research Agent requires background=True AND store=True
                         # We need to poll for completion
-                        interaction = await asyncio.to_thread(
-                            self._client.interactions.create,
-                            agent="deep-research-pro-preview-12-2025",
-                            input=full_query,
-                            background=True,  # Required for agent interactions
-                            store=True  # Required for background interactions
-                        )
+                        async with llm_governor.slot("gemini", "deep-research-pro-preview-12-2025", len(full_query) // 4), \
+                                llm_telemetry.span("gemini", "deep-research-pro-preview-12-2025", "interactions.create"):
+                            interaction = await asyncio.to_thread(
+                                self._client.interactions.create,
+                                agent="deep-research-pro-preview-12-2025",
+                                input=full_query,
+                                background=True,  # Required for agent interactions
+                                store=True  # Required for background interactions
+                            )
                         return interaction
                     
                     interaction = await _execute_deep_research_agent()
@@ -308,12 +312,16 @@ Format your response as structured JSON with these fields:
                 
                 @async_retry_with_backoff(max_attempts=3, base_delay=1.0)
                 async def _execute_standard_research():
-                    return await asyncio.to_thread(
-                        self._client.models.generate_content,
-                        model=settings.GEMINI_PRO_MODEL,
-                        contents=full_query,
-                        config=config
-                    )
+                    async with llm_governor.slot("gemini", settings.GEMINI_PRO_MODEL, len(full_query) // 4), \
+                            llm_telemetry.span("gemini", settings.GEMINI_PRO_MODEL, "generateContent") as span:
+                        response = await asyncio.to_thread(
+                            self._client.models.generate_content,
+                            model=settings.GEMINI_PRO_MODEL,
+                            contents=full_query,
+                            config=config
+                        )
+                        span.record_usage(getattr(response, "usage_metadata", None))
+                        return response
                 
                 response = await _execute_standard_research()
                 result_wrapper = {"type": "generate_content", "data": response}
@@ -699,17 +707,19 @@ TECHNICAL RESEARCH MODE:
                 # Imagen 3 uses the images.generate endpoint
                 @async_retry_with_backoff(max_attempts=3, base_delay=2.0)
                 async def _execute_imagen():
-                    return await asyncio.to_thread(
-                        self._client.models.generate_images,
-                        model=model,
-                        prompt=full_prompt,
-                        config=types.GenerateImagesConfig(
-                            number_of_images=min(num_images, 4),
-                            aspect_ratio=aspect_ratio,
-                            person_generation="allow_adult",  # Allow adult persons
-                            safety_filter_level="block_only_high",  # Less restrictive
+                    async with llm_governor.slot("gemini", model, len(full_prompt) // 4), \
+                            llm_telemetry.span("gemini", model, "generate_images"):
+                        return await asyncio.to_thread(
+                            self._client.models.generate_images,
+                            model=model,
+                            prompt=full_prompt,
+                            config=types.GenerateImagesConfig(
+                                number_of_images=min(num_images, 4),
+                                aspect_ratio=aspect_ratio,
+                                person_generation="allow_adult",  # Allow adult persons
+                                safety_filter_level="block_only_high",  # Less restrictive
+                            )
                         )
-                    )
                 
                 response = await _execute_imagen()
                 
@@ -771,12 +781,16 @@ TECHNICAL RESEARCH MODE:
                 
                 @async_retry_with_backoff(max_attempts=3, base_delay=2.0)
                 async def _execute_image_gen():
-                    return await asyncio.to_thread(
-                        self._client.models.generate_content,
-                        model="gemini-3-pro-image-preview",
-                        contents=contents,
-                        config=config
-                    )
+                    async with llm_governor.slot("gemini", "gemini-3-pro-image-preview", len(full_prompt) // 4), \
+                            llm_telemetry.span("gemini", "gemini-3-pro-image-preview", "generateContent") as span:
+                        response = await asyncio.to_thread(
+                            self._client.models.generate_content,
+                            model="gemini-3-pro-image-preview",
+                            contents=contents,
+                            config=config
+                        )
+                        span.record_usage(getattr(response, "usage_metadata", None))
+                        return response
                 
                 response = await _execute_image_gen()
                 
@@ -925,6 +939,29 @@ TECHNICAL RESEARCH MODE:
         Returns:
             Generated text content
         """
+        text, _, _ = await self.generate_content_with_usage(
+            prompt,
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            enable_thinking=enable_thinking,
+        )
+        return text
+    
+    async def generate_content_with_usage(
+        self,
+        prompt: str,
+        model_name: str = "gemini-3-pro-preview",
+        temperature: float = 0.7,
+        max_tokens: int = 8192,
+        enable_thinking: bool = False
+    ) -> Tuple[str, int, int]:
+        """
+        generate_content() plus the token counts Gemini reported.
+        
+        Returns:
+            Tuple of (text, input_tokens, output_tokens)
+        """
         if not self.is_configured:
             raise RuntimeError("Gemini not configured - check GEMINI_API_KEY")
         
@@ -945,12 +982,16 @@ TECHNICAL RESEARCH MODE:
             # Execute generation with retry
             @async_retry_with_backoff(max_attempts=3, base_delay=1.0)
             async def _execute_generation():
-                return await asyncio.to_thread(
-                    self._client.models.generate_content,
-                    model=model_name,
-                    contents=prompt,
-                    config=config
-                )
+                async with llm_governor.slot("gemini", model_name, len(prompt) // 4), \
+                        llm_telemetry.span("gemini", model_name, "generateContent") as span:
+                    response = await asyncio.to_thread(
+                        self._client.models.generate_content,
+                        model=model_name,
+                        contents=prompt,
+                        config=config
+                    )
+                    span.record_usage(getattr(response, "usage_metadata", None))
+                    return response
             
             response = await _execute_generation()
             
@@ -964,7 +1005,10 @@ TECHNICAL RESEARCH MODE:
             if not text:
                 raise RuntimeError("No text content in Gemini response")
             
-            return text
+            usage = getattr(response, "usage_metadata", None)
+            input_tokens = getattr(usage, "prompt_token_count", 0) or 0
+            output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            return text, input_tokens, output_tokens
             
         except Exception as e:
             logger.error(f"[GEMINI] Generation failed: {e}", exc_info=True)
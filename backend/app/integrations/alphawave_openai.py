@@ -22,6 +22,7 @@ import random
 import base64
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +45,7 @@ class AlphawaveOpenAIClient:
     
     def __init__(self):
         """Initialize OpenAI client."""
-        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=governed_http_client())
         self.embedding_model = "text-embedding-3-small"
         self.research_model = "o1-mini"
         self.image_model = getattr(settings, "OPENAI_IMAGE_MODEL", "gpt-image-1")
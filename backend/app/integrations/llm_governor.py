@@ -0,0 +1,504 @@
+"""
+Nicole V7 - LLM concurrency governor
+
+One process-wide gate in front of every LLM provider call, so a burst of
+background work can't spend the rate limit interactive chat needs.
+
+- Budgets: per (provider, model) token buckets for requests/minute and
+  tokens/minute (LLM_RATE_LIMITS), refilled continuously
+- Priority lanes: INTERACTIVE > PIPELINE > BACKGROUND. Waiters are served
+  in lane order, and lower lanes must leave a reserve of the bucket
+  (LLM_GOVERNOR_LANE_RESERVE) so chat always has headroom
+- Adaptive backoff: rate-limit headers (anthropic-ratelimit-*,
+  x-ratelimit-*) resync the buckets; a 429/529 pauses the model for
+  retry-after (or exponential backoff) and shrinks its effective limit,
+  which then recovers additively on success
+- Optional Redis coordination: with LLM_GOVERNOR_REDIS_ENABLED the
+  per-minute totals are also counted in Redis, so replicas share a budget
+
+Anthropic and OpenAI async clients get it transparently through
+governed_http_client() (an httpx transport). Other SDKs (google-genai)
+wrap calls in `async with llm_governor.slot("gemini", model, tokens)`.
+
+The lane comes from context:
+
+    with llm_lane(Lane.BACKGROUND):
+        await memory_intelligence.analyze(...)
+
+Untagged calls run in the PIPELINE lane. The governor fails open: a
+waiter that exceeds LLM_GOVERNOR_MAX_WAIT_SECONDS proceeds with a warning.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import httpx
+
+from app.config import settings
+from app.integrations.llm_telemetry import ResponseObserver, llm_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+class Lane(IntEnum):
+    """Priority lanes (lower value is served first)."""
+    INTERACTIVE = 0
+    PIPELINE = 1
+    BACKGROUND = 2
+
+
+_current_lane: contextvars.ContextVar[Lane] = contextvars.ContextVar("llm_lane", default=Lane.PIPELINE)
+
+
+@contextmanager
+def llm_lane(lane: Lane) -> Iterator[None]:
+    """Run LLM calls made inside this block (and tasks it spawns) in a lane."""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def in_lane(lane: Lane) -> Callable:
+    """Decorator: run an async function's LLM calls in a lane."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with llm_lane(lane):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_lane(lane: Lane) -> None:
+    """Set the lane for the rest of the current request/task."""
+    _current_lane.set(lane)
+
+
+def current_lane() -> Lane:
+    return _current_lane.get()
+
+
+PROVIDER_HOSTS = {
+    "api.anthropic.com": "anthropic",
+    "api.openai.com": "openai",
+    "generativelanguage.googleapis.com": "gemini",
+}
+
+RATE_LIMITED_STATUSES = {429, 529}
+
+
+# ============================================================================
+# BUDGETS
+# ============================================================================
+
+@dataclass
+class _Budget:
+    """Token buckets and waiters for one (provider, model)."""
+    key: str
+    rpm: float
+    tpm: float
+    requests: float = 0.0
+    tokens: float = 0.0
+    updated: float = field(default_factory=time.monotonic)
+    scale: float = 1.0  # Adaptive share of the configured limit
+    paused_until: float = 0.0
+    consecutive_limited: int = 0
+    in_flight: int = 0
+    waiters: List[Tuple[int, int]] = field(default_factory=list)  # Heap of (lane, seq)
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    # Metrics
+    admitted: Dict[str, int] = field(default_factory=lambda: {lane.name.lower(): 0 for lane in Lane})
+    waited_ms: Dict[str, List[float]] = field(default_factory=lambda: {lane.name.lower(): [] for lane in Lane})
+    rate_limited: int = 0
+    timeouts: int = 0
+
+    def __post_init__(self):
+        self.requests = self.rpm
+        self.tokens = self.tpm
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        self.updated = now
+        self.requests = min(self.rpm * self.scale, self.requests + elapsed * self.rpm * self.scale / 60)
+        self.tokens = min(self.tpm * self.scale, self.tokens + elapsed * self.tpm * self.scale / 60)
+
+    def delay_for(self, cost: float, lane: Lane) -> float:
+        """Seconds until cost fits while leaving the lane's reserve (0 = now)."""
+        reserve = settings.LLM_GOVERNOR_LANE_RESERVE.get(lane.name.lower(), 0.0)
+        need_requests = 1 + reserve * self.rpm * self.scale
+        need_tokens = min(cost + reserve * self.tpm * self.scale, self.tpm * self.scale)
+        waits = [0.0]
+        if self.requests < need_requests:
+            waits.append((need_requests - self.requests) * 60 / (self.rpm * self.scale))
+        if self.tokens < need_tokens:
+            waits.append((need_tokens - self.tokens) * 60 / (self.tpm * self.scale))
+        return max(waits)
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+@dataclass
+class Reservation:
+    """An admitted call; pass back to observe()/release()."""
+    budget: _Budget
+    lane: Lane
+    tokens: int
+    released: bool = False
+
+
+# ============================================================================
+# GOVERNOR
+# ============================================================================
+
+class LLMGovernor:
+    """Process-wide admission control for LLM calls."""
+
+    def __init__(self):
+        self._budgets: Dict[str, _Budget] = {}
+        self._seq = itertools.count()
+
+    def _budget(self, provider: str, model: str) -> _Budget:
+        key = f"{provider}:{model}"
+        budget = self._budgets.get(key)
+        if budget is None:
+            limits = settings.LLM_RATE_LIMITS
+            conf = limits.get(key) or limits.get(provider) or {"rpm": 600, "tpm": 400000}
+            budget = _Budget(key=key, rpm=float(conf["rpm"]), tpm=float(conf["tpm"]))
+            self._budgets[key] = budget
+        return budget
+
+    async def acquire(self, provider: str, model: str, tokens: int, lane: Optional[Lane] = None) -> Reservation:
+        """Wait for budget in priority order. Fails open after the max wait."""
+        lane = current_lane() if lane is None else lane
+        budget = self._budget(provider, model)
+        ticket = (int(lane), next(self._seq))
+        heapq.heappush(budget.waiters, ticket)
+        started = time.monotonic()
+        deadline = started + settings.LLM_GOVERNOR_MAX_WAIT_SECONDS
+
+        try:
+            while True:
+                now = time.monotonic()
+                budget.refill(now)
+                if budget.waiters[0] == ticket:
+                    delay = max(
+                        budget.paused_until - now,
+                        budget.delay_for(tokens, lane),
+                        0.0 if budget.in_flight < settings.LLM_GOVERNOR_MAX_IN_FLIGHT else 1.0,
+                    )
+                    if delay <= 0:
+                        if not await self._redis_admit(budget, tokens):
+                            delay = 1.0
+                        else:
+                            break
+                else:
+                    delay = 1.0  # Not our turn; woken when the head moves
+                if now >= deadline:
+                    budget.timeouts += 1
+                    logger.warning(
+                        f"[LLM GOVERNOR] {budget.key} {lane.name.lower()} waited "
+                        f"{now - started:.1f}s, proceeding over budget"
+                    )
+                    break
+                changed = budget.changed
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=min(delay, deadline - now))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            budget.waiters.remove(ticket)
+            heapq.heapify(budget.waiters)
+            budget.notify()
+
+        budget.requests -= 1
+        budget.tokens -= tokens
+        budget.in_flight += 1
+        name = lane.name.lower()
+        budget.admitted[name] += 1
+        samples = budget.waited_ms[name]
+        samples.append((time.monotonic() - started) * 1000)
+        if len(samples) > 512:
+            del samples[:256]
+        return Reservation(budget=budget, lane=lane, tokens=tokens)
+
+    def observe(self, reservation: Reservation, status_code: Optional[int], headers: Mapping[str, str]) -> None:
+        """Adapt to a response: resync from rate-limit headers, back off on 429."""
+        budget = reservation.budget
+        now = time.monotonic()
+
+        if status_code in RATE_LIMITED_STATUSES:
+            budget.rate_limited += 1
+            budget.consecutive_limited += 1
+            budget.scale = max(settings.LLM_GOVERNOR_MIN_SCALE, budget.scale * 0.7)
+            retry_after = _retry_after(headers)
+            if retry_after is None:
+                retry_after = min(60.0, 2 ** budget.consecutive_limited) * (0.5 + random.random() / 2)
+            budget.paused_until = max(budget.paused_until, now + retry_after)
+            logger.warning(
+                f"[LLM GOVERNOR] {budget.key} rate limited ({status_code}); pausing {retry_after:.1f}s, "
+                f"scale {budget.scale:.2f}"
+            )
+        elif status_code is not None and status_code < 400:
+            budget.consecutive_limited = 0
+            budget.scale = min(1.0, budget.scale + 0.02)
+
+        remaining_requests, remaining_tokens = _remaining(headers)
+        budget.refill(now)
+        if remaining_requests is not None:
+            budget.requests = min(budget.requests, remaining_requests)
+        if remaining_tokens is not None:
+            budget.tokens = min(budget.tokens, remaining_tokens)
+        budget.notify()
+
+    def release(self, reservation: Reservation) -> None:
+        """The call finished (response body consumed or request failed)."""
+        if reservation.released:
+            return
+        reservation.released = True
+        reservation.budget.in_flight -= 1
+        reservation.budget.notify()
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str, tokens: int = 0, lane: Optional[Lane] = None):
+        """Govern a call made through an SDK without an httpx hook."""
+        reservation = await self.acquire(provider, model, tokens, lane)
+        try:
+            yield reservation
+        except Exception as e:
+            status = getattr(e, "status_code", None) or getattr(e, "code", None)
+            if status in RATE_LIMITED_STATUSES:
+                self.observe(reservation, status, getattr(getattr(e, "response", None), "headers", None) or {})
+            raise
+        else:
+            self.observe(reservation, 200, {})
+        finally:
+            self.release(reservation)
+
+    async def _redis_admit(self, budget: _Budget, tokens: int) -> bool:
+        """Shared per-minute totals across replicas (always True when disabled)."""
+        if not settings.LLM_GOVERNOR_REDIS_ENABLED:
+            return True
+        from app.database import db
+        if not db.redis:
+            return True
+        minute = int(time.time() // 60)
+        requests_key = f"llmgov:{budget.key}:{minute}:req"
+        tokens_key = f"llmgov:{budget.key}:{minute}:tok"
+        try:
+            pipe = db.redis.pipeline()
+            pipe.incrby(requests_key, 1)
+            pipe.incrby(tokens_key, tokens)
+            pipe.expire(requests_key, 120)
+            pipe.expire(tokens_key, 120)
+            used_requests, used_tokens, _, _ = await pipe.execute()
+            if used_requests <= budget.rpm * budget.scale and used_tokens <= budget.tpm * budget.scale:
+                return True
+            pipe = db.redis.pipeline()
+            pipe.decrby(requests_key, 1)
+            pipe.decrby(tokens_key, tokens)
+            await pipe.execute()
+            return False
+        except Exception as e:
+            logger.debug(f"[LLM GOVERNOR] Redis coordination unavailable: {e}")
+            return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model budget state and per-lane admission metrics."""
+        def p99(samples: List[float]) -> Optional[float]:
+            if not samples:
+                return None
+            ordered = sorted(samples)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 1)
+
+        now = time.monotonic()
+        stats = {}
+        for key, budget in sorted(self._budgets.items()):
+            budget.refill(now)
+            stats[key] = {
+                "rpm": budget.rpm,
+                "tpm": budget.tpm,
+                "scale": round(budget.scale, 3),
+                "requests_available": round(budget.requests, 1),
+                "tokens_available": round(budget.tokens),
+                "in_flight": budget.in_flight,
+                "waiting": len(budget.waiters),
+                "paused_for_s": round(max(0.0, budget.paused_until - now), 1),
+                "rate_limited": budget.rate_limited,
+                "over_budget_admits": budget.timeouts,
+                "admitted": dict(budget.admitted),
+                "wait_p99_ms": {lane: p99(s) for lane, s in budget.waited_ms.items()},
+            }
+        return stats
+
+
+def _header_float(headers: Mapping[str, str], *names: str) -> Optional[float]:
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+def _retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    ms = _header_float(headers, "retry-after-ms")
+    if ms is not None:
+        return ms / 1000
+    return _header_float(headers, "retry-after")
+
+
+def _remaining(headers: Mapping[str, str]) -> Tuple[Optional[float], Optional[float]]:
+    requests = _header_float(headers, "anthropic-ratelimit-requests-remaining", "x-ratelimit-remaining-requests")
+    tokens = _header_float(
+        headers,
+        "anthropic-ratelimit-input-tokens-remaining",
+        "anthropic-ratelimit-tokens-remaining",
+        "x-ratelimit-remaining-tokens",
+    )
+    return requests, tokens
+
+
+# ============================================================================
+# HTTPX TRANSPORT
+# ============================================================================
+
+def _describe(request: httpx.Request) -> Tuple[str, str, int]:
+    """Model, operation and estimated input tokens (~4 bytes/token) of an API request."""
+    path = request.url.path
+    operation = path.rsplit("/v1/", 1)[-1] if "/v1/" in path else path.rsplit("/", 1)[-1]
+    model = "default"
+    if "/models/" in path:  # Gemini REST: /v1beta/models/{model}:{method}
+        model, _, operation = path.split("/models/", 1)[1].partition(":")
+    try:
+        body = request.content
+    except httpx.RequestNotRead:
+        return model, operation, 0
+    try:
+        payload = json.loads(body) if body else {}
+        model = str(payload.get("model") or model)
+    except (ValueError, AttributeError):
+        pass
+    return model, operation, len(body) // 4
+
+
+class _ObservedStream(httpx.AsyncByteStream):
+    """
+    Response body that feeds telemetry as it streams, and on close finishes
+    the span and releases the governor reservation.
+    """
+
+    def __init__(
+        self,
+        stream: httpx.AsyncByteStream,
+        reservation: Optional[Reservation],
+        observer: ResponseObserver,
+    ):
+        self._stream = stream
+        self._reservation = reservation
+        self._observer = observer
+        self._error: Optional[BaseException] = None
+
+    async def __aiter__(self):
+        try:
+            async for chunk in self._stream:
+                self._observer.feed(chunk)
+                yield chunk
+        except BaseException as e:
+            self._error = e
+            raise
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._observer.close()
+            llm_telemetry.finish(self._observer.span, error=self._error)
+            if self._reservation is not None:
+                llm_governor.release(self._reservation)
+
+
+class GovernedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport for provider APIs: admits POSTs through the governor
+    and records a telemetry span per call.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport or httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        provider = PROVIDER_HOSTS.get(request.url.host)
+        if provider is None or request.method != "POST":
+            return await self._transport.handle_async_request(request)
+
+        model, operation, tokens = _describe(request)
+        reservation = None
+        if settings.LLM_GOVERNOR_ENABLED:
+            queued = time.monotonic()
+            reservation = await llm_governor.acquire(provider, model, tokens)
+            queued_ms = (time.monotonic() - queued) * 1000
+        else:
+            queued_ms = 0.0
+
+        span = llm_telemetry.start(provider, model, operation)
+        span.queued_ms = queued_ms
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            llm_telemetry.finish(span, error=e)
+            if reservation is not None:
+                llm_governor.release(reservation)
+            raise
+
+        if reservation is not None:
+            llm_governor.observe(reservation, response.status_code, response.headers)
+        span.status_code = response.status_code
+        streaming = "text/event-stream" in response.headers.get("content-type", "")
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ObservedStream(
+                response.stream, reservation,
+                ResponseObserver(span, streaming, response.headers.get("content-encoding", "")),
+            ),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def governed_http_client() -> httpx.AsyncClient:
+    """
+    httpx client for AsyncAnthropic / AsyncOpenAI (`http_client=`), with the
+    SDKs' default timeout and connection limits.
+    """
+    return httpx.AsyncClient(
+        transport=GovernedTransport(),
+        timeout=httpx.Timeout(600.0, connect=5.0),
+        follow_redirects=True,
+    )
+
+
+# Global governor instance
+llm_governor = LLMGovernor()
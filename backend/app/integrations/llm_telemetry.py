@@ -0,0 +1,441 @@
+"""
+Nicole V7 - LLM call telemetry
+
+One span per provider call, whichever client made it:
+
+- latency_ms, ttft_ms (streams: time to the first delta event),
+  tokens_per_s (output tokens over generation time)
+- input / output / cache-read / cache-write tokens from the provider's
+  own usage block (Anthropic, OpenAI and Gemini shapes)
+- tool_iteration: which turn of a tool loop the call belongs to
+- queued_ms: time spent waiting in the LLM governor
+
+Spans are keyed by feature (chat, vibe, faz, muse, enjineer, memory, ...),
+taken from context like the governor's lanes: the logging middleware sets
+it from the request path, and background work tags itself with
+@in_feature("memory"). Anthropic / OpenAI / Gemini REST traffic is
+captured by the governed httpx transport; google-genai calls use
+`async with llm_telemetry.span(...)`.
+
+Finished spans are logged as JSON ({"type": "llm_span", ...}) and kept in
+rolling windows per feature and per model; get_metrics() turns them into
+percentiles for GET /health/metrics. Listeners (add_listener) see every
+finished span, e.g. the model router's per-model stats.
+"""
+
+import contextvars
+import inspect
+import json
+import logging
+import time
+import zlib
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.config import settings
+
+try:  # Same optional brotli packages httpx uses for "br"
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+_current_feature: contextvars.ContextVar[str] = contextvars.ContextVar("llm_feature", default="other")
+_current_tool_iteration: contextvars.ContextVar[int] = contextvars.ContextVar("llm_tool_iteration", default=0)
+
+# Request path prefix -> feature (first match wins)
+FEATURE_PREFIXES = (
+    ("/chat", "chat"),
+    ("/vibe", "vibe"),
+    ("/faz", "faz"),
+    ("/muse", "muse"),
+    ("/enjineer", "enjineer"),
+    ("/memories", "memory"),
+    ("/research", "research"),
+    ("/images", "images"),
+    ("/documents", "documents"),
+    ("/voice", "voice"),
+    ("/workflows", "workflows"),
+)
+
+
+def feature_for_path(path: str) -> str:
+    for prefix, feature in FEATURE_PREFIXES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return feature
+    return "other"
+
+
+def set_feature(feature: str) -> None:
+    """Attribute LLM calls for the rest of the current request/task."""
+    _current_feature.set(feature)
+
+
+def in_feature(feature: str) -> Callable:
+    """Decorator: attribute an async function's LLM calls to a feature."""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            token = _current_feature.set(feature)
+            iteration_token = _current_tool_iteration.set(0)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _current_tool_iteration.reset(iteration_token)
+                _current_feature.reset(token)
+        return wrapper
+    return decorator
+
+
+def set_tool_iteration(iteration: int) -> None:
+    """Mark subsequent calls as turn N of a tool loop (0 = no tool loop)."""
+    _current_tool_iteration.set(iteration)
+
+
+def tool_loop(func: Callable) -> Callable:
+    """
+    Decorator for a function (or async generator) that runs a tool loop with
+    set_tool_iteration(): on exit the caller's iteration is restored, so later
+    calls in the same task aren't attributed to the loop's last turn.
+    """
+    if inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def generator_wrapper(*args, **kwargs):
+            previous = _current_tool_iteration.get()
+            stream = func(*args, **kwargs)
+            try:
+                async for item in stream:
+                    yield item
+            finally:
+                await stream.aclose()
+                _current_tool_iteration.set(previous)
+        return generator_wrapper
+
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        previous = _current_tool_iteration.get()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _current_tool_iteration.set(previous)
+    return wrapper
+
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+# Provider usage field -> span field
+_USAGE_FIELDS = {
+    # Anthropic
+    "input_tokens": "input_tokens",
+    "output_tokens": "output_tokens",
+    "cache_read_input_tokens": "cache_read_tokens",
+    "cache_creation_input_tokens": "cache_write_tokens",
+    # OpenAI
+    "prompt_tokens": "input_tokens",
+    "completion_tokens": "output_tokens",
+    # Gemini (REST and google-genai)
+    "promptTokenCount": "input_tokens",
+    "candidatesTokenCount": "output_tokens",
+    "cachedContentTokenCount": "cache_read_tokens",
+    "prompt_token_count": "input_tokens",
+    "candidates_token_count": "output_tokens",
+    "cached_content_token_count": "cache_read_tokens",
+}
+
+
+def _get(obj: Any, key: str) -> Any:
+    return obj.get(key) if isinstance(obj, dict) else getattr(obj, key, None)
+
+
+@dataclass
+class LLMSpan:
+    """One provider call."""
+    provider: str
+    model: str
+    operation: str
+    feature: str = field(default_factory=_current_feature.get)
+    tool_iteration: int = field(default_factory=_current_tool_iteration.get)
+    queued_ms: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+    first_token_at: Optional[float] = None
+    status: str = "ok"
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    input_tokens: int = 0  # Uncached prompt tokens, for every provider
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    latency_ms: Optional[float] = None
+
+    def mark_first_token(self) -> None:
+        if self.first_token_at is None:
+            self.first_token_at = time.monotonic()
+
+    def record_usage(self, usage: Any) -> None:
+        """Merge a provider usage block (dict or SDK object); streams report it in parts."""
+        if not usage:
+            return
+        counts: Dict[str, int] = {}
+        for source, target in _USAGE_FIELDS.items():
+            value = _get(usage, source)
+            if isinstance(value, int):
+                counts[target] = max(counts.get(target, 0), value)
+        # OpenAI reports cache hits inside the prompt details
+        for details_key in ("prompt_tokens_details", "input_tokens_details"):
+            details = _get(usage, details_key)
+            cached = _get(details, "cached_tokens") if details else None
+            if isinstance(cached, int):
+                counts["cache_read_tokens"] = cached
+        # OpenAI / Gemini prompt counts include cache hits; Anthropic's don't
+        if self.provider != "anthropic" and "input_tokens" in counts:
+            counts["input_tokens"] -= min(counts["input_tokens"], counts.get("cache_read_tokens", 0))
+        for target, value in counts.items():
+            if value > getattr(self, target):
+                setattr(self, target, value)
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started) * 1000
+
+    @property
+    def tokens_per_s(self) -> Optional[float]:
+        if not self.output_tokens or self.latency_ms is None:
+            return None
+        generation_ms = self.latency_ms - (self.ttft_ms or 0.0)
+        return self.output_tokens / (generation_ms / 1000) if generation_ms > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("started")
+        data.pop("first_token_at")
+        data["ttft_ms"] = self.ttft_ms
+        data["tokens_per_s"] = self.tokens_per_s
+        return {k: round(v, 1) if isinstance(v, float) else v for k, v in data.items()}
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+def _percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def at(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 1)
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(ordered[-1], 1)}
+
+
+class _Series:
+    """Counters plus a rolling window of recent spans for one key."""
+
+    def __init__(self, window: int):
+        self.spans: Deque[LLMSpan] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+
+    def add(self, span: LLMSpan) -> None:
+        self.spans.append(span)
+        self.calls += 1
+        self.errors += span.status != "ok"
+        self.input_tokens += span.input_tokens
+        self.output_tokens += span.output_tokens
+        self.cache_read_tokens += span.cache_read_tokens
+        self.cache_write_tokens += span.cache_write_tokens
+
+    def summary(self) -> Dict[str, Any]:
+        spans = list(self.spans)
+        prompt_tokens = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "window": len(spans),
+            "latency_ms": _percentiles([s.latency_ms for s in spans if s.latency_ms is not None]),
+            "ttft_ms": _percentiles([s.ttft_ms for s in spans if s.ttft_ms is not None]),
+            "tokens_per_s": _percentiles([s.tokens_per_s for s in spans if s.tokens_per_s]),
+            "queued_ms": _percentiles([s.queued_ms for s in spans]),
+            "tool_iterations": _percentiles([s.tool_iteration for s in spans if s.tool_iteration]),
+            "tokens": {
+                "input": self.input_tokens,
+                "output": self.output_tokens,
+                "cache_read": self.cache_read_tokens,
+                "cache_write": self.cache_write_tokens,
+            },
+            # Share of prompt tokens served from the provider's prompt cache
+            "cache_hit_ratio": round(self.cache_read_tokens / prompt_tokens, 3) if prompt_tokens else None,
+        }
+
+
+class LLMTelemetry:
+    """Collects finished spans into per-feature and per-model series."""
+
+    def __init__(self):
+        self._features: Dict[str, _Series] = {}
+        self._models: Dict[str, _Series] = {}
+        self._listeners: List[Callable[[LLMSpan, Optional[BaseException]], None]] = []
+        self._started = time.time()
+
+    def add_listener(self, callback: Callable[[LLMSpan, Optional[BaseException]], None]) -> None:
+        """Call `callback(span, error)` for every finished span, even with telemetry disabled."""
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def start(self, provider: str, model: str, operation: str) -> LLMSpan:
+        return LLMSpan(provider=provider, model=model, operation=operation)
+
+    def finish(self, span: LLMSpan, error: Optional[BaseException] = None) -> None:
+        if span.latency_ms is not None:
+            return  # Already finished
+        span.latency_ms = (time.monotonic() - span.started) * 1000
+        if error is not None:
+            span.status = "error"
+            span.error = f"{type(error).__name__}: {error}"[:200]
+        elif span.status_code is not None and span.status_code >= 400:
+            span.status = "error"
+        for listener in self._listeners:
+            try:
+                listener(span, error)
+            except Exception as e:
+                logger.debug(f"[TELEMETRY] Span listener failed: {e}")
+        if not settings.LLM_TELEMETRY_ENABLED:
+            return
+
+        window = settings.LLM_TELEMETRY_WINDOW
+        self._features.setdefault(span.feature, _Series(window)).add(span)
+        self._models.setdefault(f"{span.provider}:{span.model}", _Series(window)).add(span)
+        if settings.LLM_TELEMETRY_LOG_SPANS:
+            logger.info(json.dumps({"type": "llm_span", **span.to_dict()}))
+
+    @asynccontextmanager
+    async def span(self, provider: str, model: str, operation: str):
+        """Span around an SDK call; call span.record_usage() with its usage block."""
+        span = self.start(provider, model, operation)
+        try:
+            yield span
+        except BaseException as e:
+            self.finish(span, error=e)
+            raise
+        else:
+            self.finish(span)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "since": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self._started)),
+            "features": {key: series.summary() for key, series in sorted(self._features.items())},
+            "models": {key: series.summary() for key, series in sorted(self._models.items())},
+        }
+
+
+# ============================================================================
+# RESPONSE BODY PARSING (used by the governed transport)
+# ============================================================================
+
+MAX_BUFFERED_BODY = 4 * 1024 * 1024  # Larger JSON bodies (images) skip usage parsing
+
+
+def _body_decoder(content_encoding: str) -> Optional[Callable[[bytes], bytes]]:
+    """Incremental decoder for a Content-Encoding; None if unsupported."""
+    encodings = [e.strip().lower() for e in content_encoding.split(",")]
+    encodings = [e for e in encodings if e and e != "identity"]
+    if not encodings:
+        return lambda chunk: chunk
+    if len(encodings) > 1:
+        return None
+    if encodings[0] in ("gzip", "x-gzip", "deflate"):
+        return zlib.decompressobj(zlib.MAX_WBITS | 32).decompress  # gzip or zlib header
+    if encodings[0] == "br" and brotli is not None:
+        decompressor = brotli.Decompressor()
+        return getattr(decompressor, "process", None) or decompressor.decompress
+    return None
+
+
+class ResponseObserver:
+    """
+    Feeds a provider response body into a span as it streams.
+
+    The transport sees the body before httpx decodes it, so chunks are
+    decompressed here per the response's Content-Encoding. Bodies in an
+    encoding that can't be decoded are not parsed (usage stays unset).
+    """
+
+    def __init__(self, span: LLMSpan, streaming: bool, content_encoding: str = ""):
+        self.span = span
+        self.streaming = streaming
+        self._decode = _body_decoder(content_encoding)
+        if self._decode is None:
+            logger.debug(f"[TELEMETRY] Can't decode {content_encoding!r} response; usage not parsed")
+        self._buffer = b""
+        self._size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk or self._decode is None:
+            return
+        try:
+            chunk = self._decode(chunk)
+        except Exception as e:  # zlib.error / brotli.error
+            logger.debug(f"[TELEMETRY] Response body decode failed; usage not parsed: {e}")
+            self._decode = None
+            self._buffer = b""
+            return
+        if not chunk:
+            return
+        if not self.streaming:
+            self._size += len(chunk)
+            if self._size <= MAX_BUFFERED_BODY:
+                self._buffer += chunk
+            return
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            self._event(line)
+
+    def close(self) -> None:
+        if self._decode is not None and self.streaming:
+            self._event(self._buffer)
+        elif self._decode is not None and self._buffer and self._size <= MAX_BUFFERED_BODY:
+            try:
+                self._usage(json.loads(self._buffer))
+            except ValueError:
+                pass
+        self._buffer = b""
+
+    def _event(self, line: bytes) -> None:
+        if not line.startswith(b"data:"):
+            return
+        if b'"delta"' in line or b'"candidates"' in line:
+            self.span.mark_first_token()
+        if b'"usage' in line:
+            try:
+                self._usage(json.loads(line[5:]))
+            except ValueError:
+                pass
+
+    def _usage(self, payload: Any) -> None:
+        if not isinstance(payload, dict):
+            return
+        self.span.record_usage(payload.get("usage") or payload.get("usageMetadata"))
+        message = payload.get("message")
+        if isinstance(message, dict):  # Anthropic message_start
+            self.span.record_usage(message.get("usage"))
+
+
+# Global telemetry instance
+llm_telemetry = LLMTelemetry()
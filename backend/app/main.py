@@ -114,6 +114,22 @@ async def lifespan(app: FastAPI):
     await startup_db()
     logger.info("[STARTUP] Database connections established")
     
+    # Feed every provider call's outcome into the model router's stats
+    try:
+        from app.services.model_router import model_router
+        model_router.observe_llm_calls()
+    except Exception as e:
+        logger.warning(f"[STARTUP] Model router stats unavailable (non-critical): {e}")
+    
+    # Load the in-process knowledge base index (optional)
+    if settings.KB_BM25_ENABLED:
+        try:
+            from app.services.kb_search_index import kb_section_index
+            sections = await kb_section_index.load()
+            logger.info(f"[STARTUP] KB BM25 index loaded: {sections} sections")
+        except Exception as e:
+            logger.warning(f"[STARTUP] KB BM25 index failed to load (non-critical): {e}")
+    
     # Setup and start scheduler
     try:
         setup_scheduled_jobs()
@@ -165,6 +181,13 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("[SHUTDOWN] Shutting down Nicole V7 API...")
     
+    # Analyze exchanges still waiting in batched memory windows
+    try:
+        flushed = await alphawave_chat.memory_window.flush_all()
+        logger.info(f"[SHUTDOWN] Memory windows flushed ({flushed} memories saved)")
+    except Exception as e:
+        logger.debug(f"[SHUTDOWN] Memory window flush: {e}")
+    
     # Disconnect MCP servers
     try:
         await shutdown_mcp()
@@ -192,6 +215,30 @@ async def lifespan(app: FastAPI):
         scheduler.shutdown(wait=False)
         logger.info("[SHUTDOWN] Background scheduler stopped")
     
+    # Stop the broadcast hub's pub/sub listener before Redis closes
+    try:
+        from app.services.broadcast_hub import broadcast_hub
+        await broadcast_hub.shutdown()
+        logger.info("[SHUTDOWN] Broadcast hub stopped")
+    except Exception as e:
+        logger.debug(f"[SHUTDOWN] Broadcast hub shutdown: {e}")
+    
+    # Write queued knowledge base access rows before the pool closes
+    try:
+        from app.services.knowledge_base_service import kb_access_log
+        written = await kb_access_log.shutdown()
+        logger.info(f"[SHUTDOWN] KB access log drained ({written} rows written)")
+    except Exception as e:
+        logger.debug(f"[SHUTDOWN] KB access log drain: {e}")
+    
+    # Write queued usage events before the pool closes
+    try:
+        from app.services.alphawave_usage_service import usage_log
+        written = await usage_log.shutdown()
+        logger.info(f"[SHUTDOWN] Usage log drained ({written} events written)")
+    except Exception as e:
+        logger.debug(f"[SHUTDOWN] Usage log drain: {e}")
+    
     # Close database connections
     await shutdown_db()
     logger.info("[SHUTDOWN] Database connections closed")
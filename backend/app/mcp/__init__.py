@@ -50,6 +50,7 @@ from app.mcp.alphawave_mcp_manager import (
     get_mcp_tools,
     call_mcp_tool
 )
+from app.mcp.mcp_supervisor import mcp_session
 
 # Service-specific MCP wrappers
 from app.mcp.alphawave_google_mcp import google_mcp, AlphawaveGoogleMCP
@@ -77,6 +78,7 @@ __all__ = [
     "shutdown_mcp",
     "get_mcp_tools",
     "call_mcp_tool",
+    "mcp_session",
     
     # Service wrappers
     "google_mcp",
@@ -13,14 +13,15 @@ Supported MCP Servers:
 - Playwright (web automation)
 
 Architecture:
-- Each MCP server runs as a subprocess
-- Communication via JSON-RPC over stdio
-- Tool discovery happens on connection
+- Each MCP server runs as a supervised pool of asyncio subprocesses
+  (MCPServerPool): warm workers, ping probes, backoff restarts
+- Communication via multiplexed JSON-RPC over stdio (MCPStdioTransport):
+  responses are routed by id, so concurrent tool calls share one process
+- Tool discovery happens on connection and on tools/list_changed
 - Tool execution is async with timeout handling
 """
 
 import asyncio
-import json
 import logging
 import subprocess
 import os
@@ -29,6 +30,16 @@ from enum import Enum
 from typing import Any, Dict, List, Optional, Callable, Awaitable
 from datetime import datetime
 
+from app.config import settings
+from app.mcp.mcp_stdio_transport import (
+    FRAMING_NEWLINE,
+    MCPRequestError,
+    MCPStdioTransport,
+    MCPTransportClosed,
+)
+from app.mcp.mcp_supervisor import MCPServerPool
+from app.mcp.mcp_tool_cache import mcp_tool_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,6 +79,10 @@ class MCPServerConfig:
     enabled: bool = True
     auto_reconnect: bool = True
     timeout_seconds: int = 30
+    max_in_flight: int = 16  # Concurrent requests per server process
+    framing: str = FRAMING_NEWLINE  # newline (MCP stdio spec) or content-length
+    pool_size: int = 1  # Warm worker processes
+    stateless: bool = False  # True: any worker can serve any call (least-loaded dispatch)
 
 
 @dataclass
@@ -75,11 +90,10 @@ class MCPServerState:
     """Runtime state for a connected MCP server."""
     config: MCPServerConfig
     status: MCPServerStatus = MCPServerStatus.DISCONNECTED
-    process: Optional[subprocess.Popen] = None
+    pool: Optional[MCPServerPool] = None
     tools: List[MCPTool] = field(default_factory=list)
     last_error: Optional[str] = None
     connected_at: Optional[datetime] = None
-    request_id: int = 0
 
 
 class AlphawaveMCPManager:
@@ -153,6 +167,7 @@ class AlphawaveMCPManager:
                 command="npx",
                 args=["-y", "@modelcontextprotocol/server-filesystem", "/tmp/nicole"],
                 enabled=True,
+                stateless=True,
             )
         )
         
@@ -163,6 +178,9 @@ class AlphawaveMCPManager:
                 command="npx",
                 args=["-y", "@modelcontextprotocol/server-puppeteer"],
                 enabled=True,
+                # Each worker owns a browser; use mcp_session() to keep a
+                # navigate -> screenshot sequence on one worker
+                pool_size=settings.MCP_BROWSER_POOL_SIZE,
             )
         )
         
@@ -183,6 +201,8 @@ class AlphawaveMCPManager:
                 command="npx",
                 args=["-y", "@modelcontextprotocol/server-fetch"],
                 enabled=True,
+                pool_size=settings.MCP_STATELESS_POOL_SIZE,
+                stateless=True,
             )
         )
         
@@ -207,6 +227,8 @@ class AlphawaveMCPManager:
                 },
                 # Enabled when BRAVE_API_KEY is present
                 enabled=bool(os.getenv("BRAVE_API_KEY")),
+                pool_size=settings.MCP_STATELESS_POOL_SIZE,
+                stateless=True,
             )
         )
         
@@ -249,46 +271,19 @@ class AlphawaveMCPManager:
             state.status = MCPServerStatus.CONNECTING
             
             try:
-                # Build environment
-                env = os.environ.copy()
-                env.update(state.config.env)
-                
-                # Start the server process
-                logger.info(f"[MCP] Starting server: {server_name}")
+                # Start the worker processes (each completes the MCP handshake)
+                logger.info(f"[MCP] Starting server: {server_name} (workers: {state.config.pool_size})")
                 logger.debug(f"[MCP] Command: {state.config.command} {' '.join(state.config.args)}")
                 
-                state.process = subprocess.Popen(
-                    [state.config.command] + state.config.args,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    env=env,
-                    text=True,
-                    bufsize=1,
-                )
-                
-                # Initialize connection (send initialize request)
-                init_response = await self._send_request(
-                    state,
-                    "initialize",
-                    {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {
-                            "tools": {},
-                            "resources": {},
-                        },
-                        "clientInfo": {
-                            "name": "nicole-v7",
-                            "version": "7.0.0"
-                        }
-                    }
+                if state.pool:
+                    await state.pool.close()
+                state.pool = MCPServerPool(
+                    name=server_name,
+                    factory=lambda index: self._spawn_worker(state, index),
+                    size=state.config.pool_size,
+                    stateless=state.config.stateless,
                 )
-                
-                if init_response is None:
-                    raise Exception("Initialize request failed - no response")
-                
-                # Send initialized notification
-                await self._send_notification(state, "notifications/initialized", {})
+                await state.pool.start()
                 
                 # Discover tools
                 await self._discover_tools(state)
@@ -312,17 +307,57 @@ class AlphawaveMCPManager:
                 state.status = MCPServerStatus.ERROR
                 state.last_error = str(e)
                 
-                # Cleanup process if it was started
-                if state.process:
-                    try:
-                        state.process.terminate()
-                        state.process.wait(timeout=5)
-                    except Exception:
-                        state.process.kill()
-                    state.process = None
+                # Cleanup processes if any were started
+                if state.pool:
+                    await state.pool.close()
+                    state.pool = None
                 
                 return False
     
+    async def _spawn_worker(self, state: MCPServerState, index: int) -> MCPStdioTransport:
+        """
+        Start one server process and complete the initialize handshake.
+        
+        Used by the server's pool for the initial start and for restarts.
+        """
+        transport = MCPStdioTransport(
+            name=f"{state.config.name}[{index}]",
+            command=state.config.command,
+            args=state.config.args,
+            env=state.config.env,
+            max_in_flight=state.config.max_in_flight,
+            framing=state.config.framing,
+            on_notification=self._notification_handler(state),
+            on_exit=lambda _transport: state.pool and state.pool.worker_exited(index),
+        )
+        await transport.start()
+        
+        try:
+            await transport.request(
+                "initialize",
+                {
+                    "protocolVersion": "2024-11-05",
+                    "capabilities": {
+                        "tools": {},
+                        "resources": {},
+                    },
+                    "clientInfo": {
+                        "name": "nicole-v7",
+                        "version": "7.0.0"
+                    }
+                },
+                timeout=state.config.timeout_seconds,
+            )
+            await transport.notify("notifications/initialized", {})
+        except asyncio.TimeoutError:
+            await transport.close()
+            raise Exception("Initialize request failed - no response")
+        except Exception:
+            await transport.close()
+            raise
+        
+        return transport
+    
     async def _send_request(
         self,
         state: MCPServerState,
@@ -331,10 +366,10 @@ class AlphawaveMCPManager:
         timeout: Optional[float] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Send a JSON-RPC request to an MCP server using the MCP protocol.
+        Send a JSON-RPC request to an MCP server.
         
-        MCP uses Content-Length headers similar to LSP:
-        Content-Length: <length>\r\n\r\n<json-message>
+        Safe to call concurrently: the pool picks a worker and the
+        transport routes each response to its caller by request id.
         
         Args:
             state: Server state
@@ -345,92 +380,27 @@ class AlphawaveMCPManager:
         Returns:
             Response result or None on error
         """
-        if not state.process or state.process.stdin is None or state.process.stdout is None:
+        if not state.pool or not state.pool.healthy:
             logger.error(f"[MCP] Process not available for {state.config.name}")
             return None
         
-        state.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "id": state.request_id,
-            "method": method,
-            "params": params
-        }
-        
         try:
-            # Encode request with Content-Length header (MCP protocol)
-            request_json = json.dumps(request)
-            message = f"Content-Length: {len(request_json)}\r\n\r\n{request_json}"
-            state.process.stdin.write(message)
-            state.process.stdin.flush()
-            
-            # Read response with timeout
-            timeout_val = timeout or state.config.timeout_seconds
-            
-            loop = asyncio.get_running_loop()
-            response_data = await asyncio.wait_for(
-                loop.run_in_executor(None, lambda: self._read_mcp_message(state)),
-                timeout=timeout_val
+            return await state.pool.request(
+                method,
+                params,
+                timeout=timeout or state.config.timeout_seconds,
             )
-            
-            if not response_data:
-                logger.error(f"[MCP] Empty response from {state.config.name}")
-                return None
-            
-            response = json.loads(response_data)
-            
-            if "error" in response:
-                logger.error(f"[MCP] Error from {state.config.name}: {response['error']}")
-                return None
-            
-            return response.get("result")
-            
         except asyncio.TimeoutError:
             logger.error(f"[MCP] Request timeout for {state.config.name}.{method}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"[MCP] Invalid JSON response: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"[MCP] Request error: {e}", exc_info=True)
+        except MCPRequestError as e:
+            logger.error(f"[MCP] Error from {state.config.name}: {e}")
             return None
-    
-    def _read_mcp_message(self, state: MCPServerState) -> Optional[str]:
-        """
-        Read a message from MCP server using Content-Length protocol.
-        
-        Returns:
-            JSON message content or None
-        """
-        if not state.process or not state.process.stdout:
+        except MCPTransportClosed as e:
+            logger.error(f"[MCP] {e}")
             return None
-        
-        try:
-            # Read headers until we find Content-Length
-            content_length = None
-            while True:
-                line = state.process.stdout.readline()
-                if not line:
-                    return None
-                
-                line = line.strip()
-                if not line:
-                    # Empty line marks end of headers
-                    break
-                
-                if line.startswith("Content-Length:"):
-                    content_length = int(line.split(":")[1].strip())
-            
-            if content_length is None:
-                logger.error("[MCP] No Content-Length header found")
-                return None
-            
-            # Read the JSON body
-            body = state.process.stdout.read(content_length)
-            return body
-            
         except Exception as e:
-            logger.error(f"[MCP] Error reading message: {e}")
+            logger.error(f"[MCP] Request error: {e}", exc_info=True)
             return None
     
     async def _send_notification(
@@ -440,29 +410,31 @@ class AlphawaveMCPManager:
         params: Dict[str, Any]
     ) -> None:
         """Send a JSON-RPC notification (no response expected)."""
-        if not state.process or state.process.stdin is None:
+        if not state.pool:
             return
         
-        notification = {
-            "jsonrpc": "2.0",
-            "method": method,
-            "params": params
-        }
-        
         try:
-            # Use Content-Length protocol
-            notification_json = json.dumps(notification)
-            message = f"Content-Length: {len(notification_json)}\r\n\r\n{notification_json}"
-            state.process.stdin.write(message)
-            state.process.stdin.flush()
+            await state.pool.notify(method, params)
         except Exception as e:
             logger.warning(f"[MCP] Notification error: {e}")
     
+    def _notification_handler(self, state: MCPServerState):
+        """Build the server-notification callback for a transport."""
+        async def handle(method: str, params: Dict[str, Any]) -> None:
+            if method == "notifications/tools/list_changed":
+                logger.info(f"[MCP] Tool list changed on {state.config.name}, rediscovering")
+                asyncio.create_task(self._discover_tools(state))
+            elif method == "notifications/message":
+                logger.debug(f"[MCP] {state.config.name}: {params.get('data')}")
+        return handle
+    
     async def _discover_tools(self, state: MCPServerState) -> None:
         """Discover available tools from an MCP server."""
         result = await self._send_request(state, "tools/list", {})
         
         if result and "tools" in result:
+            for tool in state.tools:
+                self._tool_registry.pop(tool.name, None)
             state.tools = []
             for tool_data in result["tools"]:
                 tool = MCPTool(
@@ -493,13 +465,9 @@ class AlphawaveMCPManager:
             
             state = self._servers[server_name]
             
-            if state.process:
-                try:
-                    state.process.terminate()
-                    state.process.wait(timeout=5)
-                except Exception:
-                    state.process.kill()
-                state.process = None
+            if state.pool:
+                await state.pool.close()
+                state.pool = None
             
             # Remove tools from registry
             for tool in state.tools:
@@ -532,7 +500,11 @@ class AlphawaveMCPManager:
     def get_server_status(self, server_name: str) -> Optional[MCPServerStatus]:
         """Get the connection status of a server."""
         if server_name in self._servers:
-            return self._servers[server_name].status
+            state = self._servers[server_name]
+            if state.status == MCPServerStatus.CONNECTED and state.pool and not state.pool.healthy:
+                # Every worker is down; the supervisor is restarting them
+                return MCPServerStatus.RECONNECTING
+            return state.status
         return None
     
     def get_all_tools(self) -> List[MCPTool]:
@@ -556,6 +528,9 @@ class AlphawaveMCPManager:
         """
         Execute a tool on its MCP server.
         
+        Read-only tools are served from the shared tool cache, and identical
+        concurrent calls share one execution (see mcp_tool_cache).
+        
         Args:
             tool_name: Name of the tool to call
             arguments: Tool arguments
@@ -564,6 +539,21 @@ class AlphawaveMCPManager:
         Returns:
             Tool execution result
         """
+        return await mcp_tool_cache.call(
+            "stdio",
+            tool_name,
+            arguments,
+            fetch=lambda: self._call_tool_uncached(tool_name, arguments, timeout),
+            is_error=lambda result: "error" in result or bool(result.get("isError")),
+        )
+    
+    async def _call_tool_uncached(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Reconnect if needed and execute the tool on its server."""
         tool = self._tool_registry.get(tool_name)
         
         if not tool:
@@ -575,6 +565,12 @@ class AlphawaveMCPManager:
         
         state = self._servers.get(tool.server_name)
         
+        if self.get_server_status(tool.server_name) == MCPServerStatus.RECONNECTING:
+            return {
+                "error": f"Server '{tool.server_name}' is restarting, try again shortly",
+                "last_error": state.last_error,
+            }
+        
         if not state or state.status != MCPServerStatus.CONNECTED:
             # Try to reconnect
             if state and state.config.auto_reconnect:
@@ -614,6 +610,9 @@ class AlphawaveMCPManager:
                     text_parts.append(item.get("text", ""))
             
             if text_parts:
+                if result.get("isError"):
+                    # Tool-level failure; keep it distinguishable (and uncached)
+                    return {"error": "\n".join(text_parts)}
                 return {"result": "\n".join(text_parts)}
         
         return result
@@ -648,19 +647,21 @@ class AlphawaveMCPManager:
         return {
             "servers": {
                 name: {
-                    "status": state.status.value,
+                    "status": self.get_server_status(name).value,
                     "enabled": state.config.enabled,
                     "tool_count": len(state.tools),
                     "connected_at": state.connected_at.isoformat() if state.connected_at else None,
-                    "last_error": state.last_error
+                    "last_error": state.last_error,
+                    **(state.pool.get_status() if state.pool else {}),
                 }
                 for name, state in self._servers.items()
             },
             "total_tools": len(self._tool_registry),
             "connected_servers": sum(
-                1 for s in self._servers.values() 
-                if s.status == MCPServerStatus.CONNECTED
-            )
+                1 for name in self._servers
+                if self.get_server_status(name) == MCPServerStatus.CONNECTED
+            ),
+            "tool_cache": mcp_tool_cache.get_stats(),
         }
 
 
@@ -17,6 +17,7 @@ import logging
 import base64
 
 from app.mcp.alphawave_mcp_manager import mcp_manager, AlphawaveMCPManager
+from app.mcp.mcp_supervisor import mcp_session
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +71,19 @@ class AlphawavePlaywrightMCP:
             await mcp_manager.disconnect_server(self.SERVER_NAME)
         self._connected = False
     
+    def session(self, key: str):
+        """
+        Keep a sequence of browser calls on one warm browser worker.
+        
+        The puppeteer server keeps page state per process, so a navigate
+        followed by a screenshot must hit the same worker:
+        
+            with playwright_mcp.session(f"vibe-{project_id}"):
+                await playwright_mcp.navigate(url)
+                await playwright_mcp.screenshot()
+        """
+        return mcp_session(f"{self.SERVER_NAME}:{key}")
+    
     # =========================================================================
     # NAVIGATION
     # =========================================================================
@@ -5,6 +5,8 @@ from typing import Any, Dict, List, Optional
 
 import httpx
 
+from app.mcp.mcp_tool_cache import mcp_tool_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -89,10 +91,27 @@ class DockerMCPClient:
     async def call_tool(
         self, tool_name: str, arguments: Dict[str, Any]
     ) -> MCPToolResult:
-        """Call a tool by name via MCP Gateway."""
+        """
+        Call a tool by name via MCP Gateway.
+
+        Read-only tools are served from the shared tool cache, and identical
+        concurrent calls share one gateway round trip (see mcp_tool_cache).
+        """
         if not self._connected:
             raise RuntimeError("Not connected to MCP Gateway")
 
+        return await mcp_tool_cache.call(
+            "gateway",
+            tool_name,
+            arguments,
+            fetch=lambda: self._call_tool_upstream(tool_name, arguments),
+            is_error=lambda result: result.is_error,
+        )
+
+    async def _call_tool_upstream(
+        self, tool_name: str, arguments: Dict[str, Any]
+    ) -> MCPToolResult:
+        """Execute a tool call on the gateway."""
         try:
             response = await self._http_client.post(
                 "/rpc",
@@ -0,0 +1,375 @@
+"""
+Nicole V7 - Async multiplexed JSON-RPC transport for stdio MCP servers
+
+One subprocess per transport, started with asyncio.create_subprocess_exec.
+A background reader task owns stdout and routes every response to the
+future of the request with the same JSON-RPC id, so:
+
+- many requests can be in flight on one server at once
+- a timed-out request cannot leave a stale reply for the next caller
+  (late replies are dropped by id, and the server is sent
+  notifications/cancelled)
+- server notifications and server-to-client requests (e.g. ping) are
+  handled instead of being mistaken for responses
+
+Backpressure: a semaphore bounds in-flight requests per transport, and
+writes await stdin.drain(). stderr is drained continuously so a chatty
+server cannot block on a full pipe.
+
+Framing: the MCP stdio spec uses newline-delimited JSON. Content-Length
+(LSP-style) framing is also accepted on read and can be selected for
+writes per server.
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+FRAMING_NEWLINE = "newline"
+FRAMING_CONTENT_LENGTH = "content-length"
+
+# StreamReader line limit; screenshots and page dumps arrive as one JSON line
+MAX_MESSAGE_BYTES = 32 * 1024 * 1024
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class MCPTransportError(Exception):
+    """Base class for transport failures."""
+
+
+class MCPTransportClosed(MCPTransportError):
+    """The server process exited or the transport was closed."""
+
+
+class MCPRequestError(MCPTransportError):
+    """The server answered with a JSON-RPC error object."""
+
+    def __init__(self, method: str, error: Dict[str, Any]):
+        self.method = method
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(f"{method}: {error.get('message', 'unknown error')} (code {self.code})")
+
+
+NotificationHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+# =============================================================================
+# TRANSPORT
+# =============================================================================
+
+class MCPStdioTransport:
+    """
+    Multiplexed JSON-RPC 2.0 client over a subprocess's stdin/stdout.
+
+    Usage:
+        transport = MCPStdioTransport("fetch", "npx", ["-y", "@modelcontextprotocol/server-fetch"])
+        await transport.start()
+        result = await transport.request("tools/list", {}, timeout=30)
+        await transport.close()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command: str,
+        args: Optional[List[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        max_in_flight: int = 16,
+        framing: str = FRAMING_NEWLINE,
+        on_notification: Optional[NotificationHandler] = None,
+        on_exit: Optional[Callable[["MCPStdioTransport"], None]] = None,
+    ):
+        self.name = name
+        self.command = command
+        self.args = list(args or [])
+        self.env = dict(env or {})
+        self.framing = framing
+        self._on_notification = on_notification
+        self._on_exit = on_exit
+
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._slots = asyncio.Semaphore(max(1, max_in_flight))
+        self._write_lock = asyncio.Lock()
+        self._closed = False
+
+        # Counters for status reporting
+        self.requests_sent = 0
+        self.late_replies = 0
+        self.notifications_received = 0
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Spawn the server process and start the reader tasks."""
+        env = os.environ.copy()
+        env.update(self.env)
+
+        self._process = await asyncio.create_subprocess_exec(
+            self.command,
+            *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=MAX_MESSAGE_BYTES,
+        )
+        self._closed = False
+        self._reader_task = asyncio.create_task(self._read_loop(), name=f"mcp-reader-{self.name}")
+        self._stderr_task = asyncio.create_task(self._drain_stderr(), name=f"mcp-stderr-{self.name}")
+        logger.debug(f"[MCP] {self.name} started (pid {self._process.pid})")
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Terminate the process without blocking the event loop."""
+        self._closed = True
+        process = self._process
+
+        if process and process.returncode is None:
+            try:
+                if process.stdin:
+                    process.stdin.close()
+                process.terminate()
+                await asyncio.wait_for(process.wait(), timeout=timeout)
+            except (asyncio.TimeoutError, ProcessLookupError):
+                try:
+                    process.kill()
+                    await process.wait()
+                except ProcessLookupError:
+                    pass
+            except Exception as e:
+                logger.debug(f"[MCP] {self.name} close: {e}")
+
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+        self._fail_pending(MCPTransportClosed(f"{self.name} transport closed"))
+
+    @property
+    def is_alive(self) -> bool:
+        return (
+            not self._closed
+            and self._process is not None
+            and self._process.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._process.pid if self._process else None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    # -------------------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Send a request and wait for the response with the same id.
+
+        Waits for a free in-flight slot first (backpressure); the wait
+        counts against `timeout`.
+
+        Raises:
+            asyncio.TimeoutError: No response in time (request is cancelled)
+            MCPRequestError: Server returned a JSON-RPC error
+            MCPTransportClosed: Process exited or transport closed
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+
+        def remaining() -> Optional[float]:
+            return max(0.0, deadline - loop.time()) if deadline else None
+
+        await asyncio.wait_for(self._slots.acquire(), timeout=remaining())
+        try:
+            if not self.is_alive:
+                raise MCPTransportClosed(f"{self.name} is not running")
+
+            request_id = next(self._ids)
+            future: asyncio.Future = loop.create_future()
+            self._pending[request_id] = future
+            try:
+                await self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+                self.requests_sent += 1
+                message = await asyncio.wait_for(future, timeout=remaining())
+            except asyncio.TimeoutError:
+                await self._cancel_remote(request_id, "timeout")
+                raise
+            finally:
+                self._pending.pop(request_id, None)
+        finally:
+            self._slots.release()
+
+        if "error" in message:
+            raise MCPRequestError(method, message["error"] or {})
+        return message.get("result")
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a notification (no response expected)."""
+        if not self.is_alive:
+            raise MCPTransportClosed(f"{self.name} is not running")
+        await self._write({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    async def _cancel_remote(self, request_id: int, reason: str) -> None:
+        try:
+            await self.notify("notifications/cancelled", {"requestId": request_id, "reason": reason})
+        except Exception:
+            pass
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        process = self._process
+        if not process or not process.stdin:
+            raise MCPTransportClosed(f"{self.name} has no stdin")
+
+        body = json.dumps(message, separators=(",", ":")).encode("utf-8")
+        if self.framing == FRAMING_CONTENT_LENGTH:
+            data = f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+        else:
+            data = body + b"\n"
+
+        async with self._write_lock:
+            try:
+                process.stdin.write(data)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise MCPTransportClosed(f"{self.name} stdin closed: {e}") from e
+
+    # -------------------------------------------------------------------------
+    # Reader
+    # -------------------------------------------------------------------------
+
+    async def _read_message(self) -> Optional[Dict[str, Any]]:
+        """Read one message in either framing; None at EOF."""
+        stdout = self._process.stdout
+        while True:
+            line = await stdout.readline()
+            if not line:
+                return None
+
+            stripped = line.strip()
+            if not stripped:
+                continue
+
+            if stripped.lower().startswith(b"content-length:"):
+                length = int(stripped.split(b":", 1)[1].strip())
+                # Skip any remaining headers up to the blank line
+                while (await stdout.readline()).strip():
+                    pass
+                body = await stdout.readexactly(length)
+                return json.loads(body)
+
+            try:
+                return json.loads(stripped)
+            except json.JSONDecodeError:
+                # Some servers print banners to stdout; ignore non-JSON lines
+                logger.debug(f"[MCP] {self.name} non-JSON stdout: {stripped[:200]!r}")
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                try:
+                    message = await self._read_message()
+                except (json.JSONDecodeError, ValueError) as e:
+                    logger.warning(f"[MCP] {self.name} sent an unreadable message: {e}")
+                    continue
+                if message is None:
+                    break
+                await self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[MCP] {self.name} reader failed: {e}", exc_info=True)
+        finally:
+            self._fail_pending(MCPTransportClosed(f"{self.name} exited"))
+            if not self._closed:
+                logger.warning(f"[MCP] {self.name} process exited unexpectedly")
+                if self._on_exit:
+                    self._on_exit(self)
+
+    async def _dispatch(self, message: Dict[str, Any]) -> None:
+        method = message.get("method")
+        message_id = message.get("id")
+
+        # Response to one of our requests
+        if method is None:
+            future = self._pending.get(message_id)
+            if future and not future.done():
+                future.set_result(message)
+            else:
+                self.late_replies += 1
+                logger.debug(f"[MCP] {self.name} dropped reply for unknown/expired id {message_id}")
+            return
+
+        # Server-to-client request
+        if message_id is not None:
+            if method == "ping":
+                reply = {"jsonrpc": "2.0", "id": message_id, "result": {}}
+            else:
+                reply = {
+                    "jsonrpc": "2.0",
+                    "id": message_id,
+                    "error": {"code": METHOD_NOT_FOUND, "message": f"Method not supported: {method}"},
+                }
+            try:
+                await self._write(reply)
+            except MCPTransportError:
+                pass
+            return
+
+        # Notification
+        self.notifications_received += 1
+        if self._on_notification:
+            try:
+                await self._on_notification(method, message.get("params") or {})
+            except Exception as e:
+                logger.warning(f"[MCP] {self.name} notification handler failed for {method}: {e}")
+        else:
+            logger.debug(f"[MCP] {self.name} notification: {method}")
+
+    async def _drain_stderr(self) -> None:
+        stderr = self._process.stderr
+        try:
+            while True:
+                line = await stderr.readline()
+                if not line:
+                    break
+                logger.debug(f"[MCP] {self.name} stderr: {line.decode('utf-8', 'replace').rstrip()}")
+        except (asyncio.CancelledError, ValueError):
+            pass
+
+    def _fail_pending(self, error: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
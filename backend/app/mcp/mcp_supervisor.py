@@ -0,0 +1,429 @@
+"""
+Nicole V7 - MCP server supervisor
+
+Keeps a pool of warm worker processes per MCP server and keeps them alive:
+
+- N workers per server (MCPServerConfig.pool_size), each its own
+  MCPStdioTransport with a completed initialize handshake
+- Least-loaded dispatch for stateless servers (fewest in-flight requests)
+- Session affinity for stateful servers (e.g. a browser whose page must
+  survive navigate -> screenshot): calls inside `mcp_session(key)` stick to
+  one worker, calls without a session go to the primary worker
+- Periodic `ping` probes; a worker that misses MCP_PING_FAILURE_THRESHOLD
+  probes in a row, or whose process exits, is restarted
+- Restarts use exponential backoff with jitter, reset after a healthy probe
+- Rolling per-server latency percentiles, error/timeout counts and restart
+  counts for get_status_summary
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional
+
+from app.config import settings
+from app.mcp.mcp_stdio_transport import MCPRequestError, MCPStdioTransport, MCPTransportClosed
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+LATENCY_WINDOW = 512  # Samples kept per server for percentiles
+MAX_AFFINITY_KEYS = 256  # Sticky session -> worker assignments kept per pool
+
+# Session key for stateful servers; set with mcp_session()
+mcp_affinity: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("mcp_affinity", default=None)
+
+
+@contextlib.contextmanager
+def mcp_session(key: str) -> Iterator[None]:
+    """
+    Route every MCP call made inside this block to the same worker.
+
+    Usage:
+        with mcp_session(f"screenshot-{project_id}"):
+            await playwright_mcp.navigate(url)
+            await playwright_mcp.screenshot()
+    """
+    token = mcp_affinity.set(key)
+    try:
+        yield
+    finally:
+        mcp_affinity.reset(token)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class MCPServerMetrics:
+    """Rolling call metrics for one server (all workers combined)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency_ms: float, ok: bool, timed_out: bool = False) -> None:
+        self.calls += 1
+        self._latencies.append(latency_ms)
+        if not ok:
+            self.errors += 1
+        if timed_out:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "restarts": self.restarts,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99)},
+        }
+
+
+# =============================================================================
+# WORKERS
+# =============================================================================
+
+class MCPWorkerStatus(Enum):
+    """Lifecycle of one pooled server process."""
+    STARTING = "starting"
+    READY = "ready"
+    RESTARTING = "restarting"
+    STOPPED = "stopped"
+
+
+class MCPWorker:
+    """One server process in a pool."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.transport: Optional[MCPStdioTransport] = None
+        self.status = MCPWorkerStatus.STARTING
+        self.ping_failures = 0
+        self.restart_attempts = 0
+        self.last_ping_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return (
+            self.status == MCPWorkerStatus.READY
+            and self.transport is not None
+            and self.transport.is_alive
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self.transport.in_flight if self.transport else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "status": self.status.value,
+            "pid": self.transport.pid if self.transport else None,
+            "in_flight": self.in_flight,
+            "last_ping_ms": self.last_ping_ms,
+            "restart_attempts": self.restart_attempts,
+            "last_error": self.last_error,
+        }
+
+
+# Spawns a transport for worker N and completes the initialize handshake
+WorkerFactory = Callable[[int], Awaitable[MCPStdioTransport]]
+
+
+# =============================================================================
+# POOL
+# =============================================================================
+
+class MCPServerPool:
+    """
+    Supervised pool of worker processes for one MCP server.
+
+    The factory owns process startup and the MCP handshake; the pool owns
+    dispatch, health probes and restarts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        factory: WorkerFactory,
+        size: int = 1,
+        stateless: bool = False,
+    ):
+        self.name = name
+        self.stateless = stateless
+        self.metrics = MCPServerMetrics()
+        self._factory = factory
+        self._workers = [MCPWorker(i) for i in range(max(1, size))]
+        self._affinity: "OrderedDict[str, int]" = OrderedDict()
+        self._restart_tasks: Dict[int, asyncio.Task] = {}
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._rr = 0
+
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+
+    async def start(self) -> bool:
+        """Start all workers; succeeds if at least one comes up."""
+        self._closed = False
+        results = await asyncio.gather(
+            *(self._start_worker(w) for w in self._workers),
+            return_exceptions=True,
+        )
+
+        started = 0
+        for worker, result in zip(self._workers, results):
+            if isinstance(result, BaseException):
+                worker.last_error = str(result)
+                if isinstance(result, FileNotFoundError):
+                    # No point retrying a missing binary
+                    raise result
+                self._schedule_restart(worker)
+            else:
+                started += 1
+
+        if not started:
+            await self.close()
+            raise MCPTransportClosed(
+                f"{self.name}: no worker started ({self._workers[0].last_error})"
+            )
+
+        self._monitor_task = asyncio.create_task(self._monitor(), name=f"mcp-monitor-{self.name}")
+        logger.info(f"[MCP] {self.name}: {started}/{len(self._workers)} workers ready")
+        return True
+
+    async def close(self) -> None:
+        """Stop probes and restarts and terminate every worker."""
+        self._closed = True
+        tasks = list(self._restart_tasks.values())
+        if self._monitor_task:
+            tasks.append(self._monitor_task)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        self._restart_tasks.clear()
+        self._monitor_task = None
+
+        await asyncio.gather(
+            *(w.transport.close() for w in self._workers if w.transport),
+            return_exceptions=True,
+        )
+        for worker in self._workers:
+            worker.transport = None
+            worker.status = MCPWorkerStatus.STOPPED
+        self._affinity.clear()
+
+    async def _start_worker(self, worker: MCPWorker) -> None:
+        worker.status = MCPWorkerStatus.STARTING
+        transport = await self._factory(worker.index)
+        if self._closed:
+            await transport.close()
+            return
+        worker.transport = transport
+        worker.status = MCPWorkerStatus.READY
+        worker.ping_failures = 0
+        worker.started_at = time.monotonic()
+        worker.last_error = None
+
+    # -------------------------------------------------------------------------
+    # Dispatch
+    # -------------------------------------------------------------------------
+
+    @property
+    def healthy(self) -> bool:
+        return any(w.ready for w in self._workers)
+
+    @property
+    def primary(self) -> Optional[MCPStdioTransport]:
+        """Transport of the first ready worker (used for discovery)."""
+        worker = next((w for w in self._workers if w.ready), None)
+        return worker.transport if worker else None
+
+    def _pick(self, affinity: Optional[str]) -> MCPWorker:
+        ready = [w for w in self._workers if w.ready]
+        if not ready:
+            raise MCPTransportClosed(f"{self.name}: no healthy workers")
+
+        if self.stateless:
+            # Least in-flight; rotate among ties so idle workers share load
+            low = min(w.in_flight for w in ready)
+            candidates = [w for w in ready if w.in_flight == low]
+            self._rr += 1
+            return candidates[self._rr % len(candidates)]
+
+        if affinity is None:
+            return ready[0]
+
+        index = self._affinity.get(affinity)
+        worker = self._workers[index] if index is not None else None
+        if worker is None or not worker.ready:
+            # New session (or its worker died): least-loaded by pinned sessions
+            pinned = {i: 0 for i in range(len(self._workers))}
+            for i in self._affinity.values():
+                pinned[i] += 1
+            worker = min(ready, key=lambda w: (pinned[w.index], w.in_flight))
+        self._affinity[affinity] = worker.index
+        self._affinity.move_to_end(affinity)
+        while len(self._affinity) > MAX_AFFINITY_KEYS:
+            self._affinity.popitem(last=False)
+        return worker
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        affinity: Optional[str] = None,
+    ) -> Any:
+        """Send a request to one worker, recording latency and errors."""
+        worker = self._pick(affinity if affinity is not None else mcp_affinity.get())
+        started = time.perf_counter()
+        try:
+            result = await worker.transport.request(method, params, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.metrics.record(1000 * (time.perf_counter() - started), ok=False, timed_out=True)
+            raise
+        except MCPTransportClosed:
+            self.metrics.record(1000 * (time.perf_counter() - started), ok=False)
+            self._schedule_restart(worker)
+            raise
+        except MCPRequestError:
+            self.metrics.record(1000 * (time.perf_counter() - started), ok=False)
+            raise
+        self.metrics.record(1000 * (time.perf_counter() - started), ok=True)
+        return result
+
+    async def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a notification to every ready worker."""
+        await asyncio.gather(
+            *(w.transport.notify(method, params) for w in self._workers if w.ready),
+            return_exceptions=True,
+        )
+
+    def in_flight(self) -> int:
+        return sum(w.in_flight for w in self._workers)
+
+    # -------------------------------------------------------------------------
+    # Health and restarts
+    # -------------------------------------------------------------------------
+
+    def worker_exited(self, index: int) -> None:
+        """Transport on_exit hook: restart a worker that died on its own."""
+        if not self._closed and 0 <= index < len(self._workers):
+            self._schedule_restart(self._workers[index])
+
+    async def _monitor(self) -> None:
+        interval = settings.MCP_HEALTH_CHECK_INTERVAL_SECONDS
+        while not self._closed:
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+            await asyncio.gather(
+                *(self._probe(w) for w in self._workers),
+                return_exceptions=True,
+            )
+
+    async def _probe(self, worker: MCPWorker) -> None:
+        if worker.status != MCPWorkerStatus.READY:
+            return
+        if not worker.ready:
+            self._schedule_restart(worker)
+            return
+
+        started = time.perf_counter()
+        try:
+            await worker.transport.request("ping", {}, timeout=settings.MCP_PING_TIMEOUT_SECONDS)
+        except MCPRequestError:
+            # Answered with an error (ping unsupported) - the process is alive
+            pass
+        except (asyncio.TimeoutError, MCPTransportClosed) as e:
+            worker.ping_failures += 1
+            worker.last_error = f"ping failed: {e or 'timeout'}"
+            logger.warning(
+                f"[MCP] {self.name}[{worker.index}] ping failed "
+                f"({worker.ping_failures}/{settings.MCP_PING_FAILURE_THRESHOLD})"
+            )
+            if worker.ping_failures >= settings.MCP_PING_FAILURE_THRESHOLD:
+                self._schedule_restart(worker)
+            return
+
+        worker.last_ping_ms = round(1000 * (time.perf_counter() - started), 1)
+        worker.ping_failures = 0
+        worker.restart_attempts = 0
+
+    def _schedule_restart(self, worker: MCPWorker) -> None:
+        if self._closed:
+            return
+        task = self._restart_tasks.get(worker.index)
+        if task and not task.done():
+            return
+        worker.status = MCPWorkerStatus.RESTARTING
+        self._restart_tasks[worker.index] = asyncio.create_task(
+            self._restart(worker), name=f"mcp-restart-{self.name}-{worker.index}"
+        )
+
+    async def _restart(self, worker: MCPWorker) -> None:
+        while not self._closed:
+            delay = min(
+                settings.MCP_RESTART_BACKOFF_MAX_SECONDS,
+                settings.MCP_RESTART_BACKOFF_BASE_SECONDS * (2 ** worker.restart_attempts),
+            )
+            delay *= random.uniform(0.8, 1.2)
+            worker.restart_attempts += 1
+            logger.info(
+                f"[MCP] Restarting {self.name}[{worker.index}] in {delay:.1f}s "
+                f"(attempt {worker.restart_attempts})"
+            )
+            await asyncio.sleep(delay)
+
+            old = worker.transport
+            worker.transport = None
+            if old:
+                await old.close()
+
+            try:
+                await self._start_worker(worker)
+            except Exception as e:
+                worker.last_error = str(e)
+                logger.warning(f"[MCP] {self.name}[{worker.index}] restart failed: {e}")
+                continue
+
+            self.metrics.restarts += 1
+            logger.info(f"[MCP] ✅ {self.name}[{worker.index}] restarted")
+            return
+
+    # -------------------------------------------------------------------------
+    # Status
+    # -------------------------------------------------------------------------
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "pool_size": len(self._workers),
+            "ready_workers": sum(1 for w in self._workers if w.ready),
+            "stateless": self.stateless,
+            "in_flight": self.in_flight(),
+            "workers": [w.to_dict() for w in self._workers],
+            "metrics": self.metrics.snapshot(),
+        }
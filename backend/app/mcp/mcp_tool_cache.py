@@ -0,0 +1,313 @@
+"""
+Nicole V7 - MCP tool result cache with single-flight coalescing
+
+Claude repeats the same read-only lookups (web search, fetch, Notion
+search/get) across tool iterations and across turns. This module gives
+both MCP paths - DockerMCPClient.call_tool (gateway) and
+AlphawaveMCPManager.call_tool (stdio servers) - a shared, declarative
+cache:
+
+- TOOL_CACHE_POLICIES maps tool-name patterns to a ToolCachePolicy
+  (cacheable, TTL, which argument fields form the key, invalidation group)
+- Identical concurrent calls to a cacheable tool share one upstream
+  execution (single-flight); non-cacheable tools are never coalesced
+- Error results are never stored
+- Write tools matching TOOL_INVALIDATION_RULES drop their group's entries,
+  so a Notion page update is visible to the next Notion read
+- Per-tool hit / miss / coalesced counters feed /health/mcp
+
+Entries are kept in-process (bounded LRU); cached values are deep-copied
+on the way out so callers can mutate results freely.
+"""
+
+import asyncio
+import copy
+import fnmatch
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# =============================================================================
+# POLICIES
+# =============================================================================
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """How results of one tool may be cached."""
+    cacheable: bool = False
+    ttl_seconds: int = 0
+    key_fields: Optional[Tuple[str, ...]] = None  # None = every argument
+    group: str = "default"  # Invalidation group
+
+
+NOT_CACHEABLE = ToolCachePolicy()
+
+# First matching pattern wins. Anything unmatched is not cached.
+TOOL_CACHE_POLICIES: List[Tuple[str, ToolCachePolicy]] = [
+    # Browser automation is stateful - never cache or coalesce
+    ("puppeteer_*", NOT_CACHEABLE),
+    ("playwright_*", NOT_CACHEABLE),
+
+    # Web search
+    ("brave_web_search", ToolCachePolicy(True, 600, ("query", "count", "offset"), "web")),
+    ("brave_local_search", ToolCachePolicy(True, 600, ("query", "count"), "web")),
+
+    # Page fetch
+    ("fetch", ToolCachePolicy(True, 900, ("url", "max_length", "start_index", "raw"), "web")),
+    ("firecrawl_scrape", ToolCachePolicy(True, 900, None, "web")),
+
+    # Library docs (context7)
+    ("resolve-library-id", ToolCachePolicy(True, 3600, None, "docs")),
+    ("get-library-docs", ToolCachePolicy(True, 3600, None, "docs")),
+    ("get_documentation", ToolCachePolicy(True, 3600, None, "docs")),
+
+    # Notion reads (wrapper names and the official server's API-* names)
+    ("notion_search", ToolCachePolicy(True, 120, None, "notion")),
+    ("notion_get_*", ToolCachePolicy(True, 120, None, "notion")),
+    ("notion_query_database", ToolCachePolicy(True, 60, None, "notion")),
+    ("API-post-search", ToolCachePolicy(True, 120, None, "notion")),
+    ("API-post-database-query", ToolCachePolicy(True, 60, None, "notion")),
+    ("API-retrieve-*", ToolCachePolicy(True, 120, None, "notion")),
+    ("API-get-*", ToolCachePolicy(True, 120, None, "notion")),
+
+    # Filesystem reads - short TTL, writes invalidate
+    ("read_file", ToolCachePolicy(True, 30, None, "filesystem")),
+    ("read_multiple_files", ToolCachePolicy(True, 30, None, "filesystem")),
+    ("list_directory", ToolCachePolicy(True, 30, None, "filesystem")),
+    ("directory_tree", ToolCachePolicy(True, 30, None, "filesystem")),
+    ("search_files", ToolCachePolicy(True, 30, None, "filesystem")),
+    ("get_file_info", ToolCachePolicy(True, 30, None, "filesystem")),
+]
+
+# Tools that change upstream state, and the group they invalidate
+TOOL_INVALIDATION_RULES: List[Tuple[str, str]] = [
+    ("notion_create_*", "notion"),
+    ("notion_update_*", "notion"),
+    ("notion_append_*", "notion"),
+    ("notion_delete_*", "notion"),
+    ("API-patch-*", "notion"),
+    ("API-post-page", "notion"),
+    ("API-delete-*", "notion"),
+    ("write_file", "filesystem"),
+    ("edit_file", "filesystem"),
+    ("create_directory", "filesystem"),
+    ("move_file", "filesystem"),
+]
+
+
+def policy_for(tool_name: str) -> ToolCachePolicy:
+    """Resolve the cache policy for a tool name."""
+    for pattern, policy in TOOL_CACHE_POLICIES:
+        if fnmatch.fnmatchcase(tool_name, pattern):
+            return policy
+    return NOT_CACHEABLE
+
+
+def _invalidation_group(tool_name: str) -> Optional[str]:
+    for pattern, group in TOOL_INVALIDATION_RULES:
+        if fnmatch.fnmatchcase(tool_name, pattern):
+            return group
+    return None
+
+
+def _cache_key(scope: str, tool_name: str, arguments: Dict[str, Any], policy: ToolCachePolicy) -> str:
+    if policy.key_fields is not None:
+        arguments = {k: arguments.get(k) for k in policy.key_fields if arguments.get(k) is not None}
+    normalized = {
+        k: v.strip() if isinstance(v, str) else v
+        for k, v in arguments.items()
+    }
+    payload = json.dumps([scope, tool_name, normalized], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+@dataclass
+class _ToolStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    stored: int = 0
+    errors: int = 0
+
+
+class MCPToolCache:
+    """
+    Bounded in-process LRU of tool results plus single-flight execution.
+
+    Usage:
+        result = await mcp_tool_cache.call(
+            "gateway", tool_name, arguments,
+            fetch=lambda: self._call_tool_upstream(tool_name, arguments),
+            is_error=lambda r: r.is_error,
+        )
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        # key -> (expires_at, group, value)
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, _ToolStats] = {}
+        self._generations: Dict[str, int] = {}  # Bumped on invalidation
+        self._epoch = 0  # Bumped on full invalidation
+
+    async def call(
+        self,
+        scope: str,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        fetch: Callable[[], Awaitable[T]],
+        is_error: Callable[[T], bool],
+    ) -> T:
+        """
+        Return a cached result, join an identical in-flight call, or run fetch().
+
+        Args:
+            scope: Caller namespace ("gateway", "stdio") - result shapes differ
+            tool_name: MCP tool name (selects the policy)
+            arguments: Tool arguments
+            fetch: Upstream call
+            is_error: Whether a result is an error (errors are not stored)
+        """
+        group = _invalidation_group(tool_name)
+        if group:
+            # Drop before and after; reads that started before the write
+            # finished see a new generation and don't store their result
+            self.invalidate(group)
+            try:
+                return await fetch()
+            finally:
+                self.invalidate(group)
+
+        policy = policy_for(tool_name)
+        if not policy.cacheable or not settings.MCP_TOOL_CACHE_ENABLED:
+            return await fetch()
+
+        stats = self._stats.setdefault(tool_name, _ToolStats())
+        key = _cache_key(scope, tool_name, arguments, policy)
+
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, _, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                stats.hits += 1
+                return copy.deepcopy(value)
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            stats.coalesced += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(inflight))
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading caller was cancelled; run the call ourselves
+                return await fetch()
+
+        stats.misses += 1
+        generation = self._generation(policy.group)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        if is_error(value):
+            stats.errors += 1
+        elif generation == self._generation(policy.group):
+            self._store(key, policy, value)
+            stats.stored += 1
+        return copy.deepcopy(value)
+
+    def _generation(self, group: str) -> Tuple[int, int]:
+        return self._epoch, self._generations.get(group, 0)
+
+    def _store(self, key: str, policy: ToolCachePolicy, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + policy.ttl_seconds, policy.group, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, group: Optional[str] = None) -> int:
+        """Drop every entry in a group (or everything). Returns entries removed."""
+        if group is None:
+            self._epoch += 1
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+        self._generations[group] = self._generations.get(group, 0) + 1
+        stale = [k for k, (_, g, _) in self._entries.items() if g == group]
+        for k in stale:
+            del self._entries[k]
+        if stale:
+            logger.debug(f"[MCP CACHE] Invalidated {len(stale)} {group} entries")
+        return len(stale)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics, overall and per tool."""
+        def rate(s: _ToolStats) -> float:
+            served = s.hits + s.coalesced
+            total = served + s.misses
+            return round(served / total, 4) if total else 0.0
+
+        totals = _ToolStats()
+        for s in self._stats.values():
+            totals.hits += s.hits
+            totals.misses += s.misses
+            totals.coalesced += s.coalesced
+            totals.stored += s.stored
+            totals.errors += s.errors
+
+        return {
+            "enabled": settings.MCP_TOOL_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": totals.hits,
+            "misses": totals.misses,
+            "coalesced": totals.coalesced,
+            "hit_rate": rate(totals),
+            "tools": {
+                name: {
+                    "hits": s.hits,
+                    "misses": s.misses,
+                    "coalesced": s.coalesced,
+                    "errors": s.errors,
+                    "hit_rate": rate(s),
+                }
+                for name, s in sorted(self._stats.items())
+            },
+        }
+
+
+# =============================================================================
+# GLOBAL INSTANCE
+# =============================================================================
+
+mcp_tool_cache = MCPToolCache(max_entries=settings.MCP_TOOL_CACHE_MAX_ENTRIES)
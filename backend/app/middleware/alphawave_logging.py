@@ -8,6 +8,8 @@ import logging
 import time
 import json
 
+from app.integrations.llm_telemetry import feature_for_path, set_feature
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,6 +28,9 @@ async def logging_middleware(request: Request, call_next: Callable):
     start_time = time.time()
     correlation_id = getattr(request.state, "correlation_id", "unknown")
     
+    # Attribute LLM calls made while serving this request (see llm_telemetry)
+    set_feature(feature_for_path(request.url.path))
+    
     # Log request
     logger.info(
         json.dumps({
@@ -30,6 +30,8 @@ from datetime import datetime
 
 from app.database import db
 from app.integrations.alphawave_claude import claude_client
+from app.integrations.llm_governor import Lane, in_lane, set_lane
+from app.integrations.llm_telemetry import in_feature
 from app.middleware.alphawave_auth import (
     get_current_user_id,
     get_current_tiger_user_id,
@@ -44,7 +46,13 @@ from app.services.alphawave_safety_filter import (
 from app.services.alphawave_memory_service import memory_service
 from app.services.alphawave_document_service import document_service
 from app.services.alphawave_link_processor import link_processor
-from app.services.memory_intelligence import memory_intelligence, MemoryAnalysis
+from app.services.memory_intelligence import (
+    ConversationExchange,
+    ExchangeWindow,
+    MemoryAnalysis,
+    is_explicit_memory_request,
+    memory_intelligence,
+)
 from app.prompts.nicole_system_prompt import (
     build_nicole_system_prompt,
     build_memory_context,
@@ -72,6 +80,8 @@ router = APIRouter()
 # INTELLIGENT MEMORY PROCESSING
 # ============================================================================
 
+@in_lane(Lane.BACKGROUND)
+@in_feature("memory")
 async def process_memories_intelligently(
     tiger_user_id: int,
     user_message: str,
@@ -90,7 +100,31 @@ async def process_memories_intelligently(
     5. Creates knowledge bases when patterns emerge
     
     This replaces the old pattern-based extraction with intelligent analysis.
+    
+    With MEMORY_INTEL_BATCH_SIZE > 1 the exchange is queued in the user's
+    window instead and analyzed together with the next few exchanges by
+    process_memory_window; explicit "remember that" requests flush at once.
+    Returns 0 while the exchange is still waiting in the window.
     """
+    if settings.MEMORY_INTEL_BATCH_SIZE > 1:
+        window = memory_window.add(
+            tiger_user_id,
+            ConversationExchange(
+                user_message=user_message,
+                assistant_response=assistant_response,
+                conversation_id=conversation_id,
+                user_name=user_name,
+            ),
+            urgent=is_explicit_memory_request(user_message),
+        )
+        if not window:
+            logger.debug(
+                f"[MEMORY INTEL] Queued exchange for user {tiger_user_id} "
+                f"({memory_window.pending_count(tiger_user_id)}/{settings.MEMORY_INTEL_BATCH_SIZE})"
+            )
+            return 0
+        return await process_memory_window(tiger_user_id, window)
+    
     try:
         # Step 1: Analyze the message with AI
         logger.info(f"[MEMORY INTEL] Analyzing message for user {tiger_user_id}...")
@@ -127,7 +161,12 @@ async def process_memories_intelligently(
                 if not saved_memory:
                     logger.debug(f"[MEMORY INTEL] Memory not saved (likely duplicate)")
                     continue
-                
+
+                if saved_memory.get("deduplicated"):
+                    # Merged into an existing memory that is already tagged and linked
+                    logger.debug(f"[MEMORY INTEL] Merged into existing memory {saved_memory.get('memory_id')}")
+                    continue
+
                 saved_count += 1
                 memory_id = saved_memory.get("memory_id") or saved_memory.get("id")
                 logger.info(f"[MEMORY INTEL] ✅ Saved memory {memory_id}: {extracted_mem.content[:50]}...")
@@ -193,25 +232,7 @@ async def process_memories_intelligently(
         
         # Step 6: Check if we should create a knowledge base
         if analysis.suggested_kb:
-            should_create = await memory_intelligence.should_create_knowledge_base(
-                tiger_user_id, 
-                analysis.suggested_kb,
-                threshold=3  # Need at least 3 memories about the topic
-            )
-            
-            if should_create:
-                kb_id = await memory_intelligence.create_knowledge_base(
-                    user_id=tiger_user_id,
-                    name=analysis.suggested_kb,
-                    kb_type="topic",
-                )
-                
-                if kb_id:
-                    # Organize existing memories into the new KB
-                    organized = await memory_intelligence.organize_memories_into_kb(
-                        tiger_user_id, kb_id, analysis.suggested_kb
-                    )
-                    logger.info(f"[MEMORY INTEL] Created KB '{analysis.suggested_kb}' with {organized} memories")
+            await _maybe_create_knowledge_base(tiger_user_id, analysis.suggested_kb)
         
         logger.info(f"[MEMORY INTEL] Memory processing complete - saved {saved_count} memories")
         return saved_count
@@ -222,6 +243,167 @@ async def process_memories_intelligently(
         return 0
 
 
+@in_lane(Lane.BACKGROUND)
+@in_feature("memory")
+async def process_memory_window(
+    tiger_user_id: int,
+    exchanges: List[ConversationExchange],
+) -> int:
+    """
+    Batched memory processing for a window of exchanges.
+    
+    One Claude call extracts memories, tags, typed links and corrections
+    for the whole window. Saved memories are then tagged with one tag
+    lookup/upsert and one link insert, related with one vector query and
+    one relationship upsert, and corrections are archived in one UPDATE.
+    """
+    try:
+        user_name = exchanges[-1].user_name
+        logger.info(f"[MEMORY INTEL] Analyzing window of {len(exchanges)} exchanges for user {tiger_user_id}...")
+        
+        analysis: MemoryAnalysis = await memory_intelligence.analyze_exchanges_for_memories(
+            user_id=tiger_user_id,
+            exchanges=exchanges,
+            user_name=user_name,
+        )
+        
+        if not analysis.should_save:
+            logger.info(f"[MEMORY INTEL] No memories to save: {analysis.analysis_reasoning}")
+            return 0
+        
+        # Step 2: Save memories (dedup happens inside save_memory)
+        saved = []
+        for extracted_mem in analysis.memories:
+            try:
+                saved_memory = await memory_service.save_memory(
+                    user_id=tiger_user_id,
+                    memory_type=extracted_mem.memory_type,
+                    content=extracted_mem.content,
+                    context=extracted_mem.context,
+                    importance=extracted_mem.importance,
+                    related_conversation=exchanges[extracted_mem.exchange_index].conversation_id,
+                    source="user",
+                )
+            except Exception as mem_err:
+                logger.error(f"[MEMORY INTEL] Failed to save memory: {mem_err}")
+                continue
+            
+            if not saved_memory or saved_memory.get("deduplicated"):
+                continue
+            
+            memory_id = saved_memory.get("memory_id") or saved_memory.get("id")
+            saved.append((memory_id, extracted_mem))
+            logger.info(f"[MEMORY INTEL] ✅ Saved memory {memory_id}: {extracted_mem.content[:50]}...")
+        
+        if saved:
+            # Step 3: Tags for all saved memories
+            try:
+                tag_sets = await memory_intelligence.resolve_tags_batch(
+                    tiger_user_id,
+                    [(m.content, m.memory_type, m.suggested_tags) for _, m in saved],
+                )
+                tag_links = [
+                    (memory_id, tag["tag_id"], 0.9 if not tag["is_new"] else 0.7)
+                    for (memory_id, _), tags in zip(saved, tag_sets)
+                    for tag in tags
+                ]
+                if tag_links:
+                    await db.execute(
+                        """
+                        INSERT INTO memory_tag_links (memory_id, tag_id, assigned_by, confidence)
+                        SELECT t.memory_id, t.tag_id, 'nicole', t.confidence
+                        FROM unnest($1::bigint[], $2::bigint[], $3::numeric[]) AS t(memory_id, tag_id, confidence)
+                        ON CONFLICT (memory_id, tag_id) DO NOTHING
+                        """,
+                        [link[0] for link in tag_links],
+                        [link[1] for link in tag_links],
+                        [link[2] for link in tag_links],
+                    )
+            except Exception as tag_err:
+                logger.debug(f"[MEMORY INTEL] Batch tagging failed: {tag_err}")
+            
+            # Step 4: Relationships for all saved memories
+            try:
+                relationships = await memory_intelligence.find_relationships_batch(
+                    tiger_user_id,
+                    [
+                        {
+                            "memory_id": memory_id,
+                            "content": m.content,
+                            "entities": m.entities,
+                            "suggested_links": m.should_link_to,
+                            "link_types": m.link_types,
+                        }
+                        for memory_id, m in saved
+                    ],
+                )
+                if relationships:
+                    saved_rels = await memory_intelligence.save_relationships(tiger_user_id, relationships)
+                    logger.info(f"[MEMORY INTEL] Created {saved_rels} relationships")
+            except Exception as rel_err:
+                logger.warning(f"[MEMORY INTEL] Batch relationship mapping failed: {rel_err}")
+        
+        # Step 5: Archive corrected memories
+        corrected = list({m.corrects_memory_id for m in analysis.memories if m.corrects_memory_id})
+        if corrected:
+            try:
+                await db.execute(
+                    """
+                    UPDATE memory_entries
+                    SET archived_at = NOW(),
+                        updated_at = NOW()
+                    WHERE memory_id = ANY($1::bigint[]) AND user_id = $2
+                    """,
+                    corrected,
+                    tiger_user_id,
+                )
+                logger.info(f"[MEMORY INTEL] Archived corrected memories {corrected}")
+            except Exception as corr_err:
+                logger.warning(f"[MEMORY INTEL] Correction handling failed: {corr_err}")
+        
+        # Step 6: Check if we should create a knowledge base
+        if analysis.suggested_kb:
+            await _maybe_create_knowledge_base(tiger_user_id, analysis.suggested_kb)
+        
+        logger.info(f"[MEMORY INTEL] Window processing complete - saved {len(saved)} memories")
+        return len(saved)
+    
+    except Exception as e:
+        logger.error(f"[MEMORY INTEL] Window processing failed: {e}", exc_info=True)
+        return 0
+
+
+async def _maybe_create_knowledge_base(tiger_user_id: int, suggested_kb: str) -> None:
+    """Create a topic KB once enough memories about it exist."""
+    should_create = await memory_intelligence.should_create_knowledge_base(
+        tiger_user_id, 
+        suggested_kb,
+        threshold=3  # Need at least 3 memories about the topic
+    )
+    
+    if should_create:
+        kb_id = await memory_intelligence.create_knowledge_base(
+            user_id=tiger_user_id,
+            name=suggested_kb,
+            kb_type="topic",
+        )
+        
+        if kb_id:
+            # Organize existing memories into the new KB
+            organized = await memory_intelligence.organize_memories_into_kb(
+                tiger_user_id, kb_id, suggested_kb
+            )
+            logger.info(f"[MEMORY INTEL] Created KB '{suggested_kb}' with {organized} memories")
+
+
+# Per-user windows for batched memory analysis (flushed on size, age or shutdown)
+memory_window = ExchangeWindow(
+    size=settings.MEMORY_INTEL_BATCH_SIZE,
+    max_wait_seconds=settings.MEMORY_INTEL_BATCH_MAX_WAIT_SECONDS,
+    on_flush=process_memory_window,
+)
+
+
 # ============================================================================
 # REQUEST/RESPONSE MODELS
 # ============================================================================
@@ -310,6 +492,9 @@ async def send_message(
     if not supabase_user_id or tiger_user_id is None:
         raise HTTPException(status_code=401, detail="Authentication required")
     
+    # The user is waiting on this stream: admit its model calls first
+    set_lane(Lane.INTERACTIVE)
+    
     logger.info(
         f"[{correlation_id}] Chat message received",
         extra={
@@ -12,6 +12,9 @@ from app.database import get_redis, get_qdrant, get_supabase, get_tiger_pool
 from app.config import settings
 from app.services.agent_orchestrator import agent_orchestrator
 from app.mcp.docker_mcp_client import get_mcp_client
+from app.mcp.mcp_tool_cache import mcp_tool_cache
+from app.integrations.llm_governor import llm_governor
+from app.integrations.llm_telemetry import llm_telemetry
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -132,6 +135,38 @@ async def mcp_status() -> dict:
             "total_tools": legacy_status.get("total_tools", 0),
             "servers": legacy_status.get("servers", {}),
         },
+        "tool_cache": mcp_tool_cache.get_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@router.get("/llm")
+async def llm_governor_status() -> dict:
+    """
+    LLM concurrency governor state.
+    
+    Per provider:model budget: bucket levels, adaptive scale, in-flight and
+    queued calls, rate-limit pauses, and per-lane admissions / p99 waits.
+    """
+    return {
+        "enabled": settings.LLM_GOVERNOR_ENABLED,
+        "redis_coordinated": settings.LLM_GOVERNOR_REDIS_ENABLED,
+        "budgets": llm_governor.get_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@router.get("/metrics")
+async def llm_metrics() -> dict:
+    """
+    LLM call telemetry since process start.
+    
+    Per feature and per provider:model: call/error counts, latency, TTFT,
+    tokens/sec, governor queue time and tool-loop depth percentiles over
+    the recent window, plus token totals and prompt-cache hit ratio.
+    """
+    return {
+        **llm_telemetry.get_metrics(),
         "timestamp": datetime.utcnow().isoformat(),
     }
 
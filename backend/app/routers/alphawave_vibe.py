@@ -504,6 +504,29 @@ async def run_build(
     return api_response_from_result(result)
 
 
+@router.post("/projects/{project_id}/build/stream")
+async def run_build_stream(
+    project_id: int,
+    user = Depends(get_current_user)
+):
+    """
+    Streaming build phase (SSE).
+    
+    Emits each generated file as soon as Claude finishes it, plus periodic
+    "saved" counts while files are persisted, then a final "done" (same data
+    as POST /build) or "error" event.
+    """
+    from fastapi.responses import StreamingResponse
+    user_id = get_user_id(user)
+    rate_limit(user_id, "POST:/vibe/projects/{id}/build/stream")
+
+    async def event_generator():
+        async for event in vibe_service.run_build_stream(project_id, user_id):
+            yield f"data: {json.dumps(event, default=str)}\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
 @router.post("/projects/{project_id}/qa", response_model=APIResponse)
 async def run_qa(
     project_id: int,
@@ -677,6 +700,81 @@ async def get_project_files(
     )
 
 
+@router.get("/projects/{project_id}/versions", response_model=APIResponse)
+async def get_file_versions(
+    project_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    user = Depends(get_current_user)
+) -> APIResponse:
+    """
+    Get the version history of a project's files.
+    
+    Each build, iteration or rollback that changes files records a version.
+    """
+    user_id = get_user_id(user)
+    rate_limit(user_id, "GET:/vibe/projects/{id}/versions")
+    
+    try:
+        versions = await vibe_service.get_file_versions(project_id, user_id, limit)
+    except ProjectNotFoundError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    return APIResponse(
+        success=True,
+        data={"versions": versions},
+        meta={"count": len(versions)}
+    )
+
+
+@router.get("/projects/{project_id}/versions/diff", response_model=APIResponse)
+async def diff_file_versions(
+    project_id: int,
+    from_version: int = Query(..., ge=1),
+    to_version: Optional[int] = Query(None, ge=1),
+    user = Depends(get_current_user)
+) -> APIResponse:
+    """
+    Compare two file versions (to_version defaults to the latest).
+    
+    Returns the paths added, removed and modified.
+    """
+    user_id = get_user_id(user)
+    rate_limit(user_id, "GET:/vibe/projects/{id}/versions/diff")
+    
+    try:
+        diff = await vibe_service.diff_file_versions(project_id, user_id, from_version, to_version)
+    except ProjectNotFoundError:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if not diff:
+        raise HTTPException(status_code=404, detail="Version not found")
+    
+    return APIResponse(success=True, data=diff)
+
+
+@router.post("/projects/{project_id}/versions/{version}/rollback", response_model=APIResponse)
+async def rollback_files(
+    project_id: int,
+    version: int,
+    user = Depends(get_current_user)
+) -> APIResponse:
+    """
+    Restore the project's files to an earlier version.
+    
+    The rollback itself is recorded as a new version, so it can be undone.
+    """
+    user_id = get_user_id(user)
+    rate_limit(user_id, "POST:/vibe/projects/{id}/versions/rollback")
+    
+    result = await vibe_service.rollback_files(project_id, user_id, version)
+    
+    if not result.success:
+        status_code = 404 if "not found" in str(result.error).lower() else 500
+        raise HTTPException(status_code=status_code, detail=result.error)
+    
+    return api_response_from_result(result)
+
+
 @router.get("/projects/{project_id}/inspirations", response_model=APIResponse)
 async def get_project_inspirations(
     project_id: int,
@@ -1344,6 +1442,7 @@ async def get_model_health(
         success=True,
         data={
             "models": health_summary,
+            "routing": model_orchestrator.get_routing_summary(),
             "orchestrator_version": "2.0.0",
             "strategy": "gemini_3_pro_design_claude_architecture"
         }
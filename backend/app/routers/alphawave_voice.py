@@ -156,10 +156,11 @@ async def transcribe_uploaded_audio(
     
     try:
         import openai
+        from app.integrations.llm_governor import governed_http_client
         import io
         
         # Use OpenAI Whisper API
-        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=governed_http_client())
         
         # Create a file-like object for the API
         audio_file = io.BytesIO(content)
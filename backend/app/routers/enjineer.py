@@ -17,6 +17,7 @@ from pydantic import BaseModel, Field
 
 from app.database import db, get_tiger_pool
 from app.middleware.alphawave_auth import get_current_user
+from app.services.file_blob_store import file_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -193,9 +194,10 @@ async def create_project(
         # Analyze images with Claude Vision to extract design elements
         try:
             from anthropic import AsyncAnthropic
+            from app.integrations.llm_governor import governed_http_client
             import os
             
-            client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), http_client=governed_http_client())
             
             # Build image content for Claude
             image_content = []
@@ -624,6 +626,13 @@ async def create_file(
             file["id"], request.content, "user", "Initial creation"
         )
     
+    await file_blob_store.record(
+        "enjineer", project_id,
+        changes={request.path: request.content},
+        message=f"Create {request.path}",
+        author="user",
+    )
+    
     logger.info(f"Created file: {request.path} in project {project_id}")
     
     return FileResponse(
@@ -729,6 +738,13 @@ async def update_file(
             request.commit_message or f"Updated to version {new_version}"
         )
     
+    await file_blob_store.record(
+        "enjineer", project_id,
+        changes={updated["path"]: request.content},
+        message=request.commit_message or f"Update {updated['path']}",
+        author="user",
+    )
+    
     return FileResponse(
         id=updated["id"],
         project_id=updated["project_id"],
@@ -766,6 +782,13 @@ async def delete_file(
     if result == "DELETE 0":
         raise HTTPException(status_code=404, detail="File not found")
     
+    await file_blob_store.record(
+        "enjineer", project_id,
+        deleted=[path],
+        message=f"Delete {path}",
+        author="user",
+    )
+    
     return {"success": True}
 
 
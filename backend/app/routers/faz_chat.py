@@ -20,6 +20,7 @@ from app.database import db
 from app.middleware.alphawave_auth import get_current_user
 from app.config import settings
 from app.services.tiger_user_service import tiger_user_service
+from app.services.broadcast_hub import Subscriber, broadcast_hub
 
 logger = logging.getLogger(__name__)
 
@@ -163,8 +164,20 @@ class ConnectionInfo:
         self.user_email = user_email
         self.connected_at = datetime.utcnow()
         self.last_ping = datetime.utcnow()
-        self.message_count = 0
-        self.is_alive = True
+        self.subscriber: Optional[Subscriber] = None
+    
+    @property
+    def message_count(self) -> int:
+        return self.subscriber.sent if self.subscriber else 0
+    
+    @property
+    def is_alive(self) -> bool:
+        return bool(self.subscriber) and not self.subscriber.closed
+
+
+def project_channel(project_id: int) -> str:
+    """Broadcast hub channel for a Faz project."""
+    return f"faz:project:{project_id}"
 
 
 class ConnectionManager:
@@ -176,6 +189,10 @@ class ConnectionManager:
     - Heartbeat monitoring
     - Graceful disconnection handling
     - Per-user connection limiting
+    
+    Delivery goes through the broadcast hub: each socket has its own
+    bounded send queue, and broadcasts reach sockets held by other workers
+    via Redis pub/sub. Connection limits are per worker.
     """
     
     MAX_CONNECTIONS_PER_PROJECT = 10
@@ -193,10 +210,14 @@ class ConnectionManager:
         project_id: int,
         user_id: int,
         user_email: str = "unknown",
+        last_seq: Optional[int] = None,
     ) -> bool:
         """
         Accept and track connection with rate limiting.
         
+        Args:
+            last_seq: Last event seq the client saw; missed events are replayed
+        
         Returns:
             True if connection accepted, False if rejected
         """
@@ -225,11 +246,17 @@ class ConnectionManager:
         self.active_connections[project_id].append(conn_info)
         self.user_connection_counts[user_id] = user_count + 1
         
+        conn_info.subscriber = await broadcast_hub.subscribe(
+            project_channel(project_id), websocket, last_seq=last_seq
+        )
+        
         logger.info(f"[Faz WS] {user_email} connected to project {project_id} (total: {len(self.active_connections[project_id])})")
         return True
     
-    def disconnect(self, websocket: WebSocket, project_id: int):
+    async def disconnect(self, websocket: WebSocket, project_id: int):
         """Remove connection and update counts."""
+        await broadcast_hub.unsubscribe(websocket)
+        
         if project_id not in self.active_connections:
             return
         
@@ -263,26 +290,16 @@ class ConnectionManager:
                 break
     
     async def broadcast_to_project(self, project_id: int, message: Dict[str, Any]):
-        """Broadcast message to all connections for a project."""
-        if project_id not in self.active_connections:
-            return
-        
-        dead_connections = []
-        
-        for conn in self.active_connections[project_id]:
-            try:
-                await conn.websocket.send_json(message)
-                conn.message_count += 1
-            except Exception:
-                conn.is_alive = False
-                dead_connections.append(conn.websocket)
-        
-        # Clean up dead connections
-        for dead in dead_connections:
-            self.disconnect(dead, project_id)
+        """Broadcast message to every connection for a project, on any worker."""
+        try:
+            await broadcast_hub.publish(project_channel(project_id), message)
+        except Exception as e:
+            logger.error(f"[Faz WS] Broadcast failed: {e}")
     
     async def send_personal(self, websocket: WebSocket, message: Dict[str, Any]):
-        """Send message to specific connection."""
+        """Send message to specific connection (queued behind its broadcasts)."""
+        if broadcast_hub.send(websocket, message):
+            return
         try:
             await websocket.send_json(message)
         except Exception as e:
@@ -293,7 +310,7 @@ class ConnectionManager:
         return len(self.active_connections.get(project_id, []))
     
     def get_project_stats(self, project_id: int) -> Dict[str, Any]:
-        """Get statistics about project connections."""
+        """Get statistics about this worker's connections to a project."""
         connections = self.active_connections.get(project_id, [])
         
         return {
@@ -303,6 +320,7 @@ class ConnectionManager:
                     "email": c.user_email,
                     "connected_at": c.connected_at.isoformat(),
                     "messages": c.message_count,
+                    **(c.subscriber.get_stats() if c.subscriber else {}),
                 }
                 for c in connections
             ],
@@ -322,6 +340,7 @@ async def websocket_endpoint(
     websocket: WebSocket,
     project_id: int,
     token: Optional[str] = Query(None, description="Google OAuth ID token for authentication"),
+    last_seq: Optional[int] = Query(None, description="Last broadcast seq received, to replay missed events"),
 ):
     """
     WebSocket for real-time project updates.
@@ -329,10 +348,15 @@ async def websocket_endpoint(
     Authentication:
     - Pass token as query parameter: /projects/{id}/ws?token=<google_id_token>
     
+    Reconnecting:
+    - Broadcast events carry a "seq"; reconnect with &last_seq=<seq> to
+      receive the recent events missed in between
+    
     Receives:
     - {"type": "chat", "message": "user message"} - Send chat message
     - {"type": "run", "start_agent": "nicole", "mode": "interactive"} - Run pipeline
     - {"type": "approve", "approved": true, "feedback": "..."} - Approve at gate
+    - {"type": "get_file", "path": "..."} - Full content of a file
     - {"type": "ping"} - Keep-alive
     
     Sends:
@@ -340,7 +364,9 @@ async def websocket_endpoint(
     - {"type": "chat", ...} - Chat messages
     - {"type": "status", ...} - Project status changes
     - {"type": "gate", ...} - Approval gate reached
-    - {"type": "file", ...} - File generation events
+    - {"type": "file", ...} - File generation events (modified files carry a
+      unified diff in "patch" against "base_hash", the sha256 of the previous
+      content, instead of "content"; send get_file if it doesn't apply)
     - {"type": "artifact", ...} - Artifact ready for review
     - {"type": "error", ...} - Error messages
     """
@@ -378,6 +404,7 @@ async def websocket_endpoint(
         project_id,
         user_id=user_id,
         user_email=user_info.get("email", "unknown"),
+        last_seq=last_seq,
     )
     
     if not connected:
@@ -447,6 +474,9 @@ async def websocket_endpoint(
                         websocket, project_id, approved, feedback, modifications, ws_user_id
                     )
                 
+                elif msg_type == "get_file":
+                    await handle_get_file(websocket, project_id, data.get("path", ""))
+                
                 else:
                     await manager.send_personal(websocket, {
                         "type": "error",
@@ -465,7 +495,7 @@ async def websocket_endpoint(
         logger.exception(f"[Faz WS] Error: {e}")
     finally:
         activity_task.cancel()
-        manager.disconnect(websocket, project_id)
+        await manager.disconnect(websocket, project_id)
 
 
 async def watch_activities(websocket: WebSocket, project_id: int):
@@ -528,6 +558,36 @@ async def watch_activities(websocket: WebSocket, project_id: int):
             await asyncio.sleep(2)
 
 
+async def handle_get_file(websocket: WebSocket, project_id: int, path: str):
+    """Send one file's full content (e.g. when a broadcast patch doesn't apply)."""
+    file = await db.fetchrow(
+        """
+        SELECT file_id, path, filename, extension, content, content_hash,
+               file_type, language, line_count, version
+        FROM faz_files
+        WHERE project_id = $1 AND path = $2
+        ORDER BY version DESC
+        LIMIT 1
+        """,
+        project_id,
+        path,
+    )
+    
+    if not file:
+        await manager.send_personal(websocket, {
+            "type": "error",
+            "message": f"File not found: {path}",
+        })
+        return
+    
+    await manager.send_personal(websocket, {
+        "type": "file",
+        "change": "content",
+        **dict(file),
+        "timestamp": datetime.utcnow().isoformat(),
+    })
+
+
 async def handle_chat_message(websocket: WebSocket, project_id: int, message: str, user_id: int = None):
     """Handle incoming chat message."""
     try:
@@ -1126,6 +1186,7 @@ async def health_check():
             "metrics": {
                 "active_websocket_connections": total_connections,
                 "active_projects": active_projects,
+                "broadcast": broadcast_hub.get_stats(),
             },
         }
         
@@ -18,6 +18,7 @@ from datetime import datetime
 from app.database import db
 from app.middleware.alphawave_auth import get_current_user
 from app.services.faz_orchestrator import FazOrchestrator
+from app.services.file_blob_store import file_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -587,6 +588,13 @@ async def update_file(
             project_id,
         )
         
+        await file_blob_store.record(
+            "faz", project_id,
+            changes={file["path"]: request.content},
+            message=f"Edited {file['path']}",
+            author="user",
+        )
+        
         logger.info(f"[Faz] Updated file {file['path']} (v{new_version})")
         
         return FileResponse(
@@ -660,6 +668,13 @@ async def update_file_by_path(
             project_id,
         )
         
+        await file_blob_store.record(
+            "faz", project_id,
+            changes={path: request.content},
+            message=f"Edited {path}",
+            author="user",
+        )
+        
         return {
             "success": True,
             "file_id": file["file_id"],
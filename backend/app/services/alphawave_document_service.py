@@ -23,7 +23,8 @@ import logging
 import re
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, Any, List, Optional
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 from uuid import uuid4
 
 import httpx
@@ -33,6 +34,8 @@ from app.database import db
 from app.integrations.alphawave_openai import openai_client
 from app.integrations.alphawave_claude import claude_client
 from app.services.alphawave_memory_service import memory_service
+from app.services.text_chunking import iter_chunks
+from app.services.vector_index_service import vector_index_service
 
 logger = logging.getLogger(__name__)
 
@@ -41,10 +44,10 @@ logger = logging.getLogger(__name__)
 # CONSTANTS
 # =============================================================================
 
-# Chunk configuration
-CHUNK_SIZE = 1000  # Characters per chunk
-CHUNK_OVERLAP = 200  # Overlap between chunks for context
-MAX_CHUNKS_PER_DOCUMENT = 500  # Limit for very large documents
+# Chunk configuration (token-measured, see text_chunking)
+CHUNK_TOKENS = 512  # Tokens per chunk
+CHUNK_OVERLAP_TOKENS = 64  # Overlap between chunks for context
+EMBEDDING_BATCH_SIZE = 64  # Chunks per embedding request
 
 # Supported file types
 SUPPORTED_DOCUMENT_TYPES = {
@@ -659,97 +662,91 @@ KEY_POINTS:
     # CHUNKING AND EMBEDDING (Tiger Native)
     # =========================================================================
     
-    def _create_chunks(self, text: str, title: str) -> List[Dict[str, Any]]:
-        """Split document into overlapping chunks for embedding."""
+    def _create_chunks(self, text: str, title: str) -> Iterator[Dict[str, Any]]:
+        """
+        Split document into overlapping, token-bounded chunks for embedding.
         
+        Generator over text_chunking.iter_chunks: headings, tables and code
+        blocks are respected and every part of the document is kept.
+        """
         if not text:
-            return []
-        
-        chunks = []
-        paragraphs = text.split("\n\n")
-        
-        current_chunk = ""
-        chunk_index = 0
-        
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-            
-            if len(current_chunk) + len(para) + 1 > CHUNK_SIZE:
-                if current_chunk:
-                    chunks.append({
-                        "index": chunk_index,
-                        "content": current_chunk.strip(),
-                        "title": title,
-                    })
-                    chunk_index += 1
-                    
-                    # Overlap
-                    words = current_chunk.split()
-                    overlap_words = words[-CHUNK_OVERLAP // 5:] if len(words) > CHUNK_OVERLAP // 5 else []
-                    current_chunk = " ".join(overlap_words) + " " + para
-                else:
-                    current_chunk = para
-            else:
-                current_chunk = current_chunk + "\n\n" + para if current_chunk else para
-            
-            if chunk_index >= MAX_CHUNKS_PER_DOCUMENT:
-                break
+            return
         
-        if current_chunk.strip() and chunk_index < MAX_CHUNKS_PER_DOCUMENT:
-            chunks.append({
-                "index": chunk_index,
-                "content": current_chunk.strip(),
+        for chunk in iter_chunks(text, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+            yield {
+                "index": chunk.index,
+                "content": chunk.content,
                 "title": title,
-            })
-        
-        return chunks
+                "section": chunk.section,
+                "token_count": chunk.token_count,
+            }
     
     async def _embed_and_store_chunks(
         self,
-        chunks: List[Dict[str, Any]],
+        chunks: Iterable[Dict[str, Any]],
         doc_id: int,
         user_id: int,
         title: str,
     ) -> int:
-        """Create embeddings for chunks and store in Tiger."""
-        
-        if not chunks:
-            return 0
+        """
+        Create embeddings for chunks and store in Tiger.
         
+        Consumes `chunks` lazily in EMBEDDING_BATCH_SIZE batches: one
+        embedding request and one executemany insert per batch.
+        """
         count = 0
-        batch_size = 10
+        capabilities = await vector_index_service.get_capabilities()
+        has_user_id = capabilities["chunks_have_user_id"]
+        chunk_iter = iter(chunks)
         
-        for i in range(0, len(chunks), batch_size):
-            batch = chunks[i:i + batch_size]
+        while True:
+            batch = list(islice(chunk_iter, EMBEDDING_BATCH_SIZE))
+            if not batch:
+                break
             
             try:
-                # Generate embeddings
-                texts = [f"Document: {c['title']}\n\n{c['content']}" for c in batch]
+                # Generate embeddings (section path gives the chunk its context)
+                texts = [
+                    f"Document: {c['title']}\n"
+                    + (f"Section: {c['section']}\n" if c.get("section") else "")
+                    + f"\n{c['content']}"
+                    for c in batch
+                ]
                 embeddings = await openai_client.generate_embeddings_batch(texts)
                 
-                # Store in Tiger (Production schema: doc_id, content)
-                for j, (chunk, embedding) in enumerate(zip(batch, embeddings)):
-                    # Convert embedding list to PostgreSQL vector string format
-                    embedding_str = f'[{",".join(map(str, embedding))}]'
-                    
-                    await db.execute(
-                        """
-                        INSERT INTO document_chunks (
-                            doc_id, chunk_index, content, embedding, created_at
-                        ) VALUES ($1, $2, $3, $4, NOW())
-                        """,
-                        doc_id,
-                        chunk["index"],
-                        chunk["content"],
-                        embedding_str,
-                    )
-                    count += 1
+                # Convert embedding lists to PostgreSQL vector string format
+                rows = [
+                    (chunk["index"], chunk["content"], f'[{",".join(map(str, embedding))}]')
+                    for chunk, embedding in zip(batch, embeddings)
+                ]
+                
+                async with db.acquire() as conn:
+                    if has_user_id:
+                        # user_id is denormalized for filtered ANN search (migration 036)
+                        await conn.executemany(
+                            """
+                            INSERT INTO document_chunks (
+                                doc_id, user_id, chunk_index, content, embedding, created_at
+                            ) VALUES ($1, $2, $3, $4, $5, NOW())
+                            """,
+                            [(doc_id, user_id, *row) for row in rows],
+                        )
+                    else:
+                        await conn.executemany(
+                            """
+                            INSERT INTO document_chunks (
+                                doc_id, chunk_index, content, embedding, created_at
+                            ) VALUES ($1, $2, $3, $4, NOW())
+                            """,
+                            [(doc_id, *row) for row in rows],
+                        )
+                count += len(rows)
                     
             except Exception as e:
                 logger.error(f"[DOCUMENT] Embedding batch failed: {e}")
         
+        if count:
+            vector_index_service.invalidate_user(user_id)
         return count
     
     # =========================================================================
@@ -834,37 +831,23 @@ KEY_POINTS:
             # Format as string for PostgreSQL vector type
             embedding_str = f'[{",".join(map(str, query_embedding))}]'
             
-            # Vector search in Tiger (Production schema)
-            rows = await db.fetch(
-                """
-                SELECT 
-                    dc.chunk_id,
-                    dc.doc_id,
-                    dc.content,
-                    dr.title,
-                    1 - (dc.embedding <=> $1::vector) AS score
-                FROM document_chunks dc
-                JOIN document_repository dr ON dr.doc_id = dc.doc_id
-                WHERE dr.user_id = $2
-                  AND dc.embedding IS NOT NULL
-                ORDER BY dc.embedding <=> $1::vector
-                LIMIT $3
-                """,
-                embedding_str,
-                user_id_int,
-                limit,
+            # Two-phase ANN search: ids + scores first, content for winners only
+            chunks = await vector_index_service.search_document_chunks(
+                user_id=user_id_int,
+                embedding_str=embedding_str,
+                limit=limit,
+                min_score=0.3,  # Minimum relevance threshold
             )
             
-            for row in rows:
-                if row["score"] > 0.3:  # Minimum relevance threshold
-                    results.append({
-                        "document_id": row["doc_id"],
-                        "chunk_id": row["chunk_id"],
-                        "title": row["title"],
-                        "content": row["content"],
-                        "score": float(row["score"]),
-                        "source": "vector",
-                    })
+            for chunk in chunks:
+                results.append({
+                    "document_id": chunk["doc_id"],
+                    "chunk_id": chunk["chunk_id"],
+                    "title": chunk["title"],
+                    "content": chunk["content"],
+                    "score": chunk["score"],
+                    "source": "vector",
+                })
                     
         except Exception as e:
             logger.error(f"[DOCUMENT] Vector search failed: {e}")
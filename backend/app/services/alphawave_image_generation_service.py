@@ -38,6 +38,7 @@ from enum import Enum
 import httpx
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 from app.database import db as db_manager
 from app.prompts.image_generation_agents import get_agent_prompt
 from app.services.alphawave_image_memory_service import image_memory_service
@@ -387,7 +388,7 @@ class ImageGenerationService:
         # Initialize Anthropic client for agent intelligence
         anthropic_key = getattr(settings, "ANTHROPIC_API_KEY", "")
         if AsyncAnthropic and anthropic_key:
-            self.anthropic = AsyncAnthropic(api_key=anthropic_key)
+            self.anthropic = AsyncAnthropic(api_key=anthropic_key, http_client=governed_http_client())
             logger.info("[IMAGE] Anthropic client initialized (Task Analyzer, Prompt Enhancer)")
         else:
             self.anthropic = None
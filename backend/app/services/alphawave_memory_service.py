@@ -2,7 +2,7 @@
 Nicole V7 Memory Service - Tiger Postgres Native
 
 Production-grade memory management with:
-- Hybrid search (vector + keyword via pgvectorscale)
+- Hybrid search (vector leg on the tuned two-phase ANN path + keyword)
 - Confidence decay and boosting
 - Memory relationships and consolidation
 - Nicole's proactive memory capabilities
@@ -12,16 +12,53 @@ All persistence uses Tiger Postgres with Redis caching.
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Sequence, Union
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import asyncpg
+
+from app.config import settings
 from app.database import db
 from app.integrations.alphawave_openai import openai_client
 from app.integrations.alphawave_claude import claude_client
+from app.services.vector_index_service import vector_index_service
 
 logger = logging.getLogger(__name__)
 
+# Keyset cursor start for maintenance jobs (before any stored timestamp)
+JOB_CURSOR_FLOOR = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Extra decay for memories unused for twice the decay threshold
+AGED_DECAY_EXTRA = Decimal("0.02")
+
+# Columns search_memory needs for ranking and _format_memory
+SEARCH_COLUMNS = (
+    "user_id", "content", "memory_type", "category", "source_conversation_id",
+    "confidence", "importance", "access_count", "last_accessed",
+    "created_at", "updated_at", "archived_at",
+)
+
+# Keyword leg of search_memory (mirrors keyword_matches in search_memories_hybrid)
+_KEYWORD_SEARCH_SQL = f"""
+    SELECT memory_id, {", ".join(SEARCH_COLUMNS)},
+           GREATEST(
+               ts_rank_cd(to_tsvector('english', content), plainto_tsquery('english', $2)),
+               similarity(content, $2)
+           ) AS keyword_score
+    FROM memory_entries
+    WHERE user_id = $1
+      AND archived_at IS NULL
+      AND confidence >= $3
+      AND (
+          to_tsvector('english', content) @@ plainto_tsquery('english', $2)
+          OR content ILIKE '%' || $2 || '%'
+          OR similarity(content, $2) > 0.1
+      )
+    LIMIT $4
+"""
+
 
 # =============================================================================
 # MEMORY SERVICE
@@ -197,22 +234,126 @@ class MemoryService:
         except Exception as e:
             logger.debug(f"[MEMORY] Action log failed (non-critical): {e}")
     
-    async def _is_duplicate(self, user_id: int, content: str) -> bool:
-        """Check if an identical memory already exists."""
-        content_normalized = content.strip().lower()
+    async def _find_exact_duplicate(self, user_id: int, content: str) -> Optional[Any]:
+        """
+        Find an active memory with the same normalized content.
         
-        row = await db.fetchrow(
+        Uses the content_hash column and its unique partial index
+        (migration 037); falls back to the expression scan if the column
+        has not been added yet.
+        """
+        try:
+            return await db.fetchrow(
+                """
+                SELECT * FROM memory_entries
+                WHERE user_id = $1
+                  AND archived_at IS NULL
+                  AND content_hash = md5(regexp_replace(lower(btrim($2)), '\\s+', ' ', 'g'))
+                LIMIT 1
+                """,
+                user_id,
+                content,
+            )
+        except Exception as e:
+            logger.debug(f"[MEMORY] content_hash lookup unavailable, using scan: {e}")
+        
+        return await db.fetchrow(
             """
-            SELECT 1 FROM memory_entries
+            SELECT * FROM memory_entries
             WHERE user_id = $1
               AND archived_at IS NULL
               AND LOWER(TRIM(content)) = $2
             LIMIT 1
             """,
             user_id,
-            content_normalized,
+            content.strip().lower(),
         )
-        return row is not None
+    
+    async def _find_near_duplicate(
+        self,
+        user_id: int,
+        embedding_str: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Bounded vector probe for a near-duplicate among recent memories.
+        
+        Checks only the top MEMORY_DEDUP_PROBE_LIMIT neighbours created in
+        the last MEMORY_DEDUP_WINDOW_DAYS days.
+        """
+        try:
+            matches = await vector_index_service.search_memories(
+                user_id=user_id,
+                embedding_str=embedding_str,
+                limit=settings.MEMORY_DEDUP_PROBE_LIMIT,
+                min_score=settings.MEMORY_NEAR_DUPLICATE_THRESHOLD,
+                columns=("user_id", "content", "memory_type", "category",
+                         "confidence", "importance", "access_count", "created_at"),
+                since_days=settings.MEMORY_DEDUP_WINDOW_DAYS,
+            )
+            return matches[0] if matches else None
+        except Exception as e:
+            logger.debug(f"[MEMORY] Near-duplicate probe failed (non-critical): {e}")
+            return None
+    
+    async def _merge_into_existing(
+        self,
+        user_id: int,
+        existing: Any,
+        content: str,
+        embedding_str: Optional[str],
+        importance: float,
+        source: str,
+        similarity: float,
+    ) -> Dict[str, Any]:
+        """
+        Fold a duplicate save into the existing memory.
+        
+        Keeps the richer (longer) wording, takes the higher importance and
+        counts the repeat as an access. The new embedding is reused when the
+        wording is replaced, so no extra embedding call is needed.
+        """
+        existing_id = existing["memory_id"]
+        replace_content = (
+            embedding_str is not None
+            and len(content.strip()) > len((existing["content"] or "").strip())
+        )
+        
+        try:
+            row = await db.fetchrow(
+                """
+                UPDATE memory_entries
+                SET content = CASE WHEN $3 THEN $4 ELSE content END,
+                    embedding = CASE WHEN $3 THEN $5::vector ELSE embedding END,
+                    importance = GREATEST(importance, $6),
+                    confidence = LEAST(1.0, confidence + 0.05),
+                    access_count = access_count + 1,
+                    last_accessed = NOW(),
+                    updated_at = NOW()
+                WHERE memory_id = $1 AND user_id = $2
+                RETURNING *
+                """,
+                existing_id,
+                user_id,
+                replace_content,
+                content,
+                embedding_str,
+                Decimal(str(importance)),
+            )
+        except Exception as e:
+            logger.warning(f"[MEMORY] Merge into {existing_id} failed: {e}")
+            row = None
+        
+        await self._log_action(
+            user_id,
+            "update",
+            existing_id,
+            reason=f"Merged duplicate save (similarity {similarity:.2f})",
+            triggered_by=source,
+        )
+        
+        memory = self._format_memory(row or existing)
+        memory["deduplicated"] = True
+        return memory
     
     # =========================================================================
     # CORE MEMORY OPERATIONS
@@ -267,17 +408,24 @@ class MemoryService:
             # Format embedding as string for PostgreSQL vector type
             embedding_str = f'[{",".join(map(str, embedding))}]'
             
-            # Call hybrid search function
-            rows = await db.fetch(
-                """
-                SELECT * FROM search_memories_hybrid($1, $2::vector, $3, $4, $5)
-                """,
-                user_id_int,
-                embedding_str,
-                query,
-                limit * 2,  # Get extra for filtering
-                Decimal(str(min_confidence)),
-            )
+            try:
+                rows = await self._hybrid_search_ann(
+                    user_id_int, embedding_str, query,
+                    limit * 2,  # Get extra for filtering
+                    min_confidence,
+                )
+            except Exception as e:
+                logger.warning(f"[MEMORY] ANN search failed, using search_memories_hybrid: {e}")
+                rows = await db.fetch(
+                    """
+                    SELECT * FROM search_memories_hybrid($1, $2::vector, $3, $4, $5)
+                    """,
+                    user_id_int,
+                    embedding_str,
+                    query,
+                    limit * 2,
+                    Decimal(str(min_confidence)),
+                )
             
             memories = [self._format_memory(row) for row in rows]
             
@@ -310,6 +458,64 @@ class MemoryService:
         logger.info(f"[MEMORY] Search returned {len(memories)} results for: {query[:50]}...")
         return memories
     
+    async def _hybrid_search_ann(
+        self,
+        user_id: int,
+        embedding_str: str,
+        query: str,
+        limit: int,
+        min_confidence: float,
+    ) -> List[Dict[str, Any]]:
+        """
+        search_memories_hybrid's ranking with the vector leg on the tuned
+        two-phase ANN path instead of an exact scan of the user's rows.
+        
+        Composite score: 60% vector, 30% keyword, 10% confidence/importance/
+        recency boost; rows at or below 0.05 are dropped.
+        """
+        vector_hits, keyword_rows = await asyncio.gather(
+            vector_index_service.search_memories(
+                user_id=user_id,
+                embedding_str=embedding_str,
+                limit=limit * 3,
+                columns=SEARCH_COLUMNS,
+                min_confidence=min_confidence,
+            ),
+            db.fetch(_KEYWORD_SEARCH_SQL, user_id, query, Decimal(str(min_confidence)), limit * 3),
+        )
+        
+        candidates: Dict[int, Dict[str, Any]] = {}
+        for hit in vector_hits:
+            candidates[hit["memory_id"]] = {**hit, "vector_score": hit["similarity"], "keyword_score": 0.0}
+        for row in keyword_rows:
+            keyword_score = float(row["keyword_score"] or 0.0)
+            if row["memory_id"] in candidates:
+                candidates[row["memory_id"]]["keyword_score"] = keyword_score
+            else:
+                candidates[row["memory_id"]] = {**dict(row), "vector_score": 0.0, "keyword_score": keyword_score}
+        
+        now = datetime.now(timezone.utc)
+        ranked = []
+        for memory in candidates.values():
+            last_accessed = memory.get("last_accessed")
+            if last_accessed and last_accessed > now - timedelta(days=7):
+                recency = 0.2
+            elif last_accessed and last_accessed > now - timedelta(days=30):
+                recency = 0.1
+            else:
+                recency = 0.0
+            boost = (
+                float(memory.get("confidence") or 0.5) * 0.5
+                + float(memory.get("importance") or 0.5) * 0.3
+                + recency
+            )
+            memory["composite_score"] = 0.6 * memory["vector_score"] + 0.3 * memory["keyword_score"] + 0.1 * boost
+            if memory["composite_score"] > 0.05:
+                ranked.append(memory)
+        
+        ranked.sort(key=lambda m: m["composite_score"], reverse=True)
+        return ranked[:limit]
+    
     async def _basic_text_search(
         self,
         user_id: int,
@@ -352,6 +558,7 @@ class MemoryService:
         parent_memory_id: Optional[Any] = None,
         tag_ids: Optional[Sequence[Any]] = None,
         related_conversation: Optional[Any] = None,
+        dedup_policy: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Save a new memory with embedding.
@@ -369,15 +576,26 @@ class MemoryService:
             tag_ids: Tags to apply
             related_conversation: Associated conversation ID
             
+            dedup_policy: Override MEMORY_DEDUP_POLICY (skip, merge, off)
+            
         Returns:
-            Created memory dict or None if duplicate
+            Created memory dict, the merged existing memory (flagged
+            "deduplicated") under the merge policy, or None if skipped
         """
         user_id_int = self._normalize_id(user_id)
-        
-        # Check for duplicates
-        if await self._is_duplicate(user_id_int, content):
-            logger.info(f"[MEMORY] Duplicate detected, skipping: {content[:50]}...")
-            return None
+        policy = (dedup_policy or settings.MEMORY_DEDUP_POLICY).lower()
+        
+        # Exact duplicates: one probe on the content_hash index
+        if policy != "off":
+            existing = await self._find_exact_duplicate(user_id_int, content)
+            if existing:
+                if policy == "merge":
+                    logger.info(f"[MEMORY] Exact duplicate, merging into {existing['memory_id']}")
+                    return await self._merge_into_existing(
+                        user_id_int, existing, content, None, importance, source, 1.0
+                    )
+                logger.info(f"[MEMORY] Duplicate detected, skipping: {content[:50]}...")
+                return None
         
         # Generate embedding
         embedding_str = None
@@ -388,6 +606,25 @@ class MemoryService:
         except Exception as e:
             logger.error(f"[MEMORY] Embedding generation failed: {e}")
         
+        # Near-duplicates: bounded vector probe against recent memories
+        if policy != "off" and embedding_str:
+            near = await self._find_near_duplicate(user_id_int, embedding_str)
+            if near:
+                if policy == "merge":
+                    logger.info(
+                        f"[MEMORY] Near-duplicate ({near['similarity']:.3f}), "
+                        f"merging into {near['memory_id']}"
+                    )
+                    return await self._merge_into_existing(
+                        user_id_int, near, content, embedding_str,
+                        importance, source, near["similarity"],
+                    )
+                logger.info(
+                    f"[MEMORY] Near-duplicate ({near['similarity']:.3f}) of "
+                    f"{near['memory_id']}, skipping: {content[:50]}..."
+                )
+                return None
+        
         # Map memory_type to enum value
         type_mapping = {
             "fact": "identity",
@@ -447,6 +684,10 @@ class MemoryService:
             
             return memory
             
+        except asyncpg.UniqueViolationError:
+            # Concurrent save of the same content won the content_hash index
+            logger.info(f"[MEMORY] Duplicate detected on insert, skipping: {content[:50]}...")
+            return None
         except Exception as e:
             logger.error(f"[MEMORY] Save failed: {e}", exc_info=True)
             return None
@@ -637,46 +878,357 @@ class MemoryService:
                 Decimal(str(delta)),
             )
     
-    async def decay_memories(self) -> int:
-        """Run memory decay (called by background job)."""
+    async def decay_memories(self) -> Dict[str, Any]:
+        """
+        Decay confidence of unused memories in keyset-paginated batches.
+        
+        Only rows whose decay_due_at has passed are visited (migration 038).
+        Each batch locks at most MEMORY_JOB_BATCH_SIZE rows with SKIP LOCKED
+        under a short statement/lock timeout, then pushes the row's next
+        check forward, so repeated or overlapping runs never decay the same
+        memory twice within MEMORY_DECAY_INTERVAL_HOURS. Stale memories that
+        fall to the archive threshold are archived in the same statement.
+        
+        Returns:
+            Report with decayed/archived/protected/rescheduled counts and
+            per-batch rows and timings
+        """
+        report = self._new_job_report("memory_decay")
+        cutoff = await db.fetchval("SELECT NOW()")
+        threshold_days = settings.MEMORY_DECAY_DAYS_THRESHOLD
+        cursor_due, cursor_id = JOB_CURSOR_FLOOR, 0
+        
         try:
-            row = await db.fetchrow("SELECT * FROM decay_unused_memories()")
-            decayed = row["decayed_count"] if row else 0
-            archived = row["archived_count"] if row else 0
-            logger.info(f"[MEMORY] Decay job: {decayed} decayed, {archived} archived")
-            return decayed + archived
+            for batch_number in range(1, settings.MEMORY_JOB_MAX_BATCHES + 1):
+                rows, elapsed_ms = await self._run_job_batch(
+                    """
+                    WITH batch AS (
+                        SELECT
+                            memory_id,
+                            decay_due_at AS due_at,
+                            COALESCE(last_accessed, created_at) AS last_used,
+                            confidence,
+                            importance,
+                            created_at,
+                            (importance > 0.8 AND confidence > 0.5) AS protected
+                        FROM memory_entries
+                        WHERE archived_at IS NULL
+                          AND decay_due_at <= $1
+                          AND (decay_due_at, memory_id) > ($2, $3)
+                        ORDER BY decay_due_at, memory_id
+                        LIMIT $4
+                        FOR UPDATE SKIP LOCKED
+                    ),
+                    planned AS (
+                        SELECT
+                            b.*,
+                            b.last_used < $1 - make_interval(days => $5) AS stale,
+                            CASE
+                                WHEN b.protected OR b.last_used >= $1 - make_interval(days => $5)
+                                    THEN b.confidence
+                                WHEN b.last_used < $1 - make_interval(days => $5 * 2)
+                                    THEN GREATEST($7, b.confidence - $6 - $10)
+                                ELSE GREATEST($7, b.confidence - $6)
+                            END AS new_confidence
+                        FROM batch b
+                    )
+                    UPDATE memory_entries m
+                    SET confidence = p.new_confidence,
+                        decay_due_at = CASE
+                            WHEN p.stale THEN $1 + make_interval(hours => $8)
+                            ELSE p.last_used + make_interval(days => $5)
+                        END,
+                        archived_at = CASE
+                            WHEN p.stale
+                             AND NOT p.protected
+                             AND p.new_confidence <= $9
+                             AND p.importance < 0.7
+                             AND p.created_at < $1 - INTERVAL '7 days'
+                            THEN NOW()
+                            ELSE m.archived_at
+                        END
+                    FROM planned p
+                    WHERE m.memory_id = p.memory_id
+                    RETURNING
+                        m.memory_id,
+                        m.user_id,
+                        p.due_at,
+                        p.stale,
+                        p.protected,
+                        p.new_confidence < p.confidence AS decayed,
+                        m.archived_at IS NOT NULL AS archived
+                    """,
+                    cutoff,
+                    cursor_due,
+                    cursor_id,
+                    settings.MEMORY_JOB_BATCH_SIZE,
+                    threshold_days,
+                    Decimal(str(settings.MEMORY_DECAY_AMOUNT)),
+                    Decimal(str(settings.MEMORY_MIN_CONFIDENCE)),
+                    settings.MEMORY_DECAY_INTERVAL_HOURS,
+                    Decimal(str(settings.MEMORY_ARCHIVE_THRESHOLD)),
+                    AGED_DECAY_EXTRA,
+                )
+                if not rows:
+                    break
+                
+                cursor_due, cursor_id = max((r["due_at"], r["memory_id"]) for r in rows)
+                archived = [r for r in rows if r["archived"]]
+                batch = {
+                    "batch": batch_number,
+                    "rows": len(rows),
+                    "decayed": sum(1 for r in rows if r["decayed"]),
+                    "archived": len(archived),
+                    "protected": sum(1 for r in rows if r["stale"] and r["protected"]),
+                    "rescheduled": sum(1 for r in rows if not r["stale"]),
+                    "ms": round(elapsed_ms, 1),
+                }
+                self._record_job_batch(report, batch)
+                await self._log_archived_batch(archived, "Archived due to low confidence after decay")
+                await asyncio.sleep(settings.MEMORY_JOB_BATCH_PAUSE_MS / 1000)
+            else:
+                report["truncated"] = True
+        
+        except asyncpg.UndefinedColumnError:
+            logger.warning("[MEMORY] decay_due_at missing (migration 038); using decay_unused_memories()")
+            return await self._legacy_decay(report)
         except Exception as e:
-            logger.warning(f"[MEMORY] Decay function not available: {e}")
-            # Fallback implementation
-            result = await db.execute(
+            # Batches already committed stay committed; the rest are still due
+            logger.error(f"[MEMORY] Decay batch failed: {e}")
+            report["errors"].append(str(e))
+        
+        await self._save_job_watermark("memory_decay", cutoff, cursor_id, report)
+        logger.info(
+            f"[MEMORY] Decay job: {report['decayed']} decayed, {report['archived']} archived, "
+            f"{report['protected']} protected in {len(report['batches'])} batches "
+            f"({report['total_ms']:.0f}ms)"
+        )
+        return report
+    
+    async def archive_low_confidence(self) -> Dict[str, Any]:
+        """
+        Archive low-confidence memories changed since the last sweep.
+        
+        Walks memory_entries by (updated_at, memory_id) from the stored
+        high-water mark up to the run's start, so confidence edits made
+        outside the decay job are picked up without rescanning the table.
+        The first run after migration 038 sweeps everything once.
+        
+        Returns:
+            Report with archived count and per-batch rows and timings
+        """
+        report = self._new_job_report("memory_archive")
+        cutoff = await db.fetchval("SELECT NOW()")
+        
+        try:
+            mark = await db.fetchrow(
+                "SELECT watermark, last_id FROM memory_job_watermarks WHERE job_name = $1",
+                "memory_archive",
+            )
+        except asyncpg.UndefinedTableError:
+            logger.warning("[MEMORY] memory_job_watermarks missing (migration 038); full archive pass")
+            return await self._legacy_archive(report)
+        
+        cursor_at, cursor_id = (mark["watermark"], mark["last_id"]) if mark else (JOB_CURSOR_FLOOR, 0)
+        
+        try:
+            for batch_number in range(1, settings.MEMORY_JOB_MAX_BATCHES + 1):
+                rows, elapsed_ms = await self._run_job_batch(
+                    """
+                    WITH batch AS (
+                        SELECT memory_id, updated_at
+                        FROM memory_entries
+                        WHERE (updated_at, memory_id) > ($1, $2)
+                          AND updated_at <= $3
+                        ORDER BY updated_at, memory_id
+                        LIMIT $4
+                    ),
+                    archived AS (
+                        UPDATE memory_entries m
+                        SET archived_at = NOW()
+                        FROM batch b
+                        WHERE m.memory_id = b.memory_id
+                          AND m.archived_at IS NULL
+                          AND m.confidence <= $5
+                          AND m.importance < 0.7
+                          AND m.created_at < $3 - INTERVAL '7 days'
+                        RETURNING m.memory_id, m.user_id
+                    )
+                    SELECT b.memory_id, b.updated_at, a.user_id, a.memory_id IS NOT NULL AS archived
+                    FROM batch b
+                    LEFT JOIN archived a ON a.memory_id = b.memory_id
+                    """,
+                    cursor_at,
+                    cursor_id,
+                    cutoff,
+                    settings.MEMORY_JOB_BATCH_SIZE,
+                    Decimal(str(settings.MEMORY_ARCHIVE_THRESHOLD)),
+                )
+                if not rows:
+                    break
+                
+                cursor_at, cursor_id = max((r["updated_at"], r["memory_id"]) for r in rows)
+                archived = [r for r in rows if r["archived"]]
+                self._record_job_batch(report, {
+                    "batch": batch_number,
+                    "rows": len(rows),
+                    "archived": len(archived),
+                    "ms": round(elapsed_ms, 1),
+                })
+                await self._log_archived_batch(archived, "Archived due to low confidence")
+                await asyncio.sleep(settings.MEMORY_JOB_BATCH_PAUSE_MS / 1000)
+            else:
+                report["truncated"] = True
+        
+        except Exception as e:
+            logger.error(f"[MEMORY] Archive batch failed: {e}")
+            report["errors"].append(str(e))
+        
+        # Resume from the last committed batch next time
+        await self._save_job_watermark("memory_archive", cursor_at, cursor_id, report)
+        logger.info(
+            f"[MEMORY] Archive sweep: {report['archived']} archived of {report['rows']} rows "
+            f"in {len(report['batches'])} batches ({report['total_ms']:.0f}ms)"
+        )
+        return report
+    
+    @staticmethod
+    def _new_job_report(job: str) -> Dict[str, Any]:
+        return {
+            "job": job,
+            "started_at": datetime.utcnow().isoformat(),
+            "rows": 0,
+            "decayed": 0,
+            "archived": 0,
+            "protected": 0,
+            "rescheduled": 0,
+            "total_ms": 0.0,
+            "batches": [],
+            "truncated": False,
+            "errors": [],
+        }
+    
+    @staticmethod
+    def _record_job_batch(report: Dict[str, Any], batch: Dict[str, Any]) -> None:
+        """Fold one batch's counts into the run report."""
+        for key in ("rows", "decayed", "archived", "protected", "rescheduled"):
+            report[key] += batch.get(key, 0)
+        report["total_ms"] += batch["ms"]
+        report["batches"].append(batch)
+        logger.debug(f"[MEMORY] {report['job']} batch {batch}")
+    
+    async def _run_job_batch(self, query: str, *args) -> Tuple[List[asyncpg.Record], float]:
+        """
+        Run one maintenance batch in its own short transaction.
+        
+        statement_timeout and lock_timeout are transaction-local, bounding
+        how long a batch can hold row locks against interactive traffic.
+        """
+        started = time.perf_counter()
+        async with db.transaction() as conn:
+            await conn.execute(
+                "SELECT set_config('statement_timeout', $1, true), set_config('lock_timeout', $2, true)",
+                f"{settings.MEMORY_JOB_STATEMENT_TIMEOUT_MS}ms",
+                f"{settings.MEMORY_JOB_LOCK_TIMEOUT_MS}ms",
+            )
+            rows = await conn.fetch(query, *args)
+        return rows, 1000 * (time.perf_counter() - started)
+    
+    async def _save_job_watermark(
+        self,
+        job_name: str,
+        watermark: datetime,
+        last_id: int,
+        report: Dict[str, Any],
+    ) -> None:
+        """Persist a job's high-water mark and last report."""
+        import json
+        
+        report["completed_at"] = datetime.utcnow().isoformat()
+        summary = {k: v for k, v in report.items() if k != "batches"}
+        summary["batch_count"] = len(report["batches"])
+        try:
+            await db.execute(
                 """
-                UPDATE memory_entries
-                SET confidence = GREATEST(0.1, confidence - 0.05),
-                    updated_at = NOW()
-                WHERE archived_at IS NULL
-                  AND (last_accessed IS NULL OR last_accessed < NOW() - INTERVAL '30 days')
-                  AND confidence > 0.1
+                INSERT INTO memory_job_watermarks (
+                    job_name, watermark, last_id, rows_processed, last_run_at, last_report
+                ) VALUES ($1, $2, $3, $4, NOW(), $5)
+                ON CONFLICT (job_name) DO UPDATE SET
+                    watermark = EXCLUDED.watermark,
+                    last_id = EXCLUDED.last_id,
+                    rows_processed = memory_job_watermarks.rows_processed + EXCLUDED.rows_processed,
+                    last_run_at = NOW(),
+                    last_report = EXCLUDED.last_report
+                """,
+                job_name,
+                watermark,
+                last_id,
+                report["rows"],
+                json.dumps(summary),
+            )
+        except Exception as e:
+            logger.warning(f"[MEMORY] Could not save {job_name} watermark: {e}")
+    
+    async def _log_archived_batch(self, rows: Sequence[Any], reason: str) -> None:
+        """Write one audit row per archived memory with a single INSERT."""
+        if not rows:
+            return
+        try:
+            await db.execute(
                 """
+                INSERT INTO nicole_actions (
+                    action_type, target_type, target_id, user_id, reason, context, success, created_at
+                )
+                SELECT
+                    'decay_applied'::nicole_action_type_enum,
+                    'memory'::target_type_enum,
+                    t.memory_id,
+                    t.user_id,
+                    $3,
+                    '{"triggered_by": "system"}',
+                    TRUE,
+                    NOW()
+                FROM unnest($1::bigint[], $2::bigint[]) AS t(memory_id, user_id)
+                """,
+                [r["memory_id"] for r in rows],
+                [r["user_id"] for r in rows],
+                reason,
             )
-            return 0
+        except Exception as e:
+            logger.debug(f"[MEMORY] Archive action log failed (non-critical): {e}")
+    
+    async def _legacy_decay(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Pre-038 decay via the decay_unused_memories() SQL function."""
+        try:
+            row = await db.fetchrow("SELECT * FROM decay_unused_memories()")
+            report["decayed"] = row["decayed_count"] if row else 0
+            report["archived"] = row["archived_count"] if row else 0
+        except Exception as e:
+            logger.warning(f"[MEMORY] Decay function not available: {e}")
+            report["errors"].append(str(e))
+        report["completed_at"] = datetime.utcnow().isoformat()
+        return report
     
-    async def archive_low_confidence(self) -> int:
-        """Archive memories below confidence threshold."""
+    async def _legacy_archive(self, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Pre-038 single-statement archive of all low-confidence memories."""
         result = await db.fetchrow(
             """
             WITH archived AS (
                 UPDATE memory_entries
                 SET archived_at = NOW()
-                WHERE confidence <= 0.15
+                WHERE confidence <= $1
                   AND importance < 0.7
                   AND archived_at IS NULL
                   AND created_at < NOW() - INTERVAL '7 days'
                 RETURNING memory_id
             )
             SELECT COUNT(*) AS count FROM archived
-            """
+            """,
+            Decimal(str(settings.MEMORY_ARCHIVE_THRESHOLD)),
         )
-        return result["count"] if result else 0
+        report["archived"] = result["count"] if result else 0
+        report["completed_at"] = datetime.utcnow().isoformat()
+        return report
     
     # =========================================================================
     # MEMORY STATISTICS
@@ -1443,6 +1995,7 @@ class MemoryService:
             context=f"Consolidated from {len(memories)} memories",
             importance=max(m["importance_score"] for m in memories),
             source="nicole",
+            dedup_policy="off",  # Sources are near-duplicates by design
         )
         
         # Archive source memories
@@ -44,6 +44,7 @@ from uuid import UUID
 
 from openai import AsyncOpenAI
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 from app.database import get_supabase
 
 logger = logging.getLogger(__name__)
@@ -562,7 +563,7 @@ async def provider_moderation_check(text: str, tier: AgeTier) -> SafetyDecision:
         Typical: 100-200ms API latency
     """
     try:
-        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=governed_http_client())
         
         response = await client.moderations.create(
             input=text,
@@ -10,20 +10,27 @@ Production-grade usage monitoring for:
 All data stored in Tiger Postgres for historical analysis.
 
 Architecture:
-1. Track → Record every API call with token counts
-2. Aggregate → Calculate daily/monthly totals
+1. Track → Queue every API call with token counts; a background flusher
+   writes them to api_usage_log in batches (write-behind)
+2. Aggregate → Hourly/daily rollups maintained by triggers on insert
 3. Project → Estimate future costs based on trends
 4. Alert → Flag unusual usage patterns
 """
 
+import asyncio
+import json
 import logging
-from datetime import datetime, date, timedelta
+import os
+from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
-from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Set
+from dataclasses import asdict, dataclass
+
+import asyncpg
 
 from app.database import db
 from app.config import settings
+from app.services.write_behind import UNAVAILABLE_ERRORS, WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +122,200 @@ class CostProjection:
     trend_percentage: float
 
 
+@dataclass
+class UsageEvent:
+    """One api_usage_log row, captured when the call is tracked."""
+    user_id: int
+    service: str
+    model: Optional[str]
+    request_type: Optional[str]
+    input_tokens: int
+    output_tokens: int
+    cost_usd: float
+    conversation_id: Optional[int] = None
+    metadata: Optional[Dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+
+    def __post_init__(self):
+        if self.created_at is None:
+            self.created_at = datetime.now(timezone.utc)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["created_at"] = self.created_at.isoformat()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, line: str) -> "UsageEvent":
+        data = json.loads(line)
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        return cls(**data)
+
+
+# =============================================================================
+# WRITE-BEHIND USAGE LOG
+# =============================================================================
+
+# One multi-row INSERT per batch; the rollup trigger (041) then aggregates
+# the whole batch in a single statement
+_INSERT_BATCH_SQL = """
+    INSERT INTO api_usage_log (
+        user_id, service, model, request_type,
+        input_tokens, output_tokens, cost_usd,
+        conversation_id, metadata, created_at
+    )
+    SELECT u, s, m, r, i, o, c, conv, meta::jsonb, t
+    FROM unnest(
+        $1::bigint[], $2::text[], $3::text[], $4::text[],
+        $5::int[], $6::int[], $7::numeric[],
+        $8::bigint[], $9::text[], $10::timestamptz[]
+    ) AS e(u, s, m, r, i, o, c, conv, meta, t)
+"""
+
+
+class UsageLogWriter(WriteBehindQueue[UsageEvent]):
+    """
+    Bounded in-process queue of usage events, written in batches.
+    
+    add() never touches the database: events are flushed by a background
+    task every `flush_interval` seconds, or as soon as `batch_size` are
+    pending. While Postgres is unavailable events stay queued (oldest
+    dropped past `max_queue`), or are appended to `spill_path` as JSON lines
+    and replayed after the next successful write. Call shutdown() to drain.
+    """
+    
+    log_prefix = "[USAGE]"
+    item_name = "usage events"
+    
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        max_queue: int,
+        spill_path: str = "",
+    ):
+        super().__init__(batch_size, flush_interval, max_queue)
+        self._spill_path = spill_path
+        self._spill_tasks: Set[asyncio.Task] = set()  # Held so shutdown can await them
+        self._stats.update(spilled=0, replayed=0)
+    
+    async def _insert(self, batch: List[UsageEvent]) -> None:
+        await db.execute(
+            _INSERT_BATCH_SQL,
+            [e.user_id for e in batch],
+            [e.service for e in batch],
+            [e.model for e in batch],
+            [e.request_type for e in batch],
+            [e.input_tokens for e in batch],
+            [e.output_tokens for e in batch],
+            [Decimal(str(e.cost_usd)) for e in batch],
+            [e.conversation_id for e in batch],
+            [json.dumps(e.metadata) if e.metadata is not None else None for e in batch],
+            [e.created_at for e in batch],
+        )
+    
+    def _describe(self, event: UsageEvent) -> str:
+        return f"usage event for user {event.user_id}"
+    
+    def _hold(self, batch: List[UsageEvent], error: BaseException) -> None:
+        """Keep a batch that couldn't be written: spill it, or requeue it at the front."""
+        logger.warning(f"[USAGE] Database unavailable for usage log ({len(batch)} events held): {error}")
+        if self._spill_path:
+            # Spill in the background so the next flush isn't blocked on disk
+            events = batch + list(self._pending)
+            self._pending.clear()
+            task = asyncio.create_task(self._spill(events))
+            self._spill_tasks.add(task)
+            task.add_done_callback(self._spill_tasks.discard)
+            return
+        room = self._max_queue - len(self._pending)
+        if room < len(batch):
+            self._stats["dropped"] += len(batch) - room
+            batch = batch[len(batch) - room:] if room > 0 else []
+        self._pending.extendleft(reversed(batch))
+    
+    async def _after_flush(self) -> int:
+        return await self._replay_spill() if self._spill_path else 0
+    
+    async def _drain_remaining(self) -> None:
+        if self._spill_tasks:
+            await asyncio.gather(*self._spill_tasks, return_exceptions=True)
+        if self._pending and self._spill_path:
+            await self._spill(list(self._pending))
+            self._pending.clear()
+        await super()._drain_remaining()
+    
+    # ---------------------------------------------------------------------
+    # Spill file
+    # ---------------------------------------------------------------------
+    
+    async def _spill(self, events: List[UsageEvent]) -> None:
+        lines = "".join(event.to_json() + "\n" for event in events)
+        
+        def append() -> None:
+            with open(self._spill_path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        
+        try:
+            await asyncio.to_thread(append)
+            self._stats["spilled"] += len(events)
+            logger.info(f"[USAGE] Spilled {len(events)} usage events to {self._spill_path}")
+        except OSError as e:
+            self._stats["dropped"] += len(events)
+            logger.error(f"[USAGE] Failed to spill {len(events)} usage events: {e}")
+    
+    async def _replay_spill(self) -> int:
+        """Write events spilled during an outage; called after a successful flush."""
+        replaying = self._spill_path + ".replay"
+        
+        def take() -> List[str]:
+            # Rename first so events spilled meanwhile go to a fresh file
+            if not os.path.exists(replaying):
+                if not os.path.exists(self._spill_path):
+                    return []
+                os.replace(self._spill_path, replaying)
+            with open(replaying, encoding="utf-8") as f:
+                return [line for line in f if line.strip()]
+        
+        try:
+            lines = await asyncio.to_thread(take)
+        except OSError as e:
+            logger.error(f"[USAGE] Failed to read usage spill file: {e}")
+            return 0
+        if not lines:
+            return 0
+        
+        events = []
+        for line in lines:
+            try:
+                events.append(UsageEvent.from_json(line))
+            except (ValueError, TypeError, KeyError):
+                self._stats["rejected"] += 1
+        
+        written = 0
+        for start in range(0, len(events), self._batch_size):
+            batch = events[start:start + self._batch_size]
+            try:
+                written += await self.write(batch)
+            except UNAVAILABLE_ERRORS as e:
+                # Leave the rest in the replay file for next time
+                rest = "".join(event.to_json() + "\n" for event in events[start:])
+                await asyncio.to_thread(self._rewrite, replaying, rest)
+                logger.warning(f"[USAGE] Spill replay interrupted after {written} events: {e}")
+                self._stats["replayed"] += written
+                return written
+        
+        await asyncio.to_thread(os.remove, replaying)
+        self._stats["replayed"] += written
+        logger.info(f"[USAGE] Replayed {written} spilled usage events")
+        return written
+    
+    @staticmethod
+    def _rewrite(path: str, content: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
 # =============================================================================
 # USAGE TRACKING SERVICE
 # =============================================================================
@@ -162,26 +363,16 @@ class AlphawaveUsageService:
         output_cost = Decimal(str(output_tokens)) * Decimal(str(pricing["output"])) / Decimal("1000000")
         total_cost = input_cost + output_cost
         
-        try:
-            await db.execute(
-                """
-                INSERT INTO api_usage_log (
-                    user_id, service, model, request_type,
-                    input_tokens, output_tokens, cost_usd,
-                    conversation_id, created_at
-                ) VALUES ($1, 'claude', $2, $3, $4, $5, $6, $7, NOW())
-                """,
-                user_id,
-                model,
-                request_type,
-                input_tokens,
-                output_tokens,
-                float(total_cost),
-                conversation_id,
-            )
-        except Exception as e:
-            # Don't fail the main request if tracking fails
-            logger.warning(f"[USAGE] Failed to track Claude usage: {e}")
+        await self._record(UsageEvent(
+            user_id=user_id,
+            service="claude",
+            model=model,
+            request_type=request_type,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=float(total_cost),
+            conversation_id=conversation_id,
+        ))
     
     async def track_embedding_usage(
         self,
@@ -195,24 +386,16 @@ class AlphawaveUsageService:
         pricing = OPENAI_PRICING.get(model, OPENAI_PRICING["text-embedding-3-small"])
         cost = Decimal(str(tokens)) * Decimal(str(pricing)) / Decimal("1000000")
         
-        try:
-            await db.execute(
-                """
-                INSERT INTO api_usage_log (
-                    user_id, service, model, request_type,
-                    input_tokens, output_tokens, cost_usd,
-                    metadata, created_at
-                ) VALUES ($1, 'openai', $2, $3, $4, 0, $5, $6, NOW())
-                """,
-                user_id,
-                model,
-                request_type,
-                tokens,
-                float(cost),
-                {"document_id": document_id} if document_id else None,
-            )
-        except Exception as e:
-            logger.warning(f"[USAGE] Failed to track embedding usage: {e}")
+        await self._record(UsageEvent(
+            user_id=user_id,
+            service="openai",
+            model=model,
+            request_type=request_type,
+            input_tokens=tokens,
+            output_tokens=0,
+            cost_usd=float(cost),
+            metadata={"document_id": document_id} if document_id else None,
+        ))
     
     async def track_document_processing(
         self,
@@ -224,23 +407,27 @@ class AlphawaveUsageService:
         """Track document processing (Azure Document Intelligence)."""
         cost = Decimal(str(pages)) * Decimal(str(AZURE_PRICING["document_pages"]))
         
+        await self._record(UsageEvent(
+            user_id=user_id,
+            service="azure",
+            model="document-intelligence",
+            request_type="document_processing",
+            input_tokens=pages,  # Using pages as "tokens" for document processing
+            output_tokens=0,
+            cost_usd=float(cost),
+            metadata={"document_id": document_id, "file_size_bytes": file_size_bytes},
+        ))
+    
+    async def _record(self, event: UsageEvent) -> None:
+        """Queue an event for the write-behind log (or write it now if disabled)."""
+        if settings.USAGE_LOG_WRITE_BEHIND:
+            usage_log.add(event)
+            return
         try:
-            await db.execute(
-                """
-                INSERT INTO api_usage_log (
-                    user_id, service, model, request_type,
-                    input_tokens, output_tokens, cost_usd,
-                    metadata, created_at
-                ) VALUES ($1, 'azure', 'document-intelligence', 'document_processing',
-                         $2, 0, $3, $4, NOW())
-                """,
-                user_id,
-                pages,  # Using pages as "tokens" for document processing
-                float(cost),
-                {"document_id": document_id, "file_size_bytes": file_size_bytes},
-            )
+            await usage_log.write([event])
         except Exception as e:
-            logger.warning(f"[USAGE] Failed to track document processing: {e}")
+            # Don't fail the main request if tracking fails
+            logger.warning(f"[USAGE] Failed to track {event.service} usage: {e}")
     
     # =========================================================================
     # AGGREGATION METHODS
@@ -265,84 +452,57 @@ class AlphawaveUsageService:
         period_end = date.today()
         
         try:
-            # Check if api_usage_log table exists
-            table_exists = await db.fetchval(
-                """
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = 'api_usage_log'
-                )
+            # Totals and the daily series both come from the trigger-maintained
+            # daily rollup (041_usage_rollups.sql): a few rows per day, however
+            # large api_usage_log grows
+            rollup_rows = await db.fetch(
                 """
-            )
-            
-            if not table_exists:
-                logger.warning("[USAGE] api_usage_log table does not exist - returning empty usage")
-                return self._empty_usage_summary(period_start, period_end, days)
-            
-            # Get aggregated usage data
-            usage_row = await db.fetchrow(
-                """
-                SELECT
-                    -- Claude usage
-                    COALESCE(SUM(CASE WHEN service = 'claude' THEN input_tokens ELSE 0 END), 0) AS claude_input_tokens,
-                    COALESCE(SUM(CASE WHEN service = 'claude' THEN output_tokens ELSE 0 END), 0) AS claude_output_tokens,
-                    COALESCE(COUNT(CASE WHEN service = 'claude' THEN 1 END), 0) AS claude_requests,
-                    COALESCE(SUM(CASE WHEN service = 'claude' THEN cost_usd ELSE 0 END), 0) AS claude_cost,
-                    
-                    -- OpenAI usage
-                    COALESCE(SUM(CASE WHEN service = 'openai' THEN input_tokens ELSE 0 END), 0) AS openai_tokens,
-                    COALESCE(COUNT(CASE WHEN service = 'openai' THEN 1 END), 0) AS embedding_requests,
-                    COALESCE(SUM(CASE WHEN service = 'openai' THEN cost_usd ELSE 0 END), 0) AS openai_cost,
-                    
-                    -- Azure usage
-                    COALESCE(SUM(CASE WHEN service = 'azure' THEN input_tokens ELSE 0 END), 0) AS document_pages,
-                    COALESCE(SUM(CASE WHEN service = 'azure' THEN cost_usd ELSE 0 END), 0) AS azure_cost,
-                    
-                    -- Total
-                    COALESCE(SUM(cost_usd), 0) AS total_api_cost
-                FROM api_usage_log
+                SELECT day, service,
+                       SUM(requests) AS requests,
+                       SUM(input_tokens) AS input_tokens,
+                       SUM(output_tokens) AS output_tokens,
+                       SUM(cost_usd) AS cost_usd
+                FROM usage_rollup_daily
                 WHERE user_id = $1
-                  AND created_at >= $2::date
-                  AND created_at < ($3::date + INTERVAL '1 day')
+                  AND day BETWEEN $2 AND $3
+                GROUP BY day, service
+                ORDER BY day
                 """,
                 user_id,
                 period_start,
                 period_end,
             )
+            storage_row = await db.fetchrow(
+                """
+                SELECT document_bytes, document_count, chunk_count
+                FROM usage_storage_rollup
+                WHERE user_id = $1
+                """,
+                user_id,
+            )
             
-            # Get storage usage - handle both schema variants
-            try:
-                storage_row = await db.fetchrow(
-                    """
-                    SELECT
-                        COALESCE(SUM(file_size), 0) AS document_storage,
-                        COALESCE(COUNT(*), 0) AS document_count
-                    FROM uploaded_files
-                    WHERE user_id = $1
-                    """,
-                    user_id,
+            totals: Dict[str, Dict[str, float]] = {}
+            daily: Dict[date, float] = {}
+            for row in rollup_rows:
+                service_totals = totals.setdefault(
+                    row["service"], {"requests": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
                 )
-            except Exception as e:
-                logger.warning(f"[USAGE] Failed to get storage usage: {e}")
-                storage_row = {"document_storage": 0, "document_count": 0}
+                service_totals["requests"] += row["requests"] or 0
+                service_totals["input_tokens"] += row["input_tokens"] or 0
+                service_totals["output_tokens"] += row["output_tokens"] or 0
+                service_totals["cost_usd"] += float(row["cost_usd"] or 0)
+                daily[row["day"]] = daily.get(row["day"], 0.0) + float(row["cost_usd"] or 0)
             
-            # Estimate embedding storage (1536 dims * 4 bytes * chunk count)
-            try:
-                chunk_row = await db.fetchrow(
-                    """
-                    SELECT COUNT(*) AS chunk_count
-                    FROM document_chunks dc
-                    JOIN document_repository dr ON dr.doc_id = dc.doc_id
-                    WHERE dr.user_id = $1
-                    """,
-                    user_id,
-                )
-            except Exception as e:
-                logger.warning(f"[USAGE] Failed to get chunk count: {e}")
-                chunk_row = {"chunk_count": 0}
+            empty = {"requests": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0}
+            claude = totals.get("claude", empty)
+            openai_usage = totals.get("openai", empty)
+            azure = totals.get("azure", empty)
             
-            embedding_storage = (chunk_row["chunk_count"] or 0) * 1536 * 4
-            document_storage = storage_row["document_storage"] or 0
+            # Embedding storage is estimated (1536 dims * 4 bytes * chunk count)
+            chunk_count = storage_row["chunk_count"] if storage_row else 0
+            document_count = storage_row["document_count"] if storage_row else 0
+            embedding_storage = chunk_count * 1536 * 4
+            document_storage = storage_row["document_bytes"] if storage_row else 0
             total_storage = document_storage + embedding_storage
             
             # Calculate Tiger storage cost (estimated)
@@ -350,24 +510,10 @@ class AlphawaveUsageService:
             tiger_cost = Decimal(str(storage_gb)) * Decimal(str(TIGER_PRICING["storage_per_gb_month"]))
             
             # Calculate total
-            api_cost = Decimal(str(usage_row["total_api_cost"] or 0))
+            api_cost = Decimal(str(sum(t["cost_usd"] for t in totals.values())))
             total_cost = api_cost + tiger_cost
             
-            # Get daily breakdown for trend analysis
-            daily_costs = await db.fetch(
-                """
-                SELECT
-                    DATE(created_at) AS day,
-                    SUM(cost_usd) AS daily_cost
-                FROM api_usage_log
-                WHERE user_id = $1
-                  AND created_at >= $2
-                GROUP BY DATE(created_at)
-                ORDER BY day
-                """,
-                user_id,
-                period_start,
-            )
+            daily_costs = [{"day": day, "daily_cost": cost} for day, cost in sorted(daily.items())]
             
             # Calculate projections
             projection = self._calculate_projections(daily_costs, days)
@@ -379,22 +525,20 @@ class AlphawaveUsageService:
                     "days": days,
                 },
                 "tokens": {
-                    "claude_input": usage_row["claude_input_tokens"] or 0,
-                    "claude_output": usage_row["claude_output_tokens"] or 0,
-                    "openai_embedding": usage_row["openai_tokens"] or 0,
-                    "total": (usage_row["claude_input_tokens"] or 0) + 
-                             (usage_row["claude_output_tokens"] or 0) + 
-                             (usage_row["openai_tokens"] or 0),
+                    "claude_input": claude["input_tokens"],
+                    "claude_output": claude["output_tokens"],
+                    "openai_embedding": openai_usage["input_tokens"],
+                    "total": claude["input_tokens"] + claude["output_tokens"] + openai_usage["input_tokens"],
                 },
                 "requests": {
-                    "claude": usage_row["claude_requests"] or 0,
-                    "embedding": usage_row["embedding_requests"] or 0,
-                    "document_pages": usage_row["document_pages"] or 0,
+                    "claude": claude["requests"],
+                    "embedding": openai_usage["requests"],
+                    "document_pages": azure["input_tokens"],  # Pages are logged as input tokens
                 },
                 "costs": {
-                    "claude": round(float(usage_row["claude_cost"] or 0), 4),
-                    "openai": round(float(usage_row["openai_cost"] or 0), 4),
-                    "azure": round(float(usage_row["azure_cost"] or 0), 4),
+                    "claude": round(claude["cost_usd"], 4),
+                    "openai": round(openai_usage["cost_usd"], 4),
+                    "azure": round(azure["cost_usd"], 4),
                     "tiger_storage": round(float(tiger_cost), 4),
                     "total": round(float(total_cost), 4),
                 },
@@ -405,8 +549,8 @@ class AlphawaveUsageService:
                     "embeddings_formatted": self._format_bytes(embedding_storage),
                     "total_bytes": total_storage,
                     "total_formatted": self._format_bytes(total_storage),
-                    "document_count": storage_row["document_count"] or 0,
-                    "chunk_count": chunk_row["chunk_count"] or 0,
+                    "document_count": document_count,
+                    "chunk_count": chunk_count,
                 },
                 "projections": projection,
                 "daily_breakdown": [
@@ -415,6 +559,9 @@ class AlphawaveUsageService:
                 ],
             }
             
+        except asyncpg.UndefinedTableError:
+            logger.warning("[USAGE] Usage rollup tables missing (run 041_usage_rollups.sql) - returning empty usage")
+            return self._empty_usage_summary(period_start, period_end, days)
         except Exception as e:
             logger.error(f"[USAGE] Failed to get usage summary: {e}", exc_info=True)
             return self._empty_usage_summary(period_start, period_end, days)
@@ -466,18 +613,22 @@ class AlphawaveUsageService:
                 user_id,
             )
             
-            # Get recent API failures (from usage log metadata)
-            api_health = await db.fetchrow(
-                """
-                SELECT
-                    COUNT(*) AS total_requests_24h,
-                    COUNT(*) FILTER (WHERE cost_usd = 0 AND service = 'claude') AS potential_failures
-                FROM api_usage_log
-                WHERE user_id = $1
-                  AND created_at > NOW() - INTERVAL '24 hours'
-                """,
-                user_id,
-            )
+            # Recent API failures, from the hourly rollup (the last 24 full
+            # hours plus the current one)
+            try:
+                api_health = await db.fetchrow(
+                    """
+                    SELECT
+                        COALESCE(SUM(requests), 0) AS total_requests_24h,
+                        COALESCE(SUM(zero_cost_requests) FILTER (WHERE service = 'claude'), 0) AS potential_failures
+                    FROM usage_rollup_hourly
+                    WHERE user_id = $1
+                      AND bucket >= date_trunc('hour', NOW()) - INTERVAL '24 hours'
+                    """,
+                    user_id,
+                )
+            except asyncpg.UndefinedTableError:
+                api_health = {"total_requests_24h": 0, "potential_failures": 0}
             
             # Check for stale data
             stale_check = await db.fetchrow(
@@ -683,5 +834,13 @@ class AlphawaveUsageService:
 # GLOBAL INSTANCE
 # =============================================================================
 
+# Write-behind queue for api_usage_log (drained on shutdown)
+usage_log = UsageLogWriter(
+    batch_size=settings.USAGE_LOG_BATCH_SIZE,
+    flush_interval=settings.USAGE_LOG_FLUSH_INTERVAL_SECONDS,
+    max_queue=settings.USAGE_LOG_QUEUE_MAX,
+    spill_path=settings.USAGE_LOG_SPILL_PATH,
+)
+
 usage_service = AlphawaveUsageService()
 
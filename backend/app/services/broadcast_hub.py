@@ -0,0 +1,369 @@
+"""
+Nicole V7 - WebSocket broadcast hub
+
+Fan-out for live project streams (Faz activity, files, status):
+
+- publish() stamps each event with a per-channel sequence number and
+  serializes it once; every socket is sent the same text frame.
+- Each socket has its own bounded send queue drained by its own writer
+  task, so a slow client only delays itself. Status / progress events
+  replace their still-queued predecessor; file events never do, since
+  each is a patch against the one before. When a queue is full anyway the
+  oldest event is dropped (clients re-fetch a file whose patch no longer
+  applies).
+  A socket whose send stalls past BROADCAST_SEND_TIMEOUT_SECONDS is closed
+  so the client reconnects and replays.
+- With Redis connected, events go through Redis pub/sub, so sockets held
+  by any Uvicorn worker receive them. Without Redis the hub delivers
+  in-process (single worker). If a Redis publish fails the event is
+  delivered locally, numbered on from the highest seq this process has
+  seen so connected sockets don't discard it as already sent.
+- The last BROADCAST_REPLAY_SIZE events per channel are kept (a Redis list,
+  or a local ring buffer) so a reconnecting client passing the last seq it
+  saw gets what it missed.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.config import settings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+
+_CHANNEL_PREFIX = "hub:ch:"
+_SEQ_PREFIX = "hub:seq:"
+_RING_PREFIX = "hub:ring:"
+
+# Event type -> coalesce key (None = never coalesced). File events are left
+# out: a modified file's patch only applies on top of the previous event
+_COALESCE_BY_TYPE = {
+    "status": lambda event: "status",
+    "progress": lambda event: "progress",
+}
+
+
+def coalesce_key(event: Dict[str, Any]) -> Optional[str]:
+    """Key under which a newer event supersedes a queued one."""
+    keyer = _COALESCE_BY_TYPE.get(event.get("type"))
+    return keyer(event) if keyer else None
+
+
+def _frame(seq: int, key: Optional[str], text: str) -> str:
+    # seq and key travel outside the JSON so receivers never re-parse it
+    return f"{seq}\t{key or ''}\t{text}"
+
+
+def _unframe(frame: str) -> Tuple[int, Optional[str], str]:
+    seq, key, text = frame.split("\t", 2)
+    return int(seq), key or None, text
+
+
+# ============================================================================
+# SUBSCRIBER
+# ============================================================================
+
+class Subscriber:
+    """One WebSocket: a bounded send queue and the task draining it."""
+
+    def __init__(self, websocket: Any, channel: str, max_queue: int):
+        self.websocket = websocket
+        self.channel = channel
+        self.max_queue = max_queue
+        # [seq, coalesce key, text]; seq is None for direct (personal) messages
+        self.queue: Deque[List[Any]] = deque()
+        self.last_seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def offer(self, seq: Optional[int], key: Optional[str], text: str) -> None:
+        if self.closed:
+            return
+        if key is not None:
+            for item in self.queue:
+                if item[1] == key:
+                    # Re-queue at the tail so sequence order is kept
+                    self.queue.remove(item)
+                    self.coalesced += 1
+                    break
+        if len(self.queue) >= self.max_queue:
+            self._drop_oldest()
+        self.queue.append([seq, key, text])
+        self._ready.set()
+
+    def _drop_oldest(self) -> None:
+        # Broadcast events go first; direct replies (pong, errors) are kept
+        for item in self.queue:
+            if item[0] is not None:
+                self.queue.remove(item)
+                self.dropped += 1
+                return
+        self.queue.popleft()
+        self.dropped += 1
+
+    def merge_replay(self, events: List[Tuple[int, Optional[str], str]]) -> None:
+        """Put missed events ahead of live ones queued since subscribing."""
+        live = [item for item in self.queue if item[0] is not None]
+        direct = [item for item in self.queue if item[0] is None]
+        by_seq = {seq: [seq, key, text] for seq, key, text in events}
+        by_seq.update({item[0]: item for item in live})
+        merged = [by_seq[seq] for seq in sorted(by_seq)]
+        self.queue = deque(direct + merged[-self.max_queue:])
+        if self.queue:
+            self._ready.set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        timeout = settings.BROADCAST_SEND_TIMEOUT_SECONDS
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                seq, _, text = self.queue.popleft()
+                if seq is not None:
+                    if seq <= self.last_seq:
+                        continue
+                    self.last_seq = seq
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"[BROADCAST] Send stalled on {self.channel}, closing slow client")
+            self.closed = True
+            try:
+                await self.websocket.close(code=1013, reason="Client too slow")
+            except Exception:
+                pass
+        except Exception:
+            # Socket gone; the endpoint's receive loop unsubscribes it
+            self.closed = True
+
+    async def stop(self) -> None:
+        self.closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "last_seq": self.last_seq,
+        }
+
+
+# ============================================================================
+# HUB
+# ============================================================================
+
+class BroadcastHub:
+    """Channel -> subscribers, with Redis pub/sub across worker processes."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._by_socket: Dict[int, Subscriber] = {}
+        self._rings: Dict[str, Deque[Tuple[int, Optional[str], str]]] = {}
+        self._seq: Dict[str, int] = {}  # Highest seq issued or delivered here
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.publish_fallbacks = 0
+
+    def _redis(self):
+        return db.redis if settings.BROADCAST_REDIS_ENABLED else None
+
+    # ------------------------------------------------------------------
+    # Subscribing
+    # ------------------------------------------------------------------
+
+    async def subscribe(self, channel: str, websocket: Any, last_seq: Optional[int] = None) -> Subscriber:
+        """Attach an accepted socket; replays events after last_seq if given."""
+        subscriber = Subscriber(websocket, channel, settings.BROADCAST_SEND_QUEUE_MAX)
+        # Register before reading the ring so nothing published meanwhile is missed
+        self._subscribers.setdefault(channel, set()).add(subscriber)
+        self._by_socket[id(websocket)] = subscriber
+        self._ensure_listener()
+        if last_seq is not None and last_seq <= await self.current_seq(channel):
+            subscriber.last_seq = last_seq
+            subscriber.merge_replay(await self.replay(channel, last_seq))
+        subscriber.start()
+        return subscriber
+
+    async def unsubscribe(self, websocket: Any) -> None:
+        subscriber = self._by_socket.pop(id(websocket), None)
+        if not subscriber:
+            return
+        subscribers = self._subscribers.get(subscriber.channel)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[subscriber.channel]
+        await subscriber.stop()
+
+    def send(self, websocket: Any, message: Dict[str, Any]) -> bool:
+        """Queue a direct message on one socket's writer (False if not subscribed)."""
+        subscriber = self._by_socket.get(id(websocket))
+        if not subscriber or subscriber.closed:
+            return False
+        subscriber.offer(None, None, json.dumps(message, default=str))
+        return True
+
+    def subscribers(self, channel: str) -> List[Subscriber]:
+        return list(self._subscribers.get(channel, ()))
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> int:
+        """Fan an event out to every subscriber of a channel; returns its seq."""
+        key = coalesce_key(message)
+        self.published += 1
+        redis = self._redis()
+        if redis is not None:
+            try:
+                seq = await redis.incr(_SEQ_PREFIX + channel)
+                if seq <= self._seq.get(channel, 0):
+                    # Local fallback numbered past Redis during an outage
+                    seq = await redis.incrby(_SEQ_PREFIX + channel, self._seq[channel] - seq + 1)
+                self._note_seq(channel, seq)
+                frame = _frame(seq, key, json.dumps({**message, "seq": seq}, default=str))
+                ring = _RING_PREFIX + channel
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.rpush(ring, frame)
+                    pipe.ltrim(ring, -settings.BROADCAST_REPLAY_SIZE, -1)
+                    pipe.expire(ring, settings.BROADCAST_REPLAY_TTL_SECONDS)
+                    pipe.publish(_CHANNEL_PREFIX + channel, frame)
+                    await pipe.execute()
+                # Delivered locally by the listener, like on every other worker
+                self._ensure_listener()
+                return seq
+            except Exception as e:
+                self.publish_fallbacks += 1
+                logger.warning(f"[BROADCAST] Redis publish failed, delivering locally: {e}")
+
+        seq = self._seq[channel] = self._seq.get(channel, 0) + 1
+        text = json.dumps({**message, "seq": seq}, default=str)
+        ring = self._rings.setdefault(channel, deque(maxlen=settings.BROADCAST_REPLAY_SIZE))
+        ring.append((seq, key, text))
+        self._deliver(channel, seq, key, text)
+        return seq
+
+    def _note_seq(self, channel: str, seq: int) -> None:
+        if seq > self._seq.get(channel, 0):
+            self._seq[channel] = seq
+
+    def _deliver(self, channel: str, seq: int, key: Optional[str], text: str) -> None:
+        self._note_seq(channel, seq)
+        for subscriber in self._subscribers.get(channel, ()):
+            subscriber.offer(seq, key, text)
+
+    async def current_seq(self, channel: str) -> int:
+        """Latest seq issued on a channel (0 if none)."""
+        redis = self._redis()
+        if redis is not None:
+            try:
+                return int(await redis.get(_SEQ_PREFIX + channel) or 0)
+            except Exception as e:
+                logger.warning(f"[BROADCAST] Reading seq from Redis failed: {e}")
+        return self._seq.get(channel, 0)
+
+    async def replay(self, channel: str, after_seq: int) -> List[Tuple[int, Optional[str], str]]:
+        """Buffered events with seq > after_seq, oldest first."""
+        redis = self._redis()
+        if redis is not None:
+            try:
+                frames = await redis.lrange(_RING_PREFIX + channel, 0, -1)
+                events = [_unframe(frame) for frame in frames]
+                return [event for event in events if event[0] > after_seq]
+            except Exception as e:
+                logger.warning(f"[BROADCAST] Replay from Redis failed: {e}")
+        return [event for event in self._rings.get(channel, ()) if event[0] > after_seq]
+
+    # ------------------------------------------------------------------
+    # Cross-process delivery
+    # ------------------------------------------------------------------
+
+    def _ensure_listener(self) -> None:
+        if self._redis() is None:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Relay Redis pub/sub frames to this process's subscribers."""
+        while True:
+            redis = self._redis()
+            if redis is None:
+                return
+            pubsub = redis.pubsub()
+            try:
+                await pubsub.psubscribe(_CHANNEL_PREFIX + "*")
+                logger.info("[BROADCAST] Listening for cross-worker events")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel = message["channel"][len(_CHANNEL_PREFIX):]
+                    if channel not in self._subscribers:
+                        continue
+                    try:
+                        seq, key, text = _unframe(message["data"])
+                    except ValueError:
+                        continue
+                    self._deliver(channel, seq, key, text)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[BROADCAST] Pub/sub listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def shutdown(self) -> None:
+        if self._listener and not self._listener.done():
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        for subscriber in list(self._by_socket.values()):
+            await subscriber.stop()
+        self._by_socket.clear()
+        self._subscribers.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        subscribers = list(self._by_socket.values())
+        return {
+            "mode": "redis" if self._redis() is not None else "local",
+            "channels": len(self._subscribers),
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "publish_fallbacks": self.publish_fallbacks,
+            "queued": sum(len(s.queue) for s in subscribers),
+            "dropped": sum(s.dropped for s in subscribers),
+            "coalesced": sum(s.coalesced for s in subscribers),
+        }
+
+
+# Global hub instance
+broadcast_hub = BroadcastHub()
@@ -22,11 +22,14 @@ from uuid import uuid4
 from anthropic import Anthropic, AsyncAnthropic
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
+from app.integrations.llm_telemetry import set_tool_iteration, tool_loop
 from app.database import get_tiger_pool
 from app.services.knowledge_base_service import kb_service
 from app.services.enjineer_qa_service import qa_service
 from app.services.engineer_intelligence import engineer_intelligence, PreflightResult
 from app.services.npm_validator import npm_validator
+from app.services.file_blob_store import file_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -843,7 +846,7 @@ class EnjineerNicole:
         """
         self.project_id = int(project_id)
         self.user_id = int(user_id)
-        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=governed_http_client())
         self.model = "claude-opus-4-20250514"  # Claude Opus 4.5 for superior reasoning
         self.project_data: Optional[Dict[str, Any]] = None
         self.max_tool_iterations = 10  # Safety limit
@@ -1566,6 +1569,13 @@ When creating files:
             deployment_id=self._deployment_id,
         )
         
+        await file_blob_store.record(
+            "enjineer", self.project_id,
+            changes={path: content},
+            message=f"Create {path}",
+            author="nicole",
+        )
+        
         if verification.success:
             self._verified_files.add(path)
             self._unverified_files.discard(path)
@@ -1666,6 +1676,13 @@ When creating files:
             deployment_id=self._deployment_id,
         )
         
+        await file_blob_store.record(
+            "enjineer", self.project_id,
+            changes={path: content},
+            message=commit_message,
+            author="nicole",
+        )
+        
         if verification.success:
             self._verified_files.add(path)
             self._unverified_files.discard(path)
@@ -1705,6 +1722,13 @@ When creating files:
         if result == "DELETE 0":
             return {"success": False, "error": f"File not found: {path}"}
         
+        await file_blob_store.record(
+            "enjineer", self.project_id,
+            deleted=[path],
+            message=f"Delete {path}: {reason}",
+            author="nicole",
+        )
+        
         logger.info(f"[Enjineer] Deleted file: {path} (reason: {reason})")
         return {
             "success": True,
@@ -1905,6 +1929,13 @@ This plan requires your approval before implementation begins. Review the phases
                 self.project_id, plan_md, hashlib.sha256(plan_md.encode()).hexdigest()
             )
         
+        await file_blob_store.record(
+            "enjineer", self.project_id,
+            changes={"/plan.md": plan_md},
+            message=f"Plan: {name}",
+            author="nicole",
+        )
+        
         logger.warning(f"[Enjineer] Created plan '{name}' (id={plan_id}) with {len(phases_data)} phases - awaiting approval")
         return {
             "success": True,
@@ -3180,6 +3211,7 @@ Required actions:
     # Main Message Processing (Agentic Loop)
     # ========================================================================
     
+    @tool_loop
     async def process_message(
         self,
         message: str,
@@ -3250,6 +3282,7 @@ Required actions:
         
         while iteration < self.max_tool_iterations:
             iteration += 1
+            set_tool_iteration(iteration)
             logger.debug(f"[Enjineer] Tool loop iteration {iteration}")
             
             try:
@@ -28,6 +28,7 @@ import openai
 from anthropic import AsyncAnthropic
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 from app.database import db
 
 logger = logging.getLogger(__name__)
@@ -257,8 +258,8 @@ class EnjineerQAService:
     
     def __init__(self):
         # Async clients only - no blocking calls
-        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-        self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=governed_http_client())
+        self.anthropic_client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=governed_http_client())
         
         # Model configuration
         self.standard_qa_model = "gpt-4o"
@@ -16,6 +16,8 @@ import logging
 import json
 import re
 
+from .state_projection import project_state
+
 logger = logging.getLogger(__name__)
 
 
@@ -86,6 +88,13 @@ class BaseAgent(ABC):
     valid_handoff_targets: List[str] = []
     receives_handoffs_from: List[str] = []
     
+    # State projection: keys _build_prompt / _parse_response read (None = all).
+    # Files arrive as digests unless the agent needs their full content
+    # (all files, or just the paths in full_file_paths).
+    state_slices: Optional[Tuple[str, ...]] = None
+    needs_file_contents: bool = False
+    full_file_paths: Tuple[str, ...] = ()
+    
     def __init__(self):
         """Initialize the agent."""
         self._claude_client = None
@@ -108,6 +117,13 @@ class BaseAgent(ABC):
             self._gemini_client = gemini_client
         return self._gemini_client
     
+    async def _get_openai_client(self):
+        """Get the shared OpenAI client."""
+        if self._openai_client is None:
+            from app.integrations.alphawave_openai import openai_client
+            self._openai_client = openai_client.client
+        return self._openai_client
+    
     async def _get_mcp_client(self):
         """Get or create MCP client."""
         if self._mcp_client is None:
@@ -128,7 +144,8 @@ class BaseAgent(ABC):
         start_time = datetime.utcnow()
         
         try:
-            # Build prompt
+            # Build prompt from this agent's slice of the state
+            state = project_state(state, self.state_slices, self.needs_file_contents, self.full_file_paths)
             prompt = self._build_prompt(state)
             system_prompt = self._get_system_prompt()
             
@@ -191,37 +208,39 @@ class BaseAgent(ABC):
         
         if self.model_provider == "anthropic":
             client = await self._get_claude_client()
-            response = await client.generate_response(
-                messages=messages,
-                system_prompt=system_prompt,
+            response = await client.async_client.messages.create(
                 model=self.model_name,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
+                system=system_prompt,
+                messages=messages,
             )
-            # Estimate tokens (Claude client returns response text only)
-            input_tokens = len(prompt) // 4
-            output_tokens = len(response) // 4
-            return response, input_tokens, output_tokens
+            result = "".join(block.text for block in response.content if hasattr(block, "text"))
+            usage = response.usage
+            if not usage:
+                return result, len(prompt) // 4, len(result) // 4
+            input_tokens = (
+                usage.input_tokens
+                + (getattr(usage, "cache_read_input_tokens", 0) or 0)
+                + (getattr(usage, "cache_creation_input_tokens", 0) or 0)
+            )
+            return result, input_tokens, usage.output_tokens
             
         elif self.model_provider == "google":
             client = await self._get_gemini_client()
             # Use Gemini for generation
-            result = await client.generate_content(
+            result, input_tokens, output_tokens = await client.generate_content_with_usage(
                 prompt=f"{system_prompt}\n\n{prompt}",
                 model_name=self.model_name,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
             )
-            input_tokens = len(prompt) // 4
-            output_tokens = len(result) // 4
+            if not input_tokens and not output_tokens:
+                return result, len(prompt) // 4, len(result) // 4
             return result, input_tokens, output_tokens
             
         elif self.model_provider == "openai":
-            # Use OpenAI client
-            from openai import AsyncOpenAI
-            from app.config import settings
-            
-            client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            client = await self._get_openai_client()
             response = await client.chat.completions.create(
                 model=self.model_name,
                 messages=[
@@ -231,7 +250,7 @@ class BaseAgent(ABC):
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
             )
-            result = response.choices[0].message.content
+            result = response.choices[0].message.content or ""
             input_tokens = response.usage.prompt_tokens if response.usage else len(prompt) // 4
             output_tokens = response.usage.completion_tokens if response.usage else len(result) // 4
             return result, input_tokens, output_tokens
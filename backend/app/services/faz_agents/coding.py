@@ -48,6 +48,7 @@ class CodingAgent(BaseAgent):
     available_tools = []  # Pure code generation
     valid_handoff_targets = ["qa"]
     receives_handoffs_from = ["nicole", "planning", "design"]
+    state_slices = ("original_prompt", "data", "architecture", "design_tokens", "relevant_artifacts", "relevant_errors")
     
     def _get_system_prompt(self) -> str:
         return """You are the Coding Agent for Faz Code, an expert frontend developer.
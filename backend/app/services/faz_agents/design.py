@@ -45,6 +45,7 @@ class DesignAgent(BaseAgent):
     available_tools = ["brave_web_search"]
     valid_handoff_targets = ["coding"]
     receives_handoffs_from = ["nicole", "planning", "research"]
+    state_slices = ("original_prompt", "data", "architecture", "research_results", "inspiration_analysis")
     
     def _get_system_prompt(self) -> str:
         return """You are the Design Agent for Faz Code, a world-class UI/UX designer.
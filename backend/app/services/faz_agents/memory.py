@@ -44,6 +44,7 @@ class MemoryAgent(BaseAgent):
     available_tools = []
     valid_handoff_targets = []  # End of pipeline
     receives_handoffs_from = ["nicole", "coding", "qa", "review"]
+    state_slices = ("original_prompt", "data", "files", "design_tokens")
     
     def _get_system_prompt(self) -> str:
         return """You are the Memory Agent for Faz Code, responsible for organizational learning.
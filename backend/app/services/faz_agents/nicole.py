@@ -44,6 +44,7 @@ class NicoleAgent(BaseAgent):
     
     valid_handoff_targets = ["planning", "research", "design", "coding", "qa", "review"]
     receives_handoffs_from = []  # Nicole is the entry point
+    state_slices = ("original_prompt", "current_prompt", "status", "error", "architecture", "files", "agent_history")
     
     def _get_system_prompt(self) -> str:
         return """You are Nicole, the Creative Director and Orchestrator for Faz Code.
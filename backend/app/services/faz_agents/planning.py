@@ -45,6 +45,7 @@ class PlanningAgent(BaseAgent):
     available_tools = ["memory_search"]
     valid_handoff_targets = ["design", "coding"]
     receives_handoffs_from = ["nicole", "research"]
+    state_slices = ("original_prompt", "current_prompt", "data", "design_tokens", "research_results", "relevant_memories", "relevant_skills")
     
     def _get_system_prompt(self) -> str:
         return """You are the Planning Agent for Faz Code, an expert software architect.
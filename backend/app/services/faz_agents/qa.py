@@ -45,6 +45,8 @@ class QAAgent(BaseAgent):
     available_tools = ["puppeteer_screenshot", "puppeteer_navigate", "puppeteer_evaluate"]
     valid_handoff_targets = ["coding", "review"]
     receives_handoffs_from = ["coding"]
+    state_slices = ("data", "files", "architecture")
+    needs_file_contents = True  # Reviews every line of every file
     
     def _get_system_prompt(self) -> str:
         return """You are the QA Agent for Faz Code, a meticulous code reviewer.
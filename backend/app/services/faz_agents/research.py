@@ -47,6 +47,7 @@ class ResearchAgent(BaseAgent):
     available_tools = ["brave_web_search", "puppeteer_screenshot", "puppeteer_navigate"]
     valid_handoff_targets = ["planning", "design"]
     receives_handoffs_from = ["nicole"]
+    state_slices = ("original_prompt", "current_prompt", "data", "inspiration_analysis")
     
     def _get_system_prompt(self) -> str:
         return """You are the Research Agent for Faz Code, an expert design analyst.
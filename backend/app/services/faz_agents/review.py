@@ -44,6 +44,8 @@ class ReviewAgent(BaseAgent):
     available_tools = []
     valid_handoff_targets = ["coding"]  # Can send back for fixes
     receives_handoffs_from = ["qa"]
+    state_slices = ("original_prompt", "data", "files", "architecture")
+    full_file_paths = ("app/page.tsx", "app/layout.tsx", "tailwind.config.ts")  # Quoted in the prompt
     
     def _get_system_prompt(self) -> str:
         return """You are the Review Agent for Faz Code, the final approval authority.
@@ -123,8 +125,7 @@ This is the executive review. You determine if the project is ready for deployme
                 prompt_parts.append(f"- {path}")
             
             # Include key files
-            key_files = ["app/page.tsx", "app/layout.tsx", "tailwind.config.ts"]
-            for key_file in key_files:
+            for key_file in self.full_file_paths:
                 if key_file in files:
                     content = files[key_file]
                     prompt_parts.append(f"\n### {key_file}\n```\n{content[:2000]}\n```")
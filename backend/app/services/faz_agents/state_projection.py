@@ -0,0 +1,102 @@
+"""
+Faz Code State Projection
+
+Each agent declares the ProjectState slices it reads (BaseAgent.state_slices)
+and builds its prompt from a view holding only those. Generated files are
+passed as compact digests (size, exports, first lines) plus a manifest,
+unless the agent sets needs_file_contents or names the paths it reads in
+full (full_file_paths). Prompt size then depends on what an agent uses, not
+on how many files the project has accumulated.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import re
+
+# Identity keys every view carries
+ALWAYS_INCLUDED = ("project_id", "user_id")
+
+DIGEST_HEAD_LINES = 12
+DIGEST_HEAD_CHARS = 600
+DIGEST_MAX_EXPORTS = 10
+DIGEST_CACHE_SIZE = 4096
+
+RE_EXPORT = re.compile(
+    r"^export\s+(?:default\s+)?(?:async\s+)?(?:function|const|class|interface|type|let)\s+(\w+)",
+    re.MULTILINE,
+)
+
+
+# (path, content hash) -> digest; holds digests only, never file bodies
+_digest_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def file_digest(path: str, content: str) -> str:
+    """Short stand-in for a file's content: size, exported names, first lines."""
+    key = (path, hashlib.md5(content.encode("utf-8", "surrogatepass")).digest())
+    digest = _digest_cache.get(key)
+    if digest is None:
+        digest = _build_digest(path, content)
+        _digest_cache[key] = digest
+        if len(_digest_cache) > DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    else:
+        _digest_cache.move_to_end(key)
+    return digest
+
+
+def _build_digest(path: str, content: str) -> str:
+    lines = content.splitlines()
+    parts = [f"// {path}: {len(lines)} lines, {len(content)} chars (digest)"]
+
+    exports = RE_EXPORT.findall(content)[:DIGEST_MAX_EXPORTS]
+    if exports:
+        parts.append(f"// exports: {', '.join(exports)}")
+
+    parts.append("\n".join(lines[:DIGEST_HEAD_LINES])[:DIGEST_HEAD_CHARS])
+    if len(lines) > DIGEST_HEAD_LINES:
+        parts.append(f"// ... {len(lines) - DIGEST_HEAD_LINES} more lines")
+    return "\n".join(parts)
+
+
+def file_manifest(files: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Path and size of every file, without content."""
+    return [
+        {"path": path, "lines": content.count("\n") + 1, "chars": len(content)}
+        for path, content in sorted(files.items())
+    ]
+
+
+def project_state(
+    state: Dict[str, Any],
+    slices: Optional[Sequence[str]] = None,
+    file_contents: bool = False,
+    full_files: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Build an agent's view of the pipeline state.
+
+    Args:
+        state: Full pipeline state
+        slices: Keys the agent reads (None = all keys)
+        file_contents: Pass files in full instead of as digests
+        full_files: Paths passed in full even when the rest are digests
+
+    Returns:
+        New dict; the pipeline state itself is never modified
+    """
+    if slices is None:
+        view = dict(state)
+    else:
+        view = {key: state[key] for key in (*ALWAYS_INCLUDED, *slices) if key in state}
+
+    files = view.get("files")
+    if files and isinstance(files, dict) and not file_contents:
+        view["files"] = {
+            path: content if path in full_files else file_digest(path, content or "")
+            for path, content in files.items()
+        }
+        view["file_manifest"] = file_manifest(files)
+
+    return view
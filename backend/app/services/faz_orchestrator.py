@@ -18,17 +18,30 @@ Pipeline Flow:
     │         ↓                           │
     │      memory → DONE                  │
     └─────────────────────────────────────┘
+
+Parallel stages (PARALLEL_STAGES, AUTO mode only): review runs alongside
+memory capture, which is cancelled if review sends the build back; QA over
+a large file set is split into concurrent reviews of independent file
+shards. Each branch works on its own copy of the state and is merged back
+at the join. INTERACTIVE mode keeps side branches serial so every agent
+still reaches its own approval gate.
 """
 
 import asyncio
+import difflib
+import hashlib
 import logging
 import json
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
 from enum import Enum
 from weakref import WeakValueDictionary
 
+from app.config import settings
 from app.database import db
+from app.services.file_blob_store import file_blob_store
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +105,37 @@ INTERACTIVE_GATES = {
 }
 
 
+@dataclass(frozen=True)
+class ParallelStage:
+    """
+    Agents run concurrently when the pipeline reaches `trigger`.
+    
+    Routing after the join (next agent, success, interactive gate) follows
+    the primary branch, which is always the trigger agent. With
+    `speculative`, side branches only count when the trigger ends the
+    pipeline (no next agent); otherwise they're cancelled.
+    """
+    trigger: str
+    side_branches: Tuple[str, ...]
+    speculative: bool = False
+
+
+# Side branches only read state the trigger agent doesn't produce
+# (planning consumes research_results, so it stays after research)
+PARALLEL_STAGES = {
+    "review": ParallelStage("review", ("memory",), speculative=True),
+}
+
+# State the orchestrator owns; branch copies never write these back
+ORCHESTRATOR_KEYS = frozenset({
+    "project_id", "user_id", "status", "pipeline_status", "pipeline_mode",
+    "current_phase", "awaiting_approval_for", "last_gate_reached_at", "gate_artifacts",
+    "current_agent", "agent_history", "iteration_count", "max_iterations",
+    "qa_iteration_count", "max_qa_iterations", "user_iteration_count", "is_user_testing",
+    "files", "error", "error_history", "total_tokens", "total_cost_cents",
+})
+
+
 class ProjectState(TypedDict, total=False):
     """State passed between agents."""
     # Identity
@@ -147,6 +191,114 @@ class ProjectState(TypedDict, total=False):
     total_cost_cents: float
 
 
+# Modified files are broadcast as a patch when it is under this share of the content
+FILE_PATCH_MAX_RATIO = 0.5
+
+
+def _file_patch(path: str, previous: str, content: str) -> str:
+    """
+    Unified diff between two versions, split on "\n" only (as the frontend
+    does) with "\\ No newline at end of file" markers like git.
+    """
+    def split(text: str) -> List[str]:
+        lines = [line + "\n" for line in text.split("\n")]
+        lines[-1] = lines[-1][:-1]
+        return lines if lines[-1] else lines[:-1]
+    
+    return "".join(
+        line if line.endswith("\n") else line + "\n\\ No newline at end of file\n"
+        for line in difflib.unified_diff(split(previous), split(content), fromfile=path, tofile=path)
+    )
+
+
+def _file_meta(path: str, content: str) -> Dict[str, Any]:
+    """faz_files columns derived from a path and its content."""
+    extension = path.split(".")[-1] if "." in path else ""
+    return {
+        "filename": path.split("/")[-1],
+        "extension": extension,
+        "file_type": "component" if "components/" in path else "page" if "page.tsx" in path else "config",
+        "language": "typescript" if extension in ["ts", "tsx"] else "javascript" if extension in ["js", "jsx"] else extension,
+        "line_count": content.count("\n") + 1,
+    }
+
+
+def _files_signature(files: Dict[str, str]) -> int:
+    return hash(frozenset(files.items()))
+
+
+def _shard_files(files: Dict[str, str]) -> List[Dict[str, str]]:
+    """Split files into up to FAZ_QA_MAX_SHARDS groups of similar source size."""
+    total = sum(len(content) for content in files.values())
+    shard_count = min(settings.FAZ_QA_MAX_SHARDS, len(files), -(-total // max(1, settings.FAZ_QA_SHARD_CHARS)))
+    if shard_count <= 1:
+        return [files]
+    
+    # Largest file first onto the lightest shard
+    shards: List[Dict[str, str]] = [{} for _ in range(shard_count)]
+    sizes = [0] * shard_count
+    for path, content in sorted(files.items(), key=lambda item: (-len(item[1]), item[0])):
+        lightest = sizes.index(min(sizes))
+        shards[lightest][path] = content
+        sizes[lightest] += len(content)
+    return [shard for shard in shards if shard]
+
+
+def _merge_qa_shards(results: List[Any]):
+    """
+    Join QA reviews of file shards: any failing shard sends the build back
+    to coding, issues are concatenated and scores take the lowest shard.
+    """
+    merged = results[0]
+    reviews = [r.data.get("qa_review") or r.data for r in results if r.success]
+    
+    for result in results[1:]:
+        merged.input_tokens += result.input_tokens
+        merged.output_tokens += result.output_tokens
+        merged.cost_cents += result.cost_cents
+    
+    failed = [r for r in results if not r.success]
+    if failed:
+        merged.success = False
+        merged.error = "; ".join(r.error or r.message for r in failed)
+        return merged
+    
+    passed = all(review.get("passed", True) for review in reviews)
+    score = min(review.get("score", 75) for review in reviews)
+    issues = [issue for review in reviews for issue in review.get("issues", [])]
+    scores: Dict[str, Any] = {}
+    for review in reviews:
+        for category, value in (review.get("scores") or {}).items():
+            if isinstance(value, (int, float)) and (category not in scores or value < scores[category]):
+                scores[category] = value
+    
+    needs_fixes = any(r.next_agent == "coding" for r in results)
+    verdict = "NEEDS_FIXES" if needs_fixes else "PASS"
+    qa_review = {
+        "passed": passed,
+        "score": score,
+        "issues": issues,
+        "scores": scores,
+        "verdict": verdict,
+        "summary": "\n\n".join(review.get("summary", "") for review in reviews if review.get("summary")),
+        "shards": len(results),
+    }
+    merged.data = {
+        "qa_review": qa_review,
+        "passed": passed,
+        "score": score,
+        "issues": issues,
+        "scores": scores,
+        "verdict": verdict,
+    }
+    merged.next_agent = "coding" if needs_fixes else "review"
+    if needs_fixes:
+        merged.message = f"QA found {len(issues)} issues across {len(results)} file groups (score: {score}/100). Needs fixes."
+    else:
+        merged.message = f"QA passed with score {score}/100 across {len(results)} file groups. Ready for review."
+    return merged
+
+
 # =============================================================================
 # ORCHESTRATOR
 # =============================================================================
@@ -180,6 +332,10 @@ class FazOrchestrator:
         # Cancellation support
         self._cancelled = False
         self._current_task: Optional[asyncio.Task] = None
+        self._branch_tasks: List[asyncio.Task] = []
+        
+        # Learnings captured alongside review: (files signature, memory data)
+        self._pending_learnings: Optional[Tuple[int, Dict[str, Any]]] = None
         
         # For interactive mode - store state at gate for resumption
         self._gate_state: Optional[ProjectState] = None
@@ -241,6 +397,9 @@ class FazOrchestrator:
         # If we have a current task, try to cancel it
         if self._current_task and not self._current_task.done():
             self._current_task.cancel()
+        for task in self._branch_tasks:
+            if not task.done():
+                task.cancel()
     
     def is_cancelled(self) -> bool:
         """Check if pipeline has been cancelled."""
@@ -409,14 +568,16 @@ class FazOrchestrator:
             )
             
             try:
-                # Run agent
-                agent = self._get_agent(current_agent)
-                result = await agent.run(self.state)
+                # Run agent (with any parallel branches joined into one result)
+                result = await self._run_stage(current_agent)
                 
                 # Update state with result
                 self.state["total_tokens"] += result.input_tokens + result.output_tokens
                 self.state["total_cost_cents"] += result.cost_cents
                 
+                if self._cancelled:
+                    continue
+                
                 if result.files:
                     self.state["files"].update(result.files)
                     
@@ -570,12 +731,191 @@ class FazOrchestrator:
         
         return self.state
     
+    # =========================================================================
+    # PARALLEL STAGES
+    # =========================================================================
+    
+    async def _run_stage(self, agent_id: str):
+        """Run an agent, fanning out to its parallel branches when declared."""
+        branches = self._plan_branches(agent_id)
+        if len(branches) == 1:
+            return await self._get_agent(agent_id).run(self.state)
+        return await self._run_parallel(agent_id, branches)
+    
+    def _plan_branches(self, agent_id: str) -> List[Tuple[str, str, ProjectState]]:
+        """(label, agent_id, state copy) per branch; the primary branch is first."""
+        if not settings.FAZ_PARALLEL_STAGES:
+            return [(agent_id, agent_id, self.state)]
+        
+        if agent_id == "qa":
+            shards = _shard_files(self.state.get("files", {}))
+            if len(shards) > 1:
+                return [
+                    (f"qa[{i + 1}/{len(shards)}]", "qa", self._branch_state(files=shard))
+                    for i, shard in enumerate(shards)
+                ]
+        
+        stage = PARALLEL_STAGES.get(agent_id)
+        if not stage or self.mode == PipelineMode.INTERACTIVE:
+            # Side branches would run ahead of the trigger's approval gate
+            return [(agent_id, agent_id, self.state)]
+        
+        branches = [(agent_id, agent_id, self._branch_state())]
+        for side in stage.side_branches:
+            if side == "memory" and not self.state.get("files"):
+                continue  # Nothing to learn from yet
+            branches.append((side, side, self._branch_state()))
+        return branches
+    
+    def _branch_state(self, files: Optional[Dict[str, str]] = None) -> ProjectState:
+        """Shallow copy of the state a branch can mutate without affecting others."""
+        branch = dict(self.state)
+        branch["files"] = dict(self.state.get("files", {}) if files is None else files)
+        return branch
+    
+    async def _run_parallel(self, agent_id: str, branches: List[Tuple[str, str, ProjectState]]):
+        """Run branches concurrently and join them into the primary's result."""
+        from app.services.faz_agents.base_agent import AgentResult
+        
+        labels = [label for label, _, _ in branches]
+        await self._log_activity(
+            "orchestrator", "parallel",
+            f"Running {', '.join(labels)} in parallel",
+            {"branches": labels},
+        )
+        
+        started = time.monotonic()
+        self._branch_tasks = [
+            asyncio.create_task(self._get_agent(branch_agent).run(branch_state))
+            for _, branch_agent, branch_state in branches
+        ]
+        discarded = False
+        try:
+            stage = PARALLEL_STAGES.get(agent_id)
+            if stage and stage.speculative:
+                primary = self._branch_tasks[0]
+                await asyncio.wait({primary})
+                if primary.cancelled() or primary.exception() or primary.result().next_agent:
+                    discarded = True
+                    for task in self._branch_tasks[1:]:
+                        task.cancel()
+            outcomes = await asyncio.gather(*self._branch_tasks, return_exceptions=True)
+        finally:
+            self._branch_tasks = []
+        wall_ms = int((time.monotonic() - started) * 1000)
+        
+        results = []
+        for (label, branch_agent, branch_state), outcome in zip(branches, outcomes):
+            if isinstance(outcome, BaseException):
+                error = "cancelled" if isinstance(outcome, asyncio.CancelledError) else str(outcome)
+                outcome = AgentResult(success=False, message=f"{label} failed", error=error)
+            results.append((label, branch_agent, branch_state, outcome))
+        
+        if agent_id == "qa":
+            merged = _merge_qa_shards([result for _, _, _, result in results])
+        else:
+            merged = self._merge_branches(results)
+        merged.duration_ms = wall_ms
+        
+        # Side branches: history, artifacts and pending learnings
+        for label, branch_agent, branch_state, result in results[1:]:
+            if branch_agent == agent_id:
+                continue
+            if discarded:
+                logger.info(f"[Orchestrator] {agent_id} didn't finish the pipeline; discarded {label}")
+                continue
+            self.state["agent_history"].append(branch_agent)
+            if not result.success:
+                await self._log_activity(
+                    branch_agent, "error",
+                    f"Parallel branch failed: {result.error}",
+                    content_type="error"
+                )
+                continue
+            if branch_agent == "memory":
+                self._pending_learnings = (_files_signature(branch_state["files"]), result.data)
+            else:
+                await self._store_agent_artifact(branch_agent, result)
+        
+        serial_ms = sum(result.duration_ms for _, _, _, result in results)
+        await self._log_activity(
+            "orchestrator", "join",
+            f"Joined {len(results)} parallel branches in {wall_ms / 1000:.1f}s",
+            {
+                "wall_ms": wall_ms,
+                "serial_ms": serial_ms,
+                "tokens": merged.input_tokens + merged.output_tokens,
+                "cost_cents": merged.cost_cents,
+                "branches": [
+                    {
+                        "branch": label,
+                        "success": result.success,
+                        "tokens": result.input_tokens + result.output_tokens,
+                        "cost_cents": result.cost_cents,
+                        "duration_ms": result.duration_ms,
+                    }
+                    for label, _, _, result in results
+                ],
+            },
+        )
+        return merged
+    
+    def _merge_branches(self, results):
+        """
+        Join heterogeneous branches into the primary branch's result.
+        
+        Conflict rules: the primary branch wins any data key, state key or
+        file path it also produced; otherwise side branches fill in keys in
+        declaration order. Memory output is kept out of the state (stored as
+        learnings at finalize). Tokens and cost are summed over all branches.
+        """
+        _, primary_agent, _, merged = results[0]
+        
+        written = set(merged.data)
+        merged.data = dict(merged.data)
+        files = dict(merged.files)
+        for label, branch_agent, branch_state, result in results[1:]:
+            merged.input_tokens += result.input_tokens
+            merged.output_tokens += result.output_tokens
+            merged.cost_cents += result.cost_cents
+            if not result.success or branch_agent == "memory":
+                continue
+            for key, value in result.data.items():
+                if key == "files":
+                    continue
+                if key in written:
+                    logger.info(f"[Orchestrator] {label} output '{key}' conflicts with {primary_agent}; keeping {primary_agent}'s")
+                    continue
+                merged.data[key] = value
+                written.add(key)
+            for path, content in result.files.items():
+                files.setdefault(path, content)
+        merged.files = files
+        
+        # State keys agents set directly on their copy (e.g. inspiration_analysis)
+        for _, branch_agent, branch_state, result in results:
+            if branch_agent == "memory":
+                continue
+            for key, value in branch_state.items():
+                if key in ORCHESTRATOR_KEYS or key in written:
+                    continue
+                if value is not self.state.get(key):
+                    merged.data[key] = value
+                    written.add(key)
+        
+        return merged
+    
     async def _finalize_pipeline(self) -> ProjectState:
         """Finalize the pipeline after all agents complete."""
         self.state["pipeline_status"] = PipelineStatus.COMPLETED
         
+        # Learnings captured alongside review still match the final files
+        pending, self._pending_learnings = self._pending_learnings, None
+        if pending and self.state.get("files") and pending[0] == _files_signature(self.state["files"]):
+            await self._store_learnings(pending[1])
+        
         # Run memory agent to extract learnings
-        if self.state.get("files"):
+        elif self.state.get("files"):
             try:
                 memory_agent = self._get_agent("memory")
                 memory_result = await memory_agent.run(self.state)
@@ -927,56 +1267,22 @@ class FazOrchestrator:
         await self._update_project_status(status)
     
     async def _persist_files(self):
-        """Save generated files to database and broadcast to WebSocket clients."""
+        """Save generated files to database and broadcast changes to WebSocket clients."""
         try:
             files = self.state.get("files", {})
+            agent = self.state.get("current_agent", "coding")
+            changed = await self._upsert_files(files, agent)
+            await self._broadcast_file_changes(changed, agent)
             
-            for path, content in files.items():
-                # Determine file type
-                extension = path.split(".")[-1] if "." in path else ""
-                file_type = "component" if "components/" in path else "page" if "page.tsx" in path else "config"
-                language = "typescript" if extension in ["ts", "tsx"] else "javascript" if extension in ["js", "jsx"] else extension
-                line_count = content.count("\n") + 1
-                
-                # Insert or update file in database
-                file_id = await db.fetchval(
-                    """
-                    INSERT INTO faz_files
-                        (project_id, path, filename, extension, content, file_type, 
-                         language, line_count, generated_by, status)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, 'generated')
-                    ON CONFLICT (project_id, path, version) 
-                    DO UPDATE SET content = $5, updated_at = NOW()
-                    RETURNING file_id
-                    """,
-                    self.project_id,
-                    path,
-                    path.split("/")[-1],
-                    extension,
-                    content,
-                    file_type,
-                    language,
-                    line_count,
-                    self.state.get("current_agent", "coding"),
-                )
-                
-                # Broadcast file event for real-time updates
-                if self._activity_callback:
-                    await self._activity_callback({
-                        "type": "file",
-                        "file_id": file_id,
-                        "path": path,
-                        "filename": path.split("/")[-1],
-                        "extension": extension,
-                        "content": content,
-                        "file_type": file_type,
-                        "language": language,
-                        "line_count": line_count,
-                        "agent": self.state.get("current_agent", "coding"),
-                        "timestamp": datetime.utcnow().isoformat(),
-                    })
+            logger.info(f"[Orchestrator] Persisted {len(files)} files ({len(changed)} changed)")
             
-            logger.info(f"[Orchestrator] Persisted and broadcast {len(files)} files")
+            if changed:
+                await file_blob_store.record(
+                    "faz", self.project_id,
+                    changes={change["path"]: change["content"] for change in changed},
+                    message=f"Pipeline files ({len(changed)} changed)",
+                    author=agent,
+                )
             
         except Exception as e:
             logger.error(f"[Orchestrator] Failed to persist files: {e}")
@@ -986,57 +1292,161 @@ class FazOrchestrator:
         Persist files immediately during coding phase for real-time updates.
         
         Called after each coding iteration to provide live file tree updates.
+        Files the iteration left unchanged are neither written nor broadcast.
         """
         try:
-            for path, content in files.items():
-                extension = path.split(".")[-1] if "." in path else ""
-                file_type = "component" if "components/" in path else "page" if "page.tsx" in path else "config"
-                language = "typescript" if extension in ["ts", "tsx"] else "javascript" if extension in ["js", "jsx"] else extension
-                line_count = content.count("\n") + 1
-                
-                # Upsert file
-                file_id = await db.fetchval(
-                    """
-                    INSERT INTO faz_files
-                        (project_id, path, filename, extension, content, file_type, 
-                         language, line_count, generated_by, status)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, 'generated')
-                    ON CONFLICT (project_id, path, version) 
-                    DO UPDATE SET content = EXCLUDED.content, updated_at = NOW()
-                    RETURNING file_id
-                    """,
-                    self.project_id,
-                    path,
-                    path.split("/")[-1],
-                    extension,
-                    content,
-                    file_type,
-                    language,
-                    line_count,
-                    "coding",
+            changed = await self._upsert_files(files, "coding")
+            await self._broadcast_file_changes(changed, "coding")
+            
+            logger.debug(f"[Orchestrator] Incremental persist: {len(changed)}/{len(files)} files changed")
+            
+            if changed:
+                await file_blob_store.record(
+                    "faz", self.project_id,
+                    changes={change["path"]: change["content"] for change in changed},
+                    message=f"Coding iteration ({len(changed)} files)",
+                    author="coding",
                 )
                 
-                # Broadcast file event
-                if self._activity_callback:
-                    await self._activity_callback({
-                        "type": "file",
-                        "file_id": file_id,
-                        "path": path,
-                        "filename": path.split("/")[-1],
-                        "extension": extension,
-                        "content": content,
-                        "file_type": file_type,
-                        "language": language,
-                        "line_count": line_count,
-                        "agent": "coding",
-                        "timestamp": datetime.utcnow().isoformat(),
-                    })
-                    
-                logger.debug(f"[Orchestrator] Incremental persist: {path}")
-                
         except Exception as e:
             logger.error(f"[Orchestrator] Incremental file persist failed: {e}")
     
+    async def _upsert_files(self, files: Dict[str, str], agent: str) -> List[Dict[str, Any]]:
+        """
+        Write new and changed files in one set-based statement.
+        
+        Files are compared by md5 against faz_files.content_hash (migration
+        044), so unchanged files cost only the hash comparison. An existing
+        path updates its latest version row in place - user edits bump
+        version, so (project_id, path, version) can't serve as the conflict
+        target - and new paths are inserted.
+        
+        Returns:
+            One dict per changed file: file_id, path, content, previous
+            (None for new files) and content_hash
+        """
+        if not files:
+            return []
+        
+        paths = list(files)
+        hashes = {path: hashlib.md5(files[path].encode()).hexdigest() for path in paths}
+        
+        # Same expression as the generated column (migration 044)
+        changed_rows = await db.fetch(
+            """
+            SELECT n.path, f.file_id, f.content AS previous
+            FROM unnest($2::text[], $3::text[]) AS n(path, content_hash)
+            LEFT JOIN LATERAL (
+                SELECT file_id, content, content_hash
+                FROM faz_files
+                WHERE project_id = $1 AND path = n.path
+                ORDER BY version DESC
+                LIMIT 1
+            ) f ON TRUE
+            WHERE f.content_hash IS DISTINCT FROM n.content_hash
+            """,
+            self.project_id,
+            paths,
+            [hashes[path] for path in paths],
+        )
+        if not changed_rows:
+            return []
+        
+        changed = [
+            {"path": r["path"], "file_id": r["file_id"], "previous": r["previous"], "content": files[r["path"]]}
+            for r in changed_rows
+        ]
+        meta = [_file_meta(change["path"], change["content"]) for change in changed]
+        
+        written = await db.fetch(
+            """
+            WITH incoming AS (
+                SELECT *
+                FROM unnest(
+                    $2::bigint[], $3::text[], $4::text[], $5::text[],
+                    $6::text[], $7::text[], $8::text[], $9::int[]
+                ) AS t(file_id, path, filename, extension, content, file_type, language, line_count)
+            ),
+            updated AS (
+                UPDATE faz_files f
+                SET content = i.content, line_count = i.line_count, updated_at = NOW()
+                FROM incoming i
+                WHERE f.file_id = i.file_id AND f.project_id = $1
+                RETURNING f.file_id, f.path
+            ),
+            inserted AS (
+                INSERT INTO faz_files
+                    (project_id, path, filename, extension, content, file_type,
+                     language, line_count, generated_by, status)
+                SELECT $1, path, filename, extension, content, file_type,
+                       language, line_count, $10, 'generated'
+                FROM incoming
+                WHERE file_id IS NULL
+                ON CONFLICT (project_id, path, version)
+                DO UPDATE SET content = EXCLUDED.content, updated_at = NOW()
+                RETURNING file_id, path
+            )
+            SELECT file_id, path FROM updated
+            UNION ALL
+            SELECT file_id, path FROM inserted
+            """,
+            self.project_id,
+            [change["file_id"] for change in changed],
+            [change["path"] for change in changed],
+            [m["filename"] for m in meta],
+            [m["extension"] for m in meta],
+            [change["content"] for change in changed],
+            [m["file_type"] for m in meta],
+            [m["language"] for m in meta],
+            [m["line_count"] for m in meta],
+            agent,
+        )
+        
+        file_ids = {r["path"]: r["file_id"] for r in written}
+        for change, m in zip(changed, meta):
+            change.update(m)
+            change["file_id"] = file_ids.get(change["path"], change["file_id"])
+            change["content_hash"] = hashes[change["path"]]
+        return changed
+    
+    async def _broadcast_file_changes(self, changed: List[Dict[str, Any]], agent: str):
+        """
+        Broadcast changed files: new files with content, modified ones as a
+        unified diff ("patch") against "base_hash" (sha256 of the previous
+        content) when that is smaller. Clients that don't hold the base
+        fetch full content with {"type": "get_file"}.
+        """
+        if not self._activity_callback:
+            return
+        
+        for change in changed:
+            event = {
+                "type": "file",
+                "file_id": change["file_id"],
+                "path": change["path"],
+                "filename": change["filename"],
+                "extension": change["extension"],
+                "file_type": change["file_type"],
+                "language": change["language"],
+                "line_count": change["line_count"],
+                "content_hash": change["content_hash"],
+                "agent": agent,
+                "timestamp": datetime.utcnow().isoformat(),
+            }
+            
+            previous = change["previous"]
+            if previous is None:
+                event.update(change="created", content=change["content"])
+            else:
+                patch = _file_patch(change["path"], previous, change["content"])
+                event["change"] = "modified"
+                if len(patch) < len(change["content"]) * FILE_PATCH_MAX_RATIO:
+                    event.update(patch=patch, base_hash=hashlib.sha256(previous.encode()).hexdigest())
+                else:
+                    event["content"] = change["content"]
+            
+            await self._activity_callback(event)
+    
     async def _store_learnings(self, learnings_data: Dict[str, Any]):
         """Store extracted learnings to database."""
         try:
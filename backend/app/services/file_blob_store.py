@@ -0,0 +1,430 @@
+"""
+Nicole V7 - Content-addressed file blob store
+
+Shared version history for generated project files (Vibe, Faz, Enjineer):
+
+- Blobs: file contents keyed by sha256, stored once however many versions
+  or projects reference them. zstd-compressed (zlib if zstandard isn't
+  installed), kept in Postgres (file_blobs.data) or on local disk.
+- Manifests: one row per project version mapping path -> blob hash
+  (file_manifests). A commit uploads only blobs that don't exist yet and
+  writes one small manifest row; identical trees don't create a version.
+
+Snapshot, diff and rollback only read and write manifests - O(files in the
+tree), independent of file sizes. Rollback returns the contents that
+differ so the caller can restore its working table (vibe_files,
+faz_files, enjineer_files remain the live copy every reader uses).
+
+Pass `conn` to commit() / record() / rollback() to write the manifest in
+the caller's transaction (as a savepoint), so a version only exists if the
+working-table write it describes commits too. Blobs are always written
+first on their own connection; an orphaned blob is harmless.
+
+Migration: 043_file_blob_store.sql
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+ZSTD_AVAILABLE = False
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    logger.warning("[BLOBS] zstandard not installed, compressing blobs with zlib")
+
+NAMESPACES = ("vibe", "faz", "enjineer")
+
+
+class BlobNotFoundError(LookupError):
+    """A manifest references a blob whose content can't be read."""
+
+# Compress off the event loop above this many bytes per batch
+_THREAD_COMPRESS_BYTES = 256 * 1024
+
+
+def content_hash(content: str) -> str:
+    """Blob key: sha256 of the UTF-8 content."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+# ============================================================================
+# CODECS
+# ============================================================================
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=settings.BLOB_STORE_ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd blob found but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+# ============================================================================
+# STORE
+# ============================================================================
+
+class FileBlobStore:
+    """Content-addressed blobs plus per-project version manifests."""
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    async def put_many(self, contents: Iterable[str]) -> List[str]:
+        """Store contents that aren't stored yet; returns their hashes in order."""
+        encoded: Dict[str, bytes] = {}
+        hashes: List[str] = []
+        for content in contents:
+            key = content_hash(content)
+            hashes.append(key)
+            if key not in encoded:
+                encoded[key] = content.encode()
+        if not encoded:
+            return hashes
+
+        existing = await db.fetch(
+            "SELECT hash FROM file_blobs WHERE hash = ANY($1::text[])",
+            list(encoded),
+        )
+        for row in existing:
+            encoded.pop(row["hash"], None)
+        if not encoded:
+            return hashes
+
+        def compress_all() -> List[Tuple[str, int, str, bytes]]:
+            return [(key, len(raw), *_compress(raw)) for key, raw in encoded.items()]
+
+        if sum(len(raw) for raw in encoded.values()) > _THREAD_COMPRESS_BYTES:
+            blobs = await asyncio.to_thread(compress_all)
+        else:
+            blobs = compress_all()
+
+        on_disk = settings.BLOB_STORE_BACKEND == "disk"
+        if on_disk:
+            await asyncio.to_thread(self._write_disk, [(key, data) for key, _, _, data in blobs])
+
+        await db.execute(
+            """
+            INSERT INTO file_blobs (hash, size, stored_size, codec, data)
+            SELECT h, s, ss, c, d
+            FROM unnest($1::text[], $2::bigint[], $3::bigint[], $4::text[], $5::bytea[]) AS b(h, s, ss, c, d)
+            ON CONFLICT (hash) DO NOTHING
+            """,
+            [key for key, _, _, _ in blobs],
+            [size for _, size, _, _ in blobs],
+            [len(data) for _, _, _, data in blobs],
+            [codec for _, _, codec, _ in blobs],
+            [None if on_disk else data for _, _, _, data in blobs],
+        )
+        logger.debug(f"[BLOBS] Stored {len(blobs)} new blobs")
+        return hashes
+
+    async def get_many(self, hashes: Iterable[str]) -> Dict[str, str]:
+        """Contents for the given hashes (missing hashes are omitted)."""
+        keys = list(set(hashes))
+        if not keys:
+            return {}
+        rows = await db.fetch(
+            "SELECT hash, codec, data FROM file_blobs WHERE hash = ANY($1::text[])",
+            keys,
+        )
+        from_disk = [row["hash"] for row in rows if row["data"] is None]
+        disk_data = await asyncio.to_thread(self._read_disk, from_disk) if from_disk else {}
+
+        contents: Dict[str, str] = {}
+        for row in rows:
+            data = row["data"] if row["data"] is not None else disk_data.get(row["hash"])
+            if data is None:
+                logger.error(f"[BLOBS] Blob {row['hash']} has no data")
+                continue
+            contents[row["hash"]] = _decompress(row["codec"], bytes(data)).decode()
+        return contents
+
+    @staticmethod
+    def _disk_path(key: str) -> str:
+        return os.path.join(settings.BLOB_STORE_PATH, key[:2], key[2:4], key)
+
+    def _write_disk(self, blobs: List[Tuple[str, bytes]]) -> None:
+        for key, data in blobs:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, bytes]:
+        data: Dict[str, bytes] = {}
+        for key in keys:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    data[key] = f.read()
+            except OSError as e:
+                logger.error(f"[BLOBS] Failed to read blob {key}: {e}")
+        return data
+
+    # ------------------------------------------------------------------
+    # Manifests
+    # ------------------------------------------------------------------
+
+    async def commit(
+        self,
+        namespace: str,
+        project_id: int,
+        changes: Optional[Dict[str, str]] = None,
+        deleted: Iterable[str] = (),
+        message: Optional[str] = None,
+        author: Optional[str] = None,
+        replace: bool = False,
+        conn=None,
+    ) -> int:
+        """
+        Record a new project version.
+
+        Args:
+            namespace: "vibe", "faz" or "enjineer"
+            project_id: Project within the namespace
+            changes: path -> content for added / modified files
+            deleted: Paths removed in this version
+            message: Commit message
+            author: Agent or "user"
+            replace: True = `changes` is the whole tree (snapshot)
+            conn: Write the manifest in this connection's transaction
+
+        Returns:
+            The new version, or the current one if nothing changed
+        """
+        if namespace not in NAMESPACES:
+            raise ValueError(f"Unknown blob namespace: {namespace}")
+        changes = changes or {}
+        paths = list(changes)
+        hashes = await self.put_many(changes[path] for path in paths)
+        updates = dict(zip(paths, hashes))
+
+        if conn is not None:
+            # Savepoint: a failure here doesn't abort the caller's transaction
+            async with conn.transaction():
+                return await self._write_manifest(
+                    conn, namespace, project_id, updates, deleted, message, author, replace
+                )
+        async with db.transaction() as conn:
+            return await self._write_manifest(
+                conn, namespace, project_id, updates, deleted, message, author, replace
+            )
+
+    async def _write_manifest(
+        self,
+        conn,
+        namespace: str,
+        project_id: int,
+        updates: Dict[str, str],
+        deleted: Iterable[str],
+        message: Optional[str],
+        author: Optional[str],
+        replace: bool,
+    ) -> int:
+        # Serialize commits per project so versions stay dense
+        await conn.execute(
+            "SELECT pg_advisory_xact_lock(hashtext($1))",
+            f"file_manifest:{namespace}:{project_id}",
+        )
+        head = await conn.fetchrow(
+            """
+            SELECT version, files FROM file_manifests
+            WHERE namespace = $1 AND project_id = $2
+            ORDER BY version DESC LIMIT 1
+            """,
+            namespace, project_id,
+        )
+        current: Dict[str, str] = dict(head["files"]) if head else {}
+        files = dict(updates) if replace else {**current, **updates}
+        for path in deleted:
+            files.pop(path, None)
+
+        if head and files == current:
+            return head["version"]
+
+        version = (head["version"] if head else 0) + 1
+        await conn.execute(
+            """
+            INSERT INTO file_manifests (
+                namespace, project_id, version, parent_version,
+                files, file_count, message, author
+            ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            """,
+            namespace, project_id, version,
+            head["version"] if head else None,
+            files, len(files), message, author,
+        )
+
+        logger.info(
+            f"[BLOBS] {namespace}:{project_id} v{version} "
+            f"({len(updates)} changed, {len(files)} files)"
+        )
+        return version
+
+    async def snapshot(
+        self,
+        namespace: str,
+        project_id: int,
+        files: Dict[str, str],
+        message: Optional[str] = None,
+        author: Optional[str] = None,
+    ) -> int:
+        """Record the whole file tree as a version."""
+        return await self.commit(namespace, project_id, files, message=message, author=author, replace=True)
+
+    async def record(self, namespace: str, project_id: int, **kwargs: Any) -> Optional[int]:
+        """commit() for write paths where history must never fail the write."""
+        if not settings.BLOB_STORE_ENABLED:
+            return None
+        try:
+            return await self.commit(namespace, project_id, **kwargs)
+        except Exception as e:
+            logger.warning(f"[BLOBS] Failed to record {namespace}:{project_id} version: {e}")
+            return None
+
+    async def get_manifest(
+        self,
+        namespace: str,
+        project_id: int,
+        version: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """A version's manifest (latest if version is None)."""
+        row = await db.fetchrow(
+            """
+            SELECT version, parent_version, files, file_count, message, author, created_at
+            FROM file_manifests
+            WHERE namespace = $1 AND project_id = $2 AND ($3::int IS NULL OR version = $3)
+            ORDER BY version DESC LIMIT 1
+            """,
+            namespace, project_id, version,
+        )
+        return dict(row) if row else None
+
+    async def list_versions(self, namespace: str, project_id: int, limit: int = 50) -> List[Dict[str, Any]]:
+        """Version history, newest first (without the file maps)."""
+        rows = await db.fetch(
+            """
+            SELECT version, parent_version, file_count, message, author, created_at
+            FROM file_manifests
+            WHERE namespace = $1 AND project_id = $2
+            ORDER BY version DESC LIMIT $3
+            """,
+            namespace, project_id, limit,
+        )
+        return [dict(row) for row in rows]
+
+    async def diff(
+        self,
+        namespace: str,
+        project_id: int,
+        from_version: int,
+        to_version: Optional[int] = None,
+    ) -> Optional[Dict[str, List[str]]]:
+        """Paths added / removed / modified between two versions (to = latest)."""
+        old = await self.get_manifest(namespace, project_id, from_version)
+        new = await self.get_manifest(namespace, project_id, to_version)
+        if not old or not new:
+            return None
+        return {"from_version": old["version"], "to_version": new["version"], **self._diff_files(old["files"], new["files"])}
+
+    @staticmethod
+    def _diff_files(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+        return {
+            "added": sorted(path for path in new if path not in old),
+            "removed": sorted(path for path in old if path not in new),
+            "modified": sorted(path for path in new if path in old and old[path] != new[path]),
+        }
+
+    async def read_files(
+        self,
+        namespace: str,
+        project_id: int,
+        version: Optional[int] = None,
+        paths: Optional[Iterable[str]] = None,
+    ) -> Optional[Dict[str, str]]:
+        """path -> content for a version (optionally only some paths)."""
+        manifest = await self.get_manifest(namespace, project_id, version)
+        if not manifest:
+            return None
+        files: Dict[str, str] = manifest["files"]
+        if paths is not None:
+            files = {path: files[path] for path in paths if path in files}
+        contents = await self.get_many(files.values())
+        return {path: contents[key] for path, key in files.items() if key in contents}
+
+    async def rollback(
+        self,
+        namespace: str,
+        project_id: int,
+        version: int,
+        author: Optional[str] = None,
+        conn=None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Make `version` the latest version again (as a new version).
+
+        Returns the new version, the contents of paths that differ from the
+        current tree ("restored") and the paths to delete ("removed"); only
+        those blobs are read. Pass the transaction that restores the working
+        table as `conn` so the new version commits with it.
+
+        Raises:
+            BlobNotFoundError: A file in `version` has no readable blob
+        """
+        target = await self.get_manifest(namespace, project_id, version)
+        head = await self.get_manifest(namespace, project_id)
+        if not target or not head:
+            return None
+        changes = self._diff_files(head["files"], target["files"])
+        restore_paths = changes["added"] + changes["modified"]
+        contents = await self.get_many(target["files"][path] for path in restore_paths)
+        missing = sorted(path for path in restore_paths if target["files"][path] not in contents)
+        if missing:
+            raise BlobNotFoundError(
+                f"Version {version} can't be restored: content missing for {', '.join(missing[:5])}"
+                + (f" and {len(missing) - 5} more" if len(missing) > 5 else "")
+            )
+        restored = {path: contents[target["files"][path]] for path in restore_paths}
+
+        new_version = await self.commit(
+            namespace,
+            project_id,
+            restored,
+            deleted=changes["removed"],
+            message=f"Rollback to v{version}",
+            author=author,
+            conn=conn,
+        )
+        return {
+            "version": new_version,
+            "rolled_back_to": version,
+            "restored": restored,
+            "removed": changes["removed"],
+        }
+
+
+# Global blob store instance
+file_blob_store = FileBlobStore()
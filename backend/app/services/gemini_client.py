@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional, Union
 import httpx
 
 from app.config import settings
+from app.integrations.llm_governor import GovernedTransport
 
 logger = logging.getLogger(__name__)
 
@@ -106,7 +107,7 @@ class GeminiClient:
     
     def __init__(self):
         self.api_key = getattr(settings, 'GEMINI_API_KEY', None)
-        self.client = httpx.AsyncClient(timeout=120.0)
+        self.client = httpx.AsyncClient(transport=GovernedTransport(), timeout=120.0)
         
         if not self.api_key:
             logger.warning("[GEMINI] No API key configured - Muse features disabled")
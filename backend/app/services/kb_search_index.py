@@ -0,0 +1,191 @@
+"""
+Nicole V7 - In-process BM25 index over knowledge base sections
+
+Optional (KB_BM25_ENABLED) replacement for Postgres ranking in
+KnowledgeBaseService.search_sections, which EnjineerNicole hits on every
+message. The knowledge base is small and changes rarely, so every active
+section is held in memory with its postings:
+
+- load() at startup reads all active sections in one query
+- the index is tied to kb_version, a cheap signature of the KB (file
+  count, summed file versions, latest update). Writes through
+  KnowledgeBaseService invalidate it directly; writes from other workers
+  are noticed by re-reading it at most every KB_VERSION_CHECK_SECONDS.
+  The context-pack cache in knowledge_base_service.py keys on it too
+- search() scores BM25 over file title, heading and body, counted as 3, 2
+  and 1 occurrences per term, and returns rows shaped like the Postgres
+  search_sections results
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+
+RE_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from has have how i if in into is it its "
+    "not of on or so than that the their then there these this to use was what when "
+    "where which while will with you your".split()
+)
+
+# Section field -> occurrences counted per token
+FIELD_WEIGHTS = (("file_title", 3), ("heading", 2), ("content", 1))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; plural 's' stripped."""
+    tokens = []
+    for token in RE_TOKEN.findall(text.lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class KBVersion:
+    """Signature of the knowledge base's current contents, read lazily."""
+
+    def __init__(self):
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._checked_at = 0.0
+
+    def invalidate(self) -> None:
+        """Re-read on next get() (called after KB writes)."""
+        self._checked_at = 0.0
+
+    async def get(self) -> Tuple[Any, ...]:
+        if self._signature is None or time.monotonic() - self._checked_at >= settings.KB_VERSION_CHECK_SECONDS:
+            # Soft deletes and edits both bump updated_at (trigger from migration 028)
+            row = await db.fetchrow(
+                """
+                SELECT COUNT(*), COALESCE(SUM(version), 0), MAX(updated_at)
+                FROM knowledge_base_files
+                """
+            )
+            self._signature = tuple(row)
+            self._checked_at = time.monotonic()
+        return self._signature
+
+
+class SectionBM25Index:
+    """BM25 postings for every active knowledge base section."""
+
+    def __init__(self):
+        self._sections: List[Dict[str, Any]] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        self._avg_length = 1.0
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._version is not None
+
+    async def load(self) -> int:
+        """(Re)build the index from the database; returns the section count."""
+        async with self._lock:
+            return await self._build(await kb_version.get())
+
+    async def ensure_current(self) -> bool:
+        """Reload if the KB changed; False if the index can't be used."""
+        try:
+            version = await kb_version.get()
+            if version != self._version:
+                async with self._lock:
+                    if version != self._version:
+                        await self._build(version)
+            return True
+        except Exception as e:
+            logger.warning(f"[KB] BM25 index unavailable, using Postgres search: {e}")
+            return False
+
+    async def _build(self, version: Tuple[Any, ...]) -> int:
+        rows = await db.fetch(
+            """
+            SELECT s.id, s.file_id, s.heading, s.level, s.content, s.word_count,
+                   s.token_count, f.slug AS file_slug, f.title AS file_title, f.category
+            FROM knowledge_base_sections s
+            JOIN knowledge_base_files f ON s.file_id = f.id
+            WHERE f.is_active = true
+            ORDER BY s.file_id, s.section_order
+            """
+        )
+
+        sections = [dict(r) for r in rows]
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = []
+        for doc, section in enumerate(sections):
+            counts: Dict[str, int] = {}
+            for field, weight in FIELD_WEIGHTS:
+                for token in tokenize(section.get(field) or ""):
+                    counts[token] = counts.get(token, 0) + weight
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((doc, tf))
+            lengths.append(sum(counts.values()))
+
+        self._sections = sections
+        self._postings = postings
+        self._lengths = lengths
+        self._avg_length = (sum(lengths) / len(lengths)) if lengths else 1.0
+        self._version = version
+
+        logger.info(f"[KB] BM25 index loaded: {len(sections)} sections, {len(postings)} terms")
+        return len(sections)
+
+    def search(
+        self,
+        query: str,
+        file_id: Optional[int] = None,
+        category: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Top sections by BM25 score (any query term may match)."""
+        k1 = settings.KB_BM25_K1
+        b = settings.KB_BM25_B
+        total = len(self._sections)
+
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                norm = k1 * (1 - b + b * self._lengths[doc] / self._avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        if file_id is not None or category:
+            scores = {
+                doc: score for doc, score in scores.items()
+                if (file_id is None or self._sections[doc]["file_id"] == file_id)
+                and (not category or self._sections[doc]["category"] == category)
+            }
+
+        top = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [{**self._sections[doc], "relevance": round(scores[doc], 4)} for doc in top]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "sections": len(self._sections),
+            "terms": len(self._postings),
+        }
+
+
+# Global instances
+kb_version = KBVersion()
+kb_section_index = SectionBM25Index()
@@ -5,9 +5,13 @@ Production-grade service for managing design knowledge that Nicole
 references when building $2-5K client websites.
 
 Features:
-- Full-text search with PostgreSQL GIN indexes
+- Full-text search over stored, weighted tsvectors (title > heading > body)
+  with GIN indexes (migration 045)
+- Optional in-process BM25 section ranking (kb_search_index.py)
 - Section-level granular retrieval
-- Usage tracking for popularity ranking
+- Token-budgeted context packs from per-section token counts stored at
+  ingest, cached in process per query and KB version
+- Usage tracking for popularity ranking (access log written in batches)
 - Search result caching
 - Prepared for Qdrant vector integration
 
@@ -17,14 +21,61 @@ Architecture: asyncpg-native (matches TigerDatabaseManager pattern)
 import hashlib
 import re
 import logging
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta, timezone
 
+from app.config import settings
 from app.database import db
+from app.services.kb_search_index import kb_section_index, kb_version
+from app.services.text_chunking import count_tokens, token_offsets
+from app.services.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
 
+CONTEXT_HEADER = "\n## 📚 Relevant Design Knowledge\n\n"
+
+# A section cut to fit the remaining budget must keep at least this many tokens
+MIN_TRUNCATED_SECTION_TOKENS = 128
+
+_INSERT_ACCESS_LOG_SQL = """
+    INSERT INTO knowledge_base_usage_log
+    (file_id, section_id, user_id, query_text, access_method, session_id, accessed_at)
+    SELECT * FROM unnest(
+        $1::bigint[], $2::bigint[], $3::bigint[], $4::text[],
+        $5::text[], $6::text[], $7::timestamptz[]
+    )
+"""
+
+# (file_id, section_id, user_id, query_text, access_method, session_id, accessed_at)
+AccessRow = Tuple[Optional[int], Optional[int], Optional[int], Optional[str], str, Optional[str], datetime]
+
+
+class KBAccessLogWriter(WriteBehindQueue[AccessRow]):
+    """
+    Write-behind queue for knowledge_base_usage_log.
+    
+    add() never touches the database: a background task inserts pending
+    rows in one statement every `flush_interval` seconds, or as soon as
+    `batch_size` are queued. Access analytics are best-effort, so a batch
+    that can't be written is logged and dropped, and the queue keeps only
+    the newest rows. Call shutdown() to drain.
+    """
+    
+    log_prefix = "[KB]"
+    item_name = "access log rows"
+    
+    def __init__(self, batch_size: int, flush_interval: float):
+        super().__init__(batch_size, flush_interval, max_queue=batch_size * 50)
+    
+    async def _insert(self, batch: List[AccessRow]) -> None:
+        await db.execute(_INSERT_ACCESS_LOG_SQL, *(list(column) for column in zip(*batch)))
+    
+    def _describe(self, row: AccessRow) -> str:
+        return f"access log row for file {row[0]}"
+
+
 class KnowledgeBaseService:
     """
     Core service for knowledge base operations.
@@ -33,6 +84,11 @@ class KnowledgeBaseService:
     Designed for high-performance retrieval during Nicole's coding sessions.
     """
     
+    def __init__(self):
+        # Assembled context packs, LRU; cleared whenever kb_version changes
+        self._context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._context_version: Optional[tuple] = None
+    
     # =========================================================================
     # FILE OPERATIONS
     # =========================================================================
@@ -80,26 +136,30 @@ class KnowledgeBaseService:
             file_id = row['id']
             
             # Parse and create sections
-            sections_created = await self._parse_and_create_sections(conn, file_id, content)
-            
-            logger.info(f"[KB] Created '{slug}' ({word_count} words, {sections_created} sections)")
-            
-            return {
-                **dict(row),
-                'sections_count': sections_created
-            }
+            sections_created = await self._parse_and_create_sections(conn, file_id, content, title)
+        
+        kb_version.invalidate()
+        logger.info(f"[KB] Created '{slug}' ({word_count} words, {sections_created} sections)")
+        
+        return {
+            **dict(row),
+            'sections_count': sections_created
+        }
     
     async def _parse_and_create_sections(
         self,
         conn,
         file_id: int,
-        content: str
+        content: str,
+        title: str
     ) -> int:
         """
         Parse markdown headings and create section records.
         
         Enables granular retrieval - don't return entire 50KB file
-        when only a specific section is relevant.
+        when only a specific section is relevant. Each section's
+        search_vector weights the file title (A) over the heading (B)
+        over the body (D), and token_count is stored for context packing.
         
         Returns:
             Number of sections created
@@ -138,15 +198,26 @@ class KnowledgeBaseService:
         if current_section and current_section['content'].strip():
             sections.append(current_section)
         
-        # Bulk insert sections
-        for section in sections:
-            word_count = len(section['content'].split())
-            await conn.execute("""
-                INSERT INTO knowledge_base_sections 
-                (file_id, heading, level, content, section_order, word_count)
-                VALUES ($1, $2, $3, $4, $5, $6)
-            """, file_id, section['heading'], section['level'],
-                section['content'].strip(), section['section_order'], word_count)
+        if not sections:
+            return 0
+        
+        # Bulk insert sections in one statement
+        await conn.execute("""
+            INSERT INTO knowledge_base_sections 
+            (file_id, heading, level, content, section_order, word_count, token_count, search_vector)
+            SELECT $1, s.heading, s.level, s.content, s.section_order, s.word_count, s.token_count,
+                   setweight(to_tsvector('english', $2), 'A') ||
+                   setweight(to_tsvector('english', s.heading), 'B') ||
+                   setweight(to_tsvector('english', s.content), 'D')
+            FROM unnest($3::text[], $4::int[], $5::text[], $6::int[], $7::int[], $8::int[])
+                AS s(heading, level, content, section_order, word_count, token_count)
+        """, file_id, title or '',
+            [s['heading'] for s in sections],
+            [s['level'] for s in sections],
+            [s['content'].strip() for s in sections],
+            [s['section_order'] for s in sections],
+            [len(s['content'].split()) for s in sections],
+            [count_tokens(s['content'].strip()) for s in sections])
         
         return len(sections)
     
@@ -236,14 +307,16 @@ class KnowledgeBaseService:
             """, file_id)
             
             # Re-parse and create new sections
-            sections_created = await self._parse_and_create_sections(conn, file_id, content)
-            
-            logger.info(f"[KB] Updated '{slug}' to v{row['version']} ({sections_created} sections)")
-            
-            return {
-                **dict(row),
-                'sections_count': sections_created
-            }
+            sections_created = await self._parse_and_create_sections(conn, file_id, content, row['title'])
+        
+        # After commit, so a concurrent re-read can't cache the old version
+        kb_version.invalidate()
+        logger.info(f"[KB] Updated '{slug}' to v{row['version']} ({sections_created} sections)")
+        
+        return {
+            **dict(row),
+            'sections_count': sections_created
+        }
     
     async def delete_file(self, slug: str) -> bool:
         """Soft delete a knowledge file."""
@@ -256,6 +329,7 @@ class KnowledgeBaseService:
             
             deleted = 'UPDATE 1' in result
             if deleted:
+                kb_version.invalidate()
                 logger.info(f"[KB] Soft-deleted '{slug}'")
             return deleted
     
@@ -273,8 +347,9 @@ class KnowledgeBaseService:
         """
         Full-text search across knowledge base files.
         
-        Uses PostgreSQL's tsvector for efficient text matching.
-        Results ranked by relevance and usage popularity.
+        Matches the stored, GIN-indexed search_vector (title weighted over
+        description over content). Results ranked by relevance and usage
+        popularity.
         
         Args:
             query: Search terms
@@ -309,14 +384,10 @@ class KnowledgeBaseService:
                 SELECT 
                     id, slug, title, category, description, tags,
                     word_count, usage_count,
-                    ts_rank(
-                        to_tsvector('english', title || ' ' || COALESCE(description, '') || ' ' || content),
-                        plainto_tsquery('english', $1)
-                    ) as relevance
-                FROM knowledge_base_files
+                    ts_rank(search_vector, q) as relevance
+                FROM knowledge_base_files, plainto_tsquery('english', $1) q
                 WHERE {where_clause}
-                  AND to_tsvector('english', title || ' ' || COALESCE(description, '') || ' ' || content) 
-                      @@ plainto_tsquery('english', $1)
+                  AND search_vector @@ q
                 ORDER BY relevance DESC, usage_count DESC
                 LIMIT ${param_idx}
             """, *params)
@@ -333,6 +404,10 @@ class KnowledgeBaseService:
         """
         Search within sections for more granular results.
         
+        Ranked by the in-process BM25 index when KB_BM25_ENABLED, otherwise
+        by ts_rank over the sections' weighted search_vector (file title >
+        heading > body).
+        
         Args:
             query: Search query string
             file_id: Optional filter to specific file
@@ -342,57 +417,34 @@ class KnowledgeBaseService:
         Returns:
             List of matching sections with relevance scores
         """
+        if settings.KB_BM25_ENABLED and await kb_section_index.ensure_current():
+            return kb_section_index.search(query, file_id=file_id, category=category, limit=limit)
+        
+        conditions = ["f.is_active = true", "s.search_vector @@ q"]
+        params: List[Any] = [query]
+        
+        if file_id:
+            params.append(file_id)
+            conditions.append(f"s.file_id = ${len(params)}")
+        elif category:
+            params.append(category)
+            conditions.append(f"f.category = ${len(params)}")
+        
+        params.append(limit)
+        
         async with db.acquire() as conn:
-            if file_id:
-                # Search within specific file
-                rows = await conn.fetch("""
-                    SELECT 
-                        s.id, s.file_id, s.heading, s.level, s.content, s.word_count,
-                        f.slug as file_slug, f.title as file_title, f.category,
-                        ts_rank(to_tsvector('english', s.heading || ' ' || s.content),
-                                plainto_tsquery('english', $1)) as relevance
-                    FROM knowledge_base_sections s
-                    JOIN knowledge_base_files f ON s.file_id = f.id
-                    WHERE f.is_active = true
-                      AND s.file_id = $2
-                      AND to_tsvector('english', s.heading || ' ' || s.content) 
-                          @@ plainto_tsquery('english', $1)
-                    ORDER BY relevance DESC
-                    LIMIT $3
-                """, query, file_id, limit)
-            elif category:
-                # Search within specific category (e.g., 'qa')
-                rows = await conn.fetch("""
-                    SELECT 
-                        s.id, s.file_id, s.heading, s.level, s.content, s.word_count,
-                        f.slug as file_slug, f.title as file_title, f.category,
-                        ts_rank(to_tsvector('english', s.heading || ' ' || s.content),
-                                plainto_tsquery('english', $1)) as relevance
-                    FROM knowledge_base_sections s
-                    JOIN knowledge_base_files f ON s.file_id = f.id
-                    WHERE f.is_active = true
-                      AND f.category = $2
-                      AND to_tsvector('english', s.heading || ' ' || s.content) 
-                          @@ plainto_tsquery('english', $1)
-                    ORDER BY relevance DESC
-                    LIMIT $3
-                """, query, category, limit)
-            else:
-                # Search all sections
-                rows = await conn.fetch("""
-                    SELECT 
-                        s.id, s.file_id, s.heading, s.level, s.content, s.word_count,
-                        f.slug as file_slug, f.title as file_title, f.category,
-                        ts_rank(to_tsvector('english', s.heading || ' ' || s.content),
-                                plainto_tsquery('english', $1)) as relevance
-                    FROM knowledge_base_sections s
-                    JOIN knowledge_base_files f ON s.file_id = f.id
-                    WHERE f.is_active = true
-                      AND to_tsvector('english', s.heading || ' ' || s.content) 
-                          @@ plainto_tsquery('english', $1)
-                    ORDER BY relevance DESC
-                    LIMIT $2
-                """, query, limit)
+            rows = await conn.fetch(f"""
+                SELECT 
+                    s.id, s.file_id, s.heading, s.level, s.content, s.word_count, s.token_count,
+                    f.slug as file_slug, f.title as file_title, f.category,
+                    ts_rank(s.search_vector, q) as relevance
+                FROM knowledge_base_sections s
+                JOIN knowledge_base_files f ON s.file_id = f.id,
+                     plainto_tsquery('english', $1) q
+                WHERE {" AND ".join(conditions)}
+                ORDER BY relevance DESC
+                LIMIT ${len(params)}
+            """, *params)
             
             return [dict(r) for r in rows]
     
@@ -445,57 +497,81 @@ class KnowledgeBaseService:
         Retrieve relevant knowledge context for Nicole's system prompt.
         
         This is the primary method Nicole uses to augment her responses
-        with design knowledge during coding sessions.
+        with design knowledge during coding sessions. Packs are cached in
+        process by normalized query and KB version, so a repeated query
+        costs no database round trip.
         
         Args:
             query: User's request or project context
             max_sections: Maximum sections to include
-            max_tokens: Approximate token limit (1 word ≈ 1.3 tokens)
+            max_tokens: Token budget for the returned context
             category: Optional category filter (e.g., 'qa', 'fundamentals', 'patterns')
             
         Returns:
             Formatted markdown context string
         """
-        max_words = int(max_tokens / 1.3)
+        version = await kb_version.get()
+        if version != self._context_version:
+            self._context_cache.clear()
+            self._context_version = version
+        
+        key = (" ".join(query.lower().split()), category, max_sections, max_tokens)
+        cached = self._context_cache.get(key)
+        if cached is not None:
+            self._context_cache.move_to_end(key)
+            return cached
         
         # Search for relevant sections (with optional category filter)
         sections = await self.search_sections(query, category=category, limit=max_sections * 2)
+        context = self._pack_context(sections, max_sections, max_tokens)
         
-        if not sections:
-            return ""
+        if settings.KB_CONTEXT_CACHE_SIZE > 0 and self._context_version == version:
+            self._context_cache[key] = context
+            while len(self._context_cache) > settings.KB_CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
         
-        context_parts = []
-        total_words = 0
+        return context
+    
+    @staticmethod
+    def _pack_context(sections: List[Dict[str, Any]], max_sections: int, max_tokens: int) -> str:
+        """
+        Fit sections into a token budget.
         
-        for section in sections[:max_sections]:
-            section_words = section.get('word_count', 0)
-            
-            if total_words + section_words > max_words:
-                # Truncate if needed
-                remaining_words = max_words - total_words
-                if remaining_words < 100:
-                    break
-                content = ' '.join(section['content'].split()[:remaining_words])
-            else:
-                content = section['content']
-            
-            context_parts.append(f"""
-### {section['heading']} (from {section['file_title']})
-
-{content}
-""")
-            total_words += section_words
-            
-            if total_words >= max_words:
+        Greedy in relevance order: a section that doesn't fit is skipped so
+        lower-ranked, smaller ones can still use the budget. The best skipped
+        section then fills what remains, cut at a token boundary.
+        """
+        budget = max_tokens - count_tokens(CONTEXT_HEADER)
+        packed = []  # (rank, block)
+        overflow = None
+        
+        for rank, section in enumerate(sections):
+            if len(packed) >= max_sections:
                 break
+            header = f"\n### {section['heading']} (from {section['file_title']})\n\n"
+            header_tokens = count_tokens(header)
+            content_tokens = section.get('token_count')
+            if content_tokens is None:  # Ingested before migration 046
+                content_tokens = count_tokens(section['content'])
+            
+            cost = header_tokens + content_tokens + 1  # + newline between blocks
+            if cost <= budget:
+                packed.append((rank, f"{header}{section['content']}\n"))
+                budget -= cost
+            elif overflow is None:
+                overflow = (rank, header, header_tokens, section['content'])
         
-        if context_parts:
-            return f"""
-## 📚 Relevant Design Knowledge
-
-{chr(10).join(context_parts)}
-"""
-        return ""
+        if overflow and len(packed) < max_sections:
+            rank, header, header_tokens, content = overflow
+            keep = budget - header_tokens - 1
+            offsets = token_offsets(content)
+            if MIN_TRUNCATED_SECTION_TOKENS <= keep < len(offsets):
+                packed.append((rank, f"{header}{content[:offsets[keep]].rstrip()}\n"))
+        
+        if not packed:
+            return ""
+        packed.sort()
+        return CONTEXT_HEADER + "\n".join(block for _, block in packed) + "\n"
     
     async def get_all_slugs(self) -> List[str]:
         """Get list of all active knowledge file slugs."""
@@ -523,6 +599,8 @@ class KnowledgeBaseService:
         """
         Log knowledge base access for analytics.
         
+        Queued for the write-behind kb_access_log; never waits on the database.
+        
         Args:
             file_id: Accessed file ID
             user_id: User who accessed (default: Glen = 1)
@@ -531,12 +609,10 @@ class KnowledgeBaseService:
             section_id: Specific section if applicable
             session_id: For grouping related accesses
         """
-        async with db.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO knowledge_base_usage_log 
-                (file_id, section_id, user_id, query_text, access_method, session_id)
-                VALUES ($1, $2, $3, $4, $5, $6)
-            """, file_id, section_id, user_id, query_text, access_method, session_id)
+        kb_access_log.add((
+            file_id, section_id, user_id, query_text, access_method, session_id,
+            datetime.now(timezone.utc)
+        ))
     
     async def get_popular_files(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get most accessed knowledge files."""
@@ -646,3 +722,9 @@ class KnowledgeBaseService:
 
 kb_service = KnowledgeBaseService()
 
+# Write-behind queue for knowledge_base_usage_log (drained on shutdown)
+kb_access_log = KBAccessLogWriter(
+    batch_size=settings.KB_ACCESS_LOG_BATCH_SIZE,
+    flush_interval=settings.KB_ACCESS_LOG_FLUSH_INTERVAL_SECONDS,
+)
+
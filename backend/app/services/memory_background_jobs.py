@@ -26,6 +26,7 @@ from decimal import Decimal
 from typing import Dict, Any, List, Optional
 
 from app.database import db
+from app.services.alphawave_memory_service import memory_service
 from app.services.memory_intelligence import memory_intelligence
 from app.integrations.alphawave_claude import claude_client
 
@@ -41,13 +42,17 @@ async def run_memory_decay_job() -> Dict[str, Any]:
     Apply confidence decay to unused memories.
     
     This job:
-    1. Finds memories not accessed in 30+ days
-    2. Reduces their confidence by a small amount
+    1. Visits only memories whose decay check is due (decay_due_at)
+    2. Reduces confidence of those unused for 30+ days
     3. Archives memories that fall below threshold
     4. Protects high-importance memories from aggressive decay
+    5. Sweeps rows changed since the last run for archival
+    
+    Both passes run as keyset-paginated batches with bounded statement and
+    lock time; see MemoryService.decay_memories / archive_low_confidence.
     
     Returns:
-        Dict with job results
+        Dict with job results, including per-batch rows and timings
     """
     logger.info("[MEMORY JOB] Starting memory decay job...")
     
@@ -57,95 +62,28 @@ async def run_memory_decay_job() -> Dict[str, Any]:
         "decayed_count": 0,
         "archived_count": 0,
         "protected_count": 0,
+        "batches": {},
         "errors": [],
     }
     
     try:
-        # Try to use the SQL function first
-        try:
-            row = await db.fetchrow(
-                "SELECT * FROM decay_unused_memories($1, $2, $3, $4)",
-                30,     # days threshold
-                Decimal("0.03"),  # decay amount (3%)
-                Decimal("0.10"),  # minimum confidence
-                Decimal("0.15"),  # archive threshold
-            )
-            
-            if row:
-                results["decayed_count"] = row.get("decayed_count", 0)
-                results["archived_count"] = row.get("archived_count", 0)
-                
-        except Exception as func_err:
-            logger.warning(f"[MEMORY JOB] SQL function not available, using fallback: {func_err}")
-            
-            # Fallback: Manual decay
-            # Get candidates for decay
-            candidates = await db.fetch(
-                """
-                SELECT memory_id, user_id, confidence, importance, last_accessed
-                FROM memory_entries
-                WHERE archived_at IS NULL
-                  AND (last_accessed IS NULL OR last_accessed < NOW() - INTERVAL '30 days')
-                  AND confidence > 0.10
-                ORDER BY last_accessed ASC NULLS FIRST
-                LIMIT 500
-                """
-            )
-            
-            for mem in candidates:
-                # Protect high-importance memories
-                if float(mem["importance"]) > 0.8 and float(mem["confidence"]) > 0.5:
-                    results["protected_count"] += 1
-                    continue
-                
-                # Calculate decay amount based on time since access
-                days_since_access = 30  # Default if never accessed
-                if mem["last_accessed"]:
-                    days_since_access = (datetime.utcnow() - mem["last_accessed"].replace(tzinfo=None)).days
-                
-                # More aggressive decay for very old memories
-                decay_amount = 0.03 if days_since_access < 60 else 0.05
-                new_confidence = max(0.10, float(mem["confidence"]) - decay_amount)
-                
-                # Apply decay
-                await db.execute(
-                    """
-                    UPDATE memory_entries
-                    SET confidence = $1, updated_at = NOW()
-                    WHERE memory_id = $2
-                    """,
-                    Decimal(str(new_confidence)),
-                    mem["memory_id"],
-                )
-                results["decayed_count"] += 1
-                
-                # Archive if below threshold
-                if new_confidence <= 0.15 and float(mem["importance"]) < 0.7:
-                    await db.execute(
-                        """
-                        UPDATE memory_entries
-                        SET archived_at = NOW(), updated_at = NOW()
-                        WHERE memory_id = $1
-                        """,
-                        mem["memory_id"],
-                    )
-                    results["archived_count"] += 1
-                    
-                    # Log the action
-                    await _log_job_action(
-                        mem["user_id"],
-                        "decay_applied",
-                        "memory",
-                        mem["memory_id"],
-                        f"Archived due to low confidence ({new_confidence:.2f})"
-                    )
+        decay = await memory_service.decay_memories()
+        archive = await memory_service.archive_low_confidence()
+        
+        results["decayed_count"] = decay["decayed"]
+        results["archived_count"] = decay["archived"] + archive["archived"]
+        results["protected_count"] = decay["protected"]
+        results["batches"] = {"decay": decay["batches"], "archive": archive["batches"]}
+        results["errors"] = decay["errors"] + archive["errors"]
         
         results["completed_at"] = datetime.utcnow().isoformat()
-        results["success"] = True
+        results["success"] = not results["errors"]
         
         logger.info(
             f"[MEMORY JOB] Decay complete: {results['decayed_count']} decayed, "
-            f"{results['archived_count']} archived, {results['protected_count']} protected"
+            f"{results['archived_count']} archived, {results['protected_count']} protected "
+            f"({len(decay['batches'])} + {len(archive['batches'])} batches, "
+            f"{decay['total_ms'] + archive['total_ms']:.0f}ms)"
         )
         
     except Exception as e:
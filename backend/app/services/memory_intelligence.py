@@ -27,8 +27,8 @@ import json
 import re
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
 
 from app.database import db
 from app.integrations.alphawave_claude import claude_client
@@ -36,6 +36,19 @@ from app.integrations.alphawave_openai import openai_client
 
 logger = logging.getLogger(__name__)
 
+# Phrases that mark an explicit request to remember something
+EXPLICIT_MEMORY_KEYWORDS = ["remember that", "don't forget", "keep in mind", "note that"]
+
+# Relationship types the batched analysis may propose
+LINK_TYPES = {"supersedes", "elaborates", "same_entity", "same_topic", "related_to"}
+BIDIRECTIONAL_LINK_TYPES = {"same_topic", "same_entity", "related_to"}
+
+
+def is_explicit_memory_request(message: str) -> bool:
+    """True if the user explicitly asked Nicole to remember something."""
+    message_lower = message.lower()
+    return any(kw in message_lower for kw in EXPLICIT_MEMORY_KEYWORDS)
+
 
 # =============================================================================
 # DATA CLASSES
@@ -53,6 +66,9 @@ class ExtractedMemory:
     context: str
     should_link_to: List[int]  # Memory IDs this relates to
     reasoning: str  # Why this should be remembered
+    exchange_index: int = 0  # Position in the analyzed window (batched mode)
+    link_types: Dict[int, str] = field(default_factory=dict)  # Typed links proposed by analysis
+    corrects_memory_id: Optional[int] = None
 
 
 @dataclass
@@ -77,6 +93,15 @@ class RelationshipCandidate:
     bidirectional: bool
 
 
+@dataclass
+class ConversationExchange:
+    """One user/assistant turn queued for batched memory analysis."""
+    user_message: str
+    assistant_response: str
+    conversation_id: int
+    user_name: str = "User"
+
+
 # =============================================================================
 # MEMORY INTELLIGENCE SERVICE
 # =============================================================================
@@ -314,8 +339,7 @@ GUIDELINES:
                     break  # One memory per type per message
         
         # Check for explicit memory requests
-        explicit_keywords = ["remember that", "don't forget", "keep in mind", "note that"]
-        if any(kw in message_lower for kw in explicit_keywords):
+        if is_explicit_memory_request(message):
             memories.append(ExtractedMemory(
                 content=message,
                 memory_type="fact",
@@ -337,6 +361,199 @@ GUIDELINES:
             analysis_reasoning="Fallback pattern extraction"
         )
     
+    # =========================================================================
+    # BATCHED MEMORY EXTRACTION
+    # =========================================================================
+    
+    async def analyze_exchanges_for_memories(
+        self,
+        user_id: int,
+        exchanges: List[ConversationExchange],
+        user_name: str = "User",
+    ) -> MemoryAnalysis:
+        """
+        Analyze a window of conversation exchanges in one Claude call.
+        
+        Batched counterpart of analyze_message_for_memories: the model sees
+        the recent memories with their IDs and returns, per extracted memory,
+        its tags, entities, typed links to existing memories and any memory
+        it corrects. Entity lookups for all memories run as one set query.
+        
+        Args:
+            user_id: Tiger user ID
+            exchanges: Exchanges to analyze, oldest first
+            user_name: User's name for context
+            
+        Returns:
+            MemoryAnalysis whose memories carry exchange_index, link_types
+            and corrects_memory_id
+        """
+        candidates = [
+            (i, e) for i, e in enumerate(exchanges)
+            if len(e.user_message) >= self._min_memory_length
+        ]
+        if not candidates:
+            return MemoryAnalysis(
+                should_save=False,
+                memories=[],
+                suggested_kb=None,
+                detected_correction=False,
+                correction_target=None,
+                analysis_reasoning="Messages too short to contain meaningful memory"
+            )
+        
+        today_count = await self._get_today_memory_count(user_id)
+        if today_count >= self._max_daily_memories:
+            logger.warning(f"[MEMORY INTEL] Daily limit reached for user {user_id}")
+            return MemoryAnalysis(
+                should_save=False,
+                memories=[],
+                suggested_kb=None,
+                detected_correction=False,
+                correction_target=None,
+                analysis_reasoning="Daily memory limit reached - prioritizing quality"
+            )
+        
+        recent_memories = await self._get_recent_memory_context(user_id, limit=15)
+        known_ids = {m["memory_id"] for m in recent_memories}
+        
+        exchange_text = "\n\n".join(
+            f"EXCHANGE {i}:\nUSER: \"{e.user_message}\"\nNICOLE: \"{e.assistant_response[:2000]}\""
+            for i, e in candidates
+        )
+        
+        analysis_prompt = f"""Analyze these conversation exchanges and determine what, if anything, should be remembered about {user_name}.
+
+{exchange_text}
+
+EXISTING MEMORIES ABOUT THIS USER (with IDs):
+{self._format_memories_with_ids(recent_memories)}
+
+INSTRUCTIONS:
+1. Extract information worth remembering long-term from ANY of the exchanges
+2. Identify the TYPE of each memory (preference, fact, goal, relationship, correction, pattern)
+3. Extract the CORE information to remember (be concise but complete)
+4. Suggest relevant TAGS from: important, personal, family, work, health, financial, emotional, routine, preference, goal, correction, relationship, location, time-sensitive
+5. Identify any ENTITIES mentioned (people, places, specific things)
+6. LINK each memory to existing memories it relates to, using their IDs and one of: supersedes, elaborates, same_entity, same_topic, related_to
+7. If a memory CORRECTS an existing memory, give that memory's ID
+8. Rate IMPORTANCE (0.0-1.0) based on how useful this will be for future interactions
+
+RESPOND IN JSON FORMAT:
+{{
+    "should_remember": true/false,
+    "reasoning": "Why these should/shouldn't be remembered",
+    "memories": [
+        {{
+            "exchange": 0,
+            "content": "The concise memory to store",
+            "type": "preference|fact|goal|relationship|correction|pattern",
+            "importance": 0.0-1.0,
+            "confidence": 0.0-1.0,
+            "tags": ["tag1", "tag2"],
+            "entities": ["entity1", "entity2"],
+            "context": "Brief context about when/why this was shared",
+            "links": [{{"memory_id": 123, "type": "related_to"}}],
+            "corrects_memory_id": null
+        }}
+    ],
+    "suggested_knowledge_base": "name if a new KB should be created, null otherwise"
+}}
+
+GUIDELINES:
+- Only remember MEANINGFUL information (not "hello" or "thanks")
+- Never store the same fact twice, even if it came up in several exchanges
+- Only use memory IDs from the list above
+- If unsure, err on the side of NOT remembering"""
+
+        try:
+            response = await claude_client.generate_response(
+                messages=[{"role": "user", "content": analysis_prompt}],
+                system_prompt="You are a memory analysis system. Extract meaningful memories from conversations. Respond only with valid JSON.",
+                max_tokens=min(4000, 1000 + 500 * len(candidates)),
+                temperature=0.3,
+            )
+            analysis_data = self._parse_json_response(response)
+        except Exception as e:
+            logger.error(f"[MEMORY INTEL] Batched analysis failed: {e}", exc_info=True)
+            analysis_data = None
+        
+        if not analysis_data:
+            logger.warning("[MEMORY INTEL] Batched analysis unusable, falling back to patterns")
+            return self._fallback_window_extraction(candidates, user_id)
+        
+        mem_items = [m for m in analysis_data.get("memories", []) if m.get("content")]
+        entity_matches = await self._find_related_memories_batch(
+            user_id, [m.get("entities", []) for m in mem_items]
+        )
+        valid_indexes = {i for i, _ in candidates}
+        
+        memories = []
+        for mem_data, entity_ids in zip(mem_items, entity_matches):
+            link_types = {}
+            for link in mem_data.get("links") or []:
+                target = self._as_int(link.get("memory_id"))
+                link_type = link.get("type", "related_to")
+                if target in known_ids:
+                    link_types[target] = link_type if link_type in LINK_TYPES else "related_to"
+            
+            corrects = self._as_int(mem_data.get("corrects_memory_id"))
+            exchange_index = self._as_int(mem_data.get("exchange"))
+            
+            memories.append(ExtractedMemory(
+                content=mem_data.get("content", ""),
+                memory_type=mem_data.get("type", "fact"),
+                importance=float(mem_data.get("importance", 0.5)),
+                confidence=float(mem_data.get("confidence", 0.8)),
+                suggested_tags=mem_data.get("tags", []),
+                entities=mem_data.get("entities", []),
+                context=mem_data.get("context", ""),
+                should_link_to=list(dict.fromkeys([*link_types, *entity_ids]))[:5],
+                reasoning=analysis_data.get("reasoning", ""),
+                exchange_index=exchange_index if exchange_index in valid_indexes else candidates[-1][0],
+                link_types=link_types,
+                corrects_memory_id=corrects if corrects in known_ids else None,
+            ))
+        
+        corrections = [m.corrects_memory_id for m in memories if m.corrects_memory_id]
+        return MemoryAnalysis(
+            should_save=bool(analysis_data.get("should_remember", False)) and bool(memories),
+            memories=memories,
+            suggested_kb=analysis_data.get("suggested_knowledge_base"),
+            detected_correction=bool(corrections),
+            correction_target=corrections[0] if corrections else None,
+            analysis_reasoning=analysis_data.get("reasoning", "")
+        )
+    
+    def _fallback_window_extraction(
+        self,
+        candidates: List[Tuple[int, ConversationExchange]],
+        user_id: int,
+    ) -> MemoryAnalysis:
+        """Pattern-based extraction over each exchange of a failed batch."""
+        memories = []
+        for index, exchange in candidates:
+            for mem in self._fallback_pattern_extraction(exchange.user_message, user_id).memories:
+                mem.exchange_index = index
+                memories.append(mem)
+        
+        return MemoryAnalysis(
+            should_save=len(memories) > 0,
+            memories=memories,
+            suggested_kb=None,
+            detected_correction=False,
+            correction_target=None,
+            analysis_reasoning="Fallback pattern extraction"
+        )
+    
+    @staticmethod
+    def _as_int(value: Any) -> Optional[int]:
+        """Coerce an ID from model output, or None."""
+        try:
+            return int(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+    
     # =========================================================================
     # INTELLIGENT TAG GENERATION
     # =========================================================================
@@ -365,58 +582,76 @@ GUIDELINES:
         Returns:
             List of tag dicts with id, name, and whether it's new
         """
-        result_tags = []
-        
-        # Get system tags
-        system_tags = await db.fetch(
-            "SELECT tag_id, name FROM memory_tags WHERE user_id IS NULL"
-        )
-        system_tag_map = {t["name"].lower(): t["tag_id"] for t in system_tags}
+        batches = await self.resolve_tags_batch(user_id, [(content, memory_type, suggested_tags)])
+        return batches[0]
+    
+    async def resolve_tags_batch(
+        self,
+        user_id: int,
+        items: List[Tuple[str, str, List[str]]],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Resolve tags for several memories with one lookup and one upsert.
         
-        # Get user's existing custom tags
-        user_tags = await db.fetch(
-            "SELECT tag_id, name FROM memory_tags WHERE user_id = $1",
+        Args:
+            user_id: Tiger user ID
+            items: (content, memory_type, suggested_tags) per memory
+            
+        Returns:
+            Tag dicts per item, in the same order as items
+        """
+        # System tags (user_id IS NULL) and the user's own tags in one query
+        tag_rows = await db.fetch(
+            "SELECT tag_id, name, user_id FROM memory_tags WHERE user_id IS NULL OR user_id = $1",
             user_id
         )
-        user_tag_map = {t["name"].lower(): t["tag_id"] for t in user_tags}
-        
-        # Process suggested tags
-        for tag_name in suggested_tags:
-            tag_lower = tag_name.lower().strip()
+        system_tag_map = {t["name"].lower(): t["tag_id"] for t in tag_rows if t["user_id"] is None}
+        user_tag_map = {t["name"].lower(): t["tag_id"] for t in tag_rows if t["user_id"] is not None}
+        
+        # Collect auto-tags to create across all items
+        new_tags: Dict[str, str] = {}
+        for content, _, suggested_tags in items:
+            for tag_name in suggested_tags:
+                tag_lower = tag_name.lower().strip()
+                if (
+                    tag_lower not in system_tag_map
+                    and tag_lower not in user_tag_map
+                    and len(tag_lower) >= 3
+                    and self._is_valid_tag_name(tag_lower)
+                ):
+                    new_tags.setdefault(tag_lower, content)
+        
+        created = await self._create_auto_tags(user_id, new_tags) if new_tags else {}
+        
+        results = []
+        for content, memory_type, suggested_tags in items:
+            result_tags = []
+            for tag_name in suggested_tags:
+                tag_lower = tag_name.lower().strip()
+                
+                if tag_lower in system_tag_map:
+                    tag = {"tag_id": system_tag_map[tag_lower], "name": tag_lower, "is_new": False}
+                elif tag_lower in user_tag_map:
+                    tag = {"tag_id": user_tag_map[tag_lower], "name": tag_lower, "is_new": False}
+                elif tag_lower in created:
+                    tag = {"tag_id": created[tag_lower], "name": tag_lower, "is_new": True}
+                else:
+                    continue
+                if tag["name"] not in [t["name"] for t in result_tags]:
+                    result_tags.append(tag)
             
-            # Check if it's a system tag
-            if tag_lower in system_tag_map:
+            # Always add memory_type as a tag if it's a system tag
+            type_lower = memory_type.lower()
+            if type_lower in system_tag_map and type_lower not in [t["name"] for t in result_tags]:
                 result_tags.append({
-                    "tag_id": system_tag_map[tag_lower],
-                    "name": tag_lower,
+                    "tag_id": system_tag_map[type_lower],
+                    "name": type_lower,
                     "is_new": False
                 })
-            # Check if user already has this tag
-            elif tag_lower in user_tag_map:
-                result_tags.append({
-                    "tag_id": user_tag_map[tag_lower],
-                    "name": tag_lower,
-                    "is_new": False
-                })
-            # Create new auto-tag if it seems meaningful
-            elif len(tag_lower) >= 3 and self._is_valid_tag_name(tag_lower):
-                new_tag = await self._create_auto_tag(user_id, tag_lower, content)
-                if new_tag:
-                    result_tags.append({
-                        "tag_id": new_tag["tag_id"],
-                        "name": tag_lower,
-                        "is_new": True
-                    })
-        
-        # Always add memory_type as a tag if it's a system tag
-        if memory_type.lower() in system_tag_map and memory_type.lower() not in [t["name"] for t in result_tags]:
-            result_tags.append({
-                "tag_id": system_tag_map[memory_type.lower()],
-                "name": memory_type.lower(),
-                "is_new": False
-            })
-        
-        return result_tags[:5]  # Limit to 5 tags per memory
+            
+            results.append(result_tags[:5])  # Limit to 5 tags per memory
+        
+        return results
     
     def _is_valid_tag_name(self, name: str) -> bool:
         """Check if a tag name is valid (not too generic, not gibberish)."""
@@ -470,6 +705,42 @@ GUIDELINES:
             logger.warning(f"[MEMORY INTEL] Failed to create auto-tag '{tag_name}': {e}")
             return None
     
+    async def _create_auto_tags(
+        self,
+        user_id: int,
+        tags: Dict[str, str],
+    ) -> Dict[str, int]:
+        """
+        Create several auto-tags in one statement.
+        
+        Args:
+            user_id: Tiger user ID
+            tags: Tag name -> content of the memory that introduced it
+            
+        Returns:
+            Tag name -> tag_id for every tag created or already present
+        """
+        colors = ["#EF4444", "#F59E0B", "#10B981", "#3B82F6", "#8B5CF6", "#EC4899", "#06B6D4"]
+        names = list(tags)
+        try:
+            rows = await db.fetch(
+                """
+                INSERT INTO memory_tags (user_id, name, tag_type, color, auto_criteria, created_at)
+                SELECT $1, t.name, 'auto'::tag_type_enum, t.color, t.criteria, NOW()
+                FROM unnest($2::text[], $3::text[], $4::text[]) AS t(name, color, criteria)
+                ON CONFLICT (user_id, name) DO UPDATE SET last_used_at = NOW()
+                RETURNING tag_id, name
+                """,
+                user_id,
+                names,
+                [colors[hash(n) % len(colors)] for n in names],
+                [f"Auto-created from memory containing: {tags[n][:50]}..." for n in names],
+            )
+            return {r["name"]: r["tag_id"] for r in rows}
+        except Exception as e:
+            logger.warning(f"[MEMORY INTEL] Failed to create auto-tags {names}: {e}")
+            return {}
+    
     # =========================================================================
     # INTELLIGENT RELATIONSHIP MAPPING
     # =========================================================================
@@ -497,83 +768,116 @@ GUIDELINES:
         - Limit total links per memory to prevent web of connections
         - Prefer strong, meaningful connections over weak ones
         """
-        relationships = []
+        return await self.find_relationships_batch(user_id, [{
+            "memory_id": new_memory_id,
+            "content": content,
+            "entities": entities,
+            "suggested_links": suggested_links,
+        }])
+    
+    async def find_relationships_batch(
+        self,
+        user_id: int,
+        items: List[Dict[str, Any]],
+    ) -> List[RelationshipCandidate]:
+        """
+        Find relationships for several new memories with one vector query.
         
-        # Get the new memory's embedding
-        new_memory = await db.fetchrow(
-            "SELECT embedding, memory_type, category FROM memory_entries WHERE memory_id = $1",
-            new_memory_id
-        )
+        Each item needs memory_id, content, entities and suggested_links;
+        link_types (target ID -> type proposed by batched analysis) is
+        optional. Nearest neighbours for every memory come from a single
+        LATERAL query, so the ANN index is probed once per memory inside
+        one round trip.
         
-        if not new_memory or not new_memory["embedding"]:
-            logger.debug("[MEMORY INTEL] New memory has no embedding, skipping relationship search")
-            return relationships
+        Returns:
+            Up to 5 candidates per memory, strongest first
+        """
+        if not items:
+            return []
         
-        # Find similar memories by vector similarity
-        similar_memories = await db.fetch(
+        rows = await db.fetch(
             """
-            SELECT 
-                memory_id,
-                content,
-                memory_type,
-                category,
-                1 - (embedding <=> $1::vector) AS similarity
-            FROM memory_entries
-            WHERE user_id = $2
-              AND memory_id != $3
-              AND archived_at IS NULL
-              AND embedding IS NOT NULL
-            ORDER BY embedding <=> $1::vector
-            LIMIT 10
+            SELECT
+                n.memory_id AS source_id,
+                n.memory_type AS source_type,
+                c.memory_id,
+                c.content,
+                c.memory_type,
+                1 - (c.embedding <=> n.embedding) AS similarity
+            FROM memory_entries n
+            CROSS JOIN LATERAL (
+                SELECT m.memory_id, m.content, m.memory_type, m.embedding
+                FROM memory_entries m
+                WHERE m.user_id = $2
+                  AND m.memory_id != n.memory_id
+                  AND m.archived_at IS NULL
+                  AND m.embedding IS NOT NULL
+                ORDER BY m.embedding <=> n.embedding
+                LIMIT 10
+            ) c
+            WHERE n.memory_id = ANY($1::bigint[])
+              AND n.embedding IS NOT NULL
             """,
-            str(new_memory["embedding"]),
+            [item["memory_id"] for item in items],
             user_id,
-            new_memory_id
         )
         
-        # Analyze each potential relationship
-        for mem in similar_memories:
-            similarity = float(mem["similarity"])
-            
-            # Skip if similarity is too low
-            if similarity < self._relationship_threshold:
-                continue
+        neighbours: Dict[int, List[Any]] = {}
+        for row in rows:
+            neighbours.setdefault(row["source_id"], []).append(row)
+        
+        all_relationships = []
+        for item in items:
+            source_id = item["memory_id"]
+            relationships = []
             
-            # Determine relationship type based on analysis
-            rel_type, weight, reasoning = self._determine_relationship_type(
-                new_content=content,
-                existing_content=mem["content"],
-                new_type=new_memory["memory_type"],
-                existing_type=mem["memory_type"],
-                similarity=similarity,
-                entities=entities
-            )
+            # Analyze each potential relationship
+            for mem in neighbours.get(source_id, []):
+                similarity = float(mem["similarity"])
+                
+                # Skip if similarity is too low
+                if similarity < self._relationship_threshold:
+                    continue
+                
+                rel_type, weight, reasoning = self._determine_relationship_type(
+                    new_content=item["content"],
+                    existing_content=mem["content"],
+                    new_type=mem["source_type"],
+                    existing_type=mem["memory_type"],
+                    similarity=similarity,
+                    entities=item.get("entities") or []
+                )
+                
+                if rel_type:
+                    relationships.append(RelationshipCandidate(
+                        source_id=source_id,
+                        target_id=mem["memory_id"],
+                        relationship_type=rel_type,
+                        weight=weight,
+                        reasoning=reasoning,
+                        bidirectional=rel_type in BIDIRECTIONAL_LINK_TYPES
+                    ))
             
-            if rel_type:
+            # Typed links from batched analysis, then plain suggested links
+            link_types = item.get("link_types") or {}
+            for suggested_id in item.get("suggested_links") or []:
+                if suggested_id == source_id or suggested_id in [r.target_id for r in relationships]:
+                    continue
+                rel_type = link_types.get(suggested_id, "related_to")
                 relationships.append(RelationshipCandidate(
-                    source_id=new_memory_id,
-                    target_id=mem["memory_id"],
-                    relationship_type=rel_type,
-                    weight=weight,
-                    reasoning=reasoning,
-                    bidirectional=rel_type in ["same_topic", "same_entity", "related_to"]
-                ))
-        
-        # Also check suggested links from analysis
-        for suggested_id in suggested_links:
-            if suggested_id not in [r.target_id for r in relationships]:
-                relationships.append(RelationshipCandidate(
-                    source_id=new_memory_id,
+                    source_id=source_id,
                     target_id=suggested_id,
-                    relationship_type="related_to",
-                    weight=0.7,
+                    relationship_type=rel_type,
+                    weight=0.8 if suggested_id in link_types else 0.7,
                     reasoning="Suggested by memory analysis",
-                    bidirectional=True
+                    bidirectional=rel_type in BIDIRECTIONAL_LINK_TYPES
                 ))
+            
+            # Limit to top 5 relationships
+            relationships.sort(key=lambda r: r.weight, reverse=True)
+            all_relationships.extend(relationships[:5])
         
-        # Limit to top 5 relationships
-        relationships.sort(key=lambda r: r.weight, reverse=True)
-        return relationships[:5]
+        return all_relationships
     
     def _determine_relationship_type(
         self,
@@ -633,65 +937,66 @@ GUIDELINES:
         
         Note: memory_links table has relationship_type as TEXT (not enum),
         and does not have bidirectional or reasoning columns.
+        
+        All links (and reverse links for bidirectional types) are written
+        with one multi-row upsert and logged as one action.
         """
-        saved_count = 0
+        if not relationships:
+            return 0
         
+        # One row per (source, target, type); ON CONFLICT cannot touch a row twice
+        links: Dict[Tuple[int, int, str], float] = {}
         for rel in relationships:
-            try:
-                # memory_links schema: link_id, source_memory_id, target_memory_id, 
-                # relationship_type (TEXT), weight, created_at, created_by
-                await db.execute(
-                    """
-                    INSERT INTO memory_links (
-                        source_memory_id, target_memory_id, relationship_type,
-                        weight, created_by, created_at
-                    ) VALUES ($1, $2, $3, $4, 'nicole', NOW())
-                    ON CONFLICT (source_memory_id, target_memory_id, relationship_type) 
-                    DO UPDATE SET weight = $4
-                    """,
-                    rel.source_id,
-                    rel.target_id,
-                    rel.relationship_type,  # TEXT column, no enum cast
-                    Decimal(str(rel.weight)),
+            links[(rel.source_id, rel.target_id, rel.relationship_type)] = rel.weight
+            if rel.bidirectional:
+                links.setdefault((rel.target_id, rel.source_id, rel.relationship_type), rel.weight)
+        keys = list(links)
+        
+        try:
+            # memory_links schema: link_id, source_memory_id, target_memory_id,
+            # relationship_type (TEXT), weight, created_at, created_by
+            await db.execute(
+                """
+                INSERT INTO memory_links (
+                    source_memory_id, target_memory_id, relationship_type,
+                    weight, created_by, created_at
                 )
-                saved_count += 1
-                
-                # Create reverse link if bidirectional
-                if rel.bidirectional:
-                    await db.execute(
-                        """
-                        INSERT INTO memory_links (
-                            source_memory_id, target_memory_id, relationship_type,
-                            weight, created_by, created_at
-                        ) VALUES ($1, $2, $3, $4, 'nicole', NOW())
-                        ON CONFLICT (source_memory_id, target_memory_id, relationship_type) 
-                        DO UPDATE SET weight = $4
-                        """,
-                        rel.target_id,  # Reversed
-                        rel.source_id,  # Reversed
-                        rel.relationship_type,
-                        Decimal(str(rel.weight)),
-                    )
-                
-                # Log the action
-                await self._log_nicole_action(
-                    user_id=user_id,
-                    action_type="link_memories",
-                    target_type="link",
-                    target_id=rel.source_id,
-                    reason=rel.reasoning,
-                    context={
-                        "target_memory_id": rel.target_id, 
+                SELECT l.source_id, l.target_id, l.rel_type, l.weight, 'nicole', NOW()
+                FROM unnest($1::bigint[], $2::bigint[], $3::text[], $4::numeric[])
+                    AS l(source_id, target_id, rel_type, weight)
+                ON CONFLICT (source_memory_id, target_memory_id, relationship_type)
+                DO UPDATE SET weight = EXCLUDED.weight
+                """,
+                [k[0] for k in keys],
+                [k[1] for k in keys],
+                [k[2] for k in keys],
+                [Decimal(str(links[k])) for k in keys],
+            )
+        except Exception as e:
+            logger.warning(f"[MEMORY INTEL] Failed to save relationships: {e}")
+            return 0
+        
+        await self._log_nicole_action(
+            user_id=user_id,
+            action_type="link_memories",
+            target_type="link",
+            target_id=relationships[0].source_id,
+            reason=f"Linked {len(relationships)} memory pairs",
+            context={
+                "links": [
+                    {
+                        "source_memory_id": rel.source_id,
+                        "target_memory_id": rel.target_id,
                         "type": rel.relationship_type,
                         "bidirectional": rel.bidirectional,
-                        "reasoning": rel.reasoning
+                        "reasoning": rel.reasoning,
                     }
-                )
-                
-            except Exception as e:
-                logger.warning(f"[MEMORY INTEL] Failed to save relationship: {e}")
+                    for rel in relationships
+                ]
+            }
+        )
         
-        return saved_count
+        return len(relationships)
     
     # =========================================================================
     # MEMORY CONSOLIDATION
@@ -1113,6 +1418,16 @@ Respond with ONLY the consolidated memory text (no explanations)."""
         
         return "\n".join(lines)
     
+    def _format_memories_with_ids(self, memories: List[Dict[str, Any]]) -> str:
+        """Format memories with IDs so analysis can reference them."""
+        if not memories:
+            return "No recent memories."
+        
+        return "\n".join(
+            f"- #{m['memory_id']} [{m.get('memory_type', 'unknown')}] {m.get('content', '')[:100]}"
+            for m in memories
+        )
+    
     async def _find_related_memories(
         self,
         user_id: int,
@@ -1138,6 +1453,43 @@ Respond with ONLY the consolidated memory text (no explanations)."""
         
         return list(set(related_ids))[:5]  # Dedupe and limit
     
+    async def _find_related_memories_batch(
+        self,
+        user_id: int,
+        entity_lists: List[List[str]],
+    ) -> List[List[int]]:
+        """Entity-overlap lookup for several memories in one query."""
+        entities, owners = [], []
+        for index, entity_list in enumerate(entity_lists):
+            for entity in entity_list[:3]:  # Limit entity searches
+                if entity:
+                    entities.append(entity)
+                    owners.append(index)
+        
+        related: List[List[int]] = [[] for _ in entity_lists]
+        if not entities:
+            return related
+        
+        rows = await db.fetch(
+            """
+            SELECT e.owner, m.memory_id
+            FROM unnest($2::text[], $3::int[]) AS e(entity, owner)
+            CROSS JOIN LATERAL (
+                SELECT memory_id FROM memory_entries
+                WHERE user_id = $1
+                  AND archived_at IS NULL
+                  AND LOWER(content) LIKE '%' || LOWER(e.entity) || '%'
+                LIMIT 3
+            ) m
+            """,
+            user_id, entities, owners
+        )
+        for row in rows:
+            if row["memory_id"] not in related[row["owner"]]:
+                related[row["owner"]].append(row["memory_id"])
+        
+        return [ids[:5] for ids in related]  # Dedupe and limit
+    
     async def _find_correction_target(
         self,
         user_id: int,
@@ -1255,6 +1607,84 @@ Respond with ONLY the consolidated memory text (no explanations)."""
             logger.debug(f"[MEMORY INTEL] Failed to log action: {e}")
 
 
+# =============================================================================
+# EXCHANGE WINDOW (BATCHED MODE)
+# =============================================================================
+
+class ExchangeWindow:
+    """
+    Per-user buffer of exchanges awaiting batched memory analysis.
+    
+    A user's window is handed to on_flush when it reaches `size` exchanges,
+    when its oldest exchange has waited `max_wait_seconds`, or at once when
+    an exchange is urgent (explicit "remember that" requests). Windows live
+    in process memory; call flush_all() on shutdown.
+    """
+    
+    def __init__(
+        self,
+        size: int,
+        max_wait_seconds: float,
+        on_flush: Callable[[int, List[ConversationExchange]], Awaitable[int]],
+    ):
+        self._size = max(1, size)
+        self._max_wait = max_wait_seconds
+        self._on_flush = on_flush
+        self._pending: Dict[int, List[ConversationExchange]] = {}
+        self._timers: Dict[int, asyncio.Task] = {}
+    
+    def add(
+        self,
+        user_id: int,
+        exchange: ConversationExchange,
+        urgent: bool = False,
+    ) -> Optional[List[ConversationExchange]]:
+        """Queue an exchange; returns the user's window if it should be processed now."""
+        pending = self._pending.setdefault(user_id, [])
+        pending.append(exchange)
+        
+        if urgent or len(pending) >= self._size:
+            return self._take(user_id)
+        
+        if user_id not in self._timers:
+            self._timers[user_id] = asyncio.create_task(self._flush_later(user_id))
+        return None
+    
+    def pending_count(self, user_id: int) -> int:
+        return len(self._pending.get(user_id, []))
+    
+    def _take(self, user_id: int) -> List[ConversationExchange]:
+        timer = self._timers.pop(user_id, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+        return self._pending.pop(user_id, [])
+    
+    async def _flush_later(self, user_id: int) -> None:
+        try:
+            await asyncio.sleep(self._max_wait)
+        except asyncio.CancelledError:
+            return
+        
+        window = self._take(user_id)
+        if window:
+            try:
+                await self._on_flush(user_id, window)
+            except Exception as e:
+                logger.error(f"[MEMORY INTEL] Timed window flush failed for user {user_id}: {e}")
+    
+    async def flush_all(self) -> int:
+        """Process every pending window now (e.g. on shutdown)."""
+        total = 0
+        for user_id in list(self._pending):
+            window = self._take(user_id)
+            if window:
+                try:
+                    total += await self._on_flush(user_id, window)
+                except Exception as e:
+                    logger.error(f"[MEMORY INTEL] Window flush failed for user {user_id}: {e}")
+        return total
+
+
 # =============================================================================
 # GLOBAL INSTANCE
 # =============================================================================
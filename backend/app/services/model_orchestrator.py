@@ -33,6 +33,15 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 
+from app.services.model_router import (
+    MODEL_CATALOG,
+    ModelRoute,
+    ModelSpec,
+    RoutingObjective,
+    estimate_tokens,
+    model_router,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -240,6 +249,10 @@ class ModelOrchestrator:
     2. Implement graceful degradation with fallbacks
     3. Track model health and adapt routing
     4. Provide clear observability into model decisions
+    
+    generate_with_fallback routes through model_router: each capability's
+    chain is re-ordered per call by its objective (latency, cost or the
+    declared quality order) from rolling per-model stats.
     """
     
     # Agent-to-Model mapping (role-based naming)
@@ -281,6 +294,17 @@ class ModelOrchestrator:
         ModelCapability.CONVERSATION: ["coding_agent", "architect_agent"],
     }
     
+    # Default routing objective per capability (overridable per call)
+    CAPABILITY_OBJECTIVES = {
+        ModelCapability.DESIGN_RESEARCH: RoutingObjective.QUALITY,
+        ModelCapability.WEB_GROUNDING: RoutingObjective.QUALITY,  # Only Gemini grounds
+        ModelCapability.ARCHITECTURE: RoutingObjective.QUALITY,
+        ModelCapability.CODE_GENERATION: RoutingObjective.LATENCY,
+        ModelCapability.CODE_REVIEW: RoutingObjective.COST,
+        ModelCapability.JUDGMENT: RoutingObjective.QUALITY,
+        ModelCapability.CONVERSATION: RoutingObjective.LATENCY,
+    }
+    
     def __init__(self):
         """Initialize orchestrator with agent health tracking."""
         self.model_health: Dict[str, ModelHealth] = {
@@ -512,7 +536,7 @@ class ModelOrchestrator:
             response = await self.claude.generate_response(
                 messages=[{"role": "user", "content": prompt}],
                 system_prompt="You are a professional web designer. Generate modern, attractive design systems.",
-                model="claude-sonnet-4-5-20250929",
+                model=MODEL_CATALOG["claude-sonnet"].model_id,
                 max_tokens=2000,
                 temperature=0.7
             )
@@ -558,50 +582,73 @@ class ModelOrchestrator:
         prompt: str,
         system_prompt: str,
         max_tokens: int = 4000,
-        temperature: float = 0.5
+        temperature: float = 0.5,
+        objective: Optional[RoutingObjective] = None,
+        hedge: Optional[bool] = None
     ) -> Tuple[str, str]:
         """
         Generate content with automatic fallback.
         
-        Returns: (response, model_used)
+        The capability's fallback chain is ranked by the routing objective
+        (default: CAPABILITY_OBJECTIVES); agents in cooldown are skipped and
+        slow latency-objective calls are hedged with the runner-up.
+        
+        Returns: (response, agent_used)
         """
-        chain = self.FALLBACK_CHAINS.get(capability, ["claude-sonnet"])
+        chain = self.FALLBACK_CHAINS.get(capability, ["coding_agent"])
+        candidates = [ModelRoute(agent, self.AGENT_MODELS[agent]) for agent in chain]
         
-        for model in chain:
-            health = self.model_health.get(model)
-            if not health or not health.check_available():
-                continue
-            
+        async def call(route: ModelRoute) -> str:
             try:
-                if "gemini" in model:
-                    response = await self.gemini.deep_research(
-                        query=prompt,
-                        research_type="general"
-                    )
-                    self.record_result(model, True)
-                    return response.get("summary", ""), model
-                
-                elif "claude" in model:
-                    claude_model = (
-                        "claude-sonnet-4-5-20250929" if "sonnet" in model 
-                        else "claude-opus-4-5-20251101"
-                    )
-                    response = await self.claude.generate_response(
-                        messages=[{"role": "user", "content": prompt}],
-                        system_prompt=system_prompt,
-                        model=claude_model,
-                        max_tokens=max_tokens,
-                        temperature=temperature
-                    )
-                    self.record_result(model, True)
-                    return response, model
-                    
+                response = await self._call_model(route.spec, prompt, system_prompt, max_tokens, temperature)
             except Exception as e:
-                logger.warning(f"[ORCHESTRATOR] {model} failed: {e}")
-                self.record_result(model, False, str(e))
-                continue
+                logger.warning(f"[ORCHESTRATOR] {route.agent} ({route.alias}) failed: {e}")
+                self.record_result(route.agent, False, str(e))
+                raise
+            self.record_result(route.agent, True)
+            return response
         
-        raise Exception("All models failed. Please try again later.")
+        try:
+            response, route = await model_router.run(
+                capability=capability.value,
+                candidates=candidates,
+                call=call,
+                objective=objective or self.CAPABILITY_OBJECTIVES.get(capability, RoutingObjective.QUALITY),
+                estimated_input_tokens=estimate_tokens(system_prompt + prompt),
+                max_output_tokens=max_tokens,
+                hedge=hedge,
+                is_available=lambda r: self.model_health[r.agent].check_available(),
+            )
+        except RuntimeError:
+            raise Exception("All models failed. Please try again later.")
+        
+        return response, route.agent
+    
+    async def _call_model(
+        self,
+        spec: ModelSpec,
+        prompt: str,
+        system_prompt: str,
+        max_tokens: int,
+        temperature: float
+    ) -> str:
+        """Single call to a catalog model."""
+        if spec.provider == "gemini":
+            response = await self.gemini.deep_research(
+                query=prompt,
+                research_type="general"
+            )
+            if response.get("error"):
+                raise RuntimeError(response["error"])
+            return response.get("summary", "")
+        
+        return await self.claude.generate_response(
+            messages=[{"role": "user", "content": prompt}],
+            system_prompt=system_prompt,
+            model=spec.model_id,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
     
     def get_health_summary(self) -> Dict[str, Any]:
         """Get health status summary for all models."""
@@ -617,6 +664,10 @@ class ModelOrchestrator:
             }
             for model, health in self.model_health.items()
         }
+    
+    def get_routing_summary(self) -> Dict[str, Any]:
+        """Router stats: per-model latency/error/cost and recent decisions."""
+        return model_router.get_summary()
 
 
 # Global orchestrator instance
@@ -0,0 +1,493 @@
+"""
+Model Router - cost- and latency-aware model selection
+
+Keeps rolling per-model statistics (latency percentiles, error rate,
+token usage and cost) and picks a model per call from a declared
+objective instead of a fixed fallback order:
+
+    latency  - lowest p95, penalized by error rate
+    cost     - lowest expected $ for this request, penalized by error rate
+    quality  - the declared order (strongest model first), unhealthy last
+
+Slow calls can be hedged: if the chosen model hasn't answered by its p95
+(x MODEL_ROUTER_HEDGE_P95_MULTIPLIER), the runner-up is started too and
+the first success wins. Hedging doubles spend on the slow tail, so it's
+only on by default for the latency objective.
+
+Stats are fed from llm_telemetry spans (observe_llm_calls(), called at
+startup), so every provider call counts - the Vibe, Faz and Enjineer
+pipelines' direct SDK calls as well as calls routed through run().
+
+Every decision is recorded with the stats snapshot it was made from, so
+replay() can re-score past decisions under a different objective or a
+changed scoring function. Decisions also go to a JSONL file when
+MODEL_ROUTER_DECISION_LOG_PATH is set.
+
+Usage:
+    text, route = await model_router.run(
+        capability="code_generation",
+        candidates=[ModelRoute("coding_agent", "claude-sonnet"), ...],
+        call=lambda route: ...,          # coroutine per route
+        objective=RoutingObjective.LATENCY,
+        estimated_input_tokens=1200,
+        max_output_tokens=4000,
+    )
+
+Author: AlphaWave Architecture
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.integrations.llm_telemetry import LLMSpan, llm_telemetry
+from app.services.alphawave_usage_service import CLAUDE_PRICING
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Set while run() is making an attempt, which records its own outcome
+_in_routed_call: contextvars.ContextVar[bool] = contextvars.ContextVar("model_router_routed", default=False)
+
+
+# ============================================================================
+# MODEL CATALOG
+# ============================================================================
+
+@dataclass(frozen=True)
+class ModelSpec:
+    """A routable model: provider, API id, price per 1M tokens, latency prior."""
+    alias: str
+    provider: str  # "claude" | "gemini"
+    model_id: str
+    input_per_mtok: float
+    output_per_mtok: float
+    prior_p95_ms: float  # Used until MODEL_ROUTER_MIN_SAMPLES calls are seen
+
+
+def _claude(alias: str, model_id: str, prior_p95_ms: float) -> ModelSpec:
+    pricing = CLAUDE_PRICING[model_id]
+    return ModelSpec(alias, "claude", model_id, pricing["input"], pricing["output"], prior_p95_ms)
+
+
+# The one place model IDs live for orchestrated calls
+MODEL_CATALOG: Dict[str, ModelSpec] = {
+    "claude-opus": _claude("claude-opus", "claude-opus-4-5-20251101", 45000),
+    "claude-sonnet": _claude("claude-sonnet", "claude-sonnet-4-5-20250929", 25000),
+    "claude-haiku": _claude("claude-haiku", "claude-haiku-4-5-20251001", 8000),
+    "gemini-3-pro": ModelSpec("gemini-3-pro", "gemini", settings.GEMINI_PRO_MODEL, 2.00, 12.00, 60000),
+}
+
+
+# Provider model ID -> catalog alias (for calls observed through telemetry)
+ALIAS_BY_MODEL_ID: Dict[str, str] = {spec.model_id: alias for alias, spec in MODEL_CATALOG.items()}
+
+
+class RoutingObjective(str, Enum):
+    """What the router optimizes for."""
+    LATENCY = "latency"
+    COST = "cost"
+    QUALITY = "quality"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """A candidate: the agent role making the call and the model serving it."""
+    agent: str
+    alias: str
+
+    @property
+    def spec(self) -> ModelSpec:
+        return MODEL_CATALOG[self.alias]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 chars/token) for routing and cost estimates."""
+    return max(1, len(text) // 4)
+
+
+# ============================================================================
+# ROLLING STATS
+# ============================================================================
+
+def _percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class ModelStats:
+    """Rolling latency / outcome / token windows for one model."""
+
+    def __init__(self, spec: ModelSpec, window: int):
+        self.spec = spec
+        self.latencies: Deque[float] = deque(maxlen=window)  # Successful calls only
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.output_tokens: Deque[int] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens_total = 0
+        self.output_tokens_total = 0
+        self.cost_usd_total = 0.0
+        self.hedges_started = 0
+        self.hedges_won = 0
+
+    def record(self, latency_ms: float, success: bool, input_tokens: int, output_tokens: int) -> None:
+        self.calls += 1
+        self.outcomes.append(success)
+        if success:
+            self.latencies.append(latency_ms)
+            self.output_tokens.append(output_tokens)
+        else:
+            self.errors += 1
+        self.input_tokens_total += input_tokens
+        self.output_tokens_total += output_tokens
+        self.cost_usd_total += self.cost(input_tokens, output_tokens)
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.spec.input_per_mtok + output_tokens * self.spec.output_per_mtok) / 1_000_000
+
+    @property
+    def error_rate(self) -> float:
+        return round(self.outcomes.count(False) / len(self.outcomes), 4) if self.outcomes else 0.0
+
+    def p95_ms(self) -> float:
+        """Observed p95, or the catalog prior while samples are scarce."""
+        if len(self.latencies) < settings.MODEL_ROUTER_MIN_SAMPLES:
+            return self.spec.prior_p95_ms
+        return _percentile(list(self.latencies), 0.95)
+
+    def snapshot(self, input_tokens: int, max_output_tokens: int) -> Dict[str, Any]:
+        """The numbers a decision is scored from (stored with the decision)."""
+        expected_output = (
+            sum(self.output_tokens) / len(self.output_tokens)
+            if len(self.output_tokens) >= settings.MODEL_ROUTER_MIN_SAMPLES
+            else max_output_tokens / 2
+        )
+        return {
+            "p95_ms": round(self.p95_ms(), 1),
+            "error_rate": self.error_rate,
+            "samples": len(self.outcomes),
+            "expected_cost_usd": round(self.cost(input_tokens, int(min(expected_output, max_output_tokens))), 6),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = [round(v, 1) for v in self.latencies]
+        return {
+            "model_id": self.spec.model_id,
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "p50_ms": _percentile(latencies, 0.5),
+            "p95_ms": _percentile(latencies, 0.95),
+            "p99_ms": _percentile(latencies, 0.99),
+            "input_tokens": self.input_tokens_total,
+            "output_tokens": self.output_tokens_total,
+            "cost_usd": round(self.cost_usd_total, 4),
+            "hedges_started": self.hedges_started,
+            "hedges_won": self.hedges_won,
+        }
+
+
+# ============================================================================
+# SCORING
+# ============================================================================
+
+def score(snapshot: Dict[str, Any], objective: RoutingObjective, declared_rank: int) -> float:
+    """
+    Lower is better. Pure function of a stats snapshot, so live routing and
+    replay() always agree.
+    """
+    error_rate = snapshot["error_rate"]
+    if snapshot["samples"] >= settings.MODEL_ROUTER_MIN_SAMPLES and error_rate >= settings.MODEL_ROUTER_MAX_ERROR_RATE:
+        # Degraded models sort after every healthy one, in declared order
+        return 1e12 + declared_rank
+
+    penalty = 1.0 + 4.0 * error_rate  # Retries make errors expensive
+    if objective == RoutingObjective.LATENCY:
+        return snapshot["p95_ms"] * penalty
+    if objective == RoutingObjective.COST:
+        return snapshot["expected_cost_usd"] * penalty
+    return float(declared_rank)
+
+
+@dataclass
+class RoutingDecision:
+    """One routing decision, replayable from its snapshots."""
+    decision_id: str
+    timestamp: str
+    capability: str
+    objective: str
+    candidates: List[Dict[str, Any]]  # agent, alias, declared_rank, available, snapshot, score
+    chosen: Optional[str] = None
+    hedge_after_ms: Optional[float] = None
+    hedged_with: Optional[str] = None
+    winner: Optional[str] = None
+    attempts: List[Dict[str, Any]] = field(default_factory=list)  # alias, latency_ms, ok, error
+    success: bool = False
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+class ModelRouter:
+    """Objective-based model selection with hedging and a decision log."""
+
+    def __init__(self):
+        self._stats: Dict[str, ModelStats] = {}
+        self.decisions: Deque[RoutingDecision] = deque(maxlen=settings.MODEL_ROUTER_DECISION_LOG_SIZE)
+        self._log_writer: Optional[ThreadPoolExecutor] = None  # One thread keeps log lines in order
+
+    def stats(self, alias: str) -> ModelStats:
+        if alias not in self._stats:
+            self._stats[alias] = ModelStats(MODEL_CATALOG[alias], settings.MODEL_ROUTER_WINDOW)
+        return self._stats[alias]
+
+    def record(self, alias: str, latency_ms: float, success: bool, input_tokens: int = 0, output_tokens: int = 0) -> None:
+        """Record one model call's outcome."""
+        self.stats(alias).record(latency_ms, success, input_tokens, output_tokens)
+
+    def record_span(self, span: LLMSpan, error: Optional[BaseException] = None) -> None:
+        """llm_telemetry listener: record a finished provider call for catalog models."""
+        alias = ALIAS_BY_MODEL_ID.get(span.model)
+        if alias is None or _in_routed_call.get() or isinstance(error, asyncio.CancelledError):
+            return  # Not in the catalog, already recorded by run(), or abandoned
+        input_tokens = span.input_tokens + span.cache_read_tokens + span.cache_write_tokens
+        self.record(alias, span.latency_ms or 0.0, span.status == "ok", input_tokens, span.output_tokens)
+
+    def observe_llm_calls(self) -> None:
+        """Feed every provider call seen by llm_telemetry into the stats."""
+        llm_telemetry.add_listener(self.record_span)
+
+    def is_degraded(self, alias: str) -> bool:
+        stats = self.stats(alias)
+        return len(stats.outcomes) >= settings.MODEL_ROUTER_MIN_SAMPLES and \
+            stats.error_rate >= settings.MODEL_ROUTER_MAX_ERROR_RATE
+
+    def rank(
+        self,
+        candidates: List[ModelRoute],
+        objective: RoutingObjective,
+        estimated_input_tokens: int,
+        max_output_tokens: int,
+        is_available: Callable[[ModelRoute], bool] = lambda route: True,
+    ) -> Tuple[List[ModelRoute], List[Dict[str, Any]]]:
+        """Order candidates for an objective. Returns (ranked, scored rows)."""
+        rows = []
+        for rank, route in enumerate(candidates):
+            snapshot = self.stats(route.alias).snapshot(estimated_input_tokens, max_output_tokens)
+            rows.append({
+                "agent": route.agent,
+                "alias": route.alias,
+                "declared_rank": rank,
+                "available": is_available(route),
+                "snapshot": snapshot,
+                "score": score(snapshot, objective, rank),
+            })
+        rows.sort(key=lambda r: (not r["available"], r["score"]))
+        by_key = {(route.agent, route.alias): route for route in candidates}
+        ranked = [by_key[(r["agent"], r["alias"])] for r in rows if r["available"]]
+        return ranked, rows
+
+    def hedge_delay_ms(self, alias: str) -> float:
+        delay = self.stats(alias).p95_ms() * settings.MODEL_ROUTER_HEDGE_P95_MULTIPLIER
+        return min(max(delay, settings.MODEL_ROUTER_HEDGE_MIN_MS), settings.MODEL_ROUTER_HEDGE_MAX_MS)
+
+    async def run(
+        self,
+        capability: str,
+        candidates: List[ModelRoute],
+        call: Callable[[ModelRoute], Awaitable[T]],
+        objective: RoutingObjective = RoutingObjective.QUALITY,
+        estimated_input_tokens: int = 0,
+        max_output_tokens: int = 4000,
+        hedge: Optional[bool] = None,
+        is_available: Callable[[ModelRoute], bool] = lambda route: True,
+        output_tokens: Callable[[T], int] = lambda result: estimate_tokens(str(result)),
+    ) -> Tuple[T, ModelRoute]:
+        """
+        Route one call: best candidate first (hedged if slow), then fall back
+        through the rest in ranked order.
+
+        Raises:
+            RuntimeError: Every candidate failed or none was available
+        """
+        if hedge is None:
+            hedge = settings.MODEL_ROUTER_HEDGE_ENABLED and objective == RoutingObjective.LATENCY
+
+        ranked, rows = self.rank(candidates, objective, estimated_input_tokens, max_output_tokens, is_available)
+        decision = RoutingDecision(
+            decision_id=uuid.uuid4().hex[:12],
+            timestamp=datetime.utcnow().isoformat(),
+            capability=capability,
+            objective=objective.value,
+            candidates=rows,
+            chosen=ranked[0].alias if ranked else None,
+        )
+
+        async def attempt(route: ModelRoute) -> T:
+            token = _in_routed_call.set(True)
+            started = time.perf_counter()
+            try:
+                result = await call(route)
+            except asyncio.CancelledError:
+                decision.attempts.append({"alias": route.alias, "cancelled": True})
+                raise
+            except Exception as e:
+                latency = (time.perf_counter() - started) * 1000
+                self.stats(route.alias).record(latency, False, estimated_input_tokens, 0)
+                decision.attempts.append({"alias": route.alias, "latency_ms": round(latency), "ok": False, "error": str(e)[:200]})
+                raise
+            finally:
+                _in_routed_call.reset(token)
+            latency = (time.perf_counter() - started) * 1000
+            self.stats(route.alias).record(latency, True, estimated_input_tokens, output_tokens(result))
+            decision.attempts.append({"alias": route.alias, "latency_ms": round(latency), "ok": True})
+            return result
+
+        try:
+            queue = list(ranked)
+            while queue:
+                primary = queue.pop(0)
+                backup = queue[0] if hedge and queue else None
+                started: List[ModelRoute] = []
+                try:
+                    if backup:
+                        result, winner = await self._hedged(primary, backup, attempt, decision, started)
+                    else:
+                        result, winner = await attempt(primary), primary
+                except Exception as e:
+                    logger.warning(f"[ROUTER] {capability}: {primary.alias} failed: {e}")
+                    continue
+                finally:
+                    if backup in started:
+                        queue.remove(backup)  # Already tried as the hedge
+                decision.winner = winner.alias
+                decision.success = True
+                return result, winner
+            raise RuntimeError(f"Every model for {capability} failed or is unavailable ({len(candidates)} candidates)")
+        finally:
+            self._log(decision)
+
+    async def _hedged(
+        self,
+        primary: ModelRoute,
+        backup: ModelRoute,
+        attempt: Callable[[ModelRoute], Awaitable[T]],
+        decision: RoutingDecision,
+        started: List[ModelRoute],
+    ) -> Tuple[T, ModelRoute]:
+        """Start primary; after its hedge deadline also start backup. First success wins."""
+        delay_ms = self.hedge_delay_ms(primary.alias)
+        decision.hedge_after_ms = round(delay_ms)
+        tasks = {asyncio.create_task(attempt(primary)): primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay_ms / 1000)
+            if not done:
+                decision.hedged_with = backup.alias
+                started.append(backup)
+                self.stats(backup.alias).hedges_started += 1
+                logger.info(f"[ROUTER] {primary.alias} slower than {delay_ms:.0f}ms, hedging with {backup.alias}")
+                tasks[asyncio.create_task(attempt(backup))] = backup
+
+            errors = []
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        if winner is backup:
+                            self.stats(backup.alias).hedges_won += 1
+                        return task.result(), winner
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            losers = [task for task in tasks if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def _log(self, decision: RoutingDecision) -> None:
+        self.decisions.append(decision)
+        logger.debug(
+            f"[ROUTER] {decision.capability}/{decision.objective}: chose {decision.chosen}, "
+            f"winner {decision.winner}, hedged_with {decision.hedged_with}"
+        )
+        path = settings.MODEL_ROUTER_DECISION_LOG_PATH
+        if path:
+            # File I/O stays off the event loop
+            if self._log_writer is None:
+                self._log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="router-log")
+            self._log_writer.submit(self._append_decision, path, json.dumps(asdict(decision), default=str))
+
+    @staticmethod
+    def _append_decision(path: str, line: str) -> None:
+        try:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"[ROUTER] Could not write decision log: {e}")
+
+    @staticmethod
+    def replay(
+        decisions: List[Dict[str, Any]],
+        objective: Optional[RoutingObjective] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Re-score recorded decisions (dicts, e.g. lines of the JSONL log).
+
+        Returns, per decision, what was chosen then and what the current
+        scoring picks under `objective` (default: the original one).
+        """
+        results = []
+        for d in decisions:
+            target = objective or RoutingObjective(d["objective"])
+            available = [c for c in d["candidates"] if c["available"]]
+            rescored = sorted(available, key=lambda c: score(c["snapshot"], target, c["declared_rank"]))
+            replayed = rescored[0]["alias"] if rescored else None
+            results.append({
+                "decision_id": d["decision_id"],
+                "objective": target.value,
+                "original": d["chosen"],
+                "replayed": replayed,
+                "changed": replayed != d["chosen"],
+            })
+        return results
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Per-model stats and recent decisions for health endpoints."""
+        recent = list(self.decisions)[-20:]
+        return {
+            "models": {alias: s.summary() for alias, s in sorted(self._stats.items())},
+            "decisions_logged": len(self.decisions),
+            "recent_decisions": [
+                {
+                    "capability": d.capability,
+                    "objective": d.objective,
+                    "chosen": d.chosen,
+                    "winner": d.winner,
+                    "hedged_with": d.hedged_with,
+                    "success": d.success,
+                }
+                for d in recent
+            ],
+        }
+
+
+# Global router instance
+model_router = ModelRouter()
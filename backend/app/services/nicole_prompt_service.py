@@ -17,6 +17,7 @@ from typing import List, Optional, Dict, Any
 from anthropic import AsyncAnthropic
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 
 
 logger = logging.getLogger(__name__)
@@ -83,7 +84,7 @@ class NicolePromptService:
     
     def __init__(self):
         """Initialize Nicole's prompt service."""
-        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=governed_http_client())
         logger.info("NicolePromptService initialized")
     
     def _get_nicole_system_prompt(self) -> str:
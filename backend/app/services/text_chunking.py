@@ -0,0 +1,423 @@
+"""
+Nicole V7 Text Chunking
+
+Structure-aware, token-measured chunking for embedding and retrieval.
+
+The text is first split into blocks - headings, fenced code, tables and
+paragraphs - and each block is tokenized once, keeping the character offset
+of every token. Chunks are packed from those blocks up to a token budget;
+overlap windows and splits of oversized blocks are cut at precomputed token
+offsets rather than by re-splitting strings.
+
+- Headings start a new chunk and are tracked as a section path
+  ("Setup > Install") carried on every chunk below them.
+- Code blocks and tables are kept whole when they fit; when they do not,
+  they are split on line boundaries and tables repeat their header row.
+- iter_chunks() is a generator, so callers can embed and store chunks as
+  they are produced. Nothing is dropped for long documents.
+
+Token counts use tiktoken (cl100k_base, the tokenizer of the OpenAI
+embedding models) when installed, otherwise a regex approximation.
+
+Usage:
+    from app.services.text_chunking import iter_chunks
+
+    for chunk in iter_chunks(text, max_tokens=512, overlap_tokens=64):
+        ...
+
+Author: Nicole V7 Architecture
+"""
+
+import bisect
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+    TIKTOKEN_AVAILABLE = True
+except Exception:  # ImportError, or encoding files unavailable offline
+    _ENCODING = None
+    TIKTOKEN_AVAILABLE = False
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+DEFAULT_MAX_TOKENS = 512
+DEFAULT_OVERLAP_TOKENS = 64
+
+BLOCK_HEADING = "heading"
+BLOCK_CODE = "code"
+BLOCK_TABLE = "table"
+BLOCK_PARAGRAPH = "paragraph"
+
+# Kinds that are split on line boundaries when oversized
+LINE_ORIENTED_KINDS = {BLOCK_CODE, BLOCK_TABLE}
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+_TABLE_LINE_RE = re.compile(r"^\s*\|")
+_SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]?\s")
+
+# Fallback tokenizer: short letter runs, digit groups, and punctuation,
+# which tracks cl100k_base counts closely enough for budgeting
+_APPROX_TOKEN_RE = re.compile(r"[^\W\d_]{1,6}|\d{1,3}|[^\w\s]")
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class TextChunk:
+    """One chunk ready for embedding."""
+    index: int
+    content: str
+    token_count: int
+    section: str  # Heading path, e.g. "Setup > Install" ("" before any heading)
+    kinds: Tuple[str, ...]  # Block kinds contained, in order
+
+
+@dataclass
+class _Block:
+    """A structural unit of the source text with precomputed token offsets."""
+    kind: str
+    text: str
+    section: str
+    offsets: List[int] = field(default_factory=list)  # Start char of each token
+    header: str = ""  # Table header lines repeated on continuation pieces
+    level: int = 0  # Heading level
+
+    @property
+    def tokens(self) -> int:
+        return len(self.offsets)
+
+    def char_at(self, token_index: int) -> int:
+        """Character offset where token `token_index` starts (len(text) at the end)."""
+        return self.offsets[token_index] if token_index < len(self.offsets) else len(self.text)
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[self.char_at(start):self.char_at(end)]
+
+
+# (block, start token, end token)
+_Piece = Tuple[_Block, int, int]
+
+
+# =============================================================================
+# TOKENIZATION
+# =============================================================================
+
+def token_offsets(text: str) -> List[int]:
+    """Start character offset of every token in `text`."""
+    if not text:
+        return []
+    if _ENCODING is not None:
+        tokens = _ENCODING.encode(text, disallowed_special=())
+        _, offsets = _ENCODING.decode_with_offsets(tokens)
+        return offsets
+    return [m.start() for m in _APPROX_TOKEN_RE.finditer(text)]
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` using the same tokenizer as the chunker."""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return sum(1 for _ in _APPROX_TOKEN_RE.finditer(text))
+
+
+# =============================================================================
+# BLOCK PARSING
+# =============================================================================
+
+def iter_blocks(source: Union[str, Iterable[str]]) -> Iterator[_Block]:
+    """
+    Split text into heading, code, table and paragraph blocks.
+
+    `source` may be a string or any iterable of lines (e.g. a file object),
+    so large inputs can be parsed without holding them in memory.
+    """
+    lines = source.splitlines() if isinstance(source, str) else (l.rstrip("\r\n") for l in source)
+
+    headings: List[Tuple[int, str]] = []
+    buffer: List[str] = []
+    kind = BLOCK_PARAGRAPH
+    fence: Optional[str] = None
+
+    def section() -> str:
+        return " > ".join(title for _, title in headings)
+
+    def flush() -> Optional[_Block]:
+        nonlocal buffer, kind
+        text = "\n".join(buffer).strip("\n")
+        block_kind = kind
+        buffer, kind = [], BLOCK_PARAGRAPH
+        if not text.strip():
+            return None
+        block = _Block(kind=block_kind, text=text, section=section())
+        if block_kind == BLOCK_TABLE:
+            table_lines = text.split("\n")
+            # Header row plus the |---| separator, when present
+            if len(table_lines) > 1 and set(table_lines[1].replace("|", "").strip()) <= set("-: "):
+                block.header = "\n".join(table_lines[:2])
+        return block
+
+    for line in lines:
+        # Inside a fenced code block: everything up to the closing fence
+        if fence is not None:
+            buffer.append(line)
+            if line.strip().startswith(fence):
+                fence = None
+                block = flush()
+                if block:
+                    yield block
+            continue
+
+        fence_match = _FENCE_RE.match(line)
+        if fence_match:
+            block = flush()
+            if block:
+                yield block
+            fence = fence_match.group(1)
+            kind = BLOCK_CODE
+            buffer.append(line)
+            continue
+
+        heading_match = _HEADING_RE.match(line)
+        if heading_match:
+            block = flush()
+            if block:
+                yield block
+            level = len(heading_match.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, heading_match.group(2)))
+            yield _Block(kind=BLOCK_HEADING, text=line.strip(), section=section(), level=level)
+            continue
+
+        is_table_line = bool(_TABLE_LINE_RE.match(line))
+        if is_table_line != (kind == BLOCK_TABLE) and buffer:
+            block = flush()
+            if block:
+                yield block
+        if is_table_line:
+            kind = BLOCK_TABLE
+
+        if not line.strip():
+            block = flush()
+            if block:
+                yield block
+            continue
+
+        buffer.append(line)
+
+    # Unterminated fences and trailing paragraphs
+    block = flush()
+    if block:
+        yield block
+
+
+# =============================================================================
+# CHUNKING
+# =============================================================================
+
+def _snap_end(block: _Block, start: int, end: int) -> int:
+    """
+    Move a split point back to a natural boundary inside [start, end).
+
+    Line-oriented blocks break after a newline; prose breaks after a
+    sentence end, then after any whitespace. Only the last half of the
+    window is searched so pieces stay close to the budget.
+    """
+    if end >= block.tokens:
+        return block.tokens
+    lo_char = block.char_at(start + (end - start) // 2)
+    hi_char = block.char_at(end)
+    window = block.text[lo_char:hi_char]
+
+    if block.kind in LINE_ORIENTED_KINDS:
+        cut = window.rfind("\n")
+        cut = lo_char + cut + 1 if cut >= 0 else -1
+    else:
+        matches = list(_SENTENCE_END_RE.finditer(window))
+        cut = lo_char + matches[-1].end() if matches else -1
+
+    if cut <= block.char_at(start):
+        return end
+    # First token starting at or after the cut
+    snapped = bisect.bisect_left(block.offsets, cut, start, end)
+    return snapped if snapped > start else end
+
+
+def _render(pieces: List[_Piece]) -> str:
+    parts = []
+    for block, start, end in pieces:
+        text = block.slice(start, end).strip()
+        # Continuation pieces of a table repeat its header row
+        if block.kind == BLOCK_TABLE and start > 0 and block.header:
+            text = f"{block.header}\n{text}"
+        if text:
+            parts.append(text)
+    return "\n\n".join(parts)
+
+
+def _overlap_tail(pieces: List[_Piece], overlap_tokens: int) -> List[_Piece]:
+    """Last `overlap_tokens` tokens of a chunk, as pieces (no re-splitting)."""
+    tail: List[_Piece] = []
+    need = overlap_tokens
+    for block, start, end in reversed(pieces):
+        if need <= 0 or block.kind == BLOCK_HEADING:
+            break
+        take = min(need, end - start)
+        tail.insert(0, (block, _snap_start(block, end - take, end), end))
+        need -= take
+    return tail
+
+
+def _snap_start(block: _Block, start: int, end: int) -> int:
+    """Advance an overlap start to a line start for line-oriented blocks."""
+    if block.kind not in LINE_ORIENTED_KINDS or start == 0:
+        return start
+    newline = block.text.find("\n", block.char_at(start), block.char_at(end))
+    if newline < 0:
+        return start
+    snapped = bisect.bisect_left(block.offsets, newline + 1, start, end)
+    return snapped if snapped < end else start
+
+
+def iter_chunks(
+    source: Union[str, Iterable[str]],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> Iterator[TextChunk]:
+    """
+    Yield token-bounded chunks of `source` in order.
+
+    Args:
+        source: Text, or an iterable of lines
+        max_tokens: Token budget per chunk
+        overlap_tokens: Tokens carried over from the previous chunk within
+            the same section (never across a heading)
+
+    Yields:
+        TextChunk objects with sequential indexes
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+
+    index = 0
+    pieces: List[_Piece] = []
+    used = 0
+    fresh = 0  # Tokens in `pieces` that are not overlap
+
+    def emit(force: bool = False) -> Optional[TextChunk]:
+        """Close the current chunk; `force` also closes one holding only headings."""
+        nonlocal index
+        if not fresh and not (force and pieces):
+            return None
+        content = _render(pieces)
+        if not content:
+            return None
+        chunk = TextChunk(
+            index=index,
+            content=content,
+            token_count=used,
+            section=next((b.section for b, _, _ in pieces if b.kind != BLOCK_HEADING), pieces[0][0].section),
+            kinds=tuple(dict.fromkeys(b.kind for b, _, _ in pieces)),
+        )
+        index += 1
+        return chunk
+
+    def add(block: _Block, start: int, end: int, is_fresh: bool = True) -> None:
+        nonlocal used, fresh
+        # Extend the previous piece when it is the same block and contiguous
+        if pieces and pieces[-1][0] is block and pieces[-1][2] == start:
+            pieces[-1] = (block, pieces[-1][1], end)
+        else:
+            pieces.append((block, start, end))
+        used += end - start
+        if is_fresh:
+            fresh += end - start
+
+    def restart(with_overlap: bool) -> None:
+        nonlocal pieces, used, fresh
+        pieces = _overlap_tail(pieces, overlap_tokens) if with_overlap else []
+        used = sum(e - s for _, s, e in pieces)
+        fresh = 0
+
+    for block in iter_blocks(source):
+        block.offsets = token_offsets(block.text)
+        if not block.tokens:
+            continue
+
+        if block.kind == BLOCK_HEADING:
+            chunk = emit()
+            if chunk:
+                yield chunk
+            restart(with_overlap=False)
+            add(block, 0, block.tokens, is_fresh=False)
+            continue
+
+        # Whole block fits in the current chunk
+        if used + block.tokens <= max_tokens:
+            add(block, 0, block.tokens)
+            continue
+
+        # Block fits in a fresh chunk: close the current one first. With
+        # nothing emitted yet the pieces are pending headings, which go out
+        # as their own chunk rather than being cleared
+        if block.tokens <= max_tokens:
+            chunk = emit()
+            if chunk:
+                yield chunk
+            elif pieces:
+                heading_chunk = emit(force=True)
+                if heading_chunk:
+                    yield heading_chunk
+            restart(with_overlap=bool(chunk))
+            while pieces and used + block.tokens > max_tokens:
+                _, s, e = pieces.pop(0)
+                used -= e - s
+            add(block, 0, block.tokens)
+            continue
+
+        # Oversized block: fill the current chunk, then continue in windows
+        start = 0
+        while start < block.tokens:
+            room = max_tokens - used
+            if room < max(16, max_tokens // 8):
+                chunk = emit(force=True)
+                if chunk:
+                    yield chunk
+                restart(with_overlap=bool(chunk) and fresh > 0)
+                room = max_tokens - used
+            end = _snap_end(block, start, min(block.tokens, start + room))
+            add(block, start, end)
+            start = end
+            if start < block.tokens:
+                chunk = emit()
+                if chunk:
+                    yield chunk
+                restart(with_overlap=True)
+
+    chunk = emit()
+    if chunk:
+        yield chunk
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> List[TextChunk]:
+    """List form of iter_chunks() for callers that need all chunks at once."""
+    return list(iter_chunks(text, max_tokens=max_tokens, overlap_tokens=overlap_tokens))
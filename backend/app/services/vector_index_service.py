@@ -0,0 +1,607 @@
+"""
+Nicole V7 Vector Index Service - Tiger Native
+
+Owns the ANN indexes on Nicole's vector tables and the query patterns that
+use them:
+- Index migrations for HNSW (pgvector) or StreamingDiskANN (pgvectorscale)
+- Per-query search tuning (hnsw.ef_search / diskann search list size)
+- Filtered-search strategies for the per-user predicate
+- Two-phase retrieval: ids + scores first, payload only for the winners
+
+Tables managed:
+- document_chunks (user_id denormalized from document_repository)
+- memory_entries (active rows only)
+
+Filter strategies:
+1. exact     → Small per-user corpus: scan the user's rows via btree, sort exactly
+2. iterative → Large corpus with pgvector >= 0.8 or DiskANN: index scan keeps
+               going until enough rows pass the user filter
+3. oversample → Older pgvector: raise ef_search by the inverse filter selectivity
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.config import settings
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+STRATEGY_EXACT = "exact"
+STRATEGY_ITERATIVE = "iterative"
+STRATEGY_OVERSAMPLE = "oversample"
+
+# How long cached catalog lookups (capabilities, row counts) stay valid
+CAPABILITY_TTL_SECONDS = 600
+ROW_COUNT_TTL_SECONDS = 300
+
+# HNSW build parameters (pgvector defaults are m=16, ef_construction=64)
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass(frozen=True)
+class VectorTableSpec:
+    """Describes a vector table and how its rows are scoped to a user."""
+    table: str
+    id_column: str
+    embedding_column: str = "embedding"
+    user_column: str = "user_id"
+    payload_columns: Sequence[str] = ()
+    predicate: str = ""  # Extra filter that matches the partial index, if any
+    index_prefix: str = ""
+
+
+DOCUMENT_CHUNKS = VectorTableSpec(
+    table="document_chunks",
+    id_column="chunk_id",
+    payload_columns=("doc_id", "chunk_index", "content"),
+    index_prefix="idx_chunks_embedding",
+)
+
+MEMORY_ENTRIES = VectorTableSpec(
+    table="memory_entries",
+    id_column="memory_id",
+    payload_columns=("content", "memory_type", "category", "confidence", "importance", "created_at"),
+    predicate="archived_at IS NULL",
+    index_prefix="idx_memory_embedding",
+)
+
+
+# =============================================================================
+# MIGRATIONS
+# =============================================================================
+
+# Schema changes the ANN strategies depend on (mirrors 036_vector_ann_indexes.sql)
+SCHEMA_MIGRATIONS: List[str] = [
+    "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS user_id BIGINT",
+    """
+    UPDATE document_chunks dc
+    SET user_id = dr.user_id
+    FROM document_repository dr
+    WHERE dr.doc_id = dc.doc_id
+      AND dc.user_id IS NULL
+    """,
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_user ON document_chunks (user_id, chunk_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_user_id_active ON memory_entries (user_id, memory_id) WHERE archived_at IS NULL",
+]
+
+
+def _index_ddl(spec: VectorTableSpec, method: str) -> str:
+    """Build the CREATE INDEX statement for a table and access method."""
+    where = f" WHERE {spec.predicate}" if spec.predicate else ""
+    if method == "diskann":
+        return (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {spec.index_prefix}_diskann "
+            f"ON {spec.table} USING diskann ({spec.embedding_column} vector_cosine_ops){where}"
+        )
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {spec.index_prefix}_hnsw "
+        f"ON {spec.table} USING hnsw ({spec.embedding_column} vector_cosine_ops) "
+        f"WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION}){where}"
+    )
+
+
+# =============================================================================
+# VECTOR INDEX SERVICE
+# =============================================================================
+
+class VectorIndexService:
+    """
+    ANN index management and tuned vector search for Tiger Postgres.
+
+    Capabilities (extension versions, denormalized columns, index methods)
+    are detected once and cached so the hot path only issues the search
+    queries themselves.
+    """
+
+    def __init__(self):
+        self._capabilities: Optional[Dict[str, Any]] = None
+        self._capabilities_at = 0.0
+        self._row_counts: Dict[tuple, tuple] = {}
+        self._table_sizes: Dict[str, tuple] = {}
+
+    # =========================================================================
+    # MIGRATIONS
+    # =========================================================================
+
+    async def apply_migrations(
+        self,
+        method: Optional[str] = None,
+        specs: Sequence[VectorTableSpec] = (DOCUMENT_CHUNKS, MEMORY_ENTRIES),
+    ) -> Dict[str, str]:
+        """
+        Apply schema changes and build ANN indexes.
+
+        Index builds use CONCURRENTLY so they cannot run inside a
+        transaction; each statement is executed on its own.
+
+        Args:
+            method: "hnsw" or "diskann" (defaults to VECTOR_INDEX_METHOD)
+            specs: Tables to index
+
+        Returns:
+            Dict of statement label -> "ok" or error text
+        """
+        method = (method or settings.VECTOR_INDEX_METHOD).lower()
+        results: Dict[str, str] = {}
+
+        statements = [(f"schema_{i}", sql) for i, sql in enumerate(SCHEMA_MIGRATIONS)]
+        statements += [(f"{spec.table}_{method}", _index_ddl(spec, method)) for spec in specs]
+
+        for label, sql in statements:
+            try:
+                await db.execute(sql)
+                results[label] = "ok"
+            except Exception as e:
+                logger.error(f"[VECTOR] Migration {label} failed: {e}")
+                results[label] = f"error: {str(e)[:100]}"
+
+        self._capabilities = None  # Force re-detection
+        return results
+
+    async def index_status(self) -> List[Dict[str, Any]]:
+        """List vector indexes on the managed tables with their sizes."""
+        rows = await db.fetch(
+            """
+            SELECT
+                i.tablename,
+                i.indexname,
+                am.amname AS method,
+                pg_relation_size(c.oid) AS size_bytes
+            FROM pg_indexes i
+            JOIN pg_class c ON c.relname = i.indexname
+            JOIN pg_am am ON am.oid = c.relam
+            WHERE i.tablename = ANY($1::text[])
+              AND am.amname IN ('hnsw', 'diskann', 'ivfflat')
+            ORDER BY i.tablename, i.indexname
+            """,
+            [DOCUMENT_CHUNKS.table, MEMORY_ENTRIES.table],
+        )
+        return [dict(r) for r in rows]
+
+    # =========================================================================
+    # CAPABILITY DETECTION
+    # =========================================================================
+
+    async def get_capabilities(self) -> Dict[str, Any]:
+        """Detect extension versions, ANN methods and denormalized columns."""
+        now = time.monotonic()
+        if self._capabilities and now - self._capabilities_at < CAPABILITY_TTL_SECONDS:
+            return self._capabilities
+
+        caps: Dict[str, Any] = {
+            "vector_version": None,
+            "vectorscale_version": None,
+            "iterative_scan": False,
+            "chunks_have_user_id": False,
+            "methods": {},
+        }
+
+        try:
+            row = await db.fetchrow(
+                """
+                SELECT
+                    (SELECT extversion FROM pg_extension WHERE extname = 'vector') AS vector_version,
+                    (SELECT extversion FROM pg_extension WHERE extname = 'vectorscale') AS vectorscale_version,
+                    EXISTS (
+                        SELECT 1 FROM information_schema.columns
+                        WHERE table_name = 'document_chunks' AND column_name = 'user_id'
+                    ) AS chunks_have_user_id
+                """
+            )
+            caps["vector_version"] = row["vector_version"]
+            caps["vectorscale_version"] = row["vectorscale_version"]
+            caps["chunks_have_user_id"] = bool(row["chunks_have_user_id"])
+            caps["iterative_scan"] = self._version_at_least(row["vector_version"], (0, 8))
+
+            method_rows = await db.fetch(
+                """
+                SELECT c2.relname AS tablename, am.amname AS method
+                FROM pg_index ix
+                JOIN pg_class c ON c.oid = ix.indexrelid
+                JOIN pg_class c2 ON c2.oid = ix.indrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE c2.relname = ANY($1::text[])
+                  AND am.amname IN ('hnsw', 'diskann', 'ivfflat')
+                """,
+                [DOCUMENT_CHUNKS.table, MEMORY_ENTRIES.table],
+            )
+            # Prefer the strongest available method per table
+            preference = {"diskann": 3, "hnsw": 2, "ivfflat": 1}
+            for r in method_rows:
+                current = caps["methods"].get(r["tablename"])
+                if not current or preference[r["method"]] > preference[current]:
+                    caps["methods"][r["tablename"]] = r["method"]
+
+        except Exception as e:
+            logger.warning(f"[VECTOR] Capability detection failed: {e}")
+
+        self._capabilities = caps
+        self._capabilities_at = now
+        return caps
+
+    @staticmethod
+    def _version_at_least(version: Optional[str], minimum: tuple) -> bool:
+        """Compare an extension version string against a (major, minor) tuple."""
+        if not version:
+            return False
+        try:
+            parts = tuple(int(p) for p in version.split(".")[:2])
+            return parts >= minimum
+        except ValueError:
+            return False
+
+    async def _user_row_count(self, spec: VectorTableSpec, user_id: int) -> int:
+        """Cached count of a user's rows (served by the user btree index)."""
+        key = (spec.table, user_id)
+        cached = self._row_counts.get(key)
+        if cached and time.monotonic() - cached[1] < ROW_COUNT_TTL_SECONDS:
+            return cached[0]
+
+        where = f" AND {spec.predicate}" if spec.predicate else ""
+        if spec is DOCUMENT_CHUNKS and not (await self.get_capabilities())["chunks_have_user_id"]:
+            count = await db.fetchval(
+                """
+                SELECT COUNT(*) FROM document_chunks dc
+                JOIN document_repository dr ON dr.doc_id = dc.doc_id
+                WHERE dr.user_id = $1
+                """,
+                user_id,
+            )
+        else:
+            count = await db.fetchval(
+                f"SELECT COUNT(*) FROM {spec.table} WHERE {spec.user_column} = $1{where}",
+                user_id,
+            )
+
+        self._row_counts[key] = (count or 0, time.monotonic())
+        return count or 0
+
+    async def _table_size(self, spec: VectorTableSpec) -> int:
+        """Planner estimate of total rows (pg_class.reltuples, no table scan)."""
+        cached = self._table_sizes.get(spec.table)
+        if cached and time.monotonic() - cached[1] < ROW_COUNT_TTL_SECONDS:
+            return cached[0]
+
+        estimate = await db.fetchval(
+            "SELECT GREATEST(reltuples, 0)::BIGINT FROM pg_class WHERE relname = $1",
+            spec.table,
+        )
+        self._table_sizes[spec.table] = (estimate or 0, time.monotonic())
+        return estimate or 0
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop cached row counts for a user after bulk inserts or deletes."""
+        for key in [k for k in self._row_counts if k[1] == user_id]:
+            self._row_counts.pop(key, None)
+
+    # =========================================================================
+    # STRATEGY SELECTION
+    # =========================================================================
+
+    async def choose_strategy(self, spec: VectorTableSpec, user_id: int) -> str:
+        """
+        Pick a filtered-search strategy for the user predicate.
+
+        Exact scans over a small per-user slice beat any ANN index and give
+        perfect recall. Past the threshold, use iterative index scans when
+        the extension supports them, otherwise oversample via ef_search.
+        """
+        caps = await self.get_capabilities()
+        if not caps["methods"].get(spec.table):
+            return STRATEGY_EXACT
+
+        user_rows = await self._user_row_count(spec, user_id)
+        if user_rows <= settings.VECTOR_EXACT_SCAN_MAX_ROWS:
+            return STRATEGY_EXACT
+
+        method = caps["methods"][spec.table]
+        if method == "diskann" or (method == "hnsw" and caps["iterative_scan"]):
+            return STRATEGY_ITERATIVE
+        return STRATEGY_OVERSAMPLE
+
+    async def _tuned_ef_search(
+        self,
+        spec: VectorTableSpec,
+        user_id: int,
+        limit: int,
+        ef_search: Optional[int],
+        strategy: str,
+    ) -> int:
+        """Compute the candidate list size for this query."""
+        ef = ef_search or max(settings.VECTOR_EF_SEARCH, limit * 2)
+
+        if strategy == STRATEGY_OVERSAMPLE:
+            # Without iterative scans the index returns at most ef candidates
+            # before the user filter is applied, so scale by selectivity.
+            total = await self._table_size(spec)
+            user_rows = await self._user_row_count(spec, user_id)
+            if total and user_rows:
+                ef = int(math.ceil(ef * max(1.0, total / user_rows)))
+
+        return max(limit, min(ef, settings.VECTOR_MAX_EF_SEARCH))
+
+    async def _apply_search_settings(
+        self,
+        conn: Any,
+        spec: VectorTableSpec,
+        strategy: str,
+        ef_search: int,
+    ) -> None:
+        """Set transaction-local search GUCs for the table's index method."""
+        caps = await self.get_capabilities()
+        method = caps["methods"].get(spec.table)
+
+        if method == "hnsw":
+            await conn.execute("SELECT set_config('hnsw.ef_search', $1, true)", str(ef_search))
+            if strategy == STRATEGY_ITERATIVE:
+                await conn.execute("SELECT set_config('hnsw.iterative_scan', 'relaxed_order', true)")
+        elif method == "diskann":
+            await conn.execute(
+                "SELECT set_config('diskann.query_search_list_size', $1, true)",
+                str(ef_search),
+            )
+        elif method == "ivfflat":
+            probes = max(1, ef_search // 10)
+            await conn.execute("SELECT set_config('ivfflat.probes', $1, true)", str(probes))
+
+    # =========================================================================
+    # SEARCH
+    # =========================================================================
+
+    def _candidate_sql(
+        self,
+        spec: VectorTableSpec,
+        strategy: str,
+        join_documents: bool,
+        extra_where: str = "",
+    ) -> str:
+        """
+        Build the phase-1 query that returns ids and scores only.
+
+        Params: $1 query vector, $2 user id, $3 limit.
+        """
+        emb = f"t.{spec.embedding_column}"
+        conditions = [f"{emb} IS NOT NULL"]
+        if spec.predicate:
+            conditions.append(f"t.{spec.predicate}")
+        if extra_where:
+            conditions.append(extra_where)
+
+        if join_documents:
+            source = f"{spec.table} t JOIN document_repository dr ON dr.doc_id = t.doc_id"
+            conditions.insert(0, "dr.user_id = $2")
+        else:
+            source = f"{spec.table} t"
+            conditions.insert(0, f"t.{spec.user_column} = $2")
+
+        where = " AND ".join(conditions)
+
+        if strategy == STRATEGY_EXACT:
+            # MATERIALIZED stops the planner from pushing the ORDER BY into
+            # the ANN index; the user's slice is scanned and sorted exactly.
+            return f"""
+                WITH user_rows AS MATERIALIZED (
+                    SELECT t.{spec.id_column} AS id, {emb} AS embedding
+                    FROM {source}
+                    WHERE {where}
+                )
+                SELECT id, 1 - (embedding <=> $1::vector) AS score
+                FROM user_rows
+                ORDER BY embedding <=> $1::vector
+                LIMIT $3
+            """
+
+        # Relaxed-order iterative scans may return slightly out-of-order
+        # results, so re-sort the materialized candidates.
+        return f"""
+            WITH candidates AS MATERIALIZED (
+                SELECT t.{spec.id_column} AS id, {emb} <=> $1::vector AS distance
+                FROM {source}
+                WHERE {where}
+                ORDER BY {emb} <=> $1::vector
+                LIMIT $3
+            )
+            SELECT id, 1 - distance AS score
+            FROM candidates
+            ORDER BY distance
+        """
+
+    async def search_ids(
+        self,
+        spec: VectorTableSpec,
+        user_id: int,
+        embedding_str: str,
+        limit: int = 10,
+        ef_search: Optional[int] = None,
+        strategy: Optional[str] = None,
+        extra_where: str = "",
+        extra_args: Sequence[Any] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Phase 1: nearest-neighbour ids and scores for one user.
+
+        Args:
+            spec: Table to search
+            user_id: Tiger user ID (filter predicate)
+            embedding_str: Query vector in pgvector text format
+            limit: Number of neighbours to return
+            ef_search: Override candidate list size
+            strategy: Force a filter strategy (exact/iterative/oversample)
+            extra_where: Additional predicate using params $4+ and alias t
+            extra_args: Values for extra_where params
+
+        Returns:
+            List of {"id", "score"} ordered by score descending
+        """
+        strategy = strategy or await self.choose_strategy(spec, user_id)
+        ef = await self._tuned_ef_search(spec, user_id, limit, ef_search, strategy)
+
+        join_documents = (
+            spec is DOCUMENT_CHUNKS
+            and not (await self.get_capabilities())["chunks_have_user_id"]
+        )
+        sql = self._candidate_sql(spec, strategy, join_documents, extra_where)
+
+        started = time.perf_counter()
+        async with db.transaction() as conn:
+            if strategy != STRATEGY_EXACT:
+                await self._apply_search_settings(conn, spec, strategy, ef)
+            rows = await conn.fetch(sql, embedding_str, user_id, limit, *extra_args)
+
+        logger.debug(
+            f"[VECTOR] {spec.table} user={user_id} strategy={strategy} ef={ef} "
+            f"hits={len(rows)} {1000 * (time.perf_counter() - started):.1f}ms"
+        )
+        return [{"id": r["id"], "score": float(r["score"])} for r in rows]
+
+    async def fetch_payloads(
+        self,
+        spec: VectorTableSpec,
+        ids: Sequence[int],
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[int, Dict[str, Any]]:
+        """Phase 2: fetch payload columns for the winning ids only."""
+        if not ids:
+            return {}
+
+        cols = ", ".join([spec.id_column, *(columns or spec.payload_columns)])
+        rows = await db.fetch(
+            f"SELECT {cols} FROM {spec.table} WHERE {spec.id_column} = ANY($1::bigint[])",
+            list(ids),
+        )
+        return {r[spec.id_column]: dict(r) for r in rows}
+
+    async def search_document_chunks(
+        self,
+        user_id: int,
+        embedding_str: str,
+        limit: int = 5,
+        min_score: float = 0.3,
+        ef_search: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Two-phase semantic search over a user's document chunks.
+
+        Returns:
+            List of chunk dicts (chunk_id, doc_id, title, content, score)
+        """
+        hits = await self.search_ids(
+            DOCUMENT_CHUNKS, user_id, embedding_str, limit=limit, ef_search=ef_search,
+        )
+        hits = [h for h in hits if h["score"] > min_score]
+        if not hits:
+            return []
+
+        rows = await db.fetch(
+            """
+            SELECT dc.chunk_id, dc.doc_id, dc.content, dr.title
+            FROM document_chunks dc
+            JOIN document_repository dr ON dr.doc_id = dc.doc_id
+            WHERE dc.chunk_id = ANY($1::bigint[])
+            """,
+            [h["id"] for h in hits],
+        )
+        payloads = {r["chunk_id"]: r for r in rows}
+
+        results = []
+        for hit in hits:
+            row = payloads.get(hit["id"])
+            if row:
+                results.append({
+                    "chunk_id": row["chunk_id"],
+                    "doc_id": row["doc_id"],
+                    "title": row["title"],
+                    "content": row["content"],
+                    "score": hit["score"],
+                })
+        return results
+
+    async def search_memories(
+        self,
+        user_id: int,
+        embedding_str: str,
+        limit: int = 10,
+        exclude_ids: Optional[Sequence[int]] = None,
+        min_score: float = 0.0,
+        columns: Optional[Sequence[str]] = None,
+        ef_search: Optional[int] = None,
+        since_days: Optional[int] = None,
+        min_confidence: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Two-phase semantic search over a user's active memories.
+
+        Args:
+            exclude_ids: Memory IDs to leave out of the results
+            since_days: Only consider memories created in the last N days
+            min_confidence: Only consider memories at or above this confidence
+
+        Returns:
+            List of memory dicts (memory_id, similarity, payload columns)
+        """
+        conditions: List[str] = []
+        extra_args: List[Any] = []
+        if exclude_ids:
+            extra_args.append(list(exclude_ids))
+            conditions.append(f"t.memory_id <> ALL(${3 + len(extra_args)}::bigint[])")
+        if since_days:
+            extra_args.append(since_days)
+            conditions.append(f"t.created_at > NOW() - make_interval(days => ${3 + len(extra_args)})")
+        if min_confidence is not None:
+            extra_args.append(Decimal(str(min_confidence)))
+            conditions.append(f"t.confidence >= ${3 + len(extra_args)}")
+
+        hits = await self.search_ids(
+            MEMORY_ENTRIES, user_id, embedding_str, limit=limit, ef_search=ef_search,
+            extra_where=" AND ".join(conditions), extra_args=extra_args,
+        )
+        hits = [h for h in hits if h["score"] >= min_score]
+        payloads = await self.fetch_payloads(MEMORY_ENTRIES, [h["id"] for h in hits], columns)
+
+        return [
+            {**payloads[h["id"]], "memory_id": h["id"], "similarity": h["score"]}
+            for h in hits
+            if h["id"] in payloads
+        ]
+
+
+# =============================================================================
+# GLOBAL INSTANCE
+# =============================================================================
+
+vector_index_service = VectorIndexService()
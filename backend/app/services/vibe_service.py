@@ -14,8 +14,10 @@ Version: 2.0.0
 
 import re
 import json
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Any, List, Optional, Tuple, TypeVar, Callable
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, TypeVar, Callable
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
@@ -27,6 +29,7 @@ from app.integrations.alphawave_claude import claude_client
 from app.integrations.alphawave_openai import openai_client
 from app.integrations.github_service import get_github_service, GitHubFile
 from app.integrations.vercel_service import get_vercel_service
+from app.services.file_blob_store import BlobNotFoundError, file_blob_store
 from app.services.vibe_agents import (
     AGENT_DEFINITIONS, AgentRole, get_agent, get_agent_with_skills,
     ARCHITECT_AGENT_PROMPT, CODING_AGENT_PROMPT, QA_AGENT_PROMPT, REVIEW_AGENT_PROMPT
@@ -927,6 +930,25 @@ def extract_json_from_response(response: str) -> Optional[Dict[str, Any]]:
     return None
 
 
+def _guess_filename(content: str, index: int) -> str:
+    """Name an unlabelled code block from its content (parser fallback)."""
+    # Check for component name
+    component_match = re.search(r'(?:export\s+(?:default\s+)?(?:function|const)\s+|const\s+)(\w+)', content)
+    if component_match:
+        name = component_match.group(1)
+        if name not in ('React', 'useState', 'useEffect', 'Component'):
+            return f"components/{name}.tsx"
+    
+    # Check for page-like content
+    if 'export default function' in content and ('Page' in content or 'Home' in content):
+        return "app/page.tsx"
+    elif 'tailwind' in content.lower() or '@tailwind' in content:
+        return "tailwind.config.ts"
+    elif 'globals' in content.lower() or 'body' in content:
+        return "app/globals.css"
+    return f"generated/file_{index + 1}.tsx"
+
+
 def parse_files_from_response(response: str) -> List[ParsedFile]:
     """
     Parse file contents from Claude's response.
@@ -1007,27 +1029,7 @@ def parse_files_from_response(response: str) -> List[ParsedFile]:
         for i, match in enumerate(fallback_pattern.finditer(response)):
             content = match.group(1).strip()
             if len(content) > 50:  # Only substantial code blocks
-                # Try to guess filename from content
-                filename = None
-                # Check for component name
-                component_match = re.search(r'(?:export\s+(?:default\s+)?(?:function|const)\s+|const\s+)(\w+)', content)
-                if component_match:
-                    name = component_match.group(1)
-                    if name not in ('React', 'useState', 'useEffect', 'Component'):
-                        filename = f"components/{name}.tsx"
-                
-                if not filename:
-                    # Check for page-like content
-                    if 'export default function' in content and ('Page' in content or 'Home' in content):
-                        filename = "app/page.tsx"
-                    elif 'tailwind' in content.lower() or '@tailwind' in content:
-                        filename = "tailwind.config.ts"
-                    elif 'globals' in content.lower() or 'body' in content:
-                        filename = "app/globals.css"
-                    else:
-                        filename = f"generated/file_{i + 1}.tsx"
-                
-                add_file(filename, content)
+                add_file(_guess_filename(content, i), content)
     
     if not files:
         logger.warning("[VIBE] No files parsed from build response. Response preview: %s...", 
@@ -1038,6 +1040,149 @@ def parse_files_from_response(response: str) -> List[ParsedFile]:
     return files
 
 
+# Header lines that name the file in the next code block (or, for
+# === name ===, the text up to the next separator)
+RE_STREAM_HEADER = re.compile(
+    rf'(?:\*\*([^\*\n]+\.{_FILE_EXT_PATTERN})\*\*'
+    rf'|`([^`\n]+\.{_FILE_EXT_PATTERN})`'
+    rf'|^#{{1,4}}\s*(.+\.{_FILE_EXT_PATTERN})'
+    rf'|File:\s*(.+\.{_FILE_EXT_PATTERN})'
+    rf'|^===\s*([^\s=]+\.{_FILE_EXT_PATTERN})\s*===)\s*$'
+)
+RE_STREAM_FENCE = re.compile(r'^```([\w.+-]*)(?::(.+))?\s*$')
+RE_STREAM_LINE_COMMENT = re.compile(rf'^//\s*(.+\.{_FILE_EXT_PATTERN})\s*$')
+RE_STREAM_BLOCK_COMMENT = re.compile(r'^/\*\s*([^\n\*]+\.(?:tsx?|jsx?|css))\s*\*/\s*$')
+_COMMENT_PATH_LANGS = {"ts", "tsx", "js", "jsx", "typescript", "javascript", "css", "json", "html"}
+_FALLBACK_LANGS = {"ts", "tsx", "js", "jsx", "typescript", "javascript", "css", "json", "html", "md", "py"}
+
+
+class StreamingFileParser:
+    """
+    Incremental version of parse_files_from_response for streamed output.
+    
+    feed() takes text chunks as they arrive and returns the files whose code
+    block closed in that chunk; finish() flushes the tail. Only the current
+    line and the open block are buffered, so memory is bounded by the
+    largest file rather than the whole response.
+    
+    Recognises the same formats in one pass: ```filepath:path fences,
+    **path** / `path` / ### path / File: path headers before a fence,
+    // path or /* path */ on a fence's first line, and === path === sections.
+    When a path appears more than once the first block wins. Unnamed
+    blocks are kept for the same fallback naming when nothing else matched.
+    """
+    
+    def __init__(self):
+        self._line = ""
+        self._header_path: Optional[str] = None
+        self._block: Optional[List[str]] = None  # Lines of the open fence
+        self._block_lang = ""
+        self._block_path: Optional[str] = None
+        self._section_path: Optional[str] = None  # Open === path === section
+        self._section: List[str] = []
+        self._unnamed: List[str] = []
+        self._seen_paths: set = set()
+        self.files: List[ParsedFile] = []
+    
+    def feed(self, text: str) -> List[ParsedFile]:
+        """Consume a chunk; returns files completed by it."""
+        emitted: List[ParsedFile] = []
+        *lines, self._line = (self._line + text).split("\n")
+        for line in lines:
+            self._consume(line, emitted)
+        return emitted
+    
+    def finish(self) -> List[ParsedFile]:
+        """Flush the last line and any open section; apply fallback naming."""
+        emitted: List[ParsedFile] = []
+        if self._line:
+            line, self._line = self._line, ""
+            self._consume(line, emitted)
+        if self._block is not None and self._block_path:
+            # Unterminated fence (e.g. max_tokens): keep what we have
+            self._add(self._block_path, "\n".join(self._block), emitted)
+        self._close_section(emitted)
+        if not self.files:
+            for i, content in enumerate(self._unnamed):
+                self._add(_guess_filename(content, i), content, emitted)
+        self._unnamed = []
+        return emitted
+    
+    def _consume(self, line: str, emitted: List[ParsedFile]) -> None:
+        if self._block is not None:
+            if line.lstrip().startswith("```"):
+                self._close_block(emitted)
+            elif not self._block and self._block_path is None and self._block_lang in _COMMENT_PATH_LANGS:
+                # First line may name the file: // path or /* path */
+                comment = RE_STREAM_LINE_COMMENT.match(line) or (
+                    RE_STREAM_BLOCK_COMMENT.match(line) if self._block_lang not in ("json", "html") else None
+                )
+                if comment:
+                    self._block_path = comment.group(1)
+                else:
+                    self._block.append(line)
+            else:
+                self._block.append(line)
+            return
+        
+        fence = RE_STREAM_FENCE.match(line)
+        if fence:
+            self._block = []
+            self._block_lang = fence.group(1).lower()
+            if fence.group(1) == "filepath":
+                self._block_path = fence.group(2)
+            else:
+                self._block_path = self._header_path or self._section_path
+            self._header_path = None
+            if self._block_path and self._block_path == self._section_path:
+                # === path === section whose content is a code block
+                self._section_path = None
+                self._section = []
+            return
+        
+        header = RE_STREAM_HEADER.search(line)
+        if header:
+            path = next(group for group in header.groups() if group)
+            if header.group(5):
+                self._close_section(emitted)
+                self._section_path = path
+            self._header_path = path
+            return
+        
+        if self._section_path is not None:
+            self._section.append(line)
+            if line.strip():
+                self._header_path = None
+        elif line.strip():
+            self._header_path = None
+    
+    def _close_block(self, emitted: List[ParsedFile]) -> None:
+        content = "\n".join(self._block)
+        if self._block_path:
+            self._close_section(emitted)
+            self._add(self._block_path, content, emitted)
+        elif self._block_lang in _FALLBACK_LANGS and len(content.strip()) > 50:
+            self._unnamed.append(content.strip())
+        self._block = None
+        self._block_path = None
+        self._block_lang = ""
+    
+    def _close_section(self, emitted: List[ParsedFile]) -> None:
+        if self._section_path is not None:
+            self._add(self._section_path, "\n".join(self._section), emitted)
+        self._section_path = None
+        self._section = []
+    
+    def _add(self, path: str, content: str, emitted: List[ParsedFile]) -> None:
+        path = path.strip().lstrip('/')
+        content = content.strip()
+        if path and content and path not in self._seen_paths and len(content) > 10:
+            parsed = ParsedFile(path=path, content=content, language=ParsedFile.detect_language(path))
+            self._seen_paths.add(path)
+            self.files.append(parsed)
+            emitted.append(parsed)
+
+
 # ============================================================================
 # SERVICE CLASS
 # ============================================================================
@@ -1058,6 +1203,9 @@ class VibeService:
     SONNET_MODEL = "claude-sonnet-4-5-20250929"  # Claude 4.5 Sonnet
     OPUS_MODEL = "claude-opus-4-5-20251101"       # Claude 4.5 Opus
     
+    # Streaming build: files per incremental save
+    BUILD_PERSIST_BATCH_SIZE = 4
+    
     def __init__(self):
         """Initialize the Vibe service."""
         self._inspiration_cache: Dict[int, List[Dict[str, Any]]] = {}  # project_id -> inspirations
@@ -1343,11 +1491,10 @@ class VibeService:
                 from app.mcp.alphawave_playwright_mcp import playwright_mcp
                 
                 if playwright_mcp.is_connected or await playwright_mcp.connect():
-                    # Navigate to URL
-                    await playwright_mcp.navigate(url, wait_until="networkidle")
-                    
-                    # Take screenshot
-                    result = await playwright_mcp.screenshot(full_page=False, format="png")
+                    # Same browser worker for navigate + screenshot
+                    with playwright_mcp.session(f"vibe-{project_id}-{url}"):
+                        await playwright_mcp.navigate(url, wait_until="networkidle")
+                        result = await playwright_mcp.screenshot(full_page=False, format="png")
                     
                     if result and not result.get("error"):
                         base64_data = result.get("data") or result.get("screenshot")
@@ -1794,93 +1941,106 @@ class VibeService:
         files: List[ParsedFile],
         user_id: Optional[int] = None,
         agent_name: Optional[str] = None,
-        conn=None
+        conn=None,
+        record_version: bool = True
     ) -> int:
         """
         Save multiple files with non-destructive upsert and change logging.
         
+        Changes are found by comparing content hashes in SQL (vibe_files.
+        content_hash), so only new or modified files are uploaded - one
+        unnest upsert plus one batched activity insert; unchanged files
+        cost nothing beyond the hash comparison.
+        
         Args:
             project_id: Project to save files for
             files: List of ParsedFile objects
             user_id: User performing the operation
             agent_name: AI agent name if applicable
             conn: Optional database connection for transaction support
+            record_version: Record the changed files as a new version
+                in the blob store (rollbacks record their own)
+        
+        Returns:
+            Number of files written (new or modified); unchanged files
+            are not counted
         """
         if not files:
             return 0
         
-        # Use provided connection or acquire new one
-        if conn:
-            existing_rows = await conn.fetch(
-                "SELECT file_path, content FROM vibe_files WHERE project_id = $1",
-                project_id
-            )
-        else:
-            existing_rows = await db.fetch(
-                "SELECT file_path, content FROM vibe_files WHERE project_id = $1",
-                project_id
-            )
-        existing_map = {r["file_path"]: r["content"] for r in existing_rows} if existing_rows else {}
+        # Use provided connection or the pool
+        executor = conn or db
         
-        count = 0
-        changes_to_log = []  # Collect changes to log after all files saved
+        # Last occurrence wins if a path appears twice
+        by_path = {f.path: f for f in files}
+        paths = list(by_path)
+        hashes = [hashlib.md5(by_path[path].content.encode()).hexdigest() for path in paths]
         
-        for f in files:
-            previous_content = existing_map.get(f.path)
-            
-            if conn:
-                await conn.execute(
-                    """
-                    INSERT INTO vibe_files (project_id, file_path, content, created_at, updated_at)
-                    VALUES ($1, $2, $3, NOW(), NOW())
-                    ON CONFLICT (project_id, file_path)
-                    DO UPDATE SET content = EXCLUDED.content, updated_at = NOW()
-                    """,
-                    project_id, f.path, f.content
-                )
-            else:
-                await db.execute(
-                    """
-                    INSERT INTO vibe_files (project_id, file_path, content, created_at, updated_at)
-                    VALUES ($1, $2, $3, NOW(), NOW())
-                    ON CONFLICT (project_id, file_path)
-                    DO UPDATE SET content = EXCLUDED.content, updated_at = NOW()
-                    """,
-                    project_id, f.path, f.content
-                )
-            count += 1
-            
-            # Track file changes for logging
-            if previous_content is None:
-                changes_to_log.append({
-                    "type": "added",
-                    "path": f.path,
-                    "metadata": {"path": f.path, "change": "added"}
-                })
-            elif previous_content != f.content:
-                changes_to_log.append({
-                    "type": "modified",
-                    "path": f.path,
-                    "metadata": {
-                        "path": f.path,
-                        "change": "modified",
-                        "previous_preview": previous_content[:200]
-                    }
-                })
+        # Same expression as the generated column (migration 042)
+        changed_rows = await executor.fetch(
+            """
+            SELECT n.file_path, f.file_id IS NULL AS is_new, left(f.content, 200) AS previous_preview
+            FROM unnest($2::text[], $3::text[]) AS n(file_path, content_hash)
+            LEFT JOIN vibe_files f ON f.project_id = $1 AND f.file_path = n.file_path
+            WHERE f.content_hash IS DISTINCT FROM n.content_hash
+            """,
+            project_id, paths, hashes
+        )
         
-        # Log all file changes (can be outside transaction, logging is non-critical)
-        for change in changes_to_log:
-            await self._log_activity(
+        if changed_rows:
+            changed_paths = [r["file_path"] for r in changed_rows]
+            await executor.execute(
+                """
+                INSERT INTO vibe_files (project_id, file_path, content, created_at, updated_at)
+                SELECT $1, u.file_path, u.content, NOW(), NOW()
+                FROM unnest($2::text[], $3::text[]) AS u(file_path, content)
+                ON CONFLICT (project_id, file_path)
+                DO UPDATE SET content = EXCLUDED.content, updated_at = NOW()
+                WHERE vibe_files.content_hash IS DISTINCT FROM md5(COALESCE(EXCLUDED.content, ''))
+                """,
+                project_id, changed_paths, [by_path[path].content for path in changed_paths]
+            )
+            
+            # Log all file changes in one insert (non-critical)
+            changes = []
+            for r in changed_rows:
+                if r["is_new"]:
+                    changes.append((
+                        f"File added: {r['file_path']}",
+                        {"path": r["file_path"], "change": "added"},
+                    ))
+                else:
+                    changes.append((
+                        f"File modified: {r['file_path']}",
+                        {
+                            "path": r["file_path"],
+                            "change": "modified",
+                            "previous_preview": r["previous_preview"] or "",
+                        },
+                    ))
+            await self._log_activities_batch(
                 project_id,
                 ActivityType.FILE_UPDATED,
-                description=f"File {change['type']}: {change['path']}",
+                changes,
                 user_id=user_id,
                 agent_name=agent_name,
-                metadata=change["metadata"]
             )
+            
+            if record_version:
+                await file_blob_store.record(
+                    "vibe",
+                    project_id,
+                    changes={path: by_path[path].content for path in changed_paths},
+                    message=f"{len(changed_paths)} files changed",
+                    author=agent_name or "user",
+                    conn=conn,
+                )
         
-        logger.info("[VIBE] Saved %d files for project %d", count, project_id)
-        return count
+        logger.info(
+            "[VIBE] Saved %d files for project %d (%d changed)",
+            len(paths), project_id, len(changed_rows)
+        )
+        return len(changed_rows)
     
     async def _log_activity(
         self,
@@ -1922,6 +2082,38 @@ class VibeService:
             # Don't fail operations due to activity logging errors
             logger.warning("[VIBE] Failed to log activity: %s", e, exc_info=True)
     
+    async def _log_activities_batch(
+        self,
+        project_id: int,
+        activity_type: ActivityType,
+        entries: List[Tuple[str, Dict[str, Any]]],
+        user_id: Optional[int] = None,
+        agent_name: Optional[str] = None,
+    ) -> None:
+        """Log several (description, metadata) activities with one insert."""
+        if not entries:
+            return
+        try:
+            await db.execute(
+                """
+                INSERT INTO vibe_activities (
+                    project_id, activity_type, description,
+                    user_id, agent_name, metadata, created_at
+                )
+                SELECT $1, $2, e.description, $3, $4, e.metadata::jsonb, NOW()
+                FROM unnest($5::text[], $6::text[]) AS e(description, metadata)
+                """,
+                project_id,
+                activity_type.value,
+                user_id,
+                agent_name,
+                [description for description, _ in entries],
+                [json.dumps(metadata) for _, metadata in entries],
+            )
+        except Exception as e:
+            # Don't fail operations due to activity logging errors
+            logger.warning("[VIBE] Failed to log %d activities: %s", len(entries), e, exc_info=True)
+    
     async def _log_agent_message(
         self,
         project_id: int,
@@ -2893,32 +3085,9 @@ Style Notes: {design_system.inspiration_notes}
                 api_cost=cost
             )
     
-    async def run_build(
-        self,
-        project_id: int,
-        user_id: int
-    ) -> OperationResult:
-        """
-        Run the build phase - generate all code files.
-        
-        Uses Sonnet for code generation. Files are saved atomically.
-        """
-        try:
-            project = await self._get_project_or_raise(project_id, user_id)
-        except ProjectNotFoundError as e:
-            return OperationResult(success=False, error=str(e))
-        
-        # Validate status
-        try:
-            self._validate_status_for_operation(
-                project,
-                [ProjectStatus.BUILDING],
-                "Build"
-            )
-        except InvalidStatusTransitionError as e:
-            return OperationResult(success=False, error=str(e))
-        
-        # Validate architecture exists - handle JSON string from database
+    def _load_build_inputs(self, project: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Architecture and brief for the build phase (JSON strings decoded)."""
+        # Handle JSON strings from database
         architecture = project.get("architecture", {})
         if isinstance(architecture, str):
             try:
@@ -2932,32 +3101,17 @@ Style Notes: {design_system.inspiration_notes}
                 brief = json.loads(brief)
             except (json.JSONDecodeError, TypeError):
                 brief = {}
-        
-        if not architecture or not architecture.get("pages"):
-            return OperationResult(
-                success=False,
-                error="Project has no architecture. Run planning first."
-            )
-        
-        # Log build start with progress tracking
-        page_count = len(architecture.get("pages", []))
-        await self._log_activity(
-            project_id=project_id,
-            activity_type=ActivityType.BUILD_STARTED,
-            description=f"💻 Coding Agent starting code generation ({page_count} pages)...",
-            user_id=user_id,
-            agent_name="Coding Agent",
-            metadata={"page_count": page_count, "phase": "build", "step": "started"}
-        )
-        
-        # Build comprehensive prompt
+        return architecture, brief
+    
+    def _build_prompt(self, architecture: Dict[str, Any], brief: Dict[str, Any]) -> str:
+        """Coding Agent prompt for the build phase."""
         # Extract design system for clearer reference
         design = architecture.get("design_system", architecture.get("design", {}))
         colors = design.get("colors", {})
         typography = design.get("typography", {})
         content = architecture.get("content", {})
         
-        build_prompt = f"""Build a complete Next.js 14 website. Generate ALL files in order.
+        return f"""Build a complete Next.js 14 website. Generate ALL files in order.
 
 ## Client: {content.get('business_name', brief.get('business_name', 'Client'))}
 {brief.get('description', '')}
@@ -3020,7 +3174,53 @@ Phone: {content.get('phone', '')}
 Email: {content.get('email', '')}
 
 Generate COMPLETE code for each file. No abbreviations."""
-
+    
+    async def run_build(
+        self,
+        project_id: int,
+        user_id: int
+    ) -> OperationResult:
+        """
+        Run the build phase - generate all code files.
+        
+        Uses Sonnet for code generation. Files are saved atomically.
+        """
+        try:
+            project = await self._get_project_or_raise(project_id, user_id)
+        except ProjectNotFoundError as e:
+            return OperationResult(success=False, error=str(e))
+        
+        # Validate status
+        try:
+            self._validate_status_for_operation(
+                project,
+                [ProjectStatus.BUILDING],
+                "Build"
+            )
+        except InvalidStatusTransitionError as e:
+            return OperationResult(success=False, error=str(e))
+        
+        architecture, brief = self._load_build_inputs(project)
+        
+        if not architecture or not architecture.get("pages"):
+            return OperationResult(
+                success=False,
+                error="Project has no architecture. Run planning first."
+            )
+        
+        # Log build start with progress tracking
+        page_count = len(architecture.get("pages", []))
+        await self._log_activity(
+            project_id=project_id,
+            activity_type=ActivityType.BUILD_STARTED,
+            description=f"💻 Coding Agent starting code generation ({page_count} pages)...",
+            user_id=user_id,
+            agent_name="Coding Agent",
+            metadata={"page_count": page_count, "phase": "build", "step": "started"}
+        )
+        
+        build_prompt = self._build_prompt(architecture, brief)
+        
         try:
             # Log that we're generating code
             await self._log_activity(
@@ -3117,12 +3317,13 @@ Generate COMPLETE code for each file. No abbreviations."""
         try:
             async with db.transaction() as conn:
                 # Save all files within the transaction
-                file_count = await self._save_files_batch(
+                await self._save_files_batch(
                     project_id, files,
                     user_id=user_id,
                     agent_name="Coding Agent",
                     conn=conn
                 )
+                file_count = len({f.path for f in files})
                 
                 # Update project status with optimistic locking
                 # Only update if status is still BUILDING (no concurrent modification)
@@ -3177,6 +3378,208 @@ Generate COMPLETE code for each file. No abbreviations."""
             api_cost=cost
         )
     
+    async def run_build_stream(
+        self,
+        project_id: int,
+        user_id: int
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming build phase - same prompt as run_build, incremental output.
+        
+        Claude's stream is fed through StreamingFileParser, so each file is
+        yielded as soon as its code block closes and persisted in
+        micro-batches of BUILD_PERSIST_BATCH_SIZE while generation continues.
+        The project moves to QA once the stream finishes and every file is
+        saved; files saved before a failure stay and are upserted on retry.
+        
+        Yields events:
+        - {"type": "started", "page_count": 5}
+        - {"type": "file", "path": "...", "language": "...", "content": "..."}
+        - {"type": "saved", "count": 12}
+        - {"type": "done", "success": true, ...run_build result data}
+        - {"type": "error", "error": "..."}
+        """
+        try:
+            project = await self._get_project_or_raise(project_id, user_id)
+            self._validate_status_for_operation(project, [ProjectStatus.BUILDING], "Build")
+        except (ProjectNotFoundError, InvalidStatusTransitionError) as e:
+            yield {"type": "error", "error": str(e)}
+            return
+        
+        architecture, brief = self._load_build_inputs(project)
+        if not architecture or not architecture.get("pages"):
+            yield {"type": "error", "error": "Project has no architecture. Run planning first."}
+            return
+        
+        page_count = len(architecture.get("pages", []))
+        await self._log_activity(
+            project_id=project_id,
+            activity_type=ActivityType.BUILD_STARTED,
+            description=f"💻 Coding Agent streaming code generation ({page_count} pages)...",
+            user_id=user_id,
+            agent_name="Coding Agent",
+            metadata={"page_count": page_count, "phase": "build", "step": "started", "streaming": True}
+        )
+        yield {"type": "started", "page_count": page_count}
+        
+        coding_agent = get_agent_with_skills(AgentRole.CODING)
+        system_prompt = coding_agent.system_prompt if coding_agent else CODING_AGENT_PROMPT
+        build_prompt = self._build_prompt(architecture, brief)
+        
+        parser = StreamingFileParser()
+        pending: List[ParsedFile] = []
+        save_task: Optional[asyncio.Task] = None
+        saved = 0
+        preview = ""  # Start of the response, for the no-files error
+        usage = None
+        max_retries = 3
+        
+        async def persist(batch: List[ParsedFile]) -> int:
+            return await self._save_files_batch(
+                project_id, batch, user_id=user_id, agent_name="Coding Agent"
+            )
+        
+        try:
+            for attempt in range(max_retries):
+                received = False
+                try:
+                    async with claude_client.async_client.messages.stream(
+                        model=self.SONNET_MODEL,
+                        max_tokens=16000,
+                        temperature=0.3,
+                        system=system_prompt,
+                        messages=[{"role": "user", "content": build_prompt}],
+                    ) as stream:
+                        async for text in stream.text_stream:
+                            received = True
+                            if len(preview) < 1000:
+                                preview += text
+                            for parsed in parser.feed(text):
+                                pending.append(parsed)
+                                yield {"type": "file", "path": parsed.path, "language": parsed.language, "content": parsed.content}
+                            if len(pending) >= self.BUILD_PERSIST_BATCH_SIZE:
+                                # One save in flight at a time; the stream keeps flowing meanwhile
+                                if save_task:
+                                    saved += await save_task
+                                    yield {"type": "saved", "count": saved}
+                                save_task = asyncio.create_task(persist(pending))
+                                pending = []
+                        usage = (await stream.get_final_message()).usage
+                    break
+                except Exception as e:
+                    # Only retry before any output: a restart would regenerate emitted files
+                    if received or attempt == max_retries - 1:
+                        raise
+                    error_str = str(e).lower()
+                    is_overload = "529" in error_str or "overload" in error_str or "rate" in error_str
+                    delay = 2.0 * (2 ** attempt) * (3 if is_overload else 1)
+                    logger.warning(
+                        "[VIBE] Streaming build attempt %d/%d failed: %s. Retrying in %.1fs...",
+                        attempt + 1, max_retries, e, delay
+                    )
+                    await asyncio.sleep(delay)
+            
+            for parsed in parser.finish():
+                pending.append(parsed)
+                yield {"type": "file", "path": parsed.path, "language": parsed.language, "content": parsed.content}
+            if save_task:
+                saved += await save_task
+                save_task = None
+            if pending:
+                saved += await persist(pending)
+                pending = []
+            if saved:
+                yield {"type": "saved", "count": saved}
+        except Exception as e:
+            if save_task and not save_task.done():
+                save_task.cancel()
+            logger.error("[VIBE] Streaming build failed: %s", e, exc_info=True)
+            await self._log_activity(
+                project_id=project_id,
+                activity_type=ActivityType.ERROR,
+                description=f"⚠️ Build failed: {str(e)[:120]}",
+                user_id=user_id,
+                agent_name="Coding Agent",
+                metadata={"phase": "build", "error": str(e), "files_saved": saved}
+            )
+            yield {"type": "error", "error": f"AI service error: {e}", "files_saved": saved}
+            return
+        
+        if usage is not None:
+            cost = estimate_api_cost(self.SONNET_MODEL, usage.input_tokens, usage.output_tokens)
+        else:
+            cost = estimate_api_cost(self.SONNET_MODEL, 2000, 8000)
+        await self._update_api_cost(project_id, user_id, cost)
+        
+        files = parser.files
+        if not files:
+            await self._log_activity(
+                project_id=project_id,
+                activity_type=ActivityType.ERROR,
+                description="⚠️ Build produced no files. See raw preview.",
+                user_id=user_id,
+                agent_name="Coding Agent",
+                metadata={"phase": "build", "reason": "no_files"}
+            )
+            yield {
+                "type": "error",
+                "error": "No files could be parsed from the build output. Please retry.",
+                "raw_response_preview": preview[:1000],
+                "api_cost": float(cost),
+            }
+            return
+        
+        file_count = len({f.path for f in files})
+        
+        # Files are already saved; move to QA with the same optimistic lock as run_build
+        preview_url = f"https://preview.alphawave.ai/p/{project_id}"
+        result = await db.execute(
+            """
+            UPDATE vibe_projects
+            SET status = $1, preview_url = $2, updated_at = NOW()
+            WHERE project_id = $3 AND user_id = $4 AND status = $5
+            """,
+            ProjectStatus.QA.value, preview_url, project_id, user_id,
+            ProjectStatus.BUILDING.value
+        )
+        if result and "UPDATE 0" in result:
+            logger.warning("[VIBE] Streaming build concurrency conflict for project %d", project_id)
+            yield {
+                "type": "error",
+                "error": "Project was modified by another process. Please refresh and try again.",
+                "api_cost": float(cost),
+            }
+            return
+        
+        await self._log_activity(
+            project_id=project_id,
+            activity_type=ActivityType.BUILD_COMPLETED,
+            description=f"💻 Coding Agent completed: {file_count} files generated",
+            user_id=user_id,
+            agent_name="Coding Agent",
+            metadata={
+                "file_count": file_count,
+                "files_saved": saved,
+                "files": [f.path for f in files[:10]],
+                "streaming": True,
+            }
+        )
+        
+        yield {
+            "type": "done",
+            **OperationResult(
+                success=True,
+                data={
+                    "status": ProjectStatus.QA.value,
+                    "files_generated": [f.path for f in files],
+                    "file_count": file_count,
+                    "files_saved": saved,
+                    "preview_url": preview_url
+                },
+                api_cost=cost
+            ).to_dict()
+        }
+    
     async def run_qa(
         self,
         project_id: int,
@@ -4025,6 +4428,97 @@ Keep each field under 100 words. Focus on actionable insights."""
         )
         return dict(result) if result else None
     
+    # ========================================================================
+    # FILE VERSIONS (content-addressed blob store)
+    # ========================================================================
+    
+    async def get_file_versions(
+        self,
+        project_id: int,
+        user_id: int,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Version history of the project's files, newest first."""
+        await self._get_project_or_raise(project_id, user_id)
+        return await file_blob_store.list_versions("vibe", project_id, limit)
+    
+    async def diff_file_versions(
+        self,
+        project_id: int,
+        user_id: int,
+        from_version: int,
+        to_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Paths added / removed / modified between two versions."""
+        await self._get_project_or_raise(project_id, user_id)
+        return await file_blob_store.diff("vibe", project_id, from_version, to_version)
+    
+    async def rollback_files(
+        self,
+        project_id: int,
+        user_id: int,
+        version: int
+    ) -> OperationResult:
+        """
+        Restore the project's files to an earlier version.
+        
+        Records the rollback as a new version, rewrites only the files
+        that differ from the current tree and deletes files the target
+        version didn't have - all in one transaction.
+        """
+        try:
+            await self._get_project_or_raise(project_id, user_id)
+        except ProjectNotFoundError as e:
+            return OperationResult(success=False, error=str(e))
+        
+        try:
+            async with db.transaction() as conn:
+                result = await file_blob_store.rollback("vibe", project_id, version, author="user", conn=conn)
+                if not result:
+                    return OperationResult(success=False, error=f"Version {version} not found")
+                
+                restored = [
+                    ParsedFile(path=path, content=content, language=ParsedFile.detect_language(path))
+                    for path, content in result["restored"].items()
+                ]
+                await self._save_files_batch(
+                    project_id, restored,
+                    user_id=user_id,
+                    conn=conn,
+                    record_version=False
+                )
+                if result["removed"]:
+                    await conn.execute(
+                        "DELETE FROM vibe_files WHERE project_id = $1 AND file_path = ANY($2::text[])",
+                        project_id, result["removed"]
+                    )
+        except BlobNotFoundError as e:
+            logger.error("[VIBE] Rollback of project %d failed: %s", project_id, e)
+            return OperationResult(success=False, error=str(e))
+        
+        await self._log_activity(
+            project_id,
+            ActivityType.FILE_UPDATED,
+            description=f"Files rolled back to version {version}",
+            user_id=user_id,
+            metadata={
+                "version": result["version"],
+                "rolled_back_to": version,
+                "restored": list(result["restored"]),
+                "removed": result["removed"],
+            }
+        )
+        
+        return OperationResult(
+            success=True,
+            data={
+                "version": result["version"],
+                "rolled_back_to": version,
+                "restored": list(result["restored"]),
+                "removed": result["removed"],
+            }
+        )
+    
     # ========================================================================
     # LESSONS LEARNING SYSTEM
     # ========================================================================
@@ -22,6 +22,7 @@ from PIL import Image
 import httpx
 
 from app.config import settings
+from app.integrations.llm_governor import governed_http_client
 
 
 logger = logging.getLogger(__name__)
@@ -193,7 +194,7 @@ class VisionAnalysisService:
     
     def __init__(self):
         """Initialize the vision analysis service"""
-        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=governed_http_client())
         self.sync_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
         logger.info("VisionAnalysisService initialized")
     
@@ -5,16 +5,21 @@ Production-quality workflow orchestration for multi-step agentic tasks.
 
 Features:
 - Automatic tool chaining without manual intervention
+- DAG scheduling: steps declare depends_on and independent steps run
+  concurrently (bounded by max_concurrency)
 - Progress streaming to frontend
 - Error recovery with exponential backoff
-- Template variable resolution
-- Conditional execution
-- State persistence
+- Template variable resolution and conditional execution, compiled once
+  per definition (see workflow_expressions)
+- Durable state: step results are checkpointed to Postgres and runs
+  interrupted by a restart resume from the last completed steps
+- Per-step timing on every run
 
 Architecture:
 - WorkflowStep: Single executable step with tool + args
 - WorkflowDefinition: Complete workflow with metadata
 - WorkflowExecutor: Executes workflows with progress tracking
+- WorkflowRunStore: Postgres checkpoints and run leases
 - WorkflowRegistry: Pre-built workflow templates
 - WorkflowState: Runtime state management
 
@@ -25,14 +30,32 @@ Date: December 20, 2025
 import logging
 import asyncio
 import json
-import re
+import os
+import socket
+import time
+from collections import OrderedDict
+from pathlib import Path
 from typing import Dict, Any, List, Optional, AsyncIterator, Callable
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 
+import asyncpg
+
+from app.config import settings
+from app.database import db
+from app.services.workflow_expressions import (
+    ExpressionError,
+    compile_condition,
+    compile_template,
+    compile_value,
+)
+
 logger = logging.getLogger(__name__)
 
+# Finished runs kept in memory for status lookups
+FINISHED_RUNS_KEPT = 100
+
 
 # ============================================================================
 # ENUMS
@@ -72,6 +95,16 @@ class WorkflowStep:
             condition="input.url != null",
             result_key="screenshot_data"
         )
+    
+    Dependencies:
+        depends_on=None (default) runs the step after the previous step,
+        which keeps simple workflows sequential. depends_on=[] makes it a
+        root step; a list of step names makes it wait for exactly those
+        steps, so independent branches run in parallel.
+    
+    Templates and the condition are compiled on first use (or eagerly via
+    WorkflowDefinition.compile()); mutate args/condition/prompt only
+    before the step runs.
     """
     tool: str
     args: Dict[str, Any] = field(default_factory=dict)
@@ -80,6 +113,31 @@ class WorkflowStep:
     retry_count: int = 2  # Number of retries on failure
     retry_delay: float = 1.0  # Initial retry delay (exponential backoff)
     timeout: Optional[int] = None  # Step timeout in seconds
+    name: Optional[str] = None  # Step id for depends_on / {{steps.<name>.result}}
+    depends_on: Optional[List[str]] = None  # None = previous step
+    type: str = "tool"  # tool | agent | join
+    prompt: Optional[str] = None  # Agent steps: prompt template
+    
+    def compile(self) -> "WorkflowStep":
+        """
+        Parse args, prompt and condition into closures.
+        
+        Raises:
+            ExpressionError: The condition is not a valid expression
+        """
+        self._compiled = (
+            compile_value(self.args),
+            compile_condition(self.condition) if self.condition else None,
+            compile_template(self.prompt) if self.prompt else None,
+        )
+        return self
+    
+    def compiled(self) -> tuple:
+        """(args, condition, prompt) resolvers, compiling on first use."""
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None:
+            compiled = self.compile()._compiled
+        return compiled
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -109,6 +167,133 @@ class WorkflowDefinition:
     category: str = "general"  # Workflow category for organization
     version: str = "1.0.0"
     author: str = "Nicole V7"
+    variables: Dict[str, Any] = field(default_factory=dict)  # Resolved into context at start
+    max_concurrency: Optional[int] = None  # Default: settings.WORKFLOW_MAX_CONCURRENCY
+    timeout_seconds: Optional[int] = None  # Whole-run timeout
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowDefinition":
+        """
+        Build a definition from a YAML workflow file.
+        
+        YAML steps declare their dependencies explicitly, so a step without
+        depends_on is a root. A `type: parallel` group becomes its child
+        steps plus a join step under the group's name, so dependents can
+        depend on the group and read {{steps.<group>.result}}.
+        """
+        config = data.get("config") or {}
+        default_retries = config.get("max_retries", 2)
+        steps: List[WorkflowStep] = []
+        
+        def add(raw: Dict[str, Any], inherited: Optional[List[str]] = None) -> None:
+            depends_on = list(raw.get("depends_on") or inherited or [])
+            
+            if raw.get("type") == "parallel":
+                children = []
+                for child in raw.get("steps") or []:
+                    add(child, depends_on)
+                    children.append(child["name"])
+                steps.append(WorkflowStep(
+                    tool="join",
+                    name=raw["name"],
+                    type="join",
+                    depends_on=children,
+                    result_key=raw["name"],
+                ))
+                return
+            
+            step_type = raw.get("type", "tool")
+            steps.append(WorkflowStep(
+                tool=raw.get("agent") if step_type == "agent" else raw["tool"],
+                args=raw.get("params") or {},
+                condition=raw.get("condition"),
+                result_key=raw["name"],
+                retry_count=raw.get("max_retries", default_retries),
+                timeout=raw.get("timeout_seconds"),
+                name=raw["name"],
+                depends_on=depends_on,
+                type=step_type,
+                prompt=raw.get("prompt"),
+            ))
+        
+        for raw_step in data.get("steps") or []:
+            add(raw_step)
+        
+        return cls(
+            name=data["name"],
+            description=data.get("description", ""),
+            steps=steps,
+            requires_input=data.get("requires_input") or [],
+            category=data.get("category", "scheduled"),
+            version=str(data.get("version", "1.0.0")),
+            variables=data.get("variables") or {},
+            max_concurrency=config.get("max_concurrency"),
+            timeout_seconds=config.get("timeout_seconds"),
+        )
+    
+    def compile(self) -> "WorkflowDefinition":
+        """
+        Compile every step and variable template once, at load time.
+        
+        Raises:
+            ValueError: A step condition is not a valid expression
+        """
+        for step_id, step in zip(self.step_ids(), self.steps):
+            try:
+                step.compile()
+            except ExpressionError as e:
+                raise ValueError(f"Step {step_id} of {self.name}: {e}") from e
+        self._compiled_variables = [
+            (name, compile_value(value)) for name, value in self.variables.items()
+        ]
+        return self
+    
+    def compiled_variables(self) -> List[tuple]:
+        """(name, resolver) pairs for the workflow variables."""
+        compiled = getattr(self, "_compiled_variables", None)
+        if compiled is None:
+            compiled = self.compile()._compiled_variables
+        return compiled
+    
+    def step_ids(self) -> List[str]:
+        """Stable id per step: its name, or step_<n> for unnamed steps."""
+        return [step.name or f"step_{i + 1}" for i, step in enumerate(self.steps)]
+    
+    def dependency_graph(self) -> Dict[str, List[str]]:
+        """
+        Map each step id to the ids it waits for.
+        
+        Raises:
+            ValueError: Duplicate step names, unknown dependencies or cycles
+        """
+        ids = self.step_ids()
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"Workflow {self.name} has duplicate step names")
+        
+        graph: Dict[str, List[str]] = {}
+        for i, (step_id, step) in enumerate(zip(ids, self.steps)):
+            if step.depends_on is None:
+                graph[step_id] = [ids[i - 1]] if i > 0 else []
+            else:
+                unknown = [d for d in step.depends_on if d not in ids]
+                if unknown:
+                    raise ValueError(f"Step {step_id} depends on unknown steps: {', '.join(unknown)}")
+                graph[step_id] = list(step.depends_on)
+        
+        # Kahn's algorithm - every step must be reachable
+        remaining = {k: set(v) for k, v in graph.items()}
+        while True:
+            ready = [k for k, deps in remaining.items() if not deps]
+            if not ready:
+                break
+            for k in ready:
+                del remaining[k]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        if remaining:
+            raise ValueError(f"Workflow {self.name} has a dependency cycle: {', '.join(sorted(remaining))}")
+        
+        return graph
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -179,6 +364,25 @@ class WorkflowState:
     error: Optional[str] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    user_id: Optional[int] = None
+    step_timings: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    resumed_steps: int = 0  # Steps restored from a checkpoint
+    
+    @property
+    def execution_id(self) -> str:
+        return self.run_id
+    
+    @property
+    def steps(self) -> List[StepResult]:
+        return self.step_results
+    
+    def get_completed_results(self) -> Dict[str, Any]:
+        """Results of completed steps keyed by step name."""
+        return {
+            sr.step_name: sr.result
+            for sr in self.step_results
+            if sr.status == StepStatus.COMPLETED
+        }
     
     @property
     def duration_ms(self) -> Optional[int]:
@@ -209,10 +413,211 @@ class WorkflowState:
             "error": self.error,
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "duration_ms": self.duration_ms
+            "duration_ms": self.duration_ms,
+            "step_timings": self.step_timings,
+            "resumed_steps": self.resumed_steps,
+        }
+
+
+def _jsonable(value: Any) -> Any:
+    """Round-trip through JSON so results with datetimes etc. fit in JSONB."""
+    return json.loads(json.dumps(value, default=str))
+
+
+# ============================================================================
+# RUN STORE (Postgres checkpoints)
+# ============================================================================
+
+class WorkflowRunStore:
+    """
+    Durable run state in workflow_runs / workflow_step_results.
+    
+    Every write is best-effort: a checkpoint failure is logged and the run
+    carries on. If the tables don't exist yet (migration 039 not applied),
+    checkpointing switches itself off for the process.
+    """
+    
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._enabled = settings.WORKFLOW_CHECKPOINTS_ENABLED
+    
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+    
+    async def _run(self, query: str, *args, fetch: bool = False):
+        if not self._enabled:
+            return [] if fetch else None
+        try:
+            if fetch:
+                return await db.fetch(query, *args)
+            return await db.execute(query, *args)
+        except asyncpg.UndefinedTableError:
+            logger.warning("[WORKFLOW] workflow_runs table missing (run migration 039); checkpoints disabled")
+            self._enabled = False
+        except Exception as e:
+            logger.warning(f"[WORKFLOW] Checkpoint write failed: {e}")
+        return [] if fetch else None
+    
+    async def start_run(self, state: WorkflowState, base_context: Dict[str, Any], resumed: bool) -> None:
+        await self._run(
+            """
+            INSERT INTO workflow_runs (
+                run_id, workflow_name, user_id, status, input_data, base_context,
+                lease_owner, lease_expires_at, started_at, updated_at
+            )
+            VALUES ($1, $2, $3, 'running', $4, $5, $6, NOW() + make_interval(secs => $7), NOW(), NOW())
+            ON CONFLICT (run_id) DO UPDATE SET
+                status = 'running',
+                error = NULL,
+                completed_at = NULL,
+                resume_count = workflow_runs.resume_count + CASE WHEN $8 THEN 1 ELSE 0 END,
+                lease_owner = EXCLUDED.lease_owner,
+                lease_expires_at = EXCLUDED.lease_expires_at,
+                updated_at = NOW()
+            """,
+            state.run_id,
+            state.workflow_name,
+            state.user_id,
+            _jsonable(state.input_data),
+            _jsonable(base_context),
+            self.owner,
+            float(settings.WORKFLOW_RUN_LEASE_SECONDS),
+            resumed,
+        )
+    
+    async def save_step(self, run_id: str, step_id: str, step_result: StepResult, timings: Dict[str, Any]) -> None:
+        """Checkpoint a finished step and renew the run lease in one round trip."""
+        await self._run(
+            """
+            WITH step AS (
+                INSERT INTO workflow_step_results (
+                    run_id, step_name, step_number, tool, status, result, error,
+                    retry_count, started_at, completed_at, duration_ms
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+                ON CONFLICT (run_id, step_name) DO UPDATE SET
+                    status = EXCLUDED.status,
+                    result = EXCLUDED.result,
+                    error = EXCLUDED.error,
+                    retry_count = EXCLUDED.retry_count,
+                    started_at = EXCLUDED.started_at,
+                    completed_at = EXCLUDED.completed_at,
+                    duration_ms = EXCLUDED.duration_ms
+            )
+            UPDATE workflow_runs
+            SET step_timings = $12,
+                lease_expires_at = NOW() + make_interval(secs => $13),
+                updated_at = NOW()
+            WHERE run_id = $1
+            """,
+            run_id,
+            step_id,
+            step_result.step_number,
+            step_result.tool,
+            step_result.status.value,
+            _jsonable(step_result.result),
+            step_result.error,
+            step_result.retry_count,
+            step_result.started_at,
+            step_result.completed_at,
+            step_result.duration_ms,
+            _jsonable(timings),
+            float(settings.WORKFLOW_RUN_LEASE_SECONDS),
+        )
+    
+    async def renew_lease(self, run_id: str) -> None:
+        await self._run(
+            """
+            UPDATE workflow_runs
+            SET lease_expires_at = NOW() + make_interval(secs => $2), updated_at = NOW()
+            WHERE run_id = $1 AND lease_owner = $3
+            """,
+            run_id,
+            float(settings.WORKFLOW_RUN_LEASE_SECONDS),
+            self.owner,
+        )
+    
+    async def finish_run(self, state: WorkflowState) -> None:
+        await self._run(
+            """
+            UPDATE workflow_runs
+            SET status = $2, error = $3, step_timings = $4, completed_at = NOW(),
+                lease_owner = NULL, lease_expires_at = NULL, updated_at = NOW()
+            WHERE run_id = $1
+            """,
+            state.run_id,
+            state.status.value,
+            state.error,
+            _jsonable(state.step_timings),
+        )
+    
+    async def claim_resumable(self, workflow_names: List[str], limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Atomically take over running runs whose owner stopped renewing the lease.
+        
+        SKIP LOCKED keeps two starting workers from claiming the same run.
+        """
+        rows = await self._run(
+            """
+            WITH stale AS (
+                SELECT run_id
+                FROM workflow_runs
+                WHERE status = 'running'
+                  AND lease_expires_at < NOW()
+                  AND workflow_name = ANY($1::text[])
+                ORDER BY lease_expires_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE workflow_runs r
+            SET lease_owner = $3,
+                lease_expires_at = NOW() + make_interval(secs => $4),
+                updated_at = NOW()
+            FROM stale
+            WHERE r.run_id = stale.run_id
+            RETURNING r.run_id, r.workflow_name, r.user_id, r.input_data, r.base_context
+            """,
+            workflow_names,
+            limit,
+            self.owner,
+            float(settings.WORKFLOW_RUN_LEASE_SECONDS),
+            fetch=True,
+        )
+        return [dict(r) for r in rows]
+    
+    async def load_steps(self, run_id: str) -> Dict[str, StepResult]:
+        """Finished (completed or skipped) steps of a run, keyed by step id."""
+        rows = await self._run(
+            """
+            SELECT step_name, step_number, tool, status, result, error, retry_count,
+                   started_at, completed_at, duration_ms
+            FROM workflow_step_results
+            WHERE run_id = $1 AND status IN ('completed', 'skipped')
+            """,
+            run_id,
+            fetch=True,
+        )
+        return {
+            r["step_name"]: StepResult(
+                step_number=r["step_number"],
+                step_name=r["step_name"],
+                tool=r["tool"],
+                status=StepStatus(r["status"]),
+                result=r["result"],
+                error=r["error"],
+                started_at=r["started_at"],
+                completed_at=r["completed_at"],
+                duration_ms=r["duration_ms"],
+                retry_count=r["retry_count"],
+            )
+            for r in rows
         }
 
 
+workflow_run_store = WorkflowRunStore()
+
+
 # ============================================================================
 # WORKFLOW EXECUTOR
 # ============================================================================
@@ -222,12 +627,14 @@ class WorkflowExecutor:
     Executes workflow definitions with progress tracking and error recovery.
     
     Features:
-    - Step-by-step execution with context accumulation
-    - Template variable resolution ({{input.x}}, {{prev.y}})
+    - DAG scheduling: a step starts as soon as its dependencies finish,
+      up to max_concurrency steps at once
+    - Template variable resolution ({{input.x}}, {{prev.y}}, {{steps.name.result}})
     - Conditional execution
     - Retry logic with exponential backoff
     - Progress streaming via async iterator
-    - State persistence
+    - Step checkpoints in Postgres; resume() continues an interrupted run
+    - Per-step timing (queue wait, start offset, duration) on every run
     
     Usage:
         executor = WorkflowExecutor(tool_executor_fn)
@@ -238,21 +645,35 @@ class WorkflowExecutor:
                 print(f"Workflow complete: {event['result']}")
     """
     
-    def __init__(self, tool_executor: Callable):
+    def __init__(
+        self,
+        tool_executor: Callable,
+        agent_executor: Optional[Callable] = None,
+        run_store: Optional[WorkflowRunStore] = None,
+    ):
         """
         Initialize workflow executor.
         
         Args:
             tool_executor: Async function(tool_name, tool_args) -> result
+            agent_executor: Async function(agent_name, prompt, context) -> result
+                            for `type: agent` steps
+            run_store: Checkpoint store (shared default if omitted)
         """
         self.tool_executor = tool_executor
+        self.agent_executor = agent_executor
+        self.run_store = run_store or workflow_run_store
         self._active_workflows: Dict[str, WorkflowState] = {}
+        self._finished_workflows: "OrderedDict[str, WorkflowState]" = OrderedDict()
     
     async def execute(
         self,
         workflow: WorkflowDefinition,
         input_data: Dict[str, Any],
-        run_id: Optional[str] = None
+        run_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        base_context: Optional[Dict[str, Any]] = None,
+        restored: Optional[Dict[str, StepResult]] = None,
     ) -> AsyncIterator[Dict[str, Any]]:
         """
         Execute a workflow and stream progress events.
@@ -261,13 +682,16 @@ class WorkflowExecutor:
             workflow: Workflow definition to execute
             input_data: Input data for the workflow
             run_id: Optional run ID (generated if not provided)
+            user_id: Passed to tool steps as `_user_id`
+            base_context: Extra top-level context (now, user, ...)
+            restored: Finished steps from a checkpoint (see resume())
             
         Yields:
             Progress events:
             - {"type": "started", "run_id": ..., "workflow_name": ...}
             - {"type": "step_progress", "current_step": ..., "status": ...}
             - {"type": "step_complete", "step_number": ..., "result": ...}
-            - {"type": "complete", "status": ..., "result": ...}
+            - {"type": "complete", "status": ..., "result": ..., "step_timings": ...}
             - {"type": "error", "error": ...}
         """
         # Generate run ID
@@ -286,75 +710,149 @@ class WorkflowExecutor:
             }
             return
         
+        try:
+            graph = workflow.dependency_graph()
+        except ValueError as e:
+            logger.error(f"[WORKFLOW:{run_id}] Invalid workflow: {e}")
+            yield {"type": "error", "error": str(e), "run_id": run_id}
+            return
+        
         # Initialize state
+        base_context = dict(base_context or {})
         state = WorkflowState(
             workflow_name=workflow.name,
             run_id=run_id,
             status=WorkflowStatus.RUNNING,
             input_data=input_data,
-            context={"input": input_data},
+            context={**base_context, "input": input_data, "steps": {}},
             total_steps=len(workflow.steps),
-            started_at=datetime.now()
+            started_at=datetime.now(),
+            user_id=user_id,
         )
+        for name, resolve in workflow.compiled_variables():
+            state.context[name] = resolve(state.context)
         
         self._active_workflows[run_id] = state
+        await self.run_store.start_run(state, base_context, resumed=restored is not None)
+        heartbeat = asyncio.create_task(self._heartbeat(run_id))
+        
+        step_ids = workflow.step_ids()
+        steps = dict(zip(step_ids, workflow.steps))
+        numbers = {step_id: i + 1 for i, step_id in enumerate(step_ids)}
+        done: set = set()
         
-        logger.info(f"[WORKFLOW:{run_id}] Started: {workflow.name} ({state.total_steps} steps)")
+        # Restore checkpointed steps
+        for step_id, step_result in (restored or {}).items():
+            if step_id in steps:
+                self._apply_result(state, step_id, steps[step_id], step_result)
+                done.add(step_id)
+        state.resumed_steps = len(done)
+        
+        logger.info(
+            f"[WORKFLOW:{run_id}] {'Resumed' if restored is not None else 'Started'}: "
+            f"{workflow.name} ({state.total_steps} steps, {len(done)} restored)"
+        )
         
         # Yield start event
         yield {
             "type": "started",
             "run_id": run_id,
             "workflow_name": workflow.name,
-            "total_steps": state.total_steps
+            "total_steps": state.total_steps,
+            "resumed_steps": state.resumed_steps,
         }
         
+        limit = max(1, workflow.max_concurrency or settings.WORKFLOW_MAX_CONCURRENCY)
+        deadline = time.monotonic() + workflow.timeout_seconds if workflow.timeout_seconds else None
+        run_started = time.monotonic()
+        ready_at: Dict[str, float] = {}
+        running: Dict[asyncio.Task, str] = {}
+        
         # Execute steps
         try:
-            for i, step in enumerate(workflow.steps):
-                state.current_step = i + 1
-                
-                # Yield progress event
-                yield {
-                    "type": "step_progress",
-                    "run_id": run_id,
-                    "current_step": state.current_step,
-                    "total_steps": state.total_steps,
-                    "step_name": step.tool,
-                    "status": "running"
-                }
-                
-                # Execute step
-                step_result = await self._execute_step(step, state, i + 1)
-                
-                # Store result
-                state.step_results.append(step_result)
-                
-                # Update context
-                if step.result_key:
-                    state.context[step.result_key] = step_result.result
-                state.context["prev"] = step_result.result
-                
-                # Yield step complete event
-                yield {
-                    "type": "step_complete",
-                    "run_id": run_id,
-                    "step_number": i + 1,
-                    "step_name": step.tool,
-                    "status": step_result.status.value,
-                    "result": step_result.result,
-                    "error": step_result.error,
-                    "duration_ms": step_result.duration_ms
-                }
+            while len(done) < len(step_ids):
+                # Start every step whose dependencies are done, in definition order
+                for step_id in step_ids:
+                    if step_id in done or step_id in running.values():
+                        continue
+                    if not all(dep in done for dep in graph[step_id]):
+                        continue
+                    ready_at.setdefault(step_id, time.monotonic())
+                    if len(running) >= limit:
+                        continue
+                    
+                    step = steps[step_id]
+                    step_context = dict(state.context)
+                    if graph[step_id]:
+                        # prev = last listed dependency's result
+                        step_context["prev"] = state.context["steps"][graph[step_id][-1]]["result"]
+                    
+                    state.step_timings[step_id] = {
+                        "queued_ms": int(1000 * (time.monotonic() - ready_at[step_id])),
+                        "start_offset_ms": int(1000 * (time.monotonic() - run_started)),
+                    }
+                    task = asyncio.create_task(
+                        self._execute_step(step, state, numbers[step_id], step_context, step_id)
+                    )
+                    running[task] = step_id
+                    state.current_step = len(done) + len(running)
+                    
+                    # Yield progress event
+                    yield {
+                        "type": "step_progress",
+                        "run_id": run_id,
+                        "current_step": numbers[step_id],
+                        "total_steps": state.total_steps,
+                        "step_name": step.name or step.tool,
+                        "status": "running",
+                        "running": len(running),
+                    }
                 
-                # Check if step failed
-                if step_result.status == StepStatus.FAILED:
-                    raise Exception(f"Step {i + 1} failed: {step_result.error}")
+                if not running:
+                    raise Exception("No runnable steps left (unsatisfiable dependencies)")
                 
-                logger.info(
-                    f"[WORKFLOW:{run_id}] Step {i + 1}/{state.total_steps} complete: "
-                    f"{step.tool} (duration={step_result.duration_ms}ms)"
+                timeout = None
+                if deadline:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        raise asyncio.TimeoutError()
+                finished, _ = await asyncio.wait(
+                    running.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED
                 )
+                if not finished:
+                    raise asyncio.TimeoutError()
+                
+                for task in finished:
+                    step_id = running.pop(task)
+                    step = steps[step_id]
+                    step_result = task.result()
+                    
+                    self._apply_result(state, step_id, step, step_result)
+                    state.step_timings[step_id]["duration_ms"] = step_result.duration_ms
+                    state.step_timings[step_id]["status"] = step_result.status.value
+                    done.add(step_id)
+                    await self.run_store.save_step(run_id, step_id, step_result, state.step_timings)
+                    
+                    # Yield step complete event
+                    yield {
+                        "type": "step_complete",
+                        "run_id": run_id,
+                        "step_number": numbers[step_id],
+                        "step_name": step.name or step.tool,
+                        "status": step_result.status.value,
+                        "result": step_result.result,
+                        "error": step_result.error,
+                        "duration_ms": step_result.duration_ms
+                    }
+                    
+                    # Check if step failed
+                    if step_result.status == StepStatus.FAILED:
+                        raise Exception(f"Step {numbers[step_id]} ({step_id}) failed: {step_result.error}")
+                    
+                    logger.info(
+                        f"[WORKFLOW:{run_id}] Step {len(done)}/{state.total_steps} complete: "
+                        f"{step_id} (duration={step_result.duration_ms}ms)"
+                    )
             
             # Workflow completed successfully
             state.status = WorkflowStatus.COMPLETED
@@ -362,7 +860,7 @@ class WorkflowExecutor:
             
             logger.info(
                 f"[WORKFLOW:{run_id}] Completed: {workflow.name} "
-                f"(duration={state.duration_ms}ms)"
+                f"(duration={state.duration_ms}ms, step time={self._total_step_ms(state)}ms)"
             )
             
             yield {
@@ -371,11 +869,14 @@ class WorkflowExecutor:
                 "workflow_name": workflow.name,
                 "status": "completed",
                 "result": state.context,
-                "duration_ms": state.duration_ms
+                "duration_ms": state.duration_ms,
+                "step_timings": state.step_timings,
             }
             
         except Exception as e:
             # Workflow failed
+            if isinstance(e, asyncio.TimeoutError):
+                e = Exception(f"Workflow timed out after {workflow.timeout_seconds}s")
             state.status = WorkflowStatus.FAILED
             state.error = str(e)
             state.completed_at = datetime.now()
@@ -390,19 +891,84 @@ class WorkflowExecutor:
                 "run_id": run_id,
                 "workflow_name": workflow.name,
                 "error": str(e),
-                "partial_results": state.context
+                "partial_results": state.context,
+                "step_timings": state.step_timings,
             }
         
         finally:
-            # Clean up
-            if run_id in self._active_workflows:
-                del self._active_workflows[run_id]
+            # Stop in-flight branches of a failed run
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+            heartbeat.cancel()
+            
+            if state.status != WorkflowStatus.RUNNING:
+                await self.run_store.finish_run(state)
+            
+            # Clean up (keep recent runs for status lookups)
+            self._active_workflows.pop(run_id, None)
+            self._finished_workflows[run_id] = state
+            while len(self._finished_workflows) > FINISHED_RUNS_KEPT:
+                self._finished_workflows.popitem(last=False)
+    
+    async def resume(
+        self,
+        workflow: WorkflowDefinition,
+        run: Dict[str, Any],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Continue a checkpointed run (a row from WorkflowRunStore.claim_resumable).
+        
+        Completed and skipped steps are restored from their checkpoints;
+        everything else runs again.
+        """
+        restored = await self.run_store.load_steps(run["run_id"])
+        async for event in self.execute(
+            workflow,
+            run.get("input_data") or {},
+            run_id=run["run_id"],
+            user_id=run.get("user_id"),
+            base_context=run.get("base_context") or {},
+            restored=restored,
+        ):
+            yield event
+    
+    async def _heartbeat(self, run_id: str) -> None:
+        """Renew the run lease so long steps aren't mistaken for a dead worker."""
+        interval = max(5, settings.WORKFLOW_RUN_LEASE_SECONDS // 3)
+        while True:
+            await asyncio.sleep(interval)
+            await self.run_store.renew_lease(run_id)
+    
+    def _apply_result(
+        self,
+        state: WorkflowState,
+        step_id: str,
+        step: WorkflowStep,
+        step_result: StepResult
+    ) -> None:
+        """Fold a finished step into the run state and context."""
+        state.step_results.append(step_result)
+        if step.result_key:
+            state.context[step.result_key] = step_result.result
+        state.context["prev"] = step_result.result
+        state.context["steps"][step_id] = {
+            "result": step_result.result,
+            "status": step_result.status.value,
+        }
+    
+    @staticmethod
+    def _total_step_ms(state: WorkflowState) -> int:
+        return sum(t.get("duration_ms") or 0 for t in state.step_timings.values())
     
     async def _execute_step(
         self,
         step: WorkflowStep,
         state: WorkflowState,
-        step_number: int
+        step_number: int,
+        context: Optional[Dict[str, Any]] = None,
+        step_id: Optional[str] = None
     ) -> StepResult:
         """
         Execute a single workflow step with retry logic.
@@ -411,29 +977,45 @@ class WorkflowExecutor:
             step: Step definition
             state: Current workflow state
             step_number: Step number (1-indexed)
+            context: Context snapshot for this step (defaults to state.context)
+            step_id: Step id (defaults to the step name or tool)
             
         Returns:
             StepResult with execution outcome
         """
+        context = context if context is not None else state.context
+        resolve_args, condition, _ = step.compiled()
         step_result = StepResult(
             step_number=step_number,
-            step_name=step.tool,
+            step_name=step_id or step.name or step.tool,
             tool=step.tool,
             status=StepStatus.RUNNING,
             started_at=datetime.now()
         )
         
         # Check condition
-        if step.condition:
-            should_execute = self._evaluate_condition(step.condition, state.context)
-            if not should_execute:
+        if condition:
+            if not self._check_condition(step, condition, context):
                 logger.info(f"[WORKFLOW] Step {step_number} skipped (condition failed)")
                 step_result.status = StepStatus.SKIPPED
                 step_result.completed_at = datetime.now()
+                step_result.duration_ms = 0
                 return step_result
         
+        # Join steps just collect their dependencies' results
+        if step.type == "join":
+            step_result.status = StepStatus.COMPLETED
+            step_result.result = {
+                dep: context["steps"][dep]["result"] for dep in step.depends_on or []
+            }
+            step_result.completed_at = datetime.now()
+            step_result.duration_ms = 0
+            return step_result
+        
         # Resolve template args
-        resolved_args = self._resolve_args(step.args, state.context)
+        resolved_args = resolve_args(context)
+        if step.type == "tool" and state.user_id is not None:
+            resolved_args.setdefault("_user_id", state.user_id)
         
         # Execute with retry
         retry_count = 0
@@ -447,7 +1029,10 @@ class WorkflowExecutor:
                     f"(attempt {retry_count + 1}/{step.retry_count + 1})"
                 )
                 
-                result = await self.tool_executor(step.tool, resolved_args)
+                result = await asyncio.wait_for(
+                    self._invoke(step, resolved_args, context),
+                    timeout=step.timeout,
+                )
                 
                 # Success
                 step_result.status = StepStatus.COMPLETED
@@ -456,7 +1041,7 @@ class WorkflowExecutor:
                 break
                 
             except Exception as e:
-                last_error = str(e)
+                last_error = str(e) or type(e).__name__
                 retry_count += 1
                 
                 if retry_count <= step.retry_count:
@@ -464,13 +1049,13 @@ class WorkflowExecutor:
                     delay = step.retry_delay * (2 ** (retry_count - 1))
                     logger.warning(
                         f"[WORKFLOW] Step {step_number} failed (attempt {retry_count}), "
-                        f"retrying in {delay}s: {e}"
+                        f"retrying in {delay}s: {last_error}"
                     )
                     await asyncio.sleep(delay)
                 else:
                     # All retries exhausted
                     logger.error(
-                        f"[WORKFLOW] Step {step_number} failed after {retry_count} attempts: {e}"
+                        f"[WORKFLOW] Step {step_number} failed after {retry_count} attempts: {last_error}"
                     )
                     step_result.status = StepStatus.FAILED
                     step_result.error = last_error
@@ -484,6 +1069,33 @@ class WorkflowExecutor:
         
         return step_result
     
+    async def _invoke(self, step: WorkflowStep, args: Dict[str, Any], context: Dict[str, Any]) -> Any:
+        """Run the tool or agent behind a step."""
+        if step.type == "agent":
+            if not self.agent_executor:
+                raise ValueError(f"No agent executor configured for agent step {step.name or step.tool}")
+            render_prompt = step.compiled()[2]
+            prompt = render_prompt(context) if render_prompt else ""
+            return await self.agent_executor(step.tool, str(prompt), context)
+        return await self.tool_executor(step.tool, args)
+    
+    @staticmethod
+    def _check_condition(
+        step: WorkflowStep,
+        condition: Callable[[Dict[str, Any]], bool],
+        context: Dict[str, Any],
+    ) -> bool:
+        """Evaluate a compiled condition; errors (e.g. None > 5) count as False."""
+        try:
+            return condition(context)
+        except Exception as e:
+            logger.warning(f"[WORKFLOW] Condition evaluation failed: {step.condition} - {e}")
+            return False
+    
+    def _resolve_value(self, value: Any, context: Dict[str, Any]) -> Any:
+        """Resolve templates in a value of any shape."""
+        return compile_value(value)(context)
+    
     def _resolve_args(self, args: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Resolve template variables in arguments.
@@ -493,114 +1105,41 @@ class WorkflowExecutor:
         - {{prev.key}} - Access previous step result
         - {{context.key}} - Access any context value
         
-        Args:
-            args: Arguments with potential templates
-            context: Current execution context
-            
-        Returns:
-            Resolved arguments
+        Steps use their precompiled resolver; this is for ad-hoc values.
         """
-        resolved = {}
-        
-        for key, value in args.items():
-            if isinstance(value, str):
-                resolved[key] = self._resolve_template(value, context)
-            elif isinstance(value, dict):
-                resolved[key] = self._resolve_args(value, context)
-            elif isinstance(value, list):
-                resolved[key] = [
-                    self._resolve_template(item, context) if isinstance(item, str) else item
-                    for item in value
-                ]
-            else:
-                resolved[key] = value
-        
-        return resolved
+        return compile_value(args)(context)
     
     def _resolve_template(self, template: str, context: Dict[str, Any]) -> Any:
         """
-        Resolve a single template string.
+        Resolve a single template string (compiled once per distinct string).
         
         Example:
             "{{input.url}}" -> "https://google.com"
             "Screenshot of {{prev.url}}" -> "Screenshot of https://google.com"
         """
-        # Find all {{...}} patterns
-        pattern = r'\{\{([^}]+)\}\}'
-        matches = re.findall(pattern, template)
-        
-        if not matches:
-            return template
-        
-        # If entire string is a template, return the resolved value
-        if template.startswith("{{") and template.endswith("}}") and len(matches) == 1:
-            path = matches[0].strip()
-            return self._get_nested_value(context, path)
-        
-        # Otherwise, do string interpolation
-        result = template
-        for match in matches:
-            path = match.strip()
-            value = self._get_nested_value(context, path)
-            result = result.replace(f"{{{{{match}}}}}", str(value) if value is not None else "")
-        
-        return result
-    
-    def _get_nested_value(self, obj: Dict[str, Any], path: str) -> Any:
-        """
-        Get a nested value from a dictionary using dot notation.
-        
-        Example:
-            _get_nested_value({"input": {"url": "..."}}, "input.url") -> "..."
-        """
-        parts = path.split(".")
-        current = obj
-        
-        for part in parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            elif hasattr(current, part):
-                current = getattr(current, part)
-            else:
-                return None
-        
-        return current
+        return compile_template(template)(context)
     
     def _evaluate_condition(self, condition: str, context: Dict[str, Any]) -> bool:
         """
-        Evaluate a condition string.
+        Evaluate a condition string with the safe expression evaluator.
         
-        Supports simple conditions:
+        Supports:
         - "input.url" - Truthy check
         - "prev.success == true"
-        - "context.count > 5"
+        - "context.count > 5 and not input.skip"
         
-        Args:
-            condition: Condition string
-            context: Current execution context
-            
         Returns:
-            True if condition passes
+            True if condition passes (invalid expressions are False)
         """
         try:
-            # Resolve any templates in condition
-            resolved = self._resolve_template(condition, context)
-            
-            # If it's just a path, check if it's truthy
-            if not any(op in str(resolved) for op in ["==", "!=", ">", "<", ">=", "<="]):
-                return bool(resolved)
-            
-            # Otherwise, evaluate the expression (safely)
-            # For production, use a safe expression evaluator
-            # This is a simplified version
-            return bool(eval(str(resolved)))
+            return compile_condition(condition)(context)
         except Exception as e:
             logger.warning(f"[WORKFLOW] Condition evaluation failed: {condition} - {e}")
             return False
     
     def get_workflow_state(self, run_id: str) -> Optional[WorkflowState]:
-        """Get current state of a running workflow."""
-        return self._active_workflows.get(run_id)
+        """Get current state of a running or recently finished workflow."""
+        return self._active_workflows.get(run_id) or self._finished_workflows.get(run_id)
 
 
 # ============================================================================
@@ -622,8 +1161,8 @@ class WorkflowRegistry:
     
     @classmethod
     def register(cls, workflow: WorkflowDefinition) -> None:
-        """Register a workflow template."""
-        cls._workflows[workflow.name] = workflow
+        """Register a workflow template (compiling its templates)."""
+        cls._workflows[workflow.name] = workflow.compile()
         logger.info(f"[WORKFLOW_REGISTRY] Registered workflow: {workflow.name}")
     
     @classmethod
@@ -724,9 +1263,13 @@ class WorkflowEngine:
         self._registry = WorkflowRegistry()
         self._tool_handlers: Dict[str, Any] = {}
         self._agent_handlers: Dict[str, Any] = {}
-        self._workflows: Dict[str, Any] = {}
-        # Create executor with a default tool executor that routes to registered handlers
-        self._executor = WorkflowExecutor(self._default_tool_executor)
+        self._workflows: Dict[str, Any] = {}  # Raw YAML (schedule, config, ...)
+        self._definitions: Dict[str, WorkflowDefinition] = {}
+        # Create executor with default executors that route to registered handlers
+        self._executor = WorkflowExecutor(
+            self._default_tool_executor,
+            agent_executor=self._default_agent_executor,
+        )
     
     async def _default_tool_executor(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
         """Default tool executor that routes to registered handlers."""
@@ -737,6 +1280,13 @@ class WorkflowEngine:
             return handler(**tool_args)
         raise ValueError(f"No handler registered for tool: {tool_name}")
     
+    async def _default_agent_executor(self, agent_name: str, prompt: str, context: Dict[str, Any]) -> Any:
+        """Default agent executor that routes to registered agent handlers."""
+        handler = self._agent_handlers.get(agent_name)
+        if not handler:
+            raise ValueError(f"No handler registered for agent: {agent_name}")
+        return await handler(prompt=prompt, context=context)
+    
     def register_tool_handler(self, name: str, handler: Any) -> None:
         """Register a tool handler."""
         self._tool_handlers[name] = handler
@@ -753,7 +1303,11 @@ class WorkflowEngine:
         
         if data:
             workflow_name = data.get("name", Path(path).stem)
+            data["name"] = workflow_name
+            definition = WorkflowDefinition.from_dict(data).compile()
+            definition.dependency_graph()  # Fail at load time, not at 7 AM
             self._workflows[workflow_name] = data
+            self._definitions[workflow_name] = definition
             logger.info(f"[WORKFLOW ENGINE] Loaded workflow: {workflow_name}")
     
     async def execute(
@@ -762,20 +1316,54 @@ class WorkflowEngine:
         user_id: int,
         context: Optional[Dict[str, Any]] = None,
     ) -> WorkflowState:
-        """Execute a workflow by name."""
-        workflow_def = self._workflows.get(workflow_name)
-        if not workflow_def:
+        """Execute a workflow by name and return its final state."""
+        definition = self._definitions.get(workflow_name)
+        if not definition:
             raise ValueError(f"Workflow not found: {workflow_name}")
         
-        return await self._executor.execute(
-            workflow=workflow_def,
+        import uuid
+        run_id = f"wf_{workflow_name}_{uuid.uuid4().hex[:8]}"
+        context = context or {}
+        
+        async for _event in self._executor.execute(
+            definition,
+            input_data=context.get("input") or {},
+            run_id=run_id,
             user_id=user_id,
-            context=context or {},
-        )
+            base_context=context,
+        ):
+            pass
+        
+        return self._executor.get_workflow_state(run_id)
+    
+    async def resume_interrupted_runs(self, limit: int = 10) -> int:
+        """
+        Resume runs of loaded workflows whose worker died mid-run.
+        
+        Call at startup, after workflows are loaded. Runs continue in the
+        background from their last checkpoint.
+        
+        Returns:
+            Number of runs resumed
+        """
+        if not self._definitions:
+            return 0
+        
+        runs = await self._executor.run_store.claim_resumable(list(self._definitions), limit=limit)
+        for run in runs:
+            definition = self._definitions[run["workflow_name"]]
+            logger.info(f"[WORKFLOW ENGINE] Resuming interrupted run {run['run_id']}")
+            asyncio.create_task(self._drain(self._executor.resume(definition, run)))
+        return len(runs)
+    
+    @staticmethod
+    async def _drain(events: AsyncIterator[Dict[str, Any]]) -> None:
+        async for _event in events:
+            pass
     
     def get_execution(self, execution_id: str) -> Optional[WorkflowState]:
         """Get a workflow execution by ID."""
-        return self._executor._active_workflows.get(execution_id)
+        return self._executor.get_workflow_state(execution_id)
     
     def list_workflows(self) -> List[str]:
         """List all registered workflows."""
@@ -798,6 +1386,7 @@ __all__ = [
     "WorkflowStatus",
     "StepStatus",
     "WorkflowExecutor",
+    "WorkflowRunStore",
     "WorkflowRegistry",
     "WorkflowEngine",
     "workflow_engine",
@@ -0,0 +1,270 @@
+"""
+Nicole V7 - Compiled workflow templates and conditions
+
+Workflow step arguments and conditions are parsed once, when a workflow is
+loaded or registered, into plain Python closures. Executing a step then
+only walks pre-split paths - no regex and no eval() per step.
+
+Templates:
+    "{{input.url}}"               -> the raw value at input.url
+    "Screenshot of {{prev.url}}"  -> string interpolation ("" for None)
+    {"a": ["{{x}}", 1]}           -> nested dicts/lists compiled recursively
+
+Conditions (a small, safe expression language):
+    input.url                     truthy check
+    input.url != null             comparison: == != > >= < <= in
+    prev.success == true and not input.skip
+    context.count > 5 or (steps.fetch.status == "failed")
+    {{input.mode}} == 'fast'      {{...}} around a path is allowed
+
+Literals: numbers, 'single' / "double" quoted strings, true/false,
+null/none. Boolean operators: and/or/not (also && || !). Anything else is
+a compile error, so there is no way to reach Python builtins. Path parts
+starting with "_" are rejected too, so attribute access on step results
+can't walk into dunders (__class__, __globals__, ...).
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+Context = Dict[str, Any]
+Resolver = Callable[[Context], Any]
+
+TEMPLATE_RE = re.compile(r"\{\{([^}]+)\}\}")
+
+
+class ExpressionError(ValueError):
+    """A template or condition could not be compiled."""
+
+
+# ============================================================================
+# PATHS
+# ============================================================================
+
+def compile_path(path: str) -> Resolver:
+    """Compile a dotted path (input.items.0.url) into an accessor."""
+    parts: Tuple[str, ...] = tuple(p for p in path.strip().split(".") if p)
+    if not parts:
+        raise ExpressionError(f"Empty path in {path!r}")
+    private = [part for part in parts if part.startswith("_")]
+    if private:
+        raise ExpressionError(f"Private name {private[0]!r} in path {path!r}")
+
+    def resolve(context: Context) -> Any:
+        current: Any = context
+        for part in parts:
+            if isinstance(current, dict):
+                current = current.get(part)
+            elif isinstance(current, (list, tuple)) and part.isdigit():
+                index = int(part)
+                current = current[index] if index < len(current) else None
+            elif current is not None and hasattr(current, part):
+                current = getattr(current, part)
+            else:
+                return None
+            if current is None:
+                return None
+        return current
+
+    return resolve
+
+
+# ============================================================================
+# TEMPLATES
+# ============================================================================
+
+@lru_cache(maxsize=4096)
+def compile_template(template: str) -> Resolver:
+    """
+    Compile a template string.
+
+    A string that is exactly one {{path}} resolves to the raw value (so
+    dicts, lists and numbers pass through); otherwise placeholders are
+    interpolated as strings.
+    """
+    matches = list(TEMPLATE_RE.finditer(template))
+    if not matches:
+        return lambda context: template
+
+    if len(matches) == 1 and matches[0].span() == (0, len(template)):
+        return compile_path(matches[0].group(1))
+
+    pieces: List[Any] = []
+    last = 0
+    for match in matches:
+        if match.start() > last:
+            pieces.append(template[last:match.start()])
+        pieces.append(compile_path(match.group(1)))
+        last = match.end()
+    if last < len(template):
+        pieces.append(template[last:])
+
+    def render(context: Context) -> str:
+        out = []
+        for piece in pieces:
+            if isinstance(piece, str):
+                out.append(piece)
+            else:
+                value = piece(context)
+                out.append("" if value is None else str(value))
+        return "".join(out)
+
+    return render
+
+
+def compile_value(value: Any) -> Resolver:
+    """Compile templates anywhere inside a str / dict / list value."""
+    if isinstance(value, str):
+        return compile_template(value)
+
+    if isinstance(value, dict):
+        items = [(key, compile_value(item)) for key, item in value.items()]
+        return lambda context: {key: fn(context) for key, fn in items}
+
+    if isinstance(value, list):
+        fns = [compile_value(item) for item in value]
+        return lambda context: [fn(context) for fn in fns]
+
+    return lambda context: value
+
+
+# ============================================================================
+# CONDITIONS
+# ============================================================================
+
+_TOKEN_RE = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<op>==|!=|>=|<=|>|<|&&|\|\||!|\(|\))
+      | (?P<path>\{\{[^}]+\}\}|[A-Za-z_][\w-]*(?:\.[\w-]+)*)
+    )
+    """,
+    re.VERBOSE,
+)
+
+_LITERALS = {"true": True, "false": False, "null": None, "none": None}
+_KEYWORDS = {"and", "or", "not", "in"}
+_COMPARATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "in": lambda a, b: b is not None and a in b,
+}
+
+
+def _tokenize(expression: str) -> List[Tuple[str, str]]:
+    tokens: List[Tuple[str, str]] = []
+    position = 0
+    text = expression.strip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f"Unexpected input at {text[position:position + 20]!r} in {expression!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "path" and value.lower() in _KEYWORDS:
+            kind = "op"
+            value = value.lower()
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser producing closures."""
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.index = 0
+
+    def _peek(self) -> Tuple[str, str]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else ("end", "")
+
+    def _take(self) -> Tuple[str, str]:
+        token = self._peek()
+        self.index += 1
+        return token
+
+    def _accept(self, *ops: str) -> bool:
+        kind, value = self._peek()
+        if kind == "op" and value in ops:
+            self.index += 1
+            return True
+        return False
+
+    def parse(self) -> Resolver:
+        node = self._or()
+        if self._peek()[0] != "end":
+            raise ExpressionError(f"Unexpected {self._peek()[1]!r} in {self.expression!r}")
+        return node
+
+    def _or(self) -> Resolver:
+        left = self._and()
+        while self._accept("or", "||"):
+            right = self._and()
+            left = (lambda a, b: lambda c: bool(a(c)) or bool(b(c)))(left, right)
+        return left
+
+    def _and(self) -> Resolver:
+        left = self._not()
+        while self._accept("and", "&&"):
+            right = self._not()
+            left = (lambda a, b: lambda c: bool(a(c)) and bool(b(c)))(left, right)
+        return left
+
+    def _not(self) -> Resolver:
+        if self._accept("not", "!"):
+            operand = self._not()
+            return lambda c: not operand(c)
+        return self._comparison()
+
+    def _comparison(self) -> Resolver:
+        left = self._atom()
+        kind, value = self._peek()
+        if kind == "op" and value in _COMPARATORS:
+            self.index += 1
+            right = self._atom()
+            compare = _COMPARATORS[value]
+            return lambda c: compare(left(c), right(c))
+        return left
+
+    def _atom(self) -> Resolver:
+        kind, value = self._take()
+        if kind == "op" and value == "(":
+            node = self._or()
+            if not self._accept(")"):
+                raise ExpressionError(f"Missing ')' in {self.expression!r}")
+            return node
+        if kind == "number":
+            number = float(value) if "." in value else int(value)
+            return lambda c: number
+        if kind == "string":
+            text = re.sub(r"\\(.)", r"\1", value[1:-1])
+            return lambda c: text
+        if kind == "path":
+            if value.lower() in _LITERALS:
+                literal = _LITERALS[value.lower()]
+                return lambda c: literal
+            if value.startswith("{{"):
+                value = value[2:-2]
+            return compile_path(value)
+        raise ExpressionError(f"Unexpected {value or 'end of expression'!r} in {self.expression!r}")
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(expression: str) -> Callable[[Context], bool]:
+    """
+    Compile a condition into a predicate.
+
+    Raises:
+        ExpressionError: The expression is not valid
+    """
+    node = _Parser(expression).parse()
+    return lambda context: bool(node(context))
@@ -68,6 +68,14 @@ class WorkflowScheduler:
         # Step 3: Load workflow definitions
         await self._load_workflows()
         
+        # Step 3b: Resume runs interrupted by a restart (from their checkpoints)
+        try:
+            resumed = await workflow_engine.resume_interrupted_runs()
+            if resumed:
+                logger.info(f"[WORKFLOW SCHEDULER] Resumed {resumed} interrupted workflow runs")
+        except Exception as e:
+            logger.warning(f"[WORKFLOW SCHEDULER] Could not resume interrupted runs: {e}")
+        
         # Step 4: Initialize scheduler
         self._scheduler = AsyncIOScheduler()
         
@@ -0,0 +1,170 @@
+"""
+Nicole V7 - Write-behind batch queue
+
+Shared base for logs that must never make a request wait on Postgres
+(api_usage_log via UsageLogWriter, knowledge_base_usage_log via
+KBAccessLogWriter):
+
+- add() queues an item and returns; a background task flushes every
+  `flush_interval` seconds, or as soon as `batch_size` items are pending
+- the queue is bounded: past `max_queue` the oldest items are dropped
+- a batch Postgres rejects is split so one bad row doesn't lose the rest
+- while Postgres is unreachable, _hold() decides what happens to the
+  batch (default: drop it); subclasses can requeue or spill instead
+- shutdown() stops the flusher and drains the queue
+
+Subclasses implement _insert(batch) and may override _hold(),
+_after_flush(), _drain_remaining() and _describe().
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Generic, List, Optional, TypeVar
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that mean Postgres is unreachable (hold the batch), as opposed to a
+# bad row (skip it)
+UNAVAILABLE_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.InterfaceError,
+    asyncpg.CannotConnectNowError,
+)
+
+
+class WriteBehindQueue(Generic[T]):
+    """Bounded in-process queue written to Postgres in batches."""
+
+    # Log prefix and what an item is called in log lines
+    log_prefix = "[WRITE-BEHIND]"
+    item_name = "rows"
+
+    def __init__(self, batch_size: int, flush_interval: float, max_queue: int):
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._max_queue = max(self._batch_size, max_queue)
+        self._pending: Deque[T] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stats = {"written": 0, "batches": 0, "dropped": 0, "rejected": 0}
+
+    def add(self, item: T) -> None:
+        """Queue an item; returns immediately."""
+        if len(self._pending) >= self._max_queue:
+            self._pending.popleft()
+            self._stats["dropped"] += 1
+            if self._stats["dropped"] % 1000 == 1:
+                logger.warning(
+                    f"{self.log_prefix} Queue full, dropped {self._stats['dropped']} {self.item_name} so far"
+                )
+        self._pending.append(item)
+        self._ensure_started()
+        if len(self._pending) >= self._batch_size:
+            self._wake.set()
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"{self.log_prefix} Flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Write everything pending now; returns the number of items written."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        written = 0
+        async with self._lock:
+            while self._pending:
+                batch = [self._pending.popleft() for _ in range(min(self._batch_size, len(self._pending)))]
+                try:
+                    written += await self.write(batch)
+                except UNAVAILABLE_ERRORS as e:
+                    self._hold(batch, e)
+                    return written
+            if written:
+                written += await self._after_flush()
+        return written
+
+    async def shutdown(self) -> int:
+        """Stop the flusher and drain the queue."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        written = await self.flush()
+        await self._drain_remaining()
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"pending": len(self._pending), **self._stats}
+
+    async def write(self, batch: List[T]) -> int:
+        """Insert a batch now; rows Postgres rejects are skipped and counted."""
+        try:
+            await self._insert(batch)
+        except UNAVAILABLE_ERRORS:
+            raise
+        except asyncpg.PostgresError as e:
+            if len(batch) == 1:
+                self._stats["rejected"] += 1
+                logger.warning(f"{self.log_prefix} Rejected {self._describe(batch[0])}: {e}")
+                return 0
+            # One bad row (e.g. a deleted user or file) fails the batch; isolate it
+            written = 0
+            for item in batch:
+                written += await self.write([item])
+            return written
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+        return len(batch)
+
+    # ---------------------------------------------------------------------
+    # Subclass hooks
+    # ---------------------------------------------------------------------
+
+    async def _insert(self, batch: List[T]) -> None:
+        raise NotImplementedError
+
+    def _hold(self, batch: List[T], error: BaseException) -> None:
+        """Handle a batch that couldn't be written while Postgres is unreachable."""
+        self._stats["dropped"] += len(batch)
+        logger.warning(f"{self.log_prefix} Database unavailable, dropped {len(batch)} {self.item_name}: {error}")
+
+    async def _after_flush(self) -> int:
+        """Runs (under the flush lock) after a flush wrote something; returns extra items written."""
+        return 0
+
+    async def _drain_remaining(self) -> None:
+        """Deal with items still queued at shutdown (the database was unavailable)."""
+        if self._pending:
+            self._stats["dropped"] += len(self._pending)
+            logger.error(
+                f"{self.log_prefix} Lost {len(self._pending)} {self.item_name} at shutdown (database unavailable)"
+            )
+            self._pending.clear()
+
+    def _describe(self, item: T) -> str:
+        return "row"
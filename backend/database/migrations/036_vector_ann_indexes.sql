@@ -0,0 +1,73 @@
+-- ============================================================================
+-- Migration: 036_vector_ann_indexes.sql
+-- Purpose: ANN indexes with per-user filtering for document_chunks and
+--          memory_entries
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- Mirrors app/services/vector_index_service.py (SCHEMA_MIGRATIONS and
+-- _index_ddl). The service can apply the same statements at runtime via
+-- vector_index_service.apply_migrations().
+--
+-- NOTE: CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+-- Run this file with psql in autocommit mode (no --single-transaction).
+--
+-- Choose ONE access method per table. HNSW (pgvector) is the default;
+-- StreamingDiskANN (pgvectorscale) is shown commented out below.
+-- ============================================================================
+
+-- ============================================================================
+-- 1. DENORMALIZE user_id ONTO document_chunks
+-- Lets the user filter be applied inside the index scan instead of via a join
+-- ============================================================================
+
+ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS user_id BIGINT;
+
+UPDATE document_chunks dc
+SET user_id = dr.user_id
+FROM document_repository dr
+WHERE dr.doc_id = dc.doc_id
+  AND dc.user_id IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_user
+ON document_chunks (user_id, chunk_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_user_id_active
+ON memory_entries (user_id, memory_id)
+WHERE archived_at IS NULL;
+
+-- ============================================================================
+-- 2. HNSW INDEXES (pgvector)
+-- Query-time recall is tuned per query with hnsw.ef_search and, on
+-- pgvector >= 0.8, hnsw.iterative_scan for filtered searches
+-- ============================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_embedding_hnsw
+ON document_chunks USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_embedding_hnsw
+ON memory_entries USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE archived_at IS NULL;
+
+-- ============================================================================
+-- 3. STREAMING DISKANN INDEXES (pgvectorscale) - alternative to section 2
+-- ============================================================================
+
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chunks_embedding_diskann
+-- ON document_chunks USING diskann (embedding vector_cosine_ops);
+--
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_embedding_diskann
+-- ON memory_entries USING diskann (embedding vector_cosine_ops)
+-- WHERE archived_at IS NULL;
+
+-- ============================================================================
+-- 4. DROP SUPERSEDED IVFFLAT INDEXES (run after the new indexes are valid)
+-- ============================================================================
+
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_chunks_embedding;
+
+ANALYZE document_chunks;
+ANALYZE memory_entries;
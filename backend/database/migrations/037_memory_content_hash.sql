@@ -0,0 +1,53 @@
+-- ============================================================================
+-- Migration: 037_memory_content_hash.sql
+-- Purpose: Indexed exact-duplicate detection for memory_entries
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- Replaces the per-save LOWER(TRIM(content)) expression scan with a stored
+-- hash of the normalized content and a unique partial index, so
+-- MemoryService.save_memory can detect exact duplicates with one index probe
+-- and concurrent saves of the same content cannot both succeed.
+--
+-- Normalization: lowercase, trim, collapse internal whitespace.
+--
+-- NOTE: CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+-- ============================================================================
+
+-- ============================================================================
+-- 1. ARCHIVE EXISTING EXACT DUPLICATES (keep the oldest active copy)
+-- ============================================================================
+
+WITH ranked AS (
+    SELECT
+        memory_id,
+        ROW_NUMBER() OVER (
+            PARTITION BY user_id, md5(regexp_replace(lower(btrim(content)), '\s+', ' ', 'g'))
+            ORDER BY created_at, memory_id
+        ) AS rn
+    FROM memory_entries
+    WHERE archived_at IS NULL
+)
+UPDATE memory_entries m
+SET archived_at = NOW(), updated_at = NOW()
+FROM ranked r
+WHERE r.memory_id = m.memory_id
+  AND r.rn > 1;
+
+-- ============================================================================
+-- 2. NORMALIZED CONTENT HASH
+-- Generated column stays correct on every INSERT/UPDATE without app code
+-- ============================================================================
+
+ALTER TABLE memory_entries
+ADD COLUMN IF NOT EXISTS content_hash TEXT
+GENERATED ALWAYS AS (md5(regexp_replace(lower(btrim(content)), '\s+', ' ', 'g'))) STORED;
+
+-- ============================================================================
+-- 3. UNIQUE PARTIAL INDEX (active memories only)
+-- ============================================================================
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_content_hash
+ON memory_entries (user_id, content_hash)
+WHERE archived_at IS NULL;
@@ -0,0 +1,60 @@
+-- ============================================================================
+-- Migration: 038_memory_maintenance_batches.sql
+-- Purpose: Incremental, batched memory decay and archival
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- Supports the keyset-paginated maintenance loops in
+-- MemoryService.decay_memories / archive_low_confidence:
+--
+-- * decay_due_at schedules each active memory's next decay check, so a run
+--   only visits rows that are actually due instead of rescanning the table.
+-- * memory_job_watermarks records how far each job got (high-water mark on
+--   updated_at for the archival sweep, last cutoff for decay).
+-- * Composite indexes back the (key, memory_id) keyset cursors.
+--
+-- NOTE: CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+-- ============================================================================
+
+-- ============================================================================
+-- 1. DECAY SCHEDULE
+-- ============================================================================
+
+ALTER TABLE memory_entries ADD COLUMN IF NOT EXISTS decay_due_at TIMESTAMPTZ;
+
+-- New memories become due once they have gone unused for the decay threshold.
+-- The job re-derives the schedule from last_accessed, so the default only has
+-- to be a reasonable first check.
+ALTER TABLE memory_entries
+    ALTER COLUMN decay_due_at SET DEFAULT NOW() + INTERVAL '30 days';
+
+UPDATE memory_entries
+SET decay_due_at = COALESCE(last_accessed, created_at) + INTERVAL '30 days'
+WHERE decay_due_at IS NULL
+  AND archived_at IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_decay_due
+ON memory_entries (decay_due_at, memory_id)
+WHERE archived_at IS NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_updated_keyset
+ON memory_entries (updated_at, memory_id);
+
+-- ============================================================================
+-- 2. JOB WATERMARKS
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS memory_job_watermarks (
+    job_name TEXT PRIMARY KEY,
+    watermark TIMESTAMPTZ NOT NULL,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    rows_processed BIGINT NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_report JSONB DEFAULT '{}'::jsonb
+);
+
+COMMENT ON TABLE memory_job_watermarks IS
+    'High-water marks for incremental memory maintenance jobs';
+
+ANALYZE memory_entries;
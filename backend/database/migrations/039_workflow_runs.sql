@@ -0,0 +1,70 @@
+-- ============================================================================
+-- Migration: 039_workflow_runs.sql
+-- Purpose: Durable workflow run state and per-step checkpoints
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- WorkflowExecutor checkpoints each finished step so a run interrupted by a
+-- worker restart can resume from the steps that already completed:
+--
+-- * workflow_runs holds one row per run: input, base context, status, step
+--   timings and a lease. A live executor keeps renewing lease_expires_at;
+--   a RUNNING row whose lease has expired belongs to a dead process and
+--   can be claimed for resume.
+-- * workflow_step_results holds one row per finished step (completed,
+--   skipped or failed) with its result and timing.
+-- ============================================================================
+
+-- ============================================================================
+-- 1. RUNS
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS workflow_runs (
+    run_id TEXT PRIMARY KEY,
+    workflow_name TEXT NOT NULL,
+    user_id BIGINT,
+    status TEXT NOT NULL DEFAULT 'running',
+    input_data JSONB NOT NULL DEFAULT '{}'::jsonb,
+    base_context JSONB NOT NULL DEFAULT '{}'::jsonb,
+    step_timings JSONB NOT NULL DEFAULT '{}'::jsonb,
+    error TEXT,
+    resume_count INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at TIMESTAMPTZ,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Resume scan: running runs with an expired lease
+CREATE INDEX IF NOT EXISTS idx_workflow_runs_resumable
+ON workflow_runs (lease_expires_at)
+WHERE status = 'running';
+
+CREATE INDEX IF NOT EXISTS idx_workflow_runs_name_started
+ON workflow_runs (workflow_name, started_at DESC);
+
+-- ============================================================================
+-- 2. STEP CHECKPOINTS
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS workflow_step_results (
+    run_id TEXT NOT NULL REFERENCES workflow_runs(run_id) ON DELETE CASCADE,
+    step_name TEXT NOT NULL,
+    step_number INTEGER NOT NULL,
+    tool TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result JSONB,
+    error TEXT,
+    retry_count INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ,
+    duration_ms INTEGER,
+    PRIMARY KEY (run_id, step_name)
+);
+
+COMMENT ON TABLE workflow_runs IS
+    'Durable WorkflowExecutor run state (resumable after restart)';
+COMMENT ON TABLE workflow_step_results IS
+    'Per-step checkpoints for workflow_runs';
@@ -0,0 +1,40 @@
+-- ============================================================================
+-- Migration: 040_worker_job_runs.sql
+-- Purpose: Durable, replica-safe run ledger for the background worker
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- Every replica of worker.py keeps the same APScheduler cron triggers, but
+-- a fire only runs on the replica that claims its row here:
+--
+-- * One row per (job_id, scheduled_for). The claim is an INSERT ... ON
+--   CONFLICT, so exactly one replica wins each fire.
+-- * The winner renews lease_expires_at while the job runs. A 'running' row
+--   whose lease expired belongs to a dead replica and can be re-claimed.
+-- * On startup a replica compares each job's last recorded fire with its
+--   trigger and runs fires missed while no worker was up.
+-- * metrics holds per-run fan-out counters (items, failures, item latency).
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS worker_job_runs (
+    job_id TEXT NOT NULL,
+    scheduled_for TIMESTAMPTZ NOT NULL,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    attempts INTEGER NOT NULL DEFAULT 1,
+    lease_expires_at TIMESTAMPTZ NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ,
+    duration_ms INTEGER,
+    metrics JSONB NOT NULL DEFAULT '{}'::jsonb,
+    error TEXT,
+    PRIMARY KEY (job_id, scheduled_for)
+);
+
+-- Catch-up: latest fire per job
+CREATE INDEX IF NOT EXISTS idx_worker_job_runs_latest
+ON worker_job_runs (job_id, scheduled_for DESC);
+
+COMMENT ON TABLE worker_job_runs IS
+    'Background worker run ledger: one leased row per scheduled fire';
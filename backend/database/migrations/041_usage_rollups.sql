@@ -0,0 +1,245 @@
+-- ============================================================================
+-- Migration: 041_usage_rollups.sql
+-- Purpose: Incremental usage rollups for the usage dashboard
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- AlphawaveUsageService.get_usage_summary / get_diagnostics used to scan
+-- api_usage_log, uploaded_files and document_chunks on every load. They
+-- now read only these tables, kept current by triggers:
+--
+-- * usage_rollup_hourly / usage_rollup_daily: one row per
+--   (user, bucket, service, model) with request, token and cost totals.
+--   Buckets are UTC.
+-- * usage_storage_rollup: one row per user with document bytes / count
+--   and embedding chunk count.
+--
+-- The triggers are statement-level with transition tables, so a
+-- multi-row INSERT (batched usage logging) is aggregated once per
+-- statement and upserted as one row per bucket, not once per event.
+--
+-- Run in one transaction: the source tables are locked against writes
+-- while the rollups are backfilled, so no event is missed or counted
+-- twice.
+-- ============================================================================
+
+BEGIN;
+
+-- ============================================================================
+-- 1. ROLLUP TABLES
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS usage_rollup_hourly (
+    user_id BIGINT NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    service TEXT NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    requests BIGINT NOT NULL DEFAULT 0,
+    zero_cost_requests BIGINT NOT NULL DEFAULT 0,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14, 6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, bucket, service, model)
+);
+
+CREATE TABLE IF NOT EXISTS usage_rollup_daily (
+    user_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    service TEXT NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    requests BIGINT NOT NULL DEFAULT 0,
+    zero_cost_requests BIGINT NOT NULL DEFAULT 0,
+    input_tokens BIGINT NOT NULL DEFAULT 0,
+    output_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(14, 6) NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, service, model)
+);
+
+CREATE TABLE IF NOT EXISTS usage_storage_rollup (
+    user_id BIGINT PRIMARY KEY,
+    document_bytes BIGINT NOT NULL DEFAULT 0,
+    document_count BIGINT NOT NULL DEFAULT 0,
+    chunk_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- ============================================================================
+-- 2. API USAGE TRIGGER
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION usage_rollup_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO usage_rollup_hourly AS r (
+        user_id, bucket, service, model,
+        requests, zero_cost_requests, input_tokens, output_tokens, cost_usd
+    )
+    SELECT
+        user_id, date_trunc('hour', created_at), service, COALESCE(model, ''),
+        COUNT(*), COUNT(*) FILTER (WHERE cost_usd = 0),
+        SUM(input_tokens), SUM(output_tokens), SUM(cost_usd)
+    FROM inserted
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, bucket, service, model) DO UPDATE SET
+        requests = r.requests + EXCLUDED.requests,
+        zero_cost_requests = r.zero_cost_requests + EXCLUDED.zero_cost_requests,
+        input_tokens = r.input_tokens + EXCLUDED.input_tokens,
+        output_tokens = r.output_tokens + EXCLUDED.output_tokens,
+        cost_usd = r.cost_usd + EXCLUDED.cost_usd;
+
+    INSERT INTO usage_rollup_daily AS r (
+        user_id, day, service, model,
+        requests, zero_cost_requests, input_tokens, output_tokens, cost_usd
+    )
+    SELECT
+        user_id, (created_at AT TIME ZONE 'UTC')::date, service, COALESCE(model, ''),
+        COUNT(*), COUNT(*) FILTER (WHERE cost_usd = 0),
+        SUM(input_tokens), SUM(output_tokens), SUM(cost_usd)
+    FROM inserted
+    GROUP BY 1, 2, 3, 4
+    ON CONFLICT (user_id, day, service, model) DO UPDATE SET
+        requests = r.requests + EXCLUDED.requests,
+        zero_cost_requests = r.zero_cost_requests + EXCLUDED.zero_cost_requests,
+        input_tokens = r.input_tokens + EXCLUDED.input_tokens,
+        output_tokens = r.output_tokens + EXCLUDED.output_tokens,
+        cost_usd = r.cost_usd + EXCLUDED.cost_usd;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- 3. STORAGE TRIGGERS
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION usage_storage_apply(
+    p_user_id BIGINT, p_bytes BIGINT, p_documents BIGINT, p_chunks BIGINT
+) RETURNS VOID AS $$
+    INSERT INTO usage_storage_rollup AS r (user_id, document_bytes, document_count, chunk_count)
+    VALUES (p_user_id, GREATEST(p_bytes, 0), GREATEST(p_documents, 0), GREATEST(p_chunks, 0))
+    ON CONFLICT (user_id) DO UPDATE SET
+        document_bytes = GREATEST(r.document_bytes + p_bytes, 0),
+        document_count = GREATEST(r.document_count + p_documents, 0),
+        chunk_count = GREATEST(r.chunk_count + p_chunks, 0),
+        updated_at = NOW();
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION usage_storage_on_files() RETURNS TRIGGER AS $$
+DECLARE
+    direction INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+    rec RECORD;
+BEGIN
+    FOR rec IN
+        SELECT user_id, SUM(file_size) AS bytes, COUNT(*) AS documents
+        FROM changed
+        GROUP BY user_id
+    LOOP
+        PERFORM usage_storage_apply(rec.user_id, direction * rec.bytes, direction * rec.documents, 0);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Chunks inserted without user_id are attributed through their document
+CREATE OR REPLACE FUNCTION usage_storage_on_chunks() RETURNS TRIGGER AS $$
+DECLARE
+    direction INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+    rec RECORD;
+BEGIN
+    FOR rec IN
+        SELECT COALESCE(c.user_id, dr.user_id) AS user_id, COUNT(*) AS chunks
+        FROM changed c
+        LEFT JOIN document_repository dr ON dr.doc_id = c.doc_id AND c.user_id IS NULL
+        GROUP BY 1
+    LOOP
+        IF rec.user_id IS NOT NULL THEN
+            PERFORM usage_storage_apply(rec.user_id, 0, 0, direction * rec.chunks);
+        END IF;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- 4. ATTACH TRIGGERS AND BACKFILL
+-- ============================================================================
+
+LOCK TABLE api_usage_log, uploaded_files, document_chunks IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trg_usage_rollup_insert ON api_usage_log;
+CREATE TRIGGER trg_usage_rollup_insert
+AFTER INSERT ON api_usage_log
+REFERENCING NEW TABLE AS inserted
+FOR EACH STATEMENT EXECUTE FUNCTION usage_rollup_on_insert();
+
+DROP TRIGGER IF EXISTS trg_usage_storage_files_insert ON uploaded_files;
+CREATE TRIGGER trg_usage_storage_files_insert
+AFTER INSERT ON uploaded_files
+REFERENCING NEW TABLE AS changed
+FOR EACH STATEMENT EXECUTE FUNCTION usage_storage_on_files();
+
+DROP TRIGGER IF EXISTS trg_usage_storage_files_delete ON uploaded_files;
+CREATE TRIGGER trg_usage_storage_files_delete
+AFTER DELETE ON uploaded_files
+REFERENCING OLD TABLE AS changed
+FOR EACH STATEMENT EXECUTE FUNCTION usage_storage_on_files();
+
+DROP TRIGGER IF EXISTS trg_usage_storage_chunks_insert ON document_chunks;
+CREATE TRIGGER trg_usage_storage_chunks_insert
+AFTER INSERT ON document_chunks
+REFERENCING NEW TABLE AS changed
+FOR EACH STATEMENT EXECUTE FUNCTION usage_storage_on_chunks();
+
+DROP TRIGGER IF EXISTS trg_usage_storage_chunks_delete ON document_chunks;
+CREATE TRIGGER trg_usage_storage_chunks_delete
+AFTER DELETE ON document_chunks
+REFERENCING OLD TABLE AS changed
+FOR EACH STATEMENT EXECUTE FUNCTION usage_storage_on_chunks();
+
+TRUNCATE usage_rollup_hourly, usage_rollup_daily, usage_storage_rollup;
+
+INSERT INTO usage_rollup_hourly (
+    user_id, bucket, service, model,
+    requests, zero_cost_requests, input_tokens, output_tokens, cost_usd
+)
+SELECT
+    user_id, date_trunc('hour', created_at), service, COALESCE(model, ''),
+    COUNT(*), COUNT(*) FILTER (WHERE cost_usd = 0),
+    SUM(input_tokens), SUM(output_tokens), SUM(cost_usd)
+FROM api_usage_log
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO usage_rollup_daily (
+    user_id, day, service, model,
+    requests, zero_cost_requests, input_tokens, output_tokens, cost_usd
+)
+SELECT
+    user_id, (bucket AT TIME ZONE 'UTC')::date, service, model,
+    SUM(requests), SUM(zero_cost_requests),
+    SUM(input_tokens), SUM(output_tokens), SUM(cost_usd)
+FROM usage_rollup_hourly
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO usage_storage_rollup (user_id, document_bytes, document_count, chunk_count)
+SELECT user_id, SUM(document_bytes), SUM(document_count), SUM(chunk_count)
+FROM (
+    SELECT user_id, SUM(file_size) AS document_bytes, COUNT(*) AS document_count, 0 AS chunk_count
+    FROM uploaded_files
+    GROUP BY user_id
+    UNION ALL
+    SELECT COALESCE(dc.user_id, dr.user_id), 0, 0, COUNT(*)
+    FROM document_chunks dc
+    LEFT JOIN document_repository dr ON dr.doc_id = dc.doc_id AND dc.user_id IS NULL
+    GROUP BY 1
+) totals
+WHERE user_id IS NOT NULL
+GROUP BY user_id;
+
+COMMIT;
+
+COMMENT ON TABLE usage_rollup_hourly IS
+    'Hourly api_usage_log totals per user/service/model (trigger-maintained)';
+COMMENT ON TABLE usage_rollup_daily IS
+    'Daily (UTC) api_usage_log totals per user/service/model (trigger-maintained)';
+COMMENT ON TABLE usage_storage_rollup IS
+    'Per-user document bytes/count and chunk count (trigger-maintained)';
@@ -0,0 +1,25 @@
+-- ============================================================================
+-- Migration: 042_vibe_files_content_hash.sql
+-- Purpose: Hash-based change detection for vibe_files
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- VibeService._save_files_batch used to pull every file's full content into
+-- Python to find what changed. It now sends (path, md5) pairs, compares them
+-- against this column in SQL, and uploads only new or changed files in one
+-- unnest-based upsert.
+--
+-- The app computes the same hash (hashlib.md5 of the UTF-8 content), so the
+-- expression here must not change without updating vibe_service.py.
+--
+-- NOTE: adding a stored generated column rewrites vibe_files once.
+-- ============================================================================
+
+-- Generated column stays correct on every INSERT/UPDATE without app code
+ALTER TABLE vibe_files
+ADD COLUMN IF NOT EXISTS content_hash TEXT
+GENERATED ALWAYS AS (md5(COALESCE(content, ''))) STORED;
+
+COMMENT ON COLUMN vibe_files.content_hash IS
+    'md5 of content; compared by _save_files_batch to skip unchanged files';
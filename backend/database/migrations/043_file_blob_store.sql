@@ -0,0 +1,112 @@
+-- ============================================================================
+-- Migration: 043_file_blob_store.sql
+-- Purpose: Content-addressed blobs and version manifests for project files
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- Shared history for generated files (app/services/file_blob_store.py):
+--
+-- * file_blobs: one row per distinct file content, keyed by sha256 of the
+--   UTF-8 text. `data` holds the compressed bytes (codec zstd or zlib), or
+--   is NULL when BLOB_STORE_BACKEND=disk keeps them under BLOB_STORE_PATH.
+-- * file_manifests: one row per project version, `files` = {path: hash}.
+--   Namespaces: vibe (vibe_projects), faz (faz_projects), enjineer
+--   (enjineer_projects).
+--
+-- vibe_files / faz_files / enjineer_files stay the working copy; versions
+-- only add manifests and the blobs that changed.
+--
+-- Existing projects get a version 1 snapshot of their current files so
+-- later commits (which only carry changed paths) build on a full tree.
+-- Backfilled blobs are stored uncompressed (codec 'none', left to TOAST);
+-- new blobs are compressed by the app.
+-- ============================================================================
+
+BEGIN;
+
+-- ============================================================================
+-- 1. TABLES
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS file_blobs (
+    hash TEXT PRIMARY KEY,
+    size BIGINT NOT NULL,
+    stored_size BIGINT NOT NULL,
+    codec TEXT NOT NULL CHECK (codec IN ('zstd', 'zlib', 'none')),
+    data BYTEA,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS file_manifests (
+    manifest_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    namespace TEXT NOT NULL CHECK (namespace IN ('vibe', 'faz', 'enjineer')),
+    project_id BIGINT NOT NULL,
+    version INTEGER NOT NULL,
+    parent_version INTEGER,
+    files JSONB NOT NULL DEFAULT '{}',
+    file_count INTEGER NOT NULL DEFAULT 0,
+    message TEXT,
+    author TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT file_manifests_version_unique UNIQUE (namespace, project_id, version)
+);
+
+-- ============================================================================
+-- 2. BACKFILL: blobs for current contents (sha256 of UTF-8, as in the app)
+-- ============================================================================
+
+INSERT INTO file_blobs (hash, size, stored_size, codec, data)
+SELECT DISTINCT ON (hash) hash, octet_length(b), octet_length(b), 'none', b
+FROM (
+    SELECT b, encode(sha256(b), 'hex') AS hash
+    FROM (
+        SELECT convert_to(content, 'UTF8') AS b FROM vibe_files WHERE content IS NOT NULL
+        UNION ALL
+        SELECT convert_to(content, 'UTF8') FROM faz_files
+        UNION ALL
+        SELECT convert_to(content, 'UTF8') FROM enjineer_files WHERE content IS NOT NULL
+    ) contents
+) hashed
+ON CONFLICT (hash) DO NOTHING;
+
+-- ============================================================================
+-- 3. BACKFILL: version 1 manifest per project
+-- ============================================================================
+
+INSERT INTO file_manifests (namespace, project_id, version, files, file_count, message, author)
+SELECT 'vibe', project_id, 1,
+       jsonb_object_agg(file_path, encode(sha256(convert_to(content, 'UTF8')), 'hex')),
+       COUNT(*), 'Initial snapshot', 'migration'
+FROM vibe_files
+WHERE content IS NOT NULL
+GROUP BY project_id
+ON CONFLICT (namespace, project_id, version) DO NOTHING;
+
+INSERT INTO file_manifests (namespace, project_id, version, files, file_count, message, author)
+SELECT 'faz', project_id, 1,
+       jsonb_object_agg(path, encode(sha256(convert_to(content, 'UTF8')), 'hex')),
+       COUNT(*), 'Initial snapshot', 'migration'
+FROM (
+    SELECT DISTINCT ON (project_id, path) project_id, path, content
+    FROM faz_files
+    ORDER BY project_id, path, version DESC
+) latest
+GROUP BY project_id
+ON CONFLICT (namespace, project_id, version) DO NOTHING;
+
+INSERT INTO file_manifests (namespace, project_id, version, files, file_count, message, author)
+SELECT 'enjineer', project_id, 1,
+       jsonb_object_agg(path, encode(sha256(convert_to(content, 'UTF8')), 'hex')),
+       COUNT(*), 'Initial snapshot', 'migration'
+FROM enjineer_files
+WHERE content IS NOT NULL
+GROUP BY project_id
+ON CONFLICT (namespace, project_id, version) DO NOTHING;
+
+COMMIT;
+
+COMMENT ON TABLE file_blobs IS
+    'Compressed file contents keyed by sha256 (shared by all project versions)';
+COMMENT ON TABLE file_manifests IS
+    'Project file tree per version: files = {path: file_blobs.hash}';
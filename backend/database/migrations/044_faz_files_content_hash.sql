@@ -0,0 +1,31 @@
+-- ============================================================================
+-- Migration: 044_faz_files_content_hash.sql
+-- Purpose: Hash-based change detection for faz_files
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- faz_files.content_hash (migration 020) was never written. It becomes a
+-- generated md5 of content, like vibe_files.content_hash (migration 042),
+-- so FazOrchestrator._upsert_files can compare (path, md5) pairs in SQL and
+-- write only new or changed files. User edits through the faz_projects
+-- router keep it current without any app change.
+--
+-- The app computes the same hash (hashlib.md5 of the UTF-8 content), so the
+-- expression here must not change without updating faz_orchestrator.py.
+--
+-- NOTE: adding a stored generated column rewrites faz_files once.
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE faz_files DROP COLUMN IF EXISTS content_hash;
+
+ALTER TABLE faz_files
+ADD COLUMN content_hash TEXT
+GENERATED ALWAYS AS (md5(content)) STORED;
+
+COMMIT;
+
+COMMENT ON COLUMN faz_files.content_hash IS
+    'md5 of content; compared by FazOrchestrator._upsert_files to skip unchanged files';
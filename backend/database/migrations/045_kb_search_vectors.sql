@@ -0,0 +1,62 @@
+-- ============================================================================
+-- Migration: 045_kb_search_vectors.sql
+-- Purpose: Stored, weighted tsvectors for knowledge base full-text search
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- search_fulltext / search_sections used to call to_tsvector(...) in WHERE
+-- and ORDER BY, re-tokenizing every row per query with no usable index
+-- (the 028 expression indexes cover content only, not the expressions the
+-- queries use). Both tables now carry a weighted search_vector with a GIN
+-- index:
+--
+-- * knowledge_base_files.search_vector (generated):
+--     title 'A', description 'B', content 'D'
+-- * knowledge_base_sections.search_vector (written by
+--   KnowledgeBaseService._parse_and_create_sections, since it includes the
+--   parent file's title):
+--     file title 'A', heading 'B', content 'D'
+--
+-- ts_rank's default weights {D 0.1, C 0.2, B 0.4, A 1.0} then rank title
+-- matches above heading matches above body matches.
+--
+-- NOTE: adding a stored generated column rewrites knowledge_base_files once.
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE knowledge_base_files
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(description, '')), 'B') ||
+    setweight(to_tsvector('english', content), 'D')
+) STORED;
+
+ALTER TABLE knowledge_base_sections
+ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+UPDATE knowledge_base_sections s
+SET search_vector =
+    setweight(to_tsvector('english', COALESCE(f.title, '')), 'A') ||
+    setweight(to_tsvector('english', s.heading), 'B') ||
+    setweight(to_tsvector('english', s.content), 'D')
+FROM knowledge_base_files f
+WHERE f.id = s.file_id;
+
+CREATE INDEX IF NOT EXISTS idx_kb_files_search_vector
+    ON knowledge_base_files USING GIN(search_vector);
+CREATE INDEX IF NOT EXISTS idx_kb_sections_search_vector
+    ON knowledge_base_sections USING GIN(search_vector);
+
+-- Superseded: no query matches these expressions
+DROP INDEX IF EXISTS idx_kb_files_content_fts;
+DROP INDEX IF EXISTS idx_kb_sections_content_fts;
+
+COMMIT;
+
+COMMENT ON COLUMN knowledge_base_files.search_vector IS
+    'Weighted tsvector: title A, description B, content D';
+COMMENT ON COLUMN knowledge_base_sections.search_vector IS
+    'Weighted tsvector: file title A, heading B, content D (written on section insert)';
@@ -0,0 +1,26 @@
+-- ============================================================================
+-- Migration: 046_kb_section_token_counts.sql
+-- Purpose: Store each knowledge base section's token count at ingest
+-- Author: Nicole V7 Architecture
+-- Date: 2026-10-18
+-- ============================================================================
+--
+-- KnowledgeBaseService.get_relevant_context packs sections into a token
+-- budget. Before this it estimated tokens from word counts on every call.
+-- KnowledgeBaseService._parse_and_create_sections now writes token_count
+-- when it inserts a section. The count uses text_chunking.count_tokens
+-- (cl100k_base when tiktoken is installed).
+--
+-- Existing rows stay NULL until their file is next updated. The packer
+-- counts NULL sections itself.
+-- ============================================================================
+
+BEGIN;
+
+ALTER TABLE knowledge_base_sections
+ADD COLUMN IF NOT EXISTS token_count INTEGER;
+
+COMMIT;
+
+COMMENT ON COLUMN knowledge_base_sections.token_count IS
+    'Tokens in content (text_chunking.count_tokens), written on section insert; NULL for rows ingested before 046';
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Nicole V7 Chunking Benchmark
+
+Compares the token-measured, structure-aware chunker in
+app/services/text_chunking.py with the previous character-based
+_create_chunks on large synthetic documents.
+
+For each size it reports throughput, chunk count (= embedding inputs),
+token size distribution, and how much of the document the legacy
+chunker dropped at its 500-chunk cap. Regression checks for the new
+chunker run first and stop the benchmark if one fails.
+
+Usage:
+    cd backend
+    python scripts/benchmark_chunking.py
+    python scripts/benchmark_chunking.py --sizes 1 10 50 --max-tokens 512 --overlap 64
+    python scripts/benchmark_chunking.py --file path/to/document.md
+
+No database or API access is needed.
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.services.text_chunking import TIKTOKEN_AVAILABLE, count_tokens, iter_chunks
+
+
+# =============================================================================
+# LEGACY CHUNKER (previous AlphawaveDocumentService._create_chunks)
+# =============================================================================
+
+LEGACY_CHUNK_SIZE = 1000
+LEGACY_CHUNK_OVERLAP = 200
+LEGACY_MAX_CHUNKS = 500
+
+
+def legacy_chunks(text: str) -> List[str]:
+    chunks = []
+    current_chunk = ""
+    for para in text.split("\n\n"):
+        para = para.strip()
+        if not para:
+            continue
+        if len(current_chunk) + len(para) + 1 > LEGACY_CHUNK_SIZE:
+            if current_chunk:
+                chunks.append(current_chunk.strip())
+                words = current_chunk.split()
+                keep = LEGACY_CHUNK_OVERLAP // 5
+                overlap_words = words[-keep:] if len(words) > keep else []
+                current_chunk = " ".join(overlap_words) + " " + para
+            else:
+                current_chunk = para
+        else:
+            current_chunk = current_chunk + "\n\n" + para if current_chunk else para
+        if len(chunks) >= LEGACY_MAX_CHUNKS:
+            break
+    if current_chunk.strip() and len(chunks) < LEGACY_MAX_CHUNKS:
+        chunks.append(current_chunk.strip())
+    return chunks
+
+
+# =============================================================================
+# DATA GENERATION
+# =============================================================================
+
+WORDS = (
+    "revenue pipeline customer contract renewal forecast quarter margin "
+    "deployment latency throughput schema migration index replica backup "
+    "the a of to and in for with on that is was by as at from this"
+).split()
+
+
+def synthetic_document(target_chars: int, seed: int = 7) -> str:
+    """Markdown with nested headings, prose, tables and code blocks."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    size = 0
+    section = 0
+    while size < target_chars:
+        section += 1
+        block = [f"# Chapter {section}", ""]
+        for sub in range(rng.randint(2, 5)):
+            block += [f"## Section {section}.{sub}", ""]
+            for _ in range(rng.randint(2, 6)):
+                sentences = [
+                    " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 24))).capitalize() + "."
+                    for _ in range(rng.randint(2, 12))
+                ]
+                block += [" ".join(sentences), ""]
+            roll = rng.random()
+            if roll < 0.3:
+                rows = rng.randint(5, 120)
+                block += ["| metric | q1 | q2 | q3 |", "|---|---|---|---|"]
+                block += [
+                    f"| {rng.choice(WORDS)} | {rng.randint(0, 999)} | {rng.randint(0, 999)} | {rng.randint(0, 999)} |"
+                    for _ in range(rows)
+                ]
+                block.append("")
+            elif roll < 0.5:
+                lines = rng.randint(5, 200)
+                block += ["```python"]
+                block += [f"    value_{i} = compute({rng.choice(WORDS)!r}, {i})" for i in range(lines)]
+                block += ["```", ""]
+        text = "\n".join(block)
+        parts.append(text)
+        size += len(text)
+    return "\n".join(parts)
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def describe(token_counts: List[int]) -> str:
+    if not token_counts:
+        return "-"
+    ordered = sorted(token_counts)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return f"mean={statistics.mean(ordered):.0f} p95={p95} max={ordered[-1]}"
+
+
+def run(text: str, label: str, args: argparse.Namespace) -> Dict:
+    mb = len(text) / 1_000_000
+    print(f"\n=== {label}: {mb:.1f} MB, {len(text):,} chars ===")
+
+    started = time.perf_counter()
+    old = legacy_chunks(text)
+    legacy_seconds = time.perf_counter() - started
+    covered = sum(len(c) for c in old) - (len(old) - 1) * LEGACY_CHUNK_OVERLAP
+    dropped = max(0.0, 1 - covered / max(1, len(text)))
+    legacy_tokens = [count_tokens(c) for c in old[: args.sample]]
+
+    started = time.perf_counter()
+    first_chunk_ms = None
+    new_tokens: List[int] = []
+    kinds: Dict[str, int] = {}
+    for chunk in iter_chunks(text, max_tokens=args.max_tokens, overlap_tokens=args.overlap):
+        if first_chunk_ms is None:
+            first_chunk_ms = 1000 * (time.perf_counter() - started)
+        new_tokens.append(chunk.token_count)
+        for kind in chunk.kinds:
+            kinds[kind] = kinds.get(kind, 0) + 1
+    new_seconds = time.perf_counter() - started
+
+    print(
+        f"  legacy : {len(old):>7,} chunks  {legacy_seconds * 1000:>8.1f}ms  "
+        f"tokens({describe(legacy_tokens)})  ~{dropped:.0%} of text dropped at cap"
+    )
+    print(
+        f"  tokens : {len(new_tokens):>7,} chunks  {new_seconds * 1000:>8.1f}ms  "
+        f"tokens({describe(new_tokens)})  {mb / max(new_seconds, 1e-9):.1f} MB/s  "
+        f"first chunk {first_chunk_ms or 0:.1f}ms"
+    )
+    print("  blocks : " + ", ".join(f"{k}={v:,}" for k, v in sorted(kinds.items())))
+
+    return {
+        "label": label,
+        "mb": mb,
+        "legacy_chunks": len(old),
+        "legacy_dropped": dropped,
+        "chunks": len(new_tokens),
+        "seconds": new_seconds,
+        "total_tokens": sum(new_tokens),
+    }
+
+
+# =============================================================================
+# REGRESSION CHECKS
+# =============================================================================
+
+def check_headings_kept() -> None:
+    """A heading must survive when heading + next block exceed the budget."""
+    heading = "# Installing the widget quickly"
+    for block_tokens in (101, 400):  # Block fits alone / block is oversized
+        paragraph = " ".join(["word"] * block_tokens)
+        max_tokens = min(block_tokens, 101) + count_tokens(heading) - 1
+        chunks = list(iter_chunks(f"{heading}\n\n{paragraph}", max_tokens=max_tokens, overlap_tokens=0))
+        text = "\n".join(chunk.content for chunk in chunks)
+        if heading not in text or text.count("word") < block_tokens:
+            raise SystemExit(f"Regression: text dropped chunking a {block_tokens}-token block under {max_tokens} tokens")
+    print("Checks : headings kept when the next block doesn't fit beside them")
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark document chunking")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10], help="Synthetic sizes in MB")
+    parser.add_argument("--file", type=str, help="Benchmark a real document instead")
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap", type=int, default=64)
+    parser.add_argument("--sample", type=int, default=2000, help="Legacy chunks to token-count")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"Tokenizer: {'tiktoken cl100k_base' if TIKTOKEN_AVAILABLE else 'regex approximation'}")
+    check_headings_kept()
+
+    results = []
+    if args.file:
+        text = Path(args.file).read_text(encoding="utf-8", errors="replace")
+        results.append(run(text, Path(args.file).name, args))
+    else:
+        for size in args.sizes:
+            text = synthetic_document(int(size * 1_000_000))
+            results.append(run(text, f"synthetic {size:g}MB", args))
+
+    print("\n=== SUMMARY ===")
+    print(f"{'input':<20} {'MB':>6}  {'legacy':>8} {'dropped':>8}  {'chunks':>8} {'tokens':>11} {'MB/s':>7}")
+    for r in results:
+        print(
+            f"{r['label']:<20} {r['mb']:>6.1f}  {r['legacy_chunks']:>8,} {r['legacy_dropped']:>8.0%}  "
+            f"{r['chunks']:>8,} {r['total_tokens']:>11,} {r['mb'] / max(r['seconds'], 1e-9):>7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Nicole V7 Vector Search Benchmark
+
+Measures recall@k and latency of the filtered ANN search strategies in
+vector_index_service against exact (sequential scan) ground truth.
+
+For each corpus size a scratch table is filled with synthetic clustered
+embeddings spread across several users, an ANN index is built, and a set
+of per-user queries is run at each ef_search setting.
+
+Usage:
+    cd backend
+    python scripts/benchmark_vector_search.py
+    python scripts/benchmark_vector_search.py --sizes 10000 100000 --method diskann
+    python scripts/benchmark_vector_search.py --ef 20 40 80 160 --k 10 --queries 100
+
+WARNING: 1M x 1536-dim rows is ~6 GB plus the index. Run against a
+development database, never production.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add backend to path for imports
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from app.database import db
+from app.services.vector_index_service import (
+    STRATEGY_EXACT,
+    VectorTableSpec,
+    _index_ddl,
+    vector_index_service,
+)
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+BENCH_TABLE = "bench_vector_chunks"
+
+BENCH_SPEC = VectorTableSpec(
+    table=BENCH_TABLE,
+    id_column="chunk_id",
+    payload_columns=("content",),
+    index_prefix="idx_bench_vector",
+)
+
+INSERT_BATCH = 20000
+
+
+# =============================================================================
+# DATA GENERATION
+# =============================================================================
+
+async def create_table(dim: int) -> None:
+    """Create (or recreate) the scratch benchmark table."""
+    await db.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    await db.execute(
+        f"""
+        CREATE TABLE {BENCH_TABLE} (
+            chunk_id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+            user_id BIGINT NOT NULL,
+            content TEXT NOT NULL,
+            embedding vector({dim})
+        )
+        """
+    )
+    await db.execute(f"CREATE INDEX ON {BENCH_TABLE} (user_id, chunk_id)")
+
+
+async def fill_table(size: int, dim: int, users: int, clusters: int) -> None:
+    """
+    Insert synthetic embeddings server-side.
+
+    Vectors are cluster centroids plus noise, which behaves more like real
+    embeddings than uniform random points.
+    """
+    await db.execute("DROP TABLE IF EXISTS bench_vector_centroids")
+    await db.execute(
+        f"""
+        CREATE TABLE bench_vector_centroids AS
+        SELECT c AS cluster_id,
+               ARRAY(SELECT random() - 0.5 FROM generate_series(1, {dim}) WHERE c >= 0) AS centroid
+        FROM generate_series(0, {clusters - 1}) AS c
+        """
+    )
+
+    inserted = 0
+    while inserted < size:
+        batch = min(INSERT_BATCH, size - inserted)
+        await db.execute(
+            f"""
+            INSERT INTO {BENCH_TABLE} (user_id, content, embedding)
+            SELECT
+                (g % {users}) + 1,
+                'chunk ' || g,
+                ARRAY(
+                    SELECT bc.centroid[i] + (random() - 0.5) * 0.3
+                    FROM generate_series(1, {dim}) AS i
+                )::vector
+            FROM generate_series({inserted}, {inserted + batch - 1}) AS g
+            JOIN bench_vector_centroids bc ON bc.cluster_id = (g * 7919) % {clusters}
+            """
+        )
+        inserted += batch
+        print(f"  inserted {inserted:,}/{size:,}", end="\r", flush=True)
+
+    print()
+    await db.execute("DROP TABLE bench_vector_centroids")
+    await db.execute(f"ANALYZE {BENCH_TABLE}")
+
+
+async def build_index(method: str) -> float:
+    """Build the ANN index and return build time in seconds."""
+    started = time.perf_counter()
+    await db.execute(_index_ddl(BENCH_SPEC, method))
+    await db.execute(f"ANALYZE {BENCH_TABLE}")
+    return time.perf_counter() - started
+
+
+async def sample_queries(count: int) -> List[Dict]:
+    """Use randomly chosen stored vectors as queries, scoped to their owner."""
+    rows = await db.fetch(
+        f"""
+        SELECT user_id, embedding::text AS embedding
+        FROM {BENCH_TABLE}
+        ORDER BY random()
+        LIMIT $1
+        """,
+        count,
+    )
+    return [{"user_id": r["user_id"], "embedding": r["embedding"]} for r in rows]
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+async def exact_neighbours(user_id: int, embedding: str, k: int) -> List[int]:
+    """Ground truth via sequential scan of the user's rows."""
+    async with db.transaction() as conn:
+        await conn.execute("SET LOCAL enable_indexscan = off")
+        await conn.execute("SET LOCAL enable_bitmapscan = off")
+        rows = await conn.fetch(
+            f"""
+            SELECT chunk_id FROM {BENCH_TABLE}
+            WHERE user_id = $2
+            ORDER BY embedding <=> $1::vector
+            LIMIT $3
+            """,
+            embedding,
+            user_id,
+            k,
+        )
+    return [r["chunk_id"] for r in rows]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_size(args: argparse.Namespace, size: int) -> List[Dict]:
+    """Benchmark one corpus size across ef_search settings."""
+    print(f"\n=== {size:,} chunks ({args.users} users, dim={args.dim}) ===")
+    await create_table(args.dim)
+    await fill_table(size, args.dim, args.users, args.clusters)
+    build_seconds = await build_index(args.method)
+    print(f"  {args.method} index built in {build_seconds:.1f}s")
+
+    vector_index_service._capabilities = None  # Pick up the new index
+    caps = await vector_index_service.get_capabilities()
+    caps["methods"][BENCH_TABLE] = args.method
+
+    queries = await sample_queries(args.queries)
+    truth = {
+        i: await exact_neighbours(q["user_id"], q["embedding"], args.k)
+        for i, q in enumerate(queries)
+    }
+
+    results = []
+    for ef in args.ef:
+        for strategy in args.strategies:
+            if strategy == STRATEGY_EXACT and ef != args.ef[0]:
+                continue  # ef_search does not affect exact scans
+            latencies, recalls = [], []
+            for i, q in enumerate(queries):
+                started = time.perf_counter()
+                hits = await vector_index_service.search_ids(
+                    BENCH_SPEC,
+                    q["user_id"],
+                    q["embedding"],
+                    limit=args.k,
+                    ef_search=ef,
+                    strategy=strategy,
+                )
+                latencies.append(1000 * (time.perf_counter() - started))
+                expected = set(truth[i])
+                if expected:
+                    found = {h["id"] for h in hits}
+                    recalls.append(len(found & expected) / len(expected))
+
+            row = {
+                "size": size,
+                "strategy": strategy,
+                "ef_search": ef if strategy != STRATEGY_EXACT else "-",
+                "recall": statistics.mean(recalls) if recalls else 0.0,
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "p99_ms": percentile(latencies, 99),
+            }
+            results.append(row)
+            print(
+                f"  {strategy:<10} ef={str(row['ef_search']):>4}  "
+                f"recall@{args.k}={row['recall']:.3f}  "
+                f"p50={row['p50_ms']:.1f}ms  p95={row['p95_ms']:.1f}ms  p99={row['p99_ms']:.1f}ms"
+            )
+
+    return results
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark filtered ANN vector search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--method", choices=["hnsw", "diskann"], default="hnsw")
+    parser.add_argument("--ef", type=int, nargs="+", default=[20, 40, 80, 160])
+    parser.add_argument(
+        "--strategies", nargs="+", default=["iterative", "oversample", "exact"],
+        choices=["iterative", "oversample", "exact"],
+    )
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    args = parse_args()
+    await db.connect()
+
+    all_results = []
+    try:
+        for size in args.sizes:
+            all_results.extend(await run_size(args, size))
+    finally:
+        if not args.keep:
+            await db.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        await db.disconnect()
+
+    print("\n=== SUMMARY ===")
+    print(f"{'size':>10}  {'strategy':<10} {'ef':>4}  {'recall':>7}  {'p50':>8}  {'p95':>8}  {'p99':>8}")
+    for r in all_results:
+        print(
+            f"{r['size']:>10,}  {r['strategy']:<10} {str(r['ef_search']):>4}  "
+            f"{r['recall']:>7.3f}  {r['p50_ms']:>6.1f}ms  {r['p95_ms']:>6.1f}ms  {r['p99_ms']:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
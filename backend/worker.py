@@ -19,26 +19,38 @@ Features:
 - Graceful shutdown
 - Health monitoring
 - Rate limiting protection
+- Replica-safe runs: each cron fire is claimed in worker_job_runs
+  (Postgres row lease), so N replicas run every job exactly once
+- Missed fires (worker down at fire time) are caught up on startup
+- Per-user jobs fan out over a bounded async pool with per-job metrics
 """
 
 import asyncio
+import contextvars
 import logging
+import os
 import signal
+import socket
 import sys
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 import json
 
+import asyncpg
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.executors.asyncio import AsyncIOExecutor
 
 from app.config import settings
-from app.database import get_supabase, get_redis, get_qdrant
+from app.database import db, get_supabase, get_redis, get_qdrant
 from app.services.alphawave_memory_service import MemoryService
 from app.integrations.alphawave_claude import claude_client
 from app.integrations.alphawave_openai import openai_client
+from app.integrations.llm_governor import Lane, llm_lane
+from app.integrations.llm_telemetry import set_feature
 
 # Configure logging for worker
 try:
@@ -60,12 +72,140 @@ except PermissionError:
 logger = logging.getLogger("nicole_worker")
 
 
+# ============================================================================
+# JOB RUN LEDGER
+# ============================================================================
+
+_UNAVAILABLE = object()
+
+
+@dataclass
+class JobRun:
+    """One claimed fire of a scheduled job."""
+    job_id: str
+    scheduled_for: datetime
+    started: float = field(default_factory=time.perf_counter)
+    error: Optional[str] = None
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+# The run the current task belongs to (set by _run_exclusive)
+_current_run: contextvars.ContextVar[Optional[JobRun]] = contextvars.ContextVar(
+    "worker_current_run", default=None
+)
+
+
+class JobRunLedger:
+    """
+    Postgres ledger (worker_job_runs) giving each cron fire to one replica.
+
+    APScheduler keeps the triggers in memory on every replica; the ledger is
+    what makes running them safe. Without the table or the database every
+    replica runs its own jobs, as a single worker always has.
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._enabled = True
+
+    async def _query(self, method: str, query: str, *args) -> Any:
+        if not self._enabled:
+            return _UNAVAILABLE
+        try:
+            return await getattr(db, method)(query, *args)
+        except asyncpg.UndefinedTableError:
+            logger.warning("worker_job_runs missing (run migration 040) - job runs are not coordinated")
+            self._enabled = False
+        except Exception as e:
+            logger.warning(f"Job ledger query failed: {e}")
+        return _UNAVAILABLE
+
+    async def claim(self, job_id: str, scheduled_for: datetime) -> Optional[bool]:
+        """
+        Claim a fire. True = run it, False = another replica has it,
+        None = ledger unavailable (run locally).
+        """
+        row = await self._query(
+            "fetchrow",
+            """
+            INSERT INTO worker_job_runs (job_id, scheduled_for, owner, lease_expires_at)
+            VALUES ($1, $2, $3, NOW() + make_interval(secs => $4))
+            ON CONFLICT (job_id, scheduled_for) DO UPDATE
+            SET owner = EXCLUDED.owner,
+                status = 'running',
+                attempts = worker_job_runs.attempts + 1,
+                started_at = NOW(),
+                lease_expires_at = EXCLUDED.lease_expires_at
+            WHERE worker_job_runs.status = 'running'
+              AND worker_job_runs.lease_expires_at < NOW()
+            RETURNING attempts
+            """,
+            job_id, scheduled_for, self.owner, float(settings.WORKER_JOB_LEASE_SECONDS),
+        )
+        if row is _UNAVAILABLE:
+            return None
+        if row and row["attempts"] > 1:
+            logger.warning(f"Took over {job_id} @ {scheduled_for} from an expired lease")
+        return row is not None
+
+    async def renew(self, job_id: str, scheduled_for: datetime) -> None:
+        await self._query(
+            "execute",
+            """
+            UPDATE worker_job_runs
+            SET lease_expires_at = NOW() + make_interval(secs => $4)
+            WHERE job_id = $1 AND scheduled_for = $2 AND owner = $3 AND status = 'running'
+            """,
+            job_id, scheduled_for, self.owner, float(settings.WORKER_JOB_LEASE_SECONDS),
+        )
+
+    async def finish(self, run: JobRun, duration_ms: int) -> None:
+        await self._query(
+            "execute",
+            """
+            UPDATE worker_job_runs
+            SET status = $4, finished_at = NOW(), duration_ms = $5, metrics = $6, error = $7
+            WHERE job_id = $1 AND scheduled_for = $2 AND owner = $3
+            """,
+            run.job_id, run.scheduled_for, self.owner,
+            "error" if run.error else "completed", duration_ms, run.metrics, run.error,
+        )
+
+    async def last_fire(self, job_id: str) -> Optional[datetime]:
+        """Latest recorded fire of a job (None when unknown)."""
+        value = await self._query(
+            "fetchval",
+            "SELECT MAX(scheduled_for) FROM worker_job_runs WHERE job_id = $1",
+            job_id,
+        )
+        return None if value is _UNAVAILABLE else value
+
+
+def _fires_between(trigger: CronTrigger, start: datetime, end: datetime) -> List[datetime]:
+    """Fire times of a trigger in [start, end]."""
+    fires = []
+    fire = trigger.get_next_fire_time(None, start)
+    while fire and fire <= end:
+        fires.append(fire)
+        fire = trigger.get_next_fire_time(fire, fire + timedelta(seconds=1))
+    return fires
+
+
+def _percentile(samples: List[float], pct: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))], 1)
+
+
 class NicoleBackgroundWorker:
     """
     Background worker for Nicole V7 automated tasks.
 
     Implements all scheduled jobs with proper error handling,
-    rate limiting, and status tracking.
+    rate limiting, and status tracking. Jobs are registered through
+    _add_job, which routes every fire through _run_exclusive (ledger
+    claim, lease heartbeat, metrics).
     """
 
     def __init__(self):
@@ -78,7 +218,7 @@ class NicoleBackgroundWorker:
             job_defaults={
                 'coalesce': True,
                 'max_instances': 1,
-                'misfire_grace_time': 30
+                'misfire_grace_time': settings.WORKER_MISFIRE_GRACE_SECONDS
             },
             timezone='UTC'
         )
@@ -98,6 +238,11 @@ class NicoleBackgroundWorker:
             'start_time': datetime.utcnow()
         }
 
+        # Replica coordination and per-job metrics
+        self.ledger = JobRunLedger()
+        self._jobs: Dict[str, Tuple[CronTrigger, Callable[[], Awaitable[Any]]]] = {}
+        self.job_metrics: Dict[str, Dict[str, Any]] = {}
+
         # Setup graceful shutdown
         signal.signal(signal.SIGTERM, self._shutdown_handler)
         signal.signal(signal.SIGINT, self._shutdown_handler)
@@ -124,6 +269,153 @@ class NicoleBackgroundWorker:
             logger.error(f"Error scheduling jobs: {e}")
             raise
 
+    def _add_job(self, job_id: str, name: str, func: Callable[[], Awaitable[Any]], trigger: CronTrigger):
+        """Schedule a job; every fire goes through _run_exclusive."""
+        self._jobs[job_id] = (trigger, func)
+        self.scheduler.add_job(
+            func=self._run_exclusive,
+            args=[job_id],
+            trigger=trigger,
+            id=job_id,
+            name=name,
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _current_fire(trigger: CronTrigger) -> datetime:
+        """The scheduled fire time being executed now (same on every replica)."""
+        now = datetime.now(trigger.timezone)
+        grace = timedelta(seconds=settings.WORKER_MISFIRE_GRACE_SECONDS)
+        fires = _fires_between(trigger, now - grace, now)
+        return fires[-1] if fires else now.replace(second=0, microsecond=0)
+
+    async def _run_exclusive(self, job_id: str, scheduled_for: Optional[datetime] = None):
+        """
+        Run one fire of a job if this replica wins its ledger claim.
+
+        The lease is renewed while the job runs; a replica that dies mid-job
+        stops renewing and another replica may take the fire over.
+        """
+        trigger, func = self._jobs[job_id]
+        scheduled_for = scheduled_for or self._current_fire(trigger)
+        metrics = self.job_metrics.setdefault(job_id, {
+            'runs': 0, 'failures': 0, 'skipped': 0,
+            'last_run': None, 'last_duration_ms': None, 'last_fanout': None,
+        })
+
+        claimed = await self.ledger.claim(job_id, scheduled_for)
+        if claimed is False:
+            metrics['skipped'] += 1
+            logger.info(f"{job_id} @ {scheduled_for.isoformat()} claimed by another worker, skipping")
+            return
+
+        run = JobRun(job_id=job_id, scheduled_for=scheduled_for)
+        token = _current_run.set(run)
+        set_feature("worker")
+        heartbeat = asyncio.create_task(self._renew_lease(run)) if claimed else None
+        self.job_stats['total_runs'] += 1
+        try:
+            with llm_lane(Lane.BACKGROUND):
+                await func()
+        except Exception as e:
+            run.error = str(e)
+            logger.error(f"{job_id} raised: {e}")
+        finally:
+            _current_run.reset(token)
+            if heartbeat:
+                heartbeat.cancel()
+            duration_ms = int((time.perf_counter() - run.started) * 1000)
+            metrics['runs'] += 1
+            metrics['failures'] += 1 if run.error else 0
+            metrics['last_run'] = scheduled_for.isoformat()
+            metrics['last_duration_ms'] = duration_ms
+            metrics['last_fanout'] = run.metrics or None
+            if claimed:
+                await self.ledger.finish(run, duration_ms)
+
+    async def _renew_lease(self, run: JobRun):
+        interval = max(settings.WORKER_JOB_LEASE_SECONDS / 3, 5)
+        while True:
+            await asyncio.sleep(interval)
+            await self.ledger.renew(run.job_id, run.scheduled_for)
+
+    async def catch_up_missed_runs(self) -> int:
+        """
+        Run fires missed while no worker was up.
+
+        Only jobs with ledger history are considered, so a fresh deploy
+        doesn't replay the whole catch-up window. Returns fires started.
+        """
+        started = 0
+        window = timedelta(hours=settings.WORKER_CATCHUP_HOURS)
+        for job_id, (trigger, _) in self._jobs.items():
+            last = await self.ledger.last_fire(job_id)
+            if last is None:
+                continue
+            now = datetime.now(trigger.timezone)
+            missed = [f for f in _fires_between(trigger, now - window, now) if f > last]
+            if missed:
+                # Only the latest missed fire - the jobs are idempotent per day/week
+                logger.info(f"Catching up {job_id} missed at {missed[-1].isoformat()}")
+                asyncio.create_task(self._run_exclusive(job_id, missed[-1]))
+                started += 1
+        return started
+
+    async def _fan_out(
+        self,
+        items: List[Any],
+        handler: Callable[[Any], Awaitable[Any]],
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Run handler(item) for every item on a bounded async pool.
+
+        A failing item (exception or {"error": ...} result) is counted and
+        doesn't stop the others. Counters are attached to the current run.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.WORKER_USER_CONCURRENCY)
+        latencies: List[float] = []
+        failures = 0
+
+        async def run_one(item: Any):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    result = await handler(item)
+                    if isinstance(result, dict) and result.get("error"):
+                        failures += 1
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"{getattr(handler, '__name__', 'handler')}({item}) failed: {e}")
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(run_one(item) for item in items))
+
+        stats = {
+            "items": len(items),
+            "failed": failures,
+            "concurrency": concurrency or settings.WORKER_USER_CONCURRENCY,
+            "item_p50_ms": _percentile(latencies, 0.5),
+            "item_p95_ms": _percentile(latencies, 0.95),
+            "item_max_ms": round(max(latencies), 1) if latencies else None,
+        }
+        run = _current_run.get()
+        if run:
+            run.metrics = stats
+        return stats
+
+    async def _execute(self, query) -> Any:
+        """Run a (synchronous) Supabase query off the event loop."""
+        return await asyncio.to_thread(query.execute)
+
+    async def _user_ids(self) -> List[str]:
+        """All user ids (empty when Supabase isn't configured)."""
+        if not self.supabase:
+            return []
+        result = await self._execute(self.supabase.table("users").select("id"))
+        return [user["id"] for user in result.data or []]
+
     def _shutdown_handler(self, signum, frame):
         """Handle graceful shutdown signals."""
         logger.info(f"Received signal {signum}, shutting down worker...")
@@ -136,6 +428,11 @@ class NicoleBackgroundWorker:
             self.redis_client = get_redis()
             self.qdrant_client = get_qdrant()
 
+            try:
+                await db.connect()
+            except Exception as e:
+                logger.warning(f"Postgres unavailable, job runs are not coordinated: {e}")
+
             if not self.supabase:
                 logger.error("Failed to initialize Supabase client")
                 return False
@@ -149,6 +446,10 @@ class NicoleBackgroundWorker:
 
     async def update_job_status(self, job_name: str, status: str, error: Optional[str] = None):
         """Update job status in database."""
+        run = _current_run.get()
+        if run and status == "error":
+            run.error = error or "error"
+
         try:
             if not self.supabase:
                 return
@@ -173,12 +474,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_sports_data_collection(self):
         """Schedule sports data collection job."""
-        self.scheduler.add_job(
-            func=self.collect_sports_data,
-            trigger=CronTrigger(hour=5, minute=0),
-            id='sports_data_collection',
+        self._add_job(
+            job_id='sports_data_collection',
             name='Sports Data Collection',
-            replace_existing=True
+            func=self.collect_sports_data,
+            trigger=CronTrigger(hour=5, minute=0)
         )
 
     async def collect_sports_data(self):
@@ -192,12 +492,10 @@ class NicoleBackgroundWorker:
         try:
             await worker.update_job_status("sports_data_collection", "running")
 
-            # Get all users for data collection
-            if worker.supabase:
-                users_result = worker.supabase.table("users").select("id").execute()
-                if users_result.data:
-                    for user in users_result.data:
-                        await worker._collect_user_sports_data(user["id"])
+            # Get all users for data collection (bounded fan-out)
+            user_ids = await worker._user_ids()
+            fanout = await worker._fan_out(user_ids, worker._collect_user_sports_data)
+            logger.info(f"{fanout['items']} users, {fanout['failed']} failed, p95 {fanout['item_p95_ms']}ms")
 
             await worker.update_job_status("sports_data_collection", "completed")
             worker.job_stats['successful_runs'] += 1
@@ -211,12 +509,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_sports_predictions(self):
         """Schedule sports predictions job."""
-        self.scheduler.add_job(
-            func=self.generate_predictions,
-            trigger=CronTrigger(hour=6, minute=0),
-            id='sports_predictions',
+        self._add_job(
+            job_id='sports_predictions',
             name='Sports Predictions',
-            replace_existing=True
+            func=self.generate_predictions,
+            trigger=CronTrigger(hour=6, minute=0)
         )
 
     async def generate_predictions(self):
@@ -232,8 +529,7 @@ class NicoleBackgroundWorker:
             # Generate predictions for each sport
             sports = ['nfl', 'nba', 'mlb', 'nhl']
 
-            for sport in sports:
-                await worker._generate_sport_predictions(sport)
+            await worker._fan_out(sports, worker._generate_sport_predictions, concurrency=len(sports))
 
             await worker.update_job_status("sports_predictions", "completed")
             worker.job_stats['successful_runs'] += 1
@@ -247,12 +543,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_sports_dashboard(self):
         """Schedule sports dashboard update job."""
-        self.scheduler.add_job(
-            func=self.update_sports_dashboard,
-            trigger=CronTrigger(hour=8, minute=0),
-            id='sports_dashboard_update',
+        self._add_job(
+            job_id='sports_dashboard_update',
             name='Sports Dashboard Update',
-            replace_existing=True
+            func=self.update_sports_dashboard,
+            trigger=CronTrigger(hour=8, minute=0)
         )
 
     async def update_sports_dashboard(self):
@@ -265,12 +560,10 @@ class NicoleBackgroundWorker:
         try:
             await worker.update_job_status("sports_dashboard_update", "running")
 
-            # Update dashboard for each user
-            if worker.supabase:
-                users_result = worker.supabase.table("users").select("id").execute()
-                if users_result.data:
-                    for user in users_result.data:
-                        await worker._update_user_sports_dashboard(user["id"])
+            # Update dashboard for each user (bounded fan-out)
+            user_ids = await worker._user_ids()
+            fanout = await worker._fan_out(user_ids, worker._update_user_sports_dashboard)
+            logger.info(f"{fanout['items']} users, {fanout['failed']} failed, p95 {fanout['item_p95_ms']}ms")
 
             await worker.update_job_status("sports_dashboard_update", "completed")
             worker.job_stats['successful_runs'] += 1
@@ -284,12 +577,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_sports_blog(self):
         """Schedule sports blog generation job."""
-        self.scheduler.add_job(
-            func=self.generate_sports_blog,
-            trigger=CronTrigger(hour=9, minute=0),
-            id='sports_blog_generation',
+        self._add_job(
+            job_id='sports_blog_generation',
             name='Sports Blog Generation',
-            replace_existing=True
+            func=self.generate_sports_blog,
+            trigger=CronTrigger(hour=9, minute=0)
         )
 
     async def generate_sports_blog(self):
@@ -330,12 +622,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_daily_journals(self):
         """Schedule daily journal processing job."""
-        self.scheduler.add_job(
-            func=self.respond_to_daily_journals,
-            trigger=CronTrigger(hour=23, minute=59),
-            id='daily_journal_response',
+        self._add_job(
+            job_id='daily_journal_response',
             name='Daily Journal Response',
-            replace_existing=True
+            func=self.respond_to_daily_journals,
+            trigger=CronTrigger(hour=23, minute=59)
         )
 
     async def respond_to_daily_journals(self):
@@ -348,12 +639,10 @@ class NicoleBackgroundWorker:
         try:
             await worker.update_job_status("daily_journal_response", "running")
 
-            # Process journals for each user
-            if worker.supabase:
-                users_result = worker.supabase.table("users").select("id").execute()
-                if users_result.data:
-                    for user in users_result.data:
-                        await worker._process_user_journal(user["id"])
+            # Process journals for each user (bounded fan-out)
+            user_ids = await worker._user_ids()
+            fanout = await worker._fan_out(user_ids, worker._process_user_journal)
+            logger.info(f"{fanout['items']} users, {fanout['failed']} failed, p95 {fanout['item_p95_ms']}ms")
 
             await worker.update_job_status("daily_journal_response", "completed")
             worker.job_stats['successful_runs'] += 1
@@ -367,12 +656,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_memory_decay(self):
         """Schedule weekly memory decay job."""
-        self.scheduler.add_job(
-            func=self.memory_decay,
-            trigger=CronTrigger(day_of_week='sun', hour=2, minute=0),
-            id='memory_decay',
+        self._add_job(
+            job_id='memory_decay',
             name='Memory Decay',
-            replace_existing=True
+            func=self.memory_decay,
+            trigger=CronTrigger(day_of_week='sun', hour=2, minute=0)
         )
 
     async def memory_decay(self):
@@ -391,7 +679,11 @@ class NicoleBackgroundWorker:
             # Archive low confidence memories
             archive_result = await worker.memory_service.archive_low_confidence()
 
-            logger.info(f"Memory decay: {decay_result}, Archive: {archive_result}")
+            logger.info(
+                f"Memory decay: {decay_result['decayed']} decayed, {decay_result['archived']} archived "
+                f"in {len(decay_result['batches'])} batches; archive sweep: {archive_result['archived']} "
+                f"of {archive_result['rows']} changed rows"
+            )
 
             await worker.update_job_status("memory_decay", "completed")
             worker.job_stats['successful_runs'] += 1
@@ -404,12 +696,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_weekly_reflection(self):
         """Schedule weekly reflection job."""
-        self.scheduler.add_job(
-            func=self.nicole_weekly_reflection,
-            trigger=CronTrigger(day_of_week='sun', hour=3, minute=0),
-            id='weekly_reflection',
+        self._add_job(
+            job_id='weekly_reflection',
             name='Weekly Reflection',
-            replace_existing=True
+            func=self.nicole_weekly_reflection,
+            trigger=CronTrigger(day_of_week='sun', hour=3, minute=0)
         )
 
     async def nicole_weekly_reflection(self):
@@ -449,12 +740,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_self_audit(self):
         """Schedule self-audit job."""
-        self.scheduler.add_job(
-            func=self.self_audit,
-            trigger=CronTrigger(day_of_week='sun', hour=4, minute=0),
-            id='self_audit',
+        self._add_job(
+            job_id='self_audit',
             name='Self Audit',
-            replace_existing=True
+            func=self.self_audit,
+            trigger=CronTrigger(day_of_week='sun', hour=4, minute=0)
         )
 
     async def self_audit(self):
@@ -494,12 +784,11 @@ class NicoleBackgroundWorker:
 
     def _schedule_qdrant_backup(self):
         """Schedule Qdrant backup job."""
-        self.scheduler.add_job(
-            func=self.backup_qdrant,
-            trigger=CronTrigger(hour=3, minute=0),
-            id='qdrant_backup',
+        self._add_job(
+            job_id='qdrant_backup',
             name='Qdrant Backup',
-            replace_existing=True
+            func=self.backup_qdrant,
+            trigger=CronTrigger(hour=3, minute=0)
         )
 
     async def backup_qdrant(self):
@@ -538,7 +827,7 @@ class NicoleBackgroundWorker:
 
             # Get user's sports preferences
             if self.supabase:
-                prefs_result = self.supabase.table("memory_entries").select("*").eq("user_id", user_id).eq("memory_type", "preference").execute()
+                prefs_result = await self._execute(self.supabase.table("memory_entries").select("*").eq("user_id", user_id).eq("memory_type", "preference"))
 
                 # Collect data for preferred sports
                 sports_data = {}
@@ -558,7 +847,7 @@ class NicoleBackgroundWorker:
         try:
             # Get recent sports data
             if self.supabase:
-                data_result = self.supabase.table("sports_data_cache").select("*").eq("sport", sport).order("collected_at", desc=True).limit(10).execute()
+                data_result = await self._execute(self.supabase.table("sports_data_cache").select("*").eq("sport", sport).order("collected_at", desc=True).limit(10))
 
                 if data_result.data:
                     # Use Claude to analyze and generate predictions
@@ -592,7 +881,7 @@ class NicoleBackgroundWorker:
                                 "created_at": datetime.utcnow().isoformat()
                             }
 
-                            self.supabase.table("sports_predictions").insert(prediction_entry).execute()
+                            await self._execute(self.supabase.table("sports_predictions").insert(prediction_entry))
 
                     except json.JSONDecodeError:
                         logger.error("Failed to parse prediction response")
@@ -608,7 +897,7 @@ class NicoleBackgroundWorker:
         try:
             # Get user's predictions and performance
             if self.supabase:
-                predictions_result = self.supabase.table("sports_predictions").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(50).execute()
+                predictions_result = await self._execute(self.supabase.table("sports_predictions").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(50))
 
                 if predictions_result.data:
                     # Calculate performance metrics
@@ -627,7 +916,7 @@ class NicoleBackgroundWorker:
                     }
 
                     # Upsert dashboard data
-                    self.supabase.table("generated_artifacts").upsert(dashboard_data).execute()
+                    await self._execute(self.supabase.table("generated_artifacts").upsert(dashboard_data))
 
             return {"user_id": user_id, "dashboard_updated": True}
 
@@ -672,7 +961,7 @@ class NicoleBackgroundWorker:
             # Get today's journal entry
             if self.supabase:
                 today = datetime.utcnow().date().isoformat()
-                journal_result = self.supabase.table("daily_journals").select("*").eq("user_id", user_id).eq("date", today).execute()
+                journal_result = await self._execute(self.supabase.table("daily_journals").select("*").eq("user_id", user_id).eq("date", today))
 
                 if journal_result.data:
                     journal = journal_result.data[0]
@@ -695,10 +984,10 @@ class NicoleBackgroundWorker:
                     )
 
                     # Update journal with response
-                    self.supabase.table("daily_journals").update({
+                    await self._execute(self.supabase.table("daily_journals").update({
                         "nicole_response": nicole_response,
                         "responded_at": datetime.utcnow().isoformat()
-                    }).eq("id", journal["id"]).execute()
+                    }).eq("id", journal["id"]))
 
             return {"user_id": user_id, "journal_processed": True}
 
@@ -825,6 +1114,8 @@ class NicoleBackgroundWorker:
             "uptime_seconds": (datetime.utcnow() - self.job_stats['start_time']).total_seconds(),
             "jobs_scheduled": len(self.scheduler.get_jobs()),
             "job_statistics": self.job_stats,
+            "job_metrics": self.job_metrics,
+            "ledger_owner": self.ledger.owner,
             "next_runs": [
                 {
                     "job": job.id,
@@ -871,8 +1162,13 @@ async def start_worker():
         logger.error("Failed to initialize services, exiting...")
         sys.exit(1)
 
-    # Start scheduler (jobs already scheduled in __init__)
+    # Schedule jobs and start the scheduler
+    worker._schedule_all_jobs()
     worker.scheduler.start()
+
+    caught_up = await worker.catch_up_missed_runs()
+    if caught_up:
+        logger.info(f"Catching up {caught_up} missed job runs")
     logger.info("Background worker started successfully")
 
     # Keep the worker running
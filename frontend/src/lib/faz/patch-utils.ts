@@ -0,0 +1,107 @@
+/**
+ * Faz Code Patch Utilities
+ *
+ * Applies the unified diffs the backend broadcasts for modified files
+ * (difflib.unified_diff output, "\ No newline at end of file" markers
+ * included) and hashes content to check a patch's base_hash.
+ */
+
+const HUNK_HEADER = /^@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@/;
+
+/**
+ * Split text into lines, keeping each line's trailing newline.
+ */
+function splitLines(text: string): string[] {
+  return text.match(/[^\n]*\n|[^\n]+$/g) ?? [];
+}
+
+function stripNewline(line: string): string {
+  return line.endsWith('\n') ? line.slice(0, -1) : line;
+}
+
+/**
+ * Apply a unified diff to the content it was made against.
+ *
+ * Every context and removed line must match exactly; nothing is fuzzed.
+ *
+ * @param original - Content the patch was generated from
+ * @param patch - Unified diff text
+ * @returns Patched content, or null if the patch doesn't apply
+ */
+export function applyUnifiedPatch(original: string, patch: string): string | null {
+  const source = splitLines(original);
+  const lines = splitLines(patch);
+  const output: string[] = [];
+  let position = 0;
+
+  // Skip the ---/+++ file headers
+  let i = 0;
+  while (i < lines.length && !lines[i].startsWith('@@')) i++;
+
+  while (i < lines.length) {
+    const header = HUNK_HEADER.exec(lines[i]);
+    if (!header) return null;
+    i++;
+
+    // An empty old range names the line it follows, not the first line
+    const start = parseInt(header[1], 10) - (header[2] === '0' ? 0 : 1);
+    if (start < position || start > source.length) return null;
+    output.push(...source.slice(position, start));
+    position = start;
+
+    const removed: string[] = [];
+    const added: string[] = [];
+    while (i < lines.length && !lines[i].startsWith('@@')) {
+      const line = lines[i];
+      const body = line.slice(1);
+      switch (line[0]) {
+        case ' ':
+          removed.push(body);
+          added.push(body);
+          break;
+        case '-':
+          removed.push(body);
+          break;
+        case '+':
+          added.push(body);
+          break;
+        case '\\': {
+          // The previous line has no trailing newline
+          const previous = lines[i - 1]?.[0];
+          if (previous !== '+' && removed.length) {
+            removed[removed.length - 1] = stripNewline(removed[removed.length - 1]);
+          }
+          if (previous !== '-' && added.length) {
+            added[added.length - 1] = stripNewline(added[added.length - 1]);
+          }
+          break;
+        }
+        default:
+          return null;
+      }
+      i++;
+    }
+
+    for (const line of removed) {
+      if (source[position] !== line) return null;
+      position++;
+    }
+    output.push(...added);
+  }
+
+  output.push(...source.slice(position));
+  return output.join('');
+}
+
+/**
+ * SHA-256 of a string's UTF-8 bytes as hex (matches the backend's base_hash).
+ *
+ * @returns Hex digest, or null where Web Crypto is unavailable (insecure context)
+ */
+export async function sha256Hex(text: string): Promise<string | null> {
+  if (typeof crypto === 'undefined' || !crypto.subtle) {
+    return null;
+  }
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(text));
+  return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+}
@@ -5,7 +5,8 @@
  * - Agent activity updates
  * - Chat messages
  * - Project status changes
- * - File generation events
+ * - File generation events (modified files arrive as patches, see
+ *   applyFileEvent)
  * 
  * Includes authentication via query parameter token.
  */
@@ -14,6 +15,7 @@ import { useFazStore } from './store';
 import { API_URL } from '@/lib/alphawave_config';
 import { getAuthToken } from '@/lib/alphawave_utils';
 import type { FazActivity } from '@/types/faz';
+import { applyUnifiedPatch, sha256Hex } from './patch-utils';
 
 interface WebSocketMessage {
   type: string;
@@ -105,6 +107,8 @@ class FazWebSocket {
   private reconnectTimer: NodeJS.Timeout | null = null;
   private pingInterval: NodeJS.Timeout | null = null;
   private authenticated = false;
+  // Per-path chain so file events apply in arrival order despite async hashing
+  private fileUpdates = new Map<string, Promise<void>>();
   
   /**
    * Connect to WebSocket for a specific project
@@ -328,20 +332,8 @@ class FazWebSocket {
         
       case 'file':
         // Handle file updates for live preview
-        if (data.path && data.content) {
-          store.addFile({
-            file_id: data.file_id as number,
-            path: data.path as string,
-            filename: (data.path as string).split('/').pop() || '',
-            content: data.content as string,
-            extension: (data.path as string).split('.').pop() || '',
-            file_type: normalizeFileType(data.file_type),
-            line_count: (data.content as string).split('\n').length,
-            generated_by: data.agent as string,
-            version: 1,
-            status: 'generated',
-            created_at: data.timestamp as string,
-          });
+        if (typeof data.path === 'string' && data.path) {
+          this.queueFileUpdate(data.path, () => this.applyFileEvent(data));
         }
         break;
         
@@ -364,6 +356,61 @@ class FazWebSocket {
     }
   }
   
+  /**
+   * Run a file update after any still pending for the same path
+   */
+  private queueFileUpdate(path: string, update: () => Promise<void>) {
+    const previous = this.fileUpdates.get(path) ?? Promise.resolve();
+    const next = previous
+      .then(update)
+      .catch((e) => console.error('[Faz WS] Failed to apply file update:', path, e));
+    this.fileUpdates.set(path, next);
+    next.then(() => {
+      if (this.fileUpdates.get(path) === next) {
+        this.fileUpdates.delete(path);
+      }
+    });
+  }
+  
+  /**
+   * Store a file event's content. Modified files usually carry only a
+   * unified diff ("patch") against "base_hash"; it is applied when the
+   * local copy matches that base, otherwise the full file is requested.
+   */
+  private async applyFileEvent(data: WebSocketMessage) {
+    const path = data.path as string;
+    let content = typeof data.content === 'string' ? data.content : null;
+    
+    if (content === null && typeof data.patch === 'string') {
+      const current = useFazStore.getState().files.find((f) => f.path === path);
+      if (current && (await sha256Hex(current.content)) === data.base_hash) {
+        content = applyUnifiedPatch(current.content, data.patch);
+      }
+      if (content === null) {
+        // Missed or reordered event (or no Web Crypto): resync this file
+        this.send({ type: 'get_file', path });
+        return;
+      }
+    }
+    if (content === null) {
+      return;
+    }
+    
+    useFazStore.getState().addFile({
+      file_id: data.file_id as number,
+      path,
+      filename: path.split('/').pop() || '',
+      content,
+      extension: path.split('.').pop() || '',
+      file_type: normalizeFileType(data.file_type),
+      line_count: content.split('\n').length,
+      generated_by: data.agent as string,
+      version: toNumber(data.version, 1),
+      status: 'generated',
+      created_at: data.timestamp as string,
+    });
+  }
+  
   /**
    * Start ping interval for keep-alive
    */